@@ -0,0 +1,124 @@
+"""add search keys and substring search indexes
+
+Revision ID: 003
+Revises: 702ac61ac000
+Create Date: 2026-01-15
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '702ac61ac000'
+branch_labels = None
+depends_on = None
+
+
+# search_key を構成する列（app/services/search_service.py と同じ定義）
+SEARCH_SOURCES = {
+    'cases': ('case_number',),
+    'customers': ('customer_code', 'customer_name', 'customer_name_en'),
+    'products': ('product_code', 'product_name', 'product_name_en'),
+}
+
+BATCH_SIZE = 1000
+
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def _normalize(value):
+    if not value:
+        return ""
+    normalized = unicodedata.normalize("NFKC", value).lower()
+    normalized = normalized.translate(_KATAKANA_TO_HIRAGANA)
+    return " ".join(normalized.split())
+
+
+def _backfill(bind, table_name, fields):
+    """search_key をIDの昇順にバッチで埋める（途中で中断しても再実行できる）"""
+    columns = ", ".join(("id",) + fields)
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                f"SELECT {columns} FROM {table_name} "
+                f"WHERE id > :last_id AND search_key IS NULL ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            parts = [_normalize(value) for value in row[1:]]
+            params.append({"id": row[0], "search_key": "\n".join(p for p in parts if p)})
+        bind.execute(
+            sa.text(f"UPDATE {table_name} SET search_key = :search_key WHERE id = :id"),
+            params,
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    inspector = sa.inspect(bind)
+    for table_name, fields in SEARCH_SOURCES.items():
+        # アプリ起動時（ensure_search_index）に列が追加済みの場合がある
+        existing = {column['name'] for column in inspector.get_columns(table_name)}
+        if 'search_key' not in existing:
+            op.add_column(table_name, sa.Column('search_key', sa.Text(), nullable=True, comment='検索キー（正規化済みの検索対象列）'))
+        _backfill(bind, table_name, fields)
+
+    if bind.dialect.name == 'postgresql':
+        # pg_trgm の GINインデックスで LIKE '%kw%' をインデックス検索にする
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table_name in SEARCH_SOURCES:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_key_trgm "
+                f"ON {table_name} USING gin (search_key gin_trgm_ops)"
+            )
+
+    elif bind.dialect.name == 'sqlite':
+        # FTS5（trigram）の外部コンテンツテーブルと同期トリガー
+        for table_name in SEARCH_SOURCES:
+            fts = f"{table_name}_search"
+            op.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"search_key, content='{table_name}', content_rowid='id', tokenize='trigram')"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+                f"INSERT INTO {fts}(rowid, search_key) VALUES (new.id, new.search_key); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, search_key) VALUES ('delete', old.id, old.search_key); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF search_key ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, search_key) VALUES ('delete', old.id, old.search_key); "
+                f"INSERT INTO {fts}(rowid, search_key) VALUES (new.id, new.search_key); END"
+            )
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    for table_name in SEARCH_SOURCES:
+        if bind.dialect.name == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table_name}_search_key_trgm")
+        elif bind.dialect.name == 'sqlite':
+            fts = f"{table_name}_search"
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
+
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('search_key')
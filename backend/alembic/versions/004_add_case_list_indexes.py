@@ -0,0 +1,53 @@
+"""add composite indexes for case list filters and sorts
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-01-20
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+# 案件一覧のフィルタ・ソート用インデックス（app/models/case.py と同じ定義）
+CASE_INDEXES = {
+    'ix_cases_customer_id': ['customer_id'],
+    'ix_cases_product_id': ['product_id'],
+    'ix_cases_status_created_at': ['status', 'created_at', 'id'],
+    'ix_cases_trade_type_shipment_date': ['trade_type', 'shipment_date', 'id'],
+    'ix_cases_created_at': ['created_at', 'id'],
+    'ix_cases_updated_at': ['updated_at', 'id'],
+    'ix_cases_shipment_date': ['shipment_date', 'id'],
+    'ix_cases_sales_amount': ['sales_amount', 'id'],
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        # 稼働中の書き込みをブロックしないよう CONCURRENTLY で作成する（トランザクション外で実行）
+        with op.get_context().autocommit_block():
+            for name, columns in CASE_INDEXES.items():
+                op.create_index(name, 'cases', columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, columns in CASE_INDEXES.items():
+            op.create_index(name, 'cases', columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name in CASE_INDEXES:
+                op.drop_index(name, table_name='cases', if_exists=True, postgresql_concurrently=True)
+    else:
+        for name in CASE_INDEXES:
+            op.drop_index(name, table_name='cases', if_exists=True)
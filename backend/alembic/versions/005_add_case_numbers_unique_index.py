@@ -0,0 +1,28 @@
+"""add unique index on case_numbers (year, trade_type)
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-02-03
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+# 採番サービスが (年, 区分) の行を同時に作成した場合に一意制約違反で検出するためのインデックス
+# （app/models/case_number.py と同じ定義）
+INDEX_NAME = 'uq_case_numbers_year_trade_type'
+
+
+def upgrade() -> None:
+    op.create_index(INDEX_NAME, 'case_numbers', ['year', 'trade_type'], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name='case_numbers', if_exists=True)
@@ -0,0 +1,99 @@
+"""add indexed case_number_snapshot column to change_history
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-02-10
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+# 案件番号による絞り込み・ソート用のインデックス（app/models/change_history.py と同じ定義）
+INDEX_NAME = 'ix_change_history_case_number_snapshot'
+
+BATCH_SIZE = 1000
+
+
+def _case_number(change_type, changes_json, field_name, old_value, new_value):
+    """changes_json / field_name から履歴時点の案件番号を取り出す（app/services/change_history_service.py と同じ規則）"""
+    if isinstance(changes_json, str):
+        try:
+            changes_json = json.loads(changes_json)
+        except ValueError:
+            changes_json = None
+
+    if isinstance(changes_json, dict):
+        snapshot = changes_json.get('_case_number_snapshot')
+        if isinstance(snapshot, str) and snapshot:
+            return snapshot
+
+        data = changes_json.get('case_number')
+        if isinstance(data, dict):
+            if change_type == 'DELETE':
+                case_number = data.get('old') or data.get('new')
+            else:
+                case_number = data.get('new') or data.get('old')
+            if case_number:
+                return case_number
+        elif isinstance(data, str) and data:
+            return data
+
+    if field_name == 'case_number':
+        return new_value or old_value
+    return None
+
+
+def _backfill(bind):
+    """case_number_snapshot をIDの昇順にバッチで埋める（バッチごとにコミットするため、中断しても再実行で続きから埋める）"""
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, change_type, changes_json, field_name, old_value, new_value FROM change_history "
+                "WHERE id > :last_id AND case_number_snapshot IS NULL ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            case_number = _case_number(*row[1:])
+            if case_number:
+                params.append({"id": row[0], "snapshot": case_number[:50]})
+        if params:
+            bind.execute(
+                sa.text("UPDATE change_history SET case_number_snapshot = :snapshot WHERE id = :id"),
+                params,
+            )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # アプリ起動時（ensure_case_number_snapshots）に列が追加済みの場合がある
+    existing = {column['name'] for column in sa.inspect(bind).get_columns('change_history')}
+    if 'case_number_snapshot' not in existing:
+        op.add_column('change_history', sa.Column('case_number_snapshot', sa.String(length=50), nullable=True, comment='案件番号スナップショット'))
+
+    with op.get_context().autocommit_block():
+        _backfill(bind)
+
+    op.create_index(INDEX_NAME, 'change_history', ['case_number_snapshot', 'id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name='change_history', if_exists=True)
+    op.drop_column('change_history', 'case_number_snapshot')
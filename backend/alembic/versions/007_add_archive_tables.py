@@ -0,0 +1,100 @@
+"""add archive tables for cases and change history
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-02-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # アプリ起動時（create_all）にテーブルが作成済みの場合がある
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'cases_archive' not in existing:
+        _create_cases_archive()
+    if 'change_history_archive' not in existing:
+        _create_change_history_archive()
+
+    op.create_index('ix_cases_archive_case_number', 'cases_archive', ['case_number'], unique=True, if_not_exists=True)
+    op.create_index('ix_cases_archive_customer_id', 'cases_archive', ['customer_id'], if_not_exists=True)
+    op.create_index('ix_cases_archive_product_id', 'cases_archive', ['product_id'], if_not_exists=True)
+    op.create_index('ix_cases_archive_status_created_at', 'cases_archive', ['status', 'created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_cases_archive_created_at', 'cases_archive', ['created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_change_history_archive_id', 'change_history_archive', ['id'], if_not_exists=True)
+    op.create_index('ix_change_history_archive_case_id', 'change_history_archive', ['case_id'], if_not_exists=True)
+    op.create_index('ix_change_history_archive_changed_at', 'change_history_archive', ['changed_at'], if_not_exists=True)
+    op.create_index(
+        'ix_change_history_archive_case_number_snapshot', 'change_history_archive',
+        ['case_number_snapshot', 'id'], if_not_exists=True,
+    )
+
+
+# 列は cases / change_history と同じ名前・型にそろえる（app/models/archive.py と同じ定義）
+def _create_cases_archive() -> None:
+    op.create_table(
+        'cases_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('case_number', sa.String(length=20), nullable=False, comment='案件番号'),
+        sa.Column('trade_type', sa.String(length=10), nullable=False, comment='区分（輸出/輸入）'),
+        sa.Column('customer_id', sa.Integer(), nullable=False, comment='顧客ID'),
+        sa.Column('supplier_name', sa.String(length=100), nullable=True, comment='仕入先名'),
+        sa.Column('product_id', sa.Integer(), nullable=False, comment='商品ID'),
+        sa.Column('quantity', sa.Numeric(precision=15, scale=3), nullable=False, comment='数量'),
+        sa.Column('unit', sa.String(length=10), nullable=False, comment='単位'),
+        sa.Column('sales_unit_price', sa.Numeric(precision=15, scale=2), nullable=False, comment='販売単価'),
+        sa.Column('purchase_unit_price', sa.Numeric(precision=15, scale=2), nullable=False, comment='仕入単価'),
+        sa.Column('sales_amount', sa.Numeric(precision=15, scale=2), nullable=True, comment='売上額（計算値）'),
+        sa.Column('gross_profit', sa.Numeric(precision=15, scale=2), nullable=True, comment='粗利額（計算値）'),
+        sa.Column('gross_profit_rate', sa.Numeric(precision=5, scale=2), nullable=True, comment='粗利率%（計算値）'),
+        sa.Column('shipment_date', sa.Date(), nullable=True, comment='船積予定日'),
+        sa.Column('status', sa.String(length=20), nullable=False, comment='ステータス（完了/キャンセル）'),
+        sa.Column('pic', sa.String(length=50), nullable=False, comment='担当者名'),
+        sa.Column('notes', sa.Text(), nullable=True, comment='備考'),
+        sa.Column('search_key', sa.Text(), nullable=True, comment='検索キー（正規化済みの検索対象列）'),
+        sa.Column('created_by', sa.Integer(), nullable=True, comment='作成者ID'),
+        sa.Column('updated_by', sa.Integer(), nullable=True, comment='更新者ID'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='アーカイブ日時'),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def _create_change_history_archive() -> None:
+    op.create_table(
+        'change_history_archive',
+        sa.Column('archive_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('id', sa.Integer(), nullable=False, comment='変更履歴ID（アーカイブ前のID）'),
+        sa.Column('case_id', sa.Integer(), nullable=True, comment='案件ID'),
+        sa.Column('changed_by', sa.Integer(), nullable=True, comment='変更者ID'),
+        sa.Column('change_type', sa.String(length=20), nullable=False, comment='変更タイプ（CREATE/UPDATE/DELETE）'),
+        sa.Column('field_name', sa.String(length=50), nullable=True, comment='変更フィールド名'),
+        sa.Column('old_value', sa.Text(), nullable=True, comment='変更前の値'),
+        sa.Column('new_value', sa.Text(), nullable=True, comment='変更後の値'),
+        sa.Column('case_number_snapshot', sa.String(length=50), nullable=True, comment='案件番号スナップショット'),
+        sa.Column('changes_json', sa.JSON(), nullable=True, comment='変更詳細（JSON）'),
+        sa.Column('notes', sa.Text(), nullable=True, comment='備考'),
+        sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='アーカイブ日時'),
+        sa.ForeignKeyConstraint(['changed_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('archive_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('change_history_archive')
+    op.drop_table('cases_archive')
@@ -0,0 +1,49 @@
+"""add case_checkpoints table for point-in-time case state
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-02-24
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # アプリ起動時（create_all）にテーブルが作成済みの場合がある
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    # 列は app/models/case_checkpoint.py と同じ定義
+    if 'case_checkpoints' not in existing:
+        op.create_table(
+            'case_checkpoints',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('case_id', sa.Integer(), nullable=False, comment='案件ID'),
+            sa.Column('history_id', sa.Integer(), nullable=False, comment='最後に反映した変更履歴ID'),
+            sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False, comment='最後に反映した変更履歴の変更日時'),
+            sa.Column('sequence', sa.Integer(), nullable=False, comment='反映した変更履歴の件数'),
+            sa.Column('state', sa.JSON(), nullable=False, comment='案件の全項目（項目名と値）'),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    op.create_index('ix_case_checkpoints_id', 'case_checkpoints', ['id'], if_not_exists=True)
+    op.create_index(
+        'ix_case_checkpoints_case_id_changed_at', 'case_checkpoints',
+        ['case_id', 'changed_at', 'history_id'], if_not_exists=True,
+    )
+    op.create_index(
+        'uq_case_checkpoints_case_id_history_id', 'case_checkpoints',
+        ['case_id', 'history_id'], unique=True, if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('case_checkpoints')
@@ -0,0 +1,57 @@
+"""add change_history_fields table for field-level history queries
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-03-03
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # アプリ起動時（create_all）にテーブルが作成済みの場合がある
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    # 列は app/models/change_history_field.py と同じ定義
+    # 既存の変更履歴の項目別の行は、アプリ起動時（ensure_change_history_fields）に補完する
+    if 'change_history_fields' not in existing:
+        op.create_table(
+            'change_history_fields',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('history_id', sa.Integer(), nullable=False, comment='変更履歴ID'),
+            sa.Column('case_id', sa.Integer(), nullable=True, comment='案件ID'),
+            sa.Column('changed_by', sa.Integer(), nullable=True, comment='変更者ID'),
+            sa.Column('change_type', sa.String(length=20), nullable=False, comment='変更タイプ（CREATE/UPDATE/DELETE）'),
+            sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False, comment='変更日時'),
+            sa.Column('field_name', sa.String(length=50), nullable=False, comment='変更フィールド名'),
+            sa.Column('old_value', sa.Text(), nullable=True, comment='変更前の値'),
+            sa.Column('new_value', sa.Text(), nullable=True, comment='変更後の値'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    op.create_index('ix_change_history_fields_id', 'change_history_fields', ['id'], if_not_exists=True)
+    op.create_index('ix_change_history_fields_history_id', 'change_history_fields', ['history_id'], if_not_exists=True)
+    op.create_index(
+        'ix_change_history_fields_field_changed_at', 'change_history_fields',
+        ['field_name', 'changed_at', 'id'], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_change_history_fields_case_field', 'change_history_fields',
+        ['case_id', 'field_name', 'changed_at'], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_change_history_fields_changed_by', 'change_history_fields',
+        ['changed_by', 'changed_at'], if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('change_history_fields')
@@ -0,0 +1,41 @@
+"""add (status, id) index for case list sorting by status
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-03-10
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+# 一覧のステータス順ソート（キーセットページングの (ステータス, id)）用（app/models/case.py と同じ定義）
+INDEX_NAME = 'ix_cases_status_id'
+INDEX_COLUMNS = ['status', 'id']
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        # 稼働中の書き込みをブロックしないよう CONCURRENTLY で作成する（トランザクション外で実行）
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX_NAME, 'cases', INDEX_COLUMNS, unique=False, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        op.create_index(INDEX_NAME, 'cases', INDEX_COLUMNS, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(INDEX_NAME, table_name='cases', if_exists=True, postgresql_concurrently=True)
+    else:
+        op.drop_index(INDEX_NAME, table_name='cases', if_exists=True)
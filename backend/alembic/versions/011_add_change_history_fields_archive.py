@@ -0,0 +1,60 @@
+"""add change_history_fields_archive table for archived field-level history
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-03-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # アプリ起動時（create_all）にテーブルが作成済みの場合がある
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    # 列は app/models/archive.py（ChangeHistoryFieldArchive）と同じ定義
+    # アーカイブ済みの変更履歴の項目別の行は、アプリ起動時（ensure_change_history_fields）に補完する
+    if 'change_history_fields_archive' not in existing:
+        op.create_table(
+            'change_history_fields_archive',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('history_id', sa.Integer(), nullable=False, comment='変更履歴ID（アーカイブ前のID）'),
+            sa.Column('case_id', sa.Integer(), nullable=True, comment='案件ID'),
+            sa.Column('changed_by', sa.Integer(), nullable=True, comment='変更者ID'),
+            sa.Column('change_type', sa.String(length=20), nullable=False, comment='変更タイプ（CREATE/UPDATE/DELETE）'),
+            sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False, comment='変更日時'),
+            sa.Column('field_name', sa.String(length=50), nullable=False, comment='変更フィールド名'),
+            sa.Column('old_value', sa.Text(), nullable=True, comment='変更前の値'),
+            sa.Column('new_value', sa.Text(), nullable=True, comment='変更後の値'),
+            sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='アーカイブ日時'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    op.create_index(
+        'ix_change_history_fields_archive_history_id', 'change_history_fields_archive',
+        ['history_id'], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_change_history_fields_archive_field_changed_at', 'change_history_fields_archive',
+        ['field_name', 'changed_at', 'id'], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_change_history_fields_archive_case_field', 'change_history_fields_archive',
+        ['case_id', 'field_name', 'changed_at'], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_change_history_fields_archive_changed_by', 'change_history_fields_archive',
+        ['changed_by', 'changed_at'], if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('change_history_fields_archive')
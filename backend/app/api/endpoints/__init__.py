@@ -1,6 +1,6 @@
 """
 APIエンドポイントパッケージ
 """
-from . import auth, cases, case_numbers, customers, products, analytics, documents, change_history, backups
+from . import auth, cases, case_numbers, customers, products, analytics, documents, change_history, backups, exports
 
-__all__ = ["auth", "cases", "case_numbers", "customers", "products", "analytics", "documents", "change_history", "backups"]
+__all__ = ["auth", "cases", "case_numbers", "customers", "products", "analytics", "documents", "change_history", "backups", "exports"]
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from ...core.config import settings
 from ...core.deps import get_db, get_current_active_user
+from ...core.executors import run_blocking
 from ...core.security import verify_password, create_access_token
 from ...models.user import User as UserModel
 from ...schemas.auth import LoginResponse, Token
@@ -39,7 +40,8 @@ async def login(
     user = db.query(UserModel).filter(UserModel.username == form_data.username).first()
 
     # ユーザーが存在しない、またはパスワードが一致しない場合
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # （bcryptの照合は重いため、イベントループを止めないようスレッドプールで実行する）
+    if not user or not await run_blocking("password_hash", verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="ユーザー名またはパスワードが正しくありません",
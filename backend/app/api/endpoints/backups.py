@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
 from ...core.deps import get_db, get_current_active_user, get_current_superuser
+from ...core.pagination import KeysetPaginator
 from ...models.backup import Backup as BackupModel
 from ...models.user import User as UserModel
 from ...schemas.backup import (
@@ -31,6 +32,7 @@ def to_jst(dt):
         dt = dt.replace(tzinfo=timezone.utc)
 
     return dt.astimezone(JST)
+from ...core.executors import run_blocking
 from ...services.backup_service import (
     create_backup,
     restore_backup,
@@ -66,7 +68,10 @@ async def create_backup_endpoint(
         HTTPException: バックアップ作成に失敗した場合
     """
     try:
-        backup_record, backup_path = create_backup(
+        # ファイルのコピーはイベントループを止めないようバックアップ用のスレッドプールで実行する
+        backup_record, backup_path = await run_blocking(
+            "backups",
+            create_backup,
             db=db,
             backup_name=backup_data.backup_name,
             backup_type=backup_data.backup_type,
@@ -86,6 +91,7 @@ async def get_backups(
     current_user: UserModel = Depends(get_current_active_user),
     page: int = Query(1, ge=1, description="ページ番号"),
     page_size: int = Query(50, ge=1, le=100, description="1ページあたりの件数"),
+    cursor: Optional[str] = Query(None, description="次ページのカーソル（指定時はpageより優先）"),
     backup_type: Optional[str] = Query(None, description="バックアップタイプフィルタ"),
     status: Optional[str] = Query(None, description="ステータスフィルタ"),
     sort_by: Optional[str] = Query("created_at", description="ソート項目"),
@@ -99,6 +105,7 @@ async def get_backups(
         current_user: 現在のユーザー
         page: ページ番号
         page_size: 1ページあたりの件数
+        cursor: 前ページのレスポンスで返された next_cursor
         backup_type: バックアップタイプフィルタ
         status: ステータスフィルタ
         sort_by: ソート項目
@@ -127,16 +134,18 @@ async def get_backups(
     # 総件数を取得
     total = query.count()
 
-    # ソート
+    # ソート（同値の行はIDで順序を確定させる）
     sort_column = getattr(BackupModel, sort_by, BackupModel.created_at)
-    if sort_order and sort_order.lower() == "asc":
-        query = query.order_by(sort_column.asc())
-    else:
-        query = query.order_by(sort_column.desc())
+    descending = not (sort_order and sort_order.lower() == "asc")
+    paginator = KeysetPaginator(sort_column, BackupModel.id, descending)
+    query = paginator.order(query)
 
-    # ページネーション
-    offset = (page - 1) * page_size
-    backups = query.offset(offset).limit(page_size).all()
+    # ページネーション（カーソル指定時はキーセット、それ以外はオフセット）
+    if cursor:
+        query = paginator.seek(query, cursor)
+    else:
+        query = query.offset((page - 1) * page_size)
+    backups, next_cursor = paginator.fetch(query, page_size)
 
     # 総ページ数を計算
     total_pages = (total + page_size - 1) // page_size
@@ -164,7 +173,8 @@ async def get_backups(
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
@@ -234,7 +244,7 @@ async def restore_backup_endpoint(
         HTTPException: バックアップが見つからない、復元に失敗した場合
     """
     try:
-        success = restore_backup(db=db, backup_id=backup_id)
+        success = await run_blocking("backups", restore_backup, db=db, backup_id=backup_id)
         if success:
             return {
                 "message": "バックアップから復元が完了しました",
@@ -312,7 +322,7 @@ async def cleanup_backups(
     Returns:
         dict: 削除結果
     """
-    deleted_count = cleanup_old_backups(db=db, days=days)
+    deleted_count = await run_blocking("backups", cleanup_old_backups, db=db, days=days)
     return {
         "message": f"{deleted_count}件のバックアップを削除しました",
         "deleted_count": deleted_count
@@ -340,7 +350,7 @@ async def run_scheduled_backup_endpoint(
             "executed": False
         }
 
-    backup_name = run_scheduled_backup(db)
+    backup_name = await run_blocking("backups", run_scheduled_backup, db)
     if backup_name:
         return {
             "message": f"スケジュールバックアップが作成されました: {backup_name}",
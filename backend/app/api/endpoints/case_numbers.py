@@ -10,6 +10,7 @@ from ...core.deps import get_db, get_current_user
 from ...models.case_number import CaseNumber
 from ...models.user import User
 from ...schemas import case_number as case_number_schema
+from ...services.case_number_allocator import case_number_allocator, format_case_number, trade_type_code
 
 
 router = APIRouter()
@@ -27,59 +28,27 @@ def generate_case_number(
     形式: YYYY-XX-NNN
     - YYYY: 年
     - XX: 区分コード (EX=輸出, IM=輸入)
-    - NNN: 連番 (001-999)
+    - NNN: 連番（桁数は CASE_NUMBER_SEQUENCE_WIDTH、既定は 001-999）
     
     例: 2025-EX-001
     """
     # 現在の年を取得
     current_year = datetime.now().year
-    
-    # 区分コードを取得
-    trade_type_code = "EX" if request.trade_type == "輸出" else "IM"
-    
-    # 該当年・区分の案件番号管理レコードを取得（ロック）
-    case_number_record = db.query(CaseNumber).filter(
-        and_(
-            CaseNumber.year == current_year,
-            CaseNumber.trade_type == request.trade_type
-        )
-    ).with_for_update().first()
-    
-    if case_number_record:
-        # レコードが存在する場合、連番をインクリメント
-        case_number_record.last_sequence += 1
-        sequence = case_number_record.last_sequence
-    else:
-        # レコードが存在しない場合、新規作成
-        sequence = 1
-        case_number_record = CaseNumber(
-            year=current_year,
-            trade_type=request.trade_type,
-            trade_type_code=trade_type_code,
-            last_sequence=sequence
-        )
-        db.add(case_number_record)
-    
-    # 連番が999を超えた場合はエラー
-    if sequence > 999:
-        db.rollback()
+
+    # 採番サービスで連番を1件採番（別トランザクションで確定済み）
+    try:
+        sequence = case_number_allocator.allocate_sequences(db, request.trade_type, year=current_year)[0]
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{current_year}年の{request.trade_type}案件番号の連番が上限(999)に達しました"
+            detail=str(e)
         )
-    
-    # 案件番号を生成
-    case_number = CaseNumber.generate_case_number(current_year, request.trade_type, sequence)
-    
-    # コミット
-    db.commit()
-    db.refresh(case_number_record)
-    
+
     return case_number_schema.CaseNumberGenerateResponse(
-        case_number=case_number,
+        case_number=format_case_number(current_year, request.trade_type, sequence),
         year=current_year,
         trade_type=request.trade_type,
-        trade_type_code=trade_type_code,
+        trade_type_code=trade_type_code(request.trade_type),
         sequence=sequence
     )
 
@@ -92,6 +61,8 @@ def get_current_sequence(
 ):
     """
     現在の連番を取得
+
+    CASE_NUMBER_BLOCK_SIZE が2以上の場合は、各プロセスが予約済みの連番も含む。
     """
     current_year = datetime.now().year
     
@@ -2,12 +2,16 @@
 案件APIエンドポイント
 """
 from typing import Any, Optional
-from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from sqlalchemy import and_, case as sql_case, func, insert, literal, select
 
-from ...core.deps import get_db, get_current_active_user
+from ...core.deps import get_async_db, get_db, get_current_active_user
+from ...core.pagination import KeysetPaginator
+from ...core.write_queue import run_write, single_writer_enabled
+from ...models.archive import CaseArchive
 from ...models.case import Case as CaseModel
 from ...models.user import User as UserModel
 from ...models.customer import Customer as CustomerModel
@@ -17,150 +21,299 @@ from ...schemas.case import (
     CaseCreate,
     CaseUpdate,
     CaseListResponse,
-    CaseListItem
+    CaseListItem,
+    CaseBulkCreate,
+    CaseBulkCreateItem,
+    CaseBulkCreateResponse,
+    CaseBulkUpdate,
+    CaseBulkResult,
+    CaseBulkUpdateResponse,
+    CaseBulkDelete,
+    CaseBulkDeleteResponse,
+    CaseStateAsOf,
+    CASE_BULK_UPDATE_MAX_ITEMS
 )
-from ...services.change_history_service import record_change_history
-from .websocket import notify_case_updated
+from ...services.change_history_service import (
+    build_change_history,
+    insert_change_histories,
+    record_change_history,
+)
+from ...services.archive_service import adapt_columns, case_source
+from ...services.case_state_service import reconstruct_case_state
+from ...services.case_number_allocator import case_number_allocator
+from ...services.search_service import build_search_key, case_search_condition
+from ...services.count_cache import (
+    TOTAL_MODE_EXACT,
+    TOTAL_MODE_PATTERN,
+    resolve_total,
+    total_pages_for,
+)
+from ...services.master_data_cache import master_data_cache
+from ...services.etag_service import (
+    compute_etag,
+    is_not_modified,
+    not_modified_response,
+    set_etag_headers,
+    table_state,
+)
+from .websocket import notify_case_updated, notify_cases_updated
 from copy import deepcopy
 
 router = APIRouter()
 
+# 一覧のソートに指定できる項目（いずれもソート列を先頭に持つインデックスがある列）
+CASE_SORT_COLUMNS = {
+    "created_at": CaseModel.created_at,
+    "updated_at": CaseModel.updated_at,
+    "case_number": CaseModel.case_number,
+    "shipment_date": CaseModel.shipment_date,
+    "sales_amount": CaseModel.sales_amount,
+    "status": CaseModel.status,
+}
+CASE_SORT_PATTERN = "^(" + "|".join(CASE_SORT_COLUMNS) + ")$"
+
+# 一覧で取得する列（CaseListItem のフィールドと同じ名前）
+# エンティティを組み立てずに行として取得し、そのままレスポンスに詰める
+CASE_LIST_COLUMNS = (
+    CaseModel.id,
+    CaseModel.case_number,
+    CaseModel.trade_type,
+    CaseModel.customer_id,
+    CustomerModel.customer_name,
+    CaseModel.product_id,
+    ProductModel.product_name,
+    CaseModel.quantity,
+    CaseModel.unit,
+    CaseModel.sales_amount,
+    CaseModel.gross_profit,
+    CaseModel.gross_profit_rate,
+    CaseModel.status,
+    CaseModel.pic,
+    CaseModel.shipment_date,
+    CaseModel.created_at,
+    CaseModel.updated_at,
+)
+
+
+def build_case_filters(
+    db: Session,
+    search: Optional[str] = None,
+    trade_type: Optional[str] = None,
+    status: Optional[str] = None,
+    pic: Optional[str] = None,
+    shipment_date_from: Optional[date] = None,
+    shipment_date_to: Optional[date] = None,
+    model=CaseModel,
+) -> list:
+    """
+    案件一覧のフィルタ条件を生成する（一覧APIとエクスポートで共通）
+
+    Args:
+        db: データベースセッション
+        search: 検索キーワード（案件番号、顧客名、商品名）
+        trade_type: 区分フィルタ
+        status: ステータスフィルタ
+        pic: 担当者フィルタ
+        shipment_date_from: 船積予定日（開始）
+        shipment_date_to: 船積予定日（終了）
+        model: 案件の読み取り元（case_source の戻り値）
+
+    Returns:
+        list: フィルタ条件のリスト
+    """
+    filters = []
+
+    if search:
+        # 検索キーワードで案件番号、顧客名、商品名を検索（検索インデックスを利用）
+        search_filter = case_search_condition(db, search, model)
+        if search_filter is not None:
+            filters.append(search_filter)
+
+    if trade_type:
+        filters.append(model.trade_type == trade_type)
+
+    if status:
+        filters.append(model.status == status)
+
+    if pic:
+        filters.append(model.pic.ilike(f"%{pic}%"))
+
+    # 船積予定日のフィルタリング
+    if shipment_date_from:
+        filters.append(model.shipment_date >= shipment_date_from)
+    if shipment_date_to:
+        filters.append(model.shipment_date <= shipment_date_to)
+
+    return filters
+
 
 @router.get("", response_model=CaseListResponse)
 async def get_cases(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
     page: int = Query(1, ge=1, description="ページ番号"),
     page_size: int = Query(50, ge=1, le=100, description="1ページあたりの件数"),
+    cursor: Optional[str] = Query(None, description="次ページのカーソル（指定時はpageより優先）"),
     search: Optional[str] = Query(None, description="検索キーワード（案件番号、顧客名、商品名）"),
     trade_type: Optional[str] = Query(None, description="区分フィルタ"),
     status: Optional[str] = Query(None, description="ステータスフィルタ"),
     pic: Optional[str] = Query(None, description="担当者フィルタ"),
     shipment_date_from: Optional[date] = Query(None, description="船積予定日（開始）"),
     shipment_date_to: Optional[date] = Query(None, description="船積予定日（終了）"),
-    sort_by: Optional[str] = Query("created_at", description="ソート項目"),
+    sort_by: Optional[str] = Query("created_at", pattern=CASE_SORT_PATTERN, description="ソート項目"),
     sort_order: Optional[str] = Query("desc", description="ソート順（asc/desc）"),
+    total_mode: str = Query(TOTAL_MODE_EXACT, alias="total", pattern=TOTAL_MODE_PATTERN, description="総件数の取得方法（exact/estimate/none）"),
+    include_archived: bool = Query(False, description="アーカイブ済みの案件も含める"),
 ) -> Any:
     """
     案件一覧を取得（ページネーション、フィルタリング、検索対応）
 
+    一覧の内容から弱いETagを計算し、If-None-Match が一致する場合は
+    一覧を取得せずに304を返す。
+
     Args:
-        db: データベースセッション
+        request: リクエスト（If-None-Match の参照用）
+        db: 非同期データベースセッション
         current_user: 現在のユーザー
         page: ページ番号
         page_size: 1ページあたりの件数
+        cursor: 前ページのレスポンスで返された next_cursor
         search: 検索キーワード
         trade_type: 区分フィルタ
         status: ステータスフィルタ
         pic: 担当者フィルタ
         shipment_date_from: 船積予定日（開始）
         shipment_date_to: 船積予定日（終了）
-        sort_by: ソート項目
+        sort_by: ソート項目（CASE_SORT_COLUMNS のいずれか）
         sort_order: ソート順
+        total_mode: 総件数の取得方法
+            exact: 正確な件数（フィルタ条件ごとにキャッシュ）
+            estimate: PostgreSQLのプランナ統計による推定値
+            none: 取得しない（total/total_pagesはnull）
+        include_archived: アーカイブ済みの案件も含める（既定は案件テーブルのみ）
 
     Returns:
         CaseListResponse: 案件一覧とページネーション情報
     """
-    # ベースクエリ
-    query = db.query(CaseModel).options(
-        joinedload(CaseModel.customer),
-        joinedload(CaseModel.product)
-    )
-
-    # フィルタリング
-    filters = []
-
-    if search:
-        # 検索キーワードで案件番号、顧客名、商品名を検索
-        search_filter = or_(
-            CaseModel.case_number.ilike(f"%{search}%"),
-            CustomerModel.customer_name.ilike(f"%{search}%"),
-            ProductModel.product_name.ilike(f"%{search}%")
+    # 一覧の組み立ては総件数キャッシュ・キーセットページング・検索インデックスなど
+    # エクスポートと共通の同期ヘルパーを使うため、非同期セッション上で同期的に実行する
+    def build_response(sync_db: Session) -> Response:
+        # ベースクエリ（アーカイブを含める場合は案件テーブルとアーカイブの UNION ALL）
+        source = case_source(include_archived)
+        query = sync_db.query(source)
+
+        # フィルタリング
+        filters = build_case_filters(
+            sync_db,
+            search=search,
+            trade_type=trade_type,
+            status=status,
+            pic=pic,
+            shipment_date_from=shipment_date_from,
+            shipment_date_to=shipment_date_to,
+            model=source,
+        )
+        if filters:
+            query = query.filter(and_(*filters))
+
+        filter_params = {
+            "search": search,
+            "trade_type": trade_type,
+            "status": status,
+            "pic": pic,
+            "shipment_date_from": shipment_date_from,
+            "shipment_date_to": shipment_date_to,
+            "include_archived": include_archived or None,
+        }
+
+        # 条件付きGET（一覧に顧客名・商品名を含むため、顧客・商品の変更も反映する）
+        # 件数は数えず、書き込みバージョン・updated_at の最大値・キャッシュ済みの件数から計算する
+        etag_params = {
+            **filter_params,
+            "page": page,
+            "page_size": page_size,
+            "cursor": cursor,
+            "sort_by": sort_by,
+            "sort_order": sort_order,
+            "total": total_mode,
+        }
+        state = table_state(
+            sync_db,
+            [CaseModel, CustomerModel, ProductModel],
+            tables=[CaseArchive.__tablename__] if include_archived else [],
+        )
+        etag = compute_etag(etag_params, state, "cases", filter_params)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        # 総件数を取得（アーカイブへの移動は案件テーブルの書き込みとして無効化される）
+        total = resolve_total(
+            query,
+            total_mode,
+            scope="cases",
+            filters=filter_params,
+            depends_on=("cases", "customers", "products"),
+        )
+        # 件数をキャッシュした場合は、次のリクエストと同じETagを返す
+        etag = compute_etag(etag_params, state, "cases", filter_params)
+
+        # 一覧に必要な列だけを取得する（顧客名・商品名は外部結合で取得）
+        query = (
+            query.with_entities(*adapt_columns(CASE_LIST_COLUMNS, source))
+            .outerjoin(CustomerModel, source.customer_id == CustomerModel.id)
+            .outerjoin(ProductModel, source.product_id == ProductModel.id)
         )
-        query = query.join(CustomerModel).join(ProductModel)
-        filters.append(search_filter)
-
-    if trade_type:
-        filters.append(CaseModel.trade_type == trade_type)
-
-    if status:
-        filters.append(CaseModel.status == status)
-
-    if pic:
-        filters.append(CaseModel.pic.ilike(f"%{pic}%"))
-
-    # 船積予定日のフィルタリング
-    if shipment_date_from:
-        filters.append(CaseModel.shipment_date >= shipment_date_from)
-    if shipment_date_to:
-        filters.append(CaseModel.shipment_date <= shipment_date_to)
-
-    if filters:
-        query = query.filter(and_(*filters))
-
-    # 総件数を取得
-    total = query.count()
-
-    # ソート
-    sort_column = getattr(CaseModel, sort_by, CaseModel.created_at)
-    if sort_order and sort_order.lower() == "asc":
-        query = query.order_by(sort_column.asc())
-    else:
-        query = query.order_by(sort_column.desc())
-
-    # ページネーション
-    offset = (page - 1) * page_size
-    cases = query.offset(offset).limit(page_size).all()
 
-    # 総ページ数を計算
-    total_pages = (total + page_size - 1) // page_size
+        # ソート（同値の行はIDで順序を確定させる）
+        sort_column = getattr(source, CASE_SORT_COLUMNS.get(sort_by, CaseModel.created_at).key)
+        descending = not (sort_order and sort_order.lower() == "asc")
+        paginator = KeysetPaginator(sort_column, source.id, descending)
+        query = paginator.order(query)
 
-    # レスポンス用にデータを整形
-    items = []
-    for case in cases:
-        item = CaseListItem(
-            id=case.id,
-            case_number=case.case_number,
-            trade_type=case.trade_type,
-            customer_id=case.customer_id,
-            customer_name=case.customer.customer_name if case.customer else None,
-            product_id=case.product_id,
-            product_name=case.product.product_name if case.product else None,
-            quantity=case.quantity,
-            unit=case.unit,
-            sales_amount=case.sales_amount,
-            gross_profit=case.gross_profit,
-            gross_profit_rate=case.gross_profit_rate,
-            status=case.status,
-            pic=case.pic,
-            shipment_date=case.shipment_date,
-            created_at=case.created_at,
-            updated_at=case.updated_at,
+        # ページネーション（カーソル指定時はキーセット、それ以外はオフセット）
+        if cursor:
+            query = paginator.seek(query, cursor)
+        else:
+            query = query.offset((page - 1) * page_size)
+        rows, next_cursor = paginator.fetch(query, page_size)
+
+        # 総ページ数を計算
+        total_pages = total_pages_for(total, page_size)
+
+        # 行の値はDBの列型どおりのため、検証を省略してそのままシリアライズする
+        # （response_model による再検証も行われないよう Response で返す）
+        items = [CaseListItem.model_construct(**row._mapping) for row in rows]
+        response = CaseListResponse.model_construct(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
-        items.append(item)
-
-    return CaseListResponse(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+        result = Response(content=response.model_dump_json(), media_type="application/json")
+        set_etag_headers(result, etag)
+        return result
+
+    return await db.run_sync(build_response)
 
 
 @router.get("/{case_id}", response_model=Case)
 async def get_case(
     case_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
+    include_archived: bool = Query(False, description="アーカイブ済みの案件も対象にする"),
 ) -> Any:
     """
     案件詳細を取得
 
     Args:
         case_id: 案件ID
-        db: データベースセッション
+        db: 非同期データベースセッション
         current_user: 現在のユーザー
+        include_archived: アーカイブ済みの案件も対象にする
 
     Returns:
         Case: 案件詳細
@@ -168,10 +321,14 @@ async def get_case(
     Raises:
         HTTPException: 案件が見つからない場合
     """
-    case = db.query(CaseModel).options(
-        joinedload(CaseModel.customer),
-        joinedload(CaseModel.product)
-    ).filter(CaseModel.id == case_id).first()
+    source = case_source(include_archived)
+    result = await db.execute(
+        select(source).options(
+            joinedload(source.customer),
+            joinedload(source.product)
+        ).where(source.id == case_id)
+    )
+    case = result.unique().scalar_one_or_none()
 
     if not case:
         raise HTTPException(
@@ -182,51 +339,59 @@ async def get_case(
     return case
 
 
-@router.post("", response_model=Case, status_code=status.HTTP_201_CREATED)
-async def create_case(
-    case_in: CaseCreate,
-    db: Session = Depends(get_db),
+@router.get("/{case_id}/as-of", response_model=CaseStateAsOf)
+async def get_case_as_of(
+    case_id: int,
+    ts: datetime = Query(..., description="日時（タイムゾーンを省略した場合は日本時間）"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
+    include_archived: bool = Query(False, description="アーカイブ済みの変更履歴も対象にする"),
 ) -> Any:
     """
-    新規案件を作成
+    指定日時の案件の状態を変更履歴から復元して取得
 
     Args:
-        case_in: 案件作成データ
-        db: データベースセッション
+        case_id: 案件ID
+        ts: 日時
+        db: 非同期データベースセッション
         current_user: 現在のユーザー
+        include_archived: アーカイブ済みの変更履歴も対象にする
 
     Returns:
-        Case: 作成された案件
+        CaseStateAsOf: 指定日時の案件の状態
 
     Raises:
-        HTTPException: 顧客または商品が存在しない、案件番号が重複している場合
+        HTTPException: 指定日時以前の変更履歴がない場合
     """
-    # 顧客の存在確認
-    import logging
-    logging.info(f"案件作成: customer_id={case_in.customer_id} で顧客を検索中")
-
-    customer = db.query(CustomerModel).filter(CustomerModel.id == case_in.customer_id).first()
-    if not customer:
-        # デバッグ用：存在する顧客IDの一覧を取得
-        all_customers = db.query(CustomerModel.id, CustomerModel.customer_name).all()
-        customer_ids = [c.id for c in all_customers]
-        logging.warning(f"顧客が見つかりません: 検索ID={case_in.customer_id}, 存在する顧客ID={customer_ids}")
+    result = await db.run_sync(
+        lambda sync_db: reconstruct_case_state(sync_db, case_id, ts, include_archived=include_archived)
+    )
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"指定された顧客が見つかりません（顧客ID: {case_in.customer_id}）"
+            detail="指定日時の案件の状態が見つかりません"
         )
 
-    logging.info(f"顧客が見つかりました: customer_id={customer.id}, customer_name={customer.customer_name}")
+    return result
 
-    # 商品の存在確認
-    product = db.query(ProductModel).filter(ProductModel.id == case_in.product_id).first()
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="指定された商品が見つかりません"
-        )
 
+def _insert_case(db: Session, case_in: CaseCreate, user_id: int) -> int:
+    """
+    案件番号を採番して案件を登録し、変更履歴を記録する（コミットは呼び出し側で行う）
+
+    案件番号の採番は採番サービスの短いトランザクションで行う（書き込みキューでは同じトランザクション）。
+
+    Args:
+        db: データベースセッション
+        case_in: 案件作成データ
+        user_id: 作成者のユーザーID
+
+    Returns:
+        int: 作成した案件のID
+
+    Raises:
+        HTTPException: 案件番号が重複している、連番が上限に達した場合
+    """
     # 案件データを取得
     case_data = case_in.model_dump()
 
@@ -242,82 +407,100 @@ async def create_case(
                 detail="指定された案件番号は既に使用されています"
             )
     else:
-        # 案件番号が指定されていない場合、自動生成
-        from ...models.case_number import CaseNumber
-        from datetime import datetime
-        from sqlalchemy import and_
-
-        current_year = datetime.now().year
-        trade_type_code = "EX" if case_in.trade_type == "輸出" else "IM"
-
-        # 該当年・区分の案件番号管理レコードを取得（ロック）
-        case_number_record = db.query(CaseNumber).filter(
-            and_(
-                CaseNumber.year == current_year,
-                CaseNumber.trade_type == case_in.trade_type
-            )
-        ).with_for_update().first()
-
-        if case_number_record:
-            # レコードが存在する場合、連番をインクリメント
-            case_number_record.last_sequence += 1
-            sequence = case_number_record.last_sequence
-        else:
-            # レコードが存在しない場合、新規作成
-            sequence = 1
-            case_number_record = CaseNumber(
-                year=current_year,
-                trade_type=case_in.trade_type,
-                trade_type_code=trade_type_code,
-                last_sequence=sequence
-            )
-            db.add(case_number_record)
-
-        # 連番が999を超えた場合はエラー
-        if sequence > 999:
+        # 案件番号が指定されていない場合、採番サービスで自動生成
+        # （書き込みキューでは書き込みが直列化済みのため、同じトランザクション内で採番する）
+        try:
+            case_data['case_number'] = case_number_allocator.allocate(
+                db, case_in.trade_type, in_transaction=single_writer_enabled()
+            )[0]
+        except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"{current_year}年の{case_in.trade_type}案件番号の連番が上限(999)に達しました"
+                detail=str(e)
             )
 
-        # 案件番号を生成して設定
-        case_number = CaseNumber.generate_case_number(current_year, case_in.trade_type, sequence)
-        case_data['case_number'] = case_number
-
     # 案件を作成
     case = CaseModel(**case_data)
-    case.created_by = current_user.id
-    case.updated_by = current_user.id
+    case.created_by = user_id
+    case.updated_by = user_id
 
     # 金額を計算
     case.calculate_amounts()
 
     db.add(case)
-    db.commit()
-    db.refresh(case)
+    db.flush()
 
     # 変更履歴を記録
     try:
-        record_change_history(
-            db=db,
-            case_id=case.id,
-            change_type="CREATE",
-            changed_by=current_user.id,
-            new_case=case,
-            case_number_snapshot=case.case_number
-        )
-        db.commit()
+        with db.begin_nested():
+            record_change_history(
+                db=db,
+                case_id=case.id,
+                change_type="CREATE",
+                changed_by=user_id,
+                new_case=case,
+                case_number_snapshot=case.case_number
+            )
     except Exception as e:
         # 変更履歴記録エラーは警告のみ（案件作成は成功）
         import logging
-        db.rollback()
         logging.warning(f"変更履歴の記録に失敗しました: {str(e)}")
 
+    return case.id
+
+
+@router.post("", response_model=Case, status_code=status.HTTP_201_CREATED)
+async def create_case(
+    case_in: CaseCreate,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    新規案件を作成
+
+    Args:
+        case_in: 案件作成データ
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        Case: 作成された案件
+
+    Raises:
+        HTTPException: 顧客または商品が存在しない、案件番号が重複している場合
+    """
+    # 顧客の存在確認
+    import logging
+    logging.info(f"案件作成: customer_id={case_in.customer_id} で顧客を検索中")
+
+    customer = master_data_cache.get(db, "customers", case_in.customer_id)
+    if not customer:
+        # デバッグ用：存在する顧客IDの一覧を取得
+        customer_ids = [c.id for c in master_data_cache.all(db, "customers")]
+        logging.warning(f"顧客が見つかりません: 検索ID={case_in.customer_id}, 存在する顧客ID={customer_ids}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"指定された顧客が見つかりません（顧客ID: {case_in.customer_id}）"
+        )
+
+    logging.info(f"顧客が見つかりました: customer_id={customer.id}, customer_name={customer.customer_name}")
+
+    # 商品の存在確認
+    product = master_data_cache.get(db, "products", case_in.product_id)
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="指定された商品が見つかりません"
+        )
+
+    # 採番・登録・変更履歴の記録（書き込みキューが有効な場合は書き込みスレッドで順に実行）
+    case_id = await run_write(db, _insert_case, case_in, current_user.id)
+
     # リレーションを読み込んで返す
     case = db.query(CaseModel).options(
         joinedload(CaseModel.customer),
         joinedload(CaseModel.product)
-    ).filter(CaseModel.id == case.id).first()
+    ).filter(CaseModel.id == case_id).first()
 
     # WebSocket通知を送信（全ユーザーに送信）
     try:
@@ -329,24 +512,154 @@ async def create_case(
     return case
 
 
-@router.put("/{case_id}", response_model=Case)
-async def update_case(
-    case_id: int,
-    case_in: CaseUpdate,
+@router.post("/bulk", response_model=CaseBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_cases_bulk(
+    bulk_in: CaseBulkCreate,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
-    案件を更新
+    案件を一括作成
+
+    顧客・商品の存在確認はそれぞれ1回のクエリで行い、案件番号は区分ごとに
+    まとめて採番する。案件と変更履歴はexecutemanyで挿入し、1回のコミットで確定する。
+    いずれかの案件が不正な場合は1件も作成しない。
 
     Args:
-        case_id: 案件ID
-        case_in: 案件更新データ
+        bulk_in: 案件一括作成データ
         db: データベースセッション
         current_user: 現在のユーザー
 
     Returns:
-        Case: 更新された案件
+        CaseBulkCreateResponse: 作成された案件のIDと案件番号（リクエストと同じ順序）
+
+    Raises:
+        HTTPException: 顧客または商品が存在しない、案件番号が重複している場合
+    """
+    import logging
+    from datetime import datetime
+
+    items = bulk_in.items
+
+    # 顧客・商品の存在確認（まとめて1回ずつ）
+    customer_ids = {item.customer_id for item in items}
+    found_customer_ids = master_data_cache.existing_ids(db, "customers", customer_ids)
+    missing_customer_ids = sorted(customer_ids - found_customer_ids)
+    if missing_customer_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"指定された顧客が見つかりません（顧客ID: {', '.join(map(str, missing_customer_ids))}）"
+        )
+
+    product_ids = {item.product_id for item in items}
+    found_product_ids = master_data_cache.existing_ids(db, "products", product_ids)
+    missing_product_ids = sorted(product_ids - found_product_ids)
+    if missing_product_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"指定された商品が見つかりません（商品ID: {', '.join(map(str, missing_product_ids))}）"
+        )
+
+    # 指定された案件番号の重複確認（リクエスト内・既存案件）
+    requested_numbers = [item.case_number for item in items if item.case_number]
+    if len(requested_numbers) != len(set(requested_numbers)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="リクエスト内で案件番号が重複しています"
+        )
+    if requested_numbers:
+        used_numbers = sorted(db.scalars(
+            select(CaseModel.case_number).where(CaseModel.case_number.in_(requested_numbers))
+        ))
+        if used_numbers:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"指定された案件番号は既に使用されています（{', '.join(used_numbers)}）"
+            )
+
+    try:
+        # 案件番号が未指定の案件を区分ごとにまとめて採番
+        current_year = datetime.now().year
+        reserved = {}
+        for trade_type in sorted({item.trade_type for item in items if not item.case_number}):
+            count = sum(1 for item in items if not item.case_number and item.trade_type == trade_type)
+            try:
+                reserved[trade_type] = iter(
+                    case_number_allocator.allocate(db, trade_type, count, year=current_year)
+                )
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+
+        # 案件を組み立て（金額計算・検索キーはORMのイベントを通らないためここで設定）
+        cases = []
+        for item in items:
+            case = CaseModel(**item.model_dump())
+            if not case.case_number:
+                case.case_number = next(reserved[item.trade_type])
+            case.created_by = current_user.id
+            case.updated_by = current_user.id
+            case.calculate_amounts()
+            case.search_key = build_search_key(case)
+            cases.append(case)
+
+        columns = [
+            column.key for column in CaseModel.__table__.columns
+            if column.key not in ("id", "created_at", "updated_at")
+        ]
+        case_ids = db.scalars(
+            insert(CaseModel).returning(CaseModel.id, sort_by_parameter_order=True),
+            [{column: getattr(case, column) for column in columns} for case in cases],
+        ).all()
+
+        # 変更履歴をまとめて記録
+        histories = []
+        for case, case_id in zip(cases, case_ids):
+            case.id = case_id
+            histories.append(build_change_history(
+                case_id=case_id,
+                change_type="CREATE",
+                changed_by=current_user.id,
+                new_case=case,
+                case_number_snapshot=case.case_number
+            ))
+        insert_change_histories(db, histories)
+
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logging.error(f"案件の一括作成に失敗しました: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"案件の一括作成に失敗しました: {str(e)}"
+        )
+
+    # WebSocket通知を1件にまとめて送信
+    try:
+        await notify_cases_updated(list(case_ids), "created", user_id=None)
+    except Exception as e:
+        logging.warning(f"WebSocket通知の送信に失敗しました: {str(e)}")
+
+    return CaseBulkCreateResponse(
+        created=len(cases),
+        items=[CaseBulkCreateItem(id=case.id, case_number=case.case_number) for case in cases]
+    )
+
+
+def _apply_case_update(db: Session, case_id: int, case_in: CaseUpdate, user_id: int) -> None:
+    """
+    案件に変更を適用し、変更履歴を記録する（コミットは呼び出し側で行う）
+
+    Args:
+        db: データベースセッション
+        case_id: 案件ID
+        case_in: 案件更新データ
+        user_id: 更新者のユーザーID
 
     Raises:
         HTTPException: 案件が見つからない、顧客または商品が存在しない場合
@@ -378,8 +691,7 @@ async def update_case(
 
     # 顧客IDが変更される場合、顧客の存在確認
     if case_in.customer_id is not None and case_in.customer_id != case.customer_id:
-        customer = db.query(CustomerModel).filter(CustomerModel.id == case_in.customer_id).first()
-        if not customer:
+        if not master_data_cache.get(db, "customers", case_in.customer_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="指定された顧客が見つかりません"
@@ -387,8 +699,7 @@ async def update_case(
 
     # 商品IDが変更される場合、商品の存在確認
     if case_in.product_id is not None and case_in.product_id != case.product_id:
-        product = db.query(ProductModel).filter(ProductModel.id == case_in.product_id).first()
-        if not product:
+        if not master_data_cache.get(db, "products", case_in.product_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="指定された商品が見つかりません"
@@ -404,37 +715,61 @@ async def update_case(
             changes[field] = {'old': old_value, 'new': new_value}
         setattr(case, field, new_value)
 
-    case.updated_by = current_user.id
+    case.updated_by = user_id
 
     # 金額を再計算
     case.calculate_amounts()
 
-    db.commit()
-    db.refresh(case)
+    db.flush()
 
     # 変更履歴を記録
     if changes:
         try:
-            record_change_history(
-                db=db,
-                case_id=case.id,
-                change_type="UPDATE",
-                changed_by=current_user.id,
-                changes=changes,
-                case_number_snapshot=case.case_number
-            )
-            db.commit()
+            with db.begin_nested():
+                record_change_history(
+                    db=db,
+                    case_id=case.id,
+                    change_type="UPDATE",
+                    changed_by=user_id,
+                    changes=changes,
+                    case_number_snapshot=case.case_number
+                )
         except Exception as e:
             # 変更履歴記録エラーは警告のみ（案件更新は成功）
             import logging
-            db.rollback()
             logging.warning(f"変更履歴の記録に失敗しました: {str(e)}")
 
+
+@router.put("/{case_id}", response_model=Case)
+async def update_case(
+    case_id: int,
+    case_in: CaseUpdate,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    案件を更新
+
+    Args:
+        case_id: 案件ID
+        case_in: 案件更新データ
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        Case: 更新された案件
+
+    Raises:
+        HTTPException: 案件が見つからない、顧客または商品が存在しない場合
+    """
+    # 変更の適用・変更履歴の記録（書き込みキューが有効な場合は書き込みスレッドで順に実行）
+    await run_write(db, _apply_case_update, case_id, case_in, current_user.id)
+
     # リレーションを読み込んで返す
     case = db.query(CaseModel).options(
         joinedload(CaseModel.customer),
         joinedload(CaseModel.product)
-    ).filter(CaseModel.id == case.id).first()
+    ).filter(CaseModel.id == case_id).first()
 
     # WebSocket通知を送信（全ユーザーに送信）
     try:
@@ -446,190 +781,351 @@ async def update_case(
     return case
 
 
-@router.delete("/{case_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_case(
-    case_id: int,
+# 一括更新で NULL を指定できるフィールド
+CASE_NULLABLE_FIELDS = {"supplier_name", "shipment_date", "notes"}
+
+# 変更されると金額の再計算が必要なフィールド
+CASE_AMOUNT_FIELDS = {"quantity", "sales_unit_price", "purchase_unit_price"}
+
+
+def _amount_values(patch_data: dict) -> dict:
+    """
+    金額（売上額・粗利額・粗利率）を更新後の数量・単価からSQLで再計算する式
+
+    UPDATE の SET 句では列は更新前の値を指すため、パッチで指定された値は
+    リテラルとして、指定されていない値は列として式に組み込む。
+    """
+    quantity = literal(patch_data["quantity"]) if "quantity" in patch_data else CaseModel.quantity
+    sales_price = literal(patch_data["sales_unit_price"]) if "sales_unit_price" in patch_data else CaseModel.sales_unit_price
+    purchase_price = literal(patch_data["purchase_unit_price"]) if "purchase_unit_price" in patch_data else CaseModel.purchase_unit_price
+
+    sales_amount = quantity * sales_price
+    gross_profit = sales_amount - quantity * purchase_price
+    return {
+        "sales_amount": sales_amount,
+        "gross_profit": gross_profit,
+        "gross_profit_rate": sql_case((sales_amount > 0, gross_profit * 100 / sales_amount), else_=0),
+    }
+
+
+@router.patch("/bulk", response_model=CaseBulkUpdateResponse)
+async def update_cases_bulk(
+    bulk_in: CaseBulkUpdate,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user),
-) -> None:
+) -> Any:
     """
-    案件を削除
+    案件を一括更新（IDのリストまたはフィルタ条件で対象を指定）
+
+    対象の変更前の値を1回のクエリで取得（行ロック）し、値が変わる案件だけを
+    1回のUPDATEで更新する。数量・単価を変更する場合、金額はSQLで再計算する。
+    変更履歴はexecutemanyでまとめて記録し、1回のコミットで確定する。
 
     Args:
-        case_id: 案件ID
+        bulk_in: 案件一括更新データ
         db: データベースセッション
         current_user: 現在のユーザー
 
+    Returns:
+        CaseBulkUpdateResponse: 更新件数と案件ごとの結果
+
     Raises:
-        HTTPException: 案件が見つからない場合
+        HTTPException: 更新内容が不正、顧客または商品が存在しない、対象が多すぎる場合
     """
-    # 案件を取得
-    case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
-    if not case:
+    import logging
+
+    patch_data = bulk_in.patch.model_dump(exclude_unset=True)
+    if not patch_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="更新内容が指定されていません"
+        )
+
+    null_fields = sorted(field for field, value in patch_data.items() if value is None and field not in CASE_NULLABLE_FIELDS)
+    if null_fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"次のフィールドは空にできません: {', '.join(null_fields)}"
+        )
+
+    # 顧客・商品の存在確認
+    if "customer_id" in patch_data and not master_data_cache.get(db, "customers", patch_data["customer_id"]):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="案件が見つかりません"
+            detail="指定された顧客が見つかりません"
+        )
+    if "product_id" in patch_data and not master_data_cache.get(db, "products", patch_data["product_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="指定された商品が見つかりません"
         )
 
-    # 既に削除履歴が存在するかチェック（重複記録を防ぐ）
-    from ...models.change_history import ChangeHistory as ChangeHistoryModel
-    import logging
+    # 対象の条件
+    if bulk_in.ids is not None:
+        target_condition = CaseModel.id.in_(bulk_in.ids)
+    else:
+        filters = build_case_filters(db, **bulk_in.filter.model_dump())
+        if not filters:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="filter には1つ以上の条件を指定してください"
+            )
+        target_condition = and_(*filters)
+
+    try:
+        # 変更前の値を取得（同時に更新されないよう行をロック）
+        fields = list(patch_data)
+        current_rows = (
+            db.query(CaseModel.id, CaseModel.case_number, *[getattr(CaseModel, field) for field in fields])
+            .filter(target_condition)
+            .order_by(CaseModel.id)
+            .limit(CASE_BULK_UPDATE_MAX_ITEMS + 1)
+            .with_for_update()
+            .all()
+        )
+        if len(current_rows) > CASE_BULK_UPDATE_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"対象の案件が上限({CASE_BULK_UPDATE_MAX_ITEMS}件)を超えています。条件を絞り込んでください"
+            )
 
-    # 削除対象案件の情報をログに記録（デバッグ用）
-    logging.info(f"案件削除処理開始: case_id={case.id}, case_number={case.case_number}")
+        # 値が変わる案件と変更内容を収集
+        results = {}
+        histories = []
+        for row in current_rows:
+            changes = {}
+            for field in fields:
+                old_value = getattr(row, field)
+                if old_value != patch_data[field]:
+                    changes[field] = {'old': old_value, 'new': patch_data[field]}
+
+            if not changes:
+                results[row.id] = CaseBulkResult(id=row.id, result="unchanged", case_number=row.case_number)
+                continue
+
+            results[row.id] = CaseBulkResult(id=row.id, result="updated", case_number=row.case_number)
+            histories.append(build_change_history(
+                case_id=row.id,
+                change_type="UPDATE",
+                changed_by=current_user.id,
+                changes=changes,
+                case_number_snapshot=row.case_number
+            ))
+
+        updated_ids = [history.case_id for history in histories]
+        if updated_ids:
+            values = dict(patch_data)
+            values["updated_by"] = current_user.id
+            values["updated_at"] = func.now()
+            if CASE_AMOUNT_FIELDS & patch_data.keys():
+                values.update(_amount_values(patch_data))
 
-    existing_delete_history = db.query(ChangeHistoryModel).filter(
-        ChangeHistoryModel.case_id == case.id,
-        ChangeHistoryModel.change_type == "DELETE"
-    ).first()
+            db.query(CaseModel).filter(CaseModel.id.in_(updated_ids)).update(values, synchronize_session=False)
+            insert_change_histories(db, histories)
 
-    # 削除前に変更履歴を記録（まだ記録されていない場合のみ）
-    if not existing_delete_history:
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logging.error(f"案件の一括更新に失敗しました: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"案件の一括更新に失敗しました: {str(e)}"
+        )
+
+    # IDで指定された案件のうち見つからなかったもの
+    if bulk_in.ids is not None:
+        ordered_ids = list(dict.fromkeys(bulk_in.ids))
+    else:
+        ordered_ids = list(results)
+    response_results = [
+        results.get(case_id) or CaseBulkResult(id=case_id, result="not_found")
+        for case_id in ordered_ids
+    ]
+
+    # WebSocket通知を1件にまとめて送信
+    if updated_ids:
         try:
-            # 削除履歴を記録（case_idとcase_number_snapshotを明示的に設定）
-            logging.info(f"削除履歴を記録します: case_id={case.id}, case_number={case.case_number}")
-            delete_history = record_change_history(
-                db=db,
-                case_id=case.id,  # 削除前なのでcase_idは存在する
-                change_type="DELETE",
-                changed_by=current_user.id,
-                old_case=case,
-                case_number_snapshot=case.case_number  # 案件番号を明示的に保存
-            )
-            # 削除履歴を確実にコミット（案件削除とは別トランザクション）
-            db.commit()
-            # 記録された削除履歴の内容を確認（デバッグ用）
-            db.refresh(delete_history)
-            recorded_case_number = None
-            if delete_history.changes_json and isinstance(delete_history.changes_json, dict):
-                recorded_case_number = delete_history.changes_json.get("_case_number_snapshot")
-            logging.info(f"削除履歴を記録しました: history_id={delete_history.id}, case_id={delete_history.case_id}, recorded_case_number={recorded_case_number}")
+            await notify_cases_updated(updated_ids, "updated", user_id=None)
         except Exception as e:
-            # 変更履歴記録エラーはロールバックして警告を記録
-            db.rollback()
-            import traceback
-            error_traceback = traceback.format_exc()
-            logging.error(f"削除履歴の記録に失敗しました: case_id={case.id}, error={str(e)}\n{error_traceback}")
-            # 削除履歴の記録に失敗しても案件削除は続行（警告のみ）
-
-    # 案件を削除
-    # PostgreSQLでは外部キー制約が有効のため、削除前にchange_historyのcase_idをNULLに設定
+            logging.warning(f"WebSocket通知の送信に失敗しました: {str(e)}")
+
+    return CaseBulkUpdateResponse(updated=len(updated_ids), results=response_results)
+
+
+def _delete_cases(db: Session, case_ids: list, changed_by: Optional[int]) -> list:
+    """
+    案件を削除する（変更履歴の記録・参照の解除・削除を1トランザクションで行う）
+
+    対象の件数によらず発行するSQLは一定（取得・DELETE履歴確認・履歴挿入・
+    履歴の参照解除・ドキュメント削除・案件削除）で、最後に1回だけコミットする。
+
+    - 削除履歴（DELETE）は削除前の内容と案件番号スナップショットを残し、case_idを保持する
+    - それ以外の変更履歴は案件削除後も残すため、case_idをNULLにする
+    - ドキュメントは案件と一緒に削除する
+
+    Args:
+        db: データベースセッション
+        case_ids: 削除する案件ID
+        changed_by: 削除者ID
+
+    Returns:
+        list: 削除した案件（存在しなかったIDは含まない）
+    """
+    from ...models.change_history import ChangeHistory as ChangeHistoryModel
+    from ...models.document import Document as DocumentModel
+
+    cases = (
+        db.query(CaseModel)
+        .filter(CaseModel.id.in_(case_ids))
+        .order_by(CaseModel.id)
+        .with_for_update()
+        .all()
+    )
+    if not cases:
+        return []
+
+    ids = [case.id for case in cases]
+
+    # 削除履歴を記録（既に記録済みの案件は除く）
+    recorded_ids = set(db.scalars(
+        select(ChangeHistoryModel.case_id).where(
+            ChangeHistoryModel.case_id.in_(ids),
+            ChangeHistoryModel.change_type == "DELETE"
+        )
+    ))
+    # 削除履歴は case_id を保持したまま残すため、遅延書き込みにせず同じトランザクションで挿入する
+    insert_change_histories(db, [
+        build_change_history(
+            case_id=case.id,
+            change_type="DELETE",
+            changed_by=changed_by,
+            old_case=case,
+            case_number_snapshot=case.case_number
+        )
+        for case in cases
+        if case.id not in recorded_ids
+    ], allow_buffered=False)
+
+    # 削除履歴以外の変更履歴の参照を解除（外部キー制約のため削除前に行う）
+    db.query(ChangeHistoryModel).filter(
+        ChangeHistoryModel.case_id.in_(ids),
+        ChangeHistoryModel.change_type != "DELETE"
+    ).update({"case_id": None}, synchronize_session=False)
+
+    db.query(DocumentModel).filter(DocumentModel.case_id.in_(ids)).delete(synchronize_session=False)
+    db.query(CaseModel).filter(CaseModel.id.in_(ids)).delete(synchronize_session=False)
+
+    for case in cases:
+        db.expunge(case)
+
+    return cases
+
+
+def _delete_error(e: Exception) -> HTTPException:
+    """削除失敗時のエラーレスポンス"""
     import logging
-    import traceback
     from ...core.config import settings
 
+    error_detail = str(e)
+    error_type = type(e).__name__
+    logging.error(f"案件削除エラー [type={error_type}]: {error_detail}")
+
+    error_message = "案件の削除に失敗しました"
+    if "FOREIGN KEY" in error_detail or "foreign key" in error_detail.lower():
+        error_message += ": 外部キー制約エラー - 関連するデータが存在するため削除できません"
+    elif "constraint" in error_detail.lower():
+        error_message += ": データベースの制約に違反しています"
+    else:
+        error_message += f": {error_detail}"
+
+    if settings.DEBUG:
+        error_message += f" (エラータイプ: {error_type})"
+
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=error_message
+    )
+
+
+@router.delete("/bulk", response_model=CaseBulkDeleteResponse)
+async def delete_cases_bulk(
+    bulk_in: CaseBulkDelete,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    案件を一括削除
+
+    件数によらず一定回数のSQLで削除し、1回のコミットで確定する。
+
+    Args:
+        bulk_in: 案件一括削除データ
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        CaseBulkDeleteResponse: 削除件数と案件ごとの結果（リクエストと同じ順序）
+    """
+    import logging
+
     try:
-        # 削除前にリレーションシップを確認（デバッグ用）
-        logging.info(f"案件削除開始: case_id={case.id}, case_number={case.case_number}")
-
-        # 関連する変更履歴の数を確認
-        change_history_count = db.query(ChangeHistoryModel).filter(
-            ChangeHistoryModel.case_id == case.id
-        ).count()
-        logging.info(f"関連する変更履歴数: {change_history_count}")
-
-        # 関連するドキュメントの数を確認
-        from ...models.document import Document as DocumentModel
-        document_count = db.query(DocumentModel).filter(
-            DocumentModel.case_id == case.id
-        ).count()
-        logging.info(f"関連するドキュメント数: {document_count}")
-
-        # PostgreSQL用: 外部キー制約エラーを回避するため、削除処理を調整
-        # 削除前にchange_historyのcase_idをNULLに設定（スキーマが更新されている場合）
-        # スキーマが更新されていない場合でも、削除処理でエラーハンドリングを行う
-
-        from sqlalchemy import text
-        from sqlalchemy.exc import IntegrityError, OperationalError
-
-        # まず、change_historyのcase_idをNULLに設定を試みる（スキーマが更新されている場合）
-        # マイグレーションが実行されていない場合でも、エラーハンドリングで対応
-        # 重要: 削除履歴（DELETEタイプ）はcase_idをNULLにしない（履歴表示のため）
-        try:
-            # 削除履歴以外のchange_historyレコードのcase_idをNULLに設定
-            # 削除履歴はcase_idを保持して、案件番号スナップショットで識別する
-            update_result = db.execute(
-                text("UPDATE change_history SET case_id = NULL WHERE case_id = :case_id AND change_type != 'DELETE'"),
-                {"case_id": case.id}
-            )
-            db.commit()
-            logging.info(f"change_historyのcase_idをNULLに設定しました（削除履歴を除く）: case_id={case.id}, 更新件数={update_result.rowcount}")
-        except Exception as update_error:
-            # case_idがnullable=Falseの場合、NULLに設定できない
-            # この場合、削除処理でエラーハンドリングを行う
-            db.rollback()
-            error_str = str(update_error)
-            if "null value" in error_str.lower() or "NOT NULL" in error_str.upper():
-                logging.info(f"change_historyのcase_idをNULLに設定できません（マイグレーション未実行の可能性）。削除処理で対応します: case_id={case.id}")
-            else:
-                logging.warning(f"change_historyのcase_idをNULLに設定中にエラーが発生しました（続行）: {str(update_error)}")
-
-        # 案件を削除（リレーションシップは自動的に処理される）
-        # documentsはcascade="all, delete-orphan"で自動削除される
-        # change_historiesのcase_idは既にNULLに設定済み（またはスキーマが更新されていない）
-        try:
-            db.delete(case)
-            db.commit()
-            logging.info(f"案件削除成功: case_id={case.id}, 削除履歴は既に記録済み")
-        except (IntegrityError, OperationalError) as delete_error:
-            # 外部キー制約エラーの場合、change_historyレコードを削除して再試行
-            error_str = str(delete_error)
-            if "foreign key" in error_str.lower() or "FOREIGN KEY" in error_str or "constraint" in error_str.lower():
-                db.rollback()
-                logging.warning(f"外部キー制約エラーを検出。change_historyレコードを削除して再試行します: case_id={case.id}")
-
-                # change_historyのレコードを削除（履歴は失われるが、削除は可能）
-                # ただし、削除履歴（DELETEタイプ）は保持する（履歴表示のため）
-                try:
-                    # 削除履歴以外のchange_historyレコードを削除
-                    deleted_count = db.query(ChangeHistoryModel).filter(
-                        ChangeHistoryModel.case_id == case.id,
-                        ChangeHistoryModel.change_type != "DELETE"
-                    ).delete()
-                    db.commit()
-                    logging.info(f"change_historyレコードを削除しました（削除履歴を除く）: case_id={case.id}, 削除件数={deleted_count}")
-
-                    # 再度削除を試みる
-                    db.delete(case)
-                    db.commit()
-                    logging.info(f"案件削除成功（change_historyレコード削除後）: case_id={case.id}")
-                except Exception as retry_error:
-                    db.rollback()
-                    logging.error(f"change_historyレコード削除後の再試行に失敗しました: {str(retry_error)}")
-                    raise delete_error  # 元のエラーを再発生
-            else:
-                # その他のエラーの場合はそのまま再発生
-                raise
+        cases = _delete_cases(db, bulk_in.ids, current_user.id)
+        db.commit()
     except Exception as e:
         db.rollback()
-        error_detail = str(e)
-        error_traceback = traceback.format_exc()
-        error_type = type(e).__name__
-        logging.error(f"案件削除エラー [type={error_type}]: {error_detail}\n{error_traceback}")
-
-        # より詳細なエラーメッセージを返す
-        error_message = f"案件の削除に失敗しました"
-
-        # エラーの種類に応じた詳細メッセージ
-        if "FOREIGN KEY" in error_detail or "foreign key" in error_detail.lower():
-            error_message += ": 外部キー制約エラー - 関連するデータが存在するため削除できません"
-        elif "constraint" in error_detail.lower():
-            error_message += ": データベースの制約に違反しています"
-        elif "IntegrityError" in error_type:
-            error_message += ": データベースの整合性制約に違反しています"
-        elif "OperationalError" in error_type:
-            error_message += f": データベース操作エラー - {error_detail}"
-        else:
-            error_message += f": {error_detail}"
+        raise _delete_error(e)
 
-        # デバッグ用に詳細情報も含める（開発環境のみ）
-        if settings.DEBUG:
-            error_message += f" (エラータイプ: {error_type})"
+    deleted = {case.id: case.case_number for case in cases}
+    results = [
+        CaseBulkResult(id=case_id, result="deleted", case_number=deleted[case_id])
+        if case_id in deleted else CaseBulkResult(id=case_id, result="not_found")
+        for case_id in dict.fromkeys(bulk_in.ids)
+    ]
 
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=error_message
-        )
+    # WebSocket通知を1件にまとめて送信
+    if deleted:
+        try:
+            await notify_cases_updated(list(deleted), "deleted", user_id=None)
+        except Exception as e:
+            logging.warning(f"WebSocket通知の送信に失敗しました: {str(e)}")
+
+    return CaseBulkDeleteResponse(deleted=len(deleted), results=results)
+
+
+@router.delete("/{case_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_case(
+    case_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> None:
+    """
+    案件を削除
+
+    Args:
+        case_id: 案件ID
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Raises:
+        HTTPException: 案件が見つからない場合
+    """
+    try:
+        cases = _delete_cases(db, [case_id], current_user.id)
+        if not cases:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="案件が見つかりません"
+            )
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise _delete_error(e)
 
     # WebSocket通知を送信（全ユーザーに送信）
     try:
@@ -642,35 +1138,41 @@ async def delete_case(
 # 統計情報エンドポイント（オプション）
 @router.get("/stats/summary")
 async def get_cases_summary(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
+    include_archived: bool = Query(False, description="アーカイブ済みの案件も含める"),
 ) -> Any:
     """
     案件の統計情報を取得
 
     Args:
-        db: データベースセッション
+        db: 非同期データベースセッション
         current_user: 現在のユーザー
+        include_archived: アーカイブ済みの案件も含める
 
     Returns:
         dict: 統計情報
     """
-    from sqlalchemy import func
+    source = case_source(include_archived)
 
     # 総案件数
-    total_cases = db.query(func.count(CaseModel.id)).scalar()
+    total_cases = await db.scalar(select(func.count(source.id)))
 
     # ステータス別集計
-    status_counts = db.query(
-        CaseModel.status,
-        func.count(CaseModel.id).label('count')
-    ).group_by(CaseModel.status).all()
+    status_counts = (await db.execute(
+        select(
+            source.status,
+            func.count(source.id).label('count')
+        ).group_by(source.status)
+    )).all()
 
     # 区分別集計
-    trade_type_counts = db.query(
-        CaseModel.trade_type,
-        func.count(CaseModel.id).label('count')
-    ).group_by(CaseModel.trade_type).all()
+    trade_type_counts = (await db.execute(
+        select(
+            source.trade_type,
+            func.count(source.id).label('count')
+        ).group_by(source.trade_type)
+    )).all()
 
     return {
         "total_cases": total_cases,
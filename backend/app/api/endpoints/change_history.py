@@ -2,19 +2,31 @@
 変更履歴APIエンドポイント
 """
 from typing import Any, Optional
-from datetime import timezone, timedelta, datetime
+from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import and_, func, select
 
-from ...core.deps import get_db, get_current_active_user
-from ...models.change_history import ChangeHistory as ChangeHistoryModel
+from ...core.deps import get_async_db, get_current_active_user
+from ...core.pagination import KeysetPaginator
 from ...models.case import Case as CaseModel
+from ...models.change_history import ChangeHistory as ChangeHistoryModel
+from ...models.change_history_field import ChangeHistoryField as ChangeHistoryFieldModel
 from ...models.user import User as UserModel
+from ...services.archive_service import (
+    adapt_columns,
+    case_source,
+    change_history_field_source,
+    change_history_source,
+)
+from ...services.change_history_service import case_number_from_changes
 from ...schemas.change_history import (
     ChangeHistory,
     ChangeHistoryListResponse,
-    ChangeHistoryListItem
+    ChangeHistoryListItem,
+    ChangeHistoryFieldItem,
+    ChangeHistoryFieldListResponse,
 )
 
 router = APIRouter()
@@ -36,237 +48,377 @@ def to_jst(dt):
     return dt.astimezone(JST)
 
 
+def from_jst(dt):
+    """
+    検索条件の日時をUTCに変換して返す。
+    タイムゾーンのない日時は日本標準時（UTC+9）として扱う。
+    """
+    if dt is None:
+        return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=JST)
+
+    return dt.astimezone(timezone.utc)
+
+
 def resolve_case_number(history: ChangeHistoryModel) -> Optional[str]:
     """
     履歴ごとの案件番号を解決する。
     案件そのものを参照すると最新の番号に置き換わってしまうため、
-    changes_json に保存されたスナップショットを優先して利用する。
+    履歴時点のスナップショット（case_number_snapshot 列）を優先して利用する。
     """
-    case_number = None
-
-    if history.changes_json and isinstance(history.changes_json, dict):
-        snapshot = history.changes_json.get("_case_number_snapshot")
-        if isinstance(snapshot, str) and snapshot:
-            return snapshot
-
-    case_number_data = None
-    if history.changes_json and isinstance(history.changes_json, dict):
-        case_number_data = history.changes_json.get("case_number")
-
-    if isinstance(case_number_data, dict):
-        if history.change_type == "DELETE":
-            case_number = case_number_data.get("old") or case_number_data.get("new")
-        elif history.change_type == "CREATE":
-            case_number = case_number_data.get("new") or case_number_data.get("old")
-        else:
-            case_number = case_number_data.get("new") or case_number_data.get("old")
-    elif isinstance(case_number_data, str):
-        case_number = case_number_data
+    return (
+        history.case_number_snapshot
+        or case_number_from_changes(
+            history.change_type, history.changes_json, history.field_name, history.old_value, history.new_value
+        )
+        or f"ID:{history.case_id}"
+    )
 
-    # 単一フィールド変更時にfield_name/new_valueに入っている場合
-    if not case_number and history.field_name == "case_number":
-        case_number = history.new_value or history.old_value
 
-    if not case_number:
-        case_number = f"ID:{history.case_id}"
+def build_change_history_filters(
+    case_id: Optional[int] = None,
+    change_type: Optional[str] = None,
+    case_number: Optional[str] = None,
+    model=ChangeHistoryModel,
+) -> list:
+    """
+    変更履歴一覧のDB側フィルタ条件を生成する（一覧APIとエクスポートで共通）
 
-    return case_number
+    案件番号は履歴時点のスナップショット（case_number_snapshot 列）で部分一致判定する。
+    model には変更履歴の読み取り元（change_history_source の戻り値）を指定する。
+    """
+    filters = []
+
+    if case_id:
+        filters.append(model.case_id == case_id)
+
+    if change_type:
+        filters.append(model.change_type == change_type)
+
+    if case_number:
+        filters.append(
+            func.lower(model.case_number_snapshot).contains(case_number.lower(), autoescape=True)
+        )
+
+    return filters
+
+
+# 変更履歴一覧の列（変更者名は結合で取得する）
+CHANGE_HISTORY_LIST_COLUMNS = (
+    ChangeHistoryModel.id,
+    ChangeHistoryModel.case_id,
+    ChangeHistoryModel.changed_by,
+    UserModel.username.label("changed_by_name"),
+    ChangeHistoryModel.change_type,
+    ChangeHistoryModel.field_name,
+    ChangeHistoryModel.old_value,
+    ChangeHistoryModel.new_value,
+    ChangeHistoryModel.case_number_snapshot,
+    ChangeHistoryModel.changes_json,
+    ChangeHistoryModel.notes,
+    ChangeHistoryModel.changed_at,
+)
 
 
 @router.get("", response_model=ChangeHistoryListResponse)
 async def get_change_history(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
     page: int = Query(1, ge=1, description="ページ番号"),
     page_size: int = Query(50, ge=1, le=100, description="1ページあたりの件数"),
+    cursor: Optional[str] = Query(None, description="次ページのカーソル（指定時はpageより優先）"),
     case_id: Optional[int] = Query(None, description="案件IDフィルタ"),
     case_number: Optional[str] = Query(None, description="案件番号フィルタ（部分一致）"),
     change_type: Optional[str] = Query(None, description="変更タイプフィルタ（CREATE/UPDATE/DELETE）"),
     sort_by: Optional[str] = Query("changed_at", description="ソート項目"),
     sort_order: Optional[str] = Query("desc", description="ソート順（asc/desc）"),
+    include_archived: bool = Query(False, description="アーカイブ済みの変更履歴も含める"),
 ) -> Any:
     """
     変更履歴一覧を取得（ページネーション、フィルタリング対応）
 
+    案件番号によるフィルタ・ソートも含めてDB側で絞り込み・並べ替え・ページングする。
+
     Args:
-        db: データベースセッション
+        db: 非同期データベースセッション
         current_user: 現在のユーザー
         page: ページ番号
         page_size: 1ページあたりの件数
+        cursor: 前ページのレスポンスで返された next_cursor
         case_id: 案件IDフィルタ
+        case_number: 案件番号フィルタ（履歴時点の案件番号に部分一致）
         change_type: 変更タイプフィルタ
-        sort_by: ソート項目
+        sort_by: ソート項目（case_number は履歴時点の案件番号）
         sort_order: ソート順
+        include_archived: アーカイブ済みの変更履歴も含める（既定は変更履歴テーブルのみ）
 
     Returns:
         ChangeHistoryListResponse: 変更履歴一覧とページネーション情報
     """
-    # ベースクエリ（案件が削除されていても履歴は取得できる）
-    query = db.query(ChangeHistoryModel)
-
-    # フィルタリング（案件番号によるフィルタリングは後でPython側で行う）
-    filters = []
+    # 一覧の組み立てはエクスポートと共通の同期ヘルパー（キーセットページング）を
+    # 使うため、非同期セッション上で同期的に実行する
+    def build_response(sync_db: Session) -> ChangeHistoryListResponse:
+        # ベースクエリ（案件が削除されていても履歴は取得できる。
+        # アーカイブを含める場合は変更履歴テーブルとアーカイブの UNION ALL）
+        source = change_history_source(include_archived)
+        query = sync_db.query(source)
+
+        filters = build_change_history_filters(
+            case_id=case_id, change_type=change_type, case_number=case_number, model=source
+        )
+        if filters:
+            query = query.filter(and_(*filters))
 
-    if case_id:
-        filters.append(ChangeHistoryModel.case_id == case_id)
+        # 総件数を取得
+        total = query.count()
 
-    if change_type:
-        filters.append(ChangeHistoryModel.change_type == change_type)
-
-    if filters:
-        query = query.filter(and_(*filters))
-
-    # 案件番号によるフィルタリングまたはソートが必要な場合は、全件取得してPython側で処理
-    # それ以外の場合はDBレベルでソート・ページネーション
-    need_case_number_processing = case_number or sort_by == "case_number"
-
-    if need_case_number_processing:
-        # 全件取得してPython側でフィルタリング・ソート
-        all_histories = query.all()
-
-        # 変更者名と案件番号を取得してリスト化
-        items_with_case_number = []
-        for history in all_histories:
-            # 変更者名を取得
-            changed_by_name = None
-            if history.changed_by:
-                user = db.query(UserModel).filter(UserModel.id == history.changed_by).first()
-                if user:
-                    changed_by_name = user.username
-
-            # 案件番号（履歴時点のスナップショット）を取得
-            resolved_case_number = resolve_case_number(history)
-
-            # 案件番号による部分一致フィルタリング
-            if case_number and case_number.lower() not in (resolved_case_number or '').lower():
-                continue
-
-            item = {
-                'history': history,
-                'changed_by_name': changed_by_name,
-                'case_number': resolved_case_number,
-                'changed_at': history.changed_at,
-            }
-            items_with_case_number.append(item)
-
-        # 案件番号によるソート
+        # ソート（同値の行はIDで順序を確定させる）
         if sort_by == "case_number":
-            reverse = sort_order and sort_order.lower() != "asc"
-            items_with_case_number.sort(
-                key=lambda x: x['case_number'] or '',
-                reverse=reverse
-            )
+            sort_column = source.case_number_snapshot
+        else:
+            sort_column = getattr(source, sort_by, source.changed_at)
+        descending = not (sort_order and sort_order.lower() == "asc")
+        paginator = KeysetPaginator(sort_column, source.id, descending)
+
+        # 変更者名は結合で取得する（行ごとにユーザーを引かない）
+        query = query.with_entities(*adapt_columns(CHANGE_HISTORY_LIST_COLUMNS, source)).outerjoin(
+            UserModel, source.changed_by == UserModel.id
+        )
+        query = paginator.order(query)
+
+        # ページネーション（カーソル指定時はキーセット、それ以外はオフセット）
+        if cursor:
+            query = paginator.seek(query, cursor)
         else:
-            # その他のソート項目
-            if sort_by == "changed_at":
-                reverse = sort_order and sort_order.lower() != "asc"
-                items_with_case_number.sort(
-                    key=lambda x: x['changed_at'] or datetime.min.replace(tzinfo=timezone.utc),
-                    reverse=reverse
-                )
-            elif sort_by == "id":
-                reverse = sort_order and sort_order.lower() != "asc"
-                items_with_case_number.sort(
-                    key=lambda x: x['history'].id,
-                    reverse=reverse
-                )
-
-        # 総件数
-        total = len(items_with_case_number)
-
-        # ページネーション
-        offset = (page - 1) * page_size
-        paginated_items = items_with_case_number[offset:offset + page_size]
+            query = query.offset((page - 1) * page_size)
+        rows, next_cursor = paginator.fetch(query, page_size)
 
         # レスポンス用にデータを整形
-        items = []
-        for item_data in paginated_items:
-            history = item_data['history']
-            item = ChangeHistoryListItem(
-                id=history.id,
-                case_id=history.case_id,
-                case_number=item_data['case_number'],
-                changed_by=history.changed_by,
-                changed_by_name=item_data['changed_by_name'],
-                change_type=history.change_type,
-                field_name=history.field_name,
-                old_value=history.old_value,
-                new_value=history.new_value,
-                changes_json=history.changes_json,
-                notes=history.notes,
-                changed_at=to_jst(history.changed_at),
+        items = [
+            ChangeHistoryListItem(
+                id=row.id,
+                case_id=row.case_id,
+                case_number=resolve_case_number(row),
+                changed_by=row.changed_by,
+                changed_by_name=row.changed_by_name,
+                change_type=row.change_type,
+                field_name=row.field_name,
+                old_value=row.old_value,
+                new_value=row.new_value,
+                changes_json=row.changes_json,
+                notes=row.notes,
+                changed_at=to_jst(row.changed_at),
             )
-            items.append(item)
-    else:
-        # 通常のDBレベルでのソート・ページネーション
-        # ソート
-        sort_column = getattr(ChangeHistoryModel, sort_by, ChangeHistoryModel.changed_at)
-        if sort_order and sort_order.lower() == "asc":
-            query = query.order_by(sort_column.asc())
-        else:
-            query = query.order_by(sort_column.desc())
+            for row in rows
+        ]
+
+        # 総ページ数を計算
+        total_pages = (total + page_size - 1) // page_size if total > 0 else 0
+
+        return ChangeHistoryListResponse(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor
+        )
+
+    return await db.run_sync(build_response)
+
+
+def build_change_history_field_filters(
+    field_name: Optional[str] = None,
+    old_value: Optional[str] = None,
+    new_value: Optional[str] = None,
+    changed_by: Optional[int] = None,
+    case_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    change_type: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    model=ChangeHistoryFieldModel,
+    cases=CaseModel,
+) -> list:
+    """
+    項目別の変更履歴の検索条件を生成する
+
+    変更前後の値は変更履歴と同じ文字列表現で完全一致判定する。
+    顧客は案件の顧客で判定する。
+    model には項目別の行の読み取り元（change_history_field_source の戻り値）、
+    cases には案件の読み取り元（case_source の戻り値）を指定する。
+    """
+    filters = []
+
+    if field_name:
+        filters.append(model.field_name == field_name)
+    if old_value is not None:
+        filters.append(model.old_value == old_value)
+    if new_value is not None:
+        filters.append(model.new_value == new_value)
+    if changed_by:
+        filters.append(model.changed_by == changed_by)
+    if case_id:
+        filters.append(model.case_id == case_id)
+    if customer_id:
+        filters.append(model.case_id.in_(select(cases.id).where(cases.customer_id == customer_id)))
+    if change_type:
+        filters.append(model.change_type == change_type)
+    if date_from:
+        filters.append(model.changed_at >= from_jst(date_from))
+    if date_to:
+        filters.append(model.changed_at <= from_jst(date_to))
+
+    return filters
+
+
+# 項目別の変更履歴の列（案件番号は変更履歴、変更者名はユーザーとの結合で取得する）
+CHANGE_HISTORY_FIELD_COLUMNS = (
+    ChangeHistoryFieldModel.id,
+    ChangeHistoryFieldModel.history_id,
+    ChangeHistoryFieldModel.case_id,
+    ChangeHistoryModel.case_number_snapshot,
+    ChangeHistoryFieldModel.changed_by,
+    UserModel.username.label("changed_by_name"),
+    ChangeHistoryFieldModel.change_type,
+    ChangeHistoryFieldModel.field_name,
+    ChangeHistoryFieldModel.old_value,
+    ChangeHistoryFieldModel.new_value,
+    ChangeHistoryFieldModel.changed_at,
+)
+
+
+@router.get("/fields", response_model=ChangeHistoryFieldListResponse)
+async def search_change_history_fields(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user),
+    field_name: Optional[str] = Query(None, description="項目名（例: status, sales_unit_price）"),
+    old_value: Optional[str] = Query(None, description="変更前の値（完全一致）"),
+    new_value: Optional[str] = Query(None, description="変更後の値（完全一致）"),
+    changed_by: Optional[int] = Query(None, description="変更者ID"),
+    case_id: Optional[int] = Query(None, description="案件ID"),
+    customer_id: Optional[int] = Query(None, description="顧客ID（案件の顧客）"),
+    change_type: Optional[str] = Query(None, description="変更タイプ（CREATE/UPDATE/DELETE）"),
+    date_from: Optional[datetime] = Query(None, description="変更日時（開始。タイムゾーン省略時は日本時間）"),
+    date_to: Optional[datetime] = Query(None, description="変更日時（終了。タイムゾーン省略時は日本時間）"),
+    page: int = Query(1, ge=1, description="ページ番号"),
+    page_size: int = Query(50, ge=1, le=100, description="1ページあたりの件数"),
+    cursor: Optional[str] = Query(None, description="次ページのカーソル（指定時はpageより優先）"),
+    include_archived: bool = Query(False, description="アーカイブ済みの変更履歴も含める"),
+) -> Any:
+    """
+    項目別の変更履歴を検索（監査向け。変更日時の新しい順）
+
+    「先週ステータスを船積済に変更した案件」「顧客Xの案件の販売単価を変更したユーザー」のような
+    項目・変更前後の値・変更者・期間による検索を、項目別テーブルのインデックスで行う。
+    アーカイブ済みの変更履歴は include_archived の場合のみ対象にする。
+
+    Args:
+        db: 非同期データベースセッション
+        current_user: 現在のユーザー
+        field_name: 項目名
+        old_value: 変更前の値
+        new_value: 変更後の値
+        changed_by: 変更者ID
+        case_id: 案件ID
+        customer_id: 顧客ID
+        change_type: 変更タイプ
+        date_from: 変更日時（開始）
+        date_to: 変更日時（終了）
+        page: ページ番号
+        page_size: 1ページあたりの件数
+        cursor: 前ページのレスポンスで返された next_cursor
+        include_archived: アーカイブ済みの変更履歴も含める（既定は項目別テーブルのみ）
+
+    Returns:
+        ChangeHistoryFieldListResponse: 項目別の変更履歴とページネーション情報
+    """
+    def build_response(sync_db: Session) -> ChangeHistoryFieldListResponse:
+        # 読み取り元（アーカイブを含める場合は項目別テーブル・変更履歴とアーカイブの UNION ALL）
+        source = change_history_field_source(include_archived)
+        histories = change_history_source(include_archived)
+        query = sync_db.query(source)
+
+        filters = build_change_history_field_filters(
+            field_name=field_name,
+            old_value=old_value,
+            new_value=new_value,
+            changed_by=changed_by,
+            case_id=case_id,
+            customer_id=customer_id,
+            change_type=change_type,
+            date_from=date_from,
+            date_to=date_to,
+            model=source,
+            cases=case_source(include_archived),
+        )
+        if filters:
+            query = query.filter(and_(*filters))
 
-        # 総件数を取得
         total = query.count()
 
-        # ページネーション
-        offset = (page - 1) * page_size
-        histories = query.offset(offset).limit(page_size).all()
+        paginator = KeysetPaginator(source.changed_at, source.id, descending=True)
+        query = (
+            query.with_entities(*adapt_columns(adapt_columns(CHANGE_HISTORY_FIELD_COLUMNS, source), histories))
+            .outerjoin(histories, source.history_id == histories.id)
+            .outerjoin(UserModel, source.changed_by == UserModel.id)
+        )
+        query = paginator.order(query)
 
-        # レスポンス用にデータを整形
-        items = []
-        for history in histories:
-            # 変更者名を取得
-            changed_by_name = None
-            if history.changed_by:
-                user = db.query(UserModel).filter(UserModel.id == history.changed_by).first()
-                if user:
-                    changed_by_name = user.username
-
-            # 案件番号（履歴時点のスナップショット）を取得
-            resolved_case_number = resolve_case_number(history)
-
-            item = ChangeHistoryListItem(
-                id=history.id,
-                case_id=history.case_id,
-                case_number=resolved_case_number,
-                changed_by=history.changed_by,
-                changed_by_name=changed_by_name,
-                change_type=history.change_type,
-                field_name=history.field_name,
-                old_value=history.old_value,
-                new_value=history.new_value,
-                changes_json=history.changes_json,
-                notes=history.notes,
-                changed_at=to_jst(history.changed_at),
+        if cursor:
+            query = paginator.seek(query, cursor)
+        else:
+            query = query.offset((page - 1) * page_size)
+        rows, next_cursor = paginator.fetch(query, page_size)
+
+        items = [
+            ChangeHistoryFieldItem(
+                id=row.id,
+                history_id=row.history_id,
+                case_id=row.case_id,
+                case_number=row.case_number_snapshot or (f"ID:{row.case_id}" if row.case_id else None),
+                changed_by=row.changed_by,
+                changed_by_name=row.changed_by_name,
+                change_type=row.change_type,
+                field_name=row.field_name,
+                old_value=row.old_value,
+                new_value=row.new_value,
+                changed_at=to_jst(row.changed_at),
             )
-            items.append(item)
+            for row in rows
+        ]
+
+        total_pages = (total + page_size - 1) // page_size if total > 0 else 0
+
+        return ChangeHistoryFieldListResponse(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor
+        )
 
-    # 総ページ数を計算
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
-
-    return ChangeHistoryListResponse(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    return await db.run_sync(build_response)
 
 
 @router.get("/{history_id}", response_model=ChangeHistory)
 async def get_change_history_detail(
     history_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
+    include_archived: bool = Query(False, description="アーカイブ済みの変更履歴も対象にする"),
 ) -> Any:
     """
     変更履歴詳細を取得
 
     Args:
         history_id: 変更履歴ID
-        db: データベースセッション
+        db: 非同期データベースセッション
         current_user: 現在のユーザー
+        include_archived: アーカイブ済みの変更履歴も対象にする
 
     Returns:
         ChangeHistory: 変更履歴詳細
@@ -274,9 +426,10 @@ async def get_change_history_detail(
     Raises:
         HTTPException: 変更履歴が見つからない場合
     """
-    history = db.query(ChangeHistoryModel).filter(
-        ChangeHistoryModel.id == history_id
-    ).first()
+    source = change_history_source(include_archived)
+    history = await db.scalar(
+        select(source).where(source.id == history_id).limit(1)
+    )
 
     if not history:
         raise HTTPException(
@@ -291,20 +444,24 @@ async def get_change_history_detail(
 @router.get("/case/{case_id}/history", response_model=ChangeHistoryListResponse)
 async def get_case_change_history(
     case_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
     page: int = Query(1, ge=1, description="ページ番号"),
     page_size: int = Query(50, ge=1, le=100, description="1ページあたりの件数"),
+    cursor: Optional[str] = Query(None, description="次ページのカーソル（指定時はpageより優先）"),
+    include_archived: bool = Query(False, description="アーカイブ済みの案件・変更履歴も対象にする"),
 ) -> Any:
     """
     特定案件の変更履歴を取得
 
     Args:
         case_id: 案件ID
-        db: データベースセッション
+        db: 非同期データベースセッション
         current_user: 現在のユーザー
         page: ページ番号
         page_size: 1ページあたりの件数
+        cursor: 前ページのレスポンスで返された next_cursor
+        include_archived: アーカイブ済みの案件・変更履歴も対象にする
 
     Returns:
         ChangeHistoryListResponse: 変更履歴一覧とページネーション情報
@@ -313,8 +470,9 @@ async def get_case_change_history(
         HTTPException: 案件が見つからない場合
     """
     # 案件の存在確認
-    case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
-    if not case:
+    source = case_source(include_archived)
+    case = await db.scalar(select(source.id).where(source.id == case_id))
+    if case is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="案件が見つかりません"
@@ -326,9 +484,11 @@ async def get_case_change_history(
         current_user=current_user,
         page=page,
         page_size=page_size,
+        cursor=cursor,
         case_id=case_id,
         case_number=None,  # 明示的にNoneを渡す
         change_type=None,  # 明示的にNoneを渡す
         sort_by="changed_at",
-        sort_order="desc"
+        sort_order="desc",
+        include_archived=include_archived,
     )
@@ -2,11 +2,30 @@
 顧客マスタ API エンドポイント
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-
-from ...core.deps import get_db, get_current_user
+from sqlalchemy import func, select
+
+from ...core.deps import get_async_db, get_db, get_current_user
+from ...core.pagination import KeysetPaginator
+from ...services.search_service import search_condition
+from ...services.count_cache import (
+    TOTAL_MODE_EXACT,
+    TOTAL_MODE_NONE,
+    TOTAL_MODE_PATTERN,
+    resolve_total,
+    total_pages_for,
+)
+from ...services.master_data_cache import master_data_cache, page_items
+from ...services.etag_service import (
+    compute_etag,
+    is_not_modified,
+    master_data_cache_control,
+    not_modified_response,
+    set_etag_headers,
+    table_state,
+)
 from ...models.user import User
 from ...models.customer import Customer
 from ...schemas.customer import (
@@ -20,62 +39,127 @@ router = APIRouter()
 
 
 @router.get("/", response_model=CustomerListResponse)
-def get_customers(
+async def get_customers(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="スキップ件数"),
     limit: int = Query(50, ge=1, le=100, description="取得件数"),
+    cursor: Optional[str] = Query(None, description="次ページのカーソル（指定時はskipより優先）"),
     search: Optional[str] = Query(None, description="検索キーワード（顧客コード、顧客名）"),
     is_active: Optional[int] = Query(None, description="有効フラグフィルタ"),
-    db: Session = Depends(get_db),
+    total_mode: str = Query(TOTAL_MODE_EXACT, alias="total", pattern=TOTAL_MODE_PATTERN, description="総件数の取得方法（exact/estimate/none）"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     顧客マスタ一覧取得
+
+    マスタデータは更新頻度が低いため、短時間のブラウザキャッシュを許可し、
+    期限後は ETag による条件付きGET（一致すれば304）で再検証させる。
     """
-    query = db.query(Customer)
-
-    # 検索フィルタ
-    if search:
-        query = query.filter(
-            or_(
-                Customer.customer_code.ilike(f"%{search}%"),
-                Customer.customer_name.ilike(f"%{search}%"),
-                Customer.customer_name_en.ilike(f"%{search}%")
+    # マスタキャッシュ・総件数キャッシュ・キーセットページングは同期ヘルパーのため、
+    # 非同期セッション上で同期的に実行する
+    def build_response(sync_db: Session):
+        cache_control = master_data_cache_control()
+        etag_params = {
+            "skip": skip,
+            "limit": limit,
+            "cursor": cursor,
+            "search": search,
+            "is_active": is_active,
+            "total": total_mode,
+        }
+
+        # 検索条件がなければマスタキャッシュから返す（検索は検索インデックスを使うためDBで行う）
+        if not search:
+            # ETagはスナップショットの世代から計算する（DBの集計を行わない）
+            etag = compute_etag(etag_params, [master_data_cache.generation(sync_db, "customers")])
+            if is_not_modified(request, etag):
+                return not_modified_response(etag, cache_control)
+            set_etag_headers(response, etag, cache_control)
+            items = [
+                item for item in master_data_cache.all(sync_db, "customers")
+                if (is_active is None or item.is_active == is_active)
+            ]
+            customers, next_cursor = page_items(items, "customer_code", skip, limit, cursor)
+            total = None if total_mode == TOTAL_MODE_NONE else len(items)
+            return CustomerListResponse(
+                total=total,
+                items=customers,
+                page=(skip // limit) + 1,
+                page_size=limit,
+                total_pages=total_pages_for(total, limit),
+                next_cursor=next_cursor
             )
-        )
-
-    # 有効フラグフィルタ
-    if is_active is not None:
-        query = query.filter(Customer.is_active == is_active)
-
-    # 総件数
-    total = query.count()
-
-    # ページング
-    customers = query.order_by(Customer.customer_code).offset(skip).limit(limit).all()
 
-    # ページ情報計算
-    page = (skip // limit) + 1
-    total_pages = (total + limit - 1) // limit
+        count_filters = {
+            "search": search,
+            "is_active": is_active,
+        }
+        state = table_state(sync_db, [Customer])
+        etag = compute_etag(etag_params, state, "customers", count_filters)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, cache_control)
+        set_etag_headers(response, etag, cache_control)
+
+        query = sync_db.query(Customer)
+
+        # 検索フィルタ（検索インデックスを利用）
+        if search:
+            search_filter = search_condition(sync_db, Customer, search)
+            if search_filter is not None:
+                query = query.filter(search_filter)
+
+        # 有効フラグフィルタ
+        if is_active is not None:
+            query = query.filter(Customer.is_active == is_active)
+
+        # 総件数
+        total = resolve_total(
+            query,
+            total_mode,
+            scope="customers",
+            filters=count_filters,
+            depends_on=("customers",),
+        )
+        # 件数をキャッシュした場合は、次のリクエストと同じETagを返す
+        set_etag_headers(response, compute_etag(etag_params, state, "customers", count_filters), cache_control)
+
+        # ページング（カーソル指定時はキーセット、それ以外はオフセット）
+        paginator = KeysetPaginator(Customer.customer_code, Customer.id, descending=False)
+        query = paginator.order(query)
+        if cursor:
+            query = paginator.seek(query, cursor)
+        else:
+            query = query.offset(skip)
+        customers, next_cursor = paginator.fetch(query, limit)
+
+        # ページ情報計算
+        page = (skip // limit) + 1
+        total_pages = total_pages_for(total, limit)
+
+        return CustomerListResponse(
+            total=total,
+            items=customers,
+            page=page,
+            page_size=limit,
+            total_pages=total_pages,
+            next_cursor=next_cursor
+        )
 
-    return CustomerListResponse(
-        total=total,
-        items=customers,
-        page=page,
-        page_size=limit,
-        total_pages=total_pages
-    )
+    return await db.run_sync(build_response)
 
 
 @router.get("/{customer_id}", response_model=CustomerResponse)
-def get_customer(
+async def get_customer(
     customer_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     顧客マスタ詳細取得
     """
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = await db.scalar(select(Customer).where(Customer.id == customer_id))
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -108,6 +192,7 @@ def create_customer(
     db.add(customer)
     db.commit()
     db.refresh(customer)
+    master_data_cache.put(customer)
 
     return customer
 
@@ -149,6 +234,7 @@ def update_customer(
 
     db.commit()
     db.refresh(customer)
+    master_data_cache.put(customer)
 
     return customer
 
@@ -172,28 +258,27 @@ def delete_customer(
     # 論理削除
     customer.is_active = 0
     db.commit()
+    db.refresh(customer)
+    master_data_cache.put(customer)
 
     return None
 
 
 @router.get("/autocomplete/", response_model=list[CustomerResponse])
-def autocomplete_customers(
+async def autocomplete_customers(
     q: str = Query(..., min_length=1, description="検索キーワード"),
     limit: int = Query(10, ge=1, le=50, description="取得件数"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     顧客マスタオートコンプリート
     （案件フォームでの入力補完用）
+
+    顧客コード・顧客名・英語名の前方一致・部分一致（前方一致を優先）を
+    プロセス内のインデックスから返す（キャッシュが有効な間はDBへの問い合わせなし）。
     """
-    customers = db.query(Customer).filter(
-        Customer.is_active == 1,
-        or_(
-            Customer.customer_code.ilike(f"%{q}%"),
-            Customer.customer_name.ilike(f"%{q}%")
-        )
-    ).order_by(Customer.customer_code).limit(limit).all()
+    customers = await db.run_sync(master_data_cache.autocomplete, "customers", q, limit)
 
     return customers
 
@@ -7,6 +7,9 @@ from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.core.deps import get_current_user, get_db
+from app.core.executors import run_blocking
+from app.core.pagination import InvalidCursorError
+from app.services.count_cache import TOTAL_MODE_EXACT, TOTAL_MODE_PATTERN
 from app.models.user import User
 from app.schemas.document import (
     DocumentGenerateRequest,
@@ -36,8 +39,11 @@ async def generate_invoice(
         raise HTTPException(status_code=400, detail="document_type must be 'invoice'")
 
     try:
+        # Excelの生成はイベントループを止めないよう帳票用のスレッドプールで実行する
         generator = DocumentGenerator(db)
-        document = generator.generate_invoice(
+        document = await run_blocking(
+            "documents",
+            generator.generate_invoice,
             case_id=request.case_id,
             user_id=current_user.id,
             template_name=request.template_name
@@ -70,8 +76,11 @@ async def generate_packing_list(
         raise HTTPException(status_code=400, detail="document_type must be 'packing_list'")
 
     try:
+        # Excelの生成はイベントループを止めないよう帳票用のスレッドプールで実行する
         generator = DocumentGenerator(db)
-        document = generator.generate_packing_list(
+        document = await run_blocking(
+            "documents",
+            generator.generate_packing_list,
             case_id=request.case_id,
             user_id=current_user.id,
             template_name=request.template_name
@@ -93,6 +102,8 @@ async def get_documents(
     document_type: Optional[str] = Query(None, description="ドキュメントタイプでフィルタリング"),
     skip: int = Query(0, ge=0, description="スキップ数"),
     limit: int = Query(100, ge=1, le=1000, description="取得件数上限"),
+    cursor: Optional[str] = Query(None, description="次ページのカーソル（指定時はskipより優先）"),
+    total_mode: str = Query(TOTAL_MODE_EXACT, alias="total", pattern=TOTAL_MODE_PATTERN, description="総件数の取得方法（exact/estimate/none）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -103,16 +114,22 @@ async def get_documents(
     - **document_type**: ドキュメントタイプでフィルタリング（オプション）
     - **skip**: スキップ数
     - **limit**: 取得件数上限
+    - **cursor**: 前ページのレスポンスで返された next_cursor（オプション）
+    - **total**: 総件数の取得方法（exact/estimate/none）
     """
     try:
         generator = DocumentGenerator(db)
-        documents, total = generator.get_documents(
+        documents, total, next_cursor = generator.get_documents(
             case_id=case_id,
             document_type=document_type,
             skip=skip,
-            limit=limit
+            limit=limit,
+            cursor=cursor,
+            total_mode=total_mode
         )
-        return DocumentListResponse(documents=documents, total=total)
+        return DocumentListResponse(documents=documents, total=total, next_cursor=next_cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get documents: {str(e)}")
 
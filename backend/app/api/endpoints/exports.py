@@ -0,0 +1,246 @@
+"""
+一括エクスポートAPIエンドポイント
+"""
+from typing import Any, Dict, Optional
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+
+from ...core.deps import get_db, get_current_active_user
+from ...core.pagination import KeysetPaginator
+from ...models.case import Case as CaseModel
+from ...models.change_history import ChangeHistory as ChangeHistoryModel
+from ...models.customer import Customer as CustomerModel
+from ...models.document import Document as DocumentModel
+from ...models.product import Product as ProductModel
+from ...models.user import User as UserModel
+from ...services.archive_service import adapt_columns, case_source, change_history_source
+from ...services.export_service import (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PATTERN,
+    export_response,
+    rows_to_records,
+    stream_query,
+)
+from .cases import CASE_LIST_COLUMNS, CASE_SORT_COLUMNS, CASE_SORT_PATTERN, build_case_filters
+from .change_history import build_change_history_filters, resolve_case_number, to_jst
+
+router = APIRouter()
+
+# 案件エクスポートの列（一覧の列に帳票用の列を加えたもの）
+CASE_EXPORT_COLUMNS = CASE_LIST_COLUMNS + (
+    CaseModel.supplier_name,
+    CaseModel.sales_unit_price,
+    CaseModel.purchase_unit_price,
+    CaseModel.notes,
+)
+
+# 変更履歴エクスポートの列（case_number は履歴時点のスナップショットから解決する）
+CHANGE_HISTORY_EXPORT_COLUMNS = (
+    ChangeHistoryModel.id,
+    ChangeHistoryModel.case_id,
+    ChangeHistoryModel.changed_by,
+    UserModel.username.label("changed_by_name"),
+    ChangeHistoryModel.change_type,
+    ChangeHistoryModel.field_name,
+    ChangeHistoryModel.old_value,
+    ChangeHistoryModel.new_value,
+    ChangeHistoryModel.case_number_snapshot,
+    ChangeHistoryModel.changes_json,
+    ChangeHistoryModel.notes,
+    ChangeHistoryModel.changed_at,
+)
+CHANGE_HISTORY_EXPORT_FIELDS = (
+    "id",
+    "case_id",
+    "case_number",
+    "changed_by",
+    "changed_by_name",
+    "change_type",
+    "field_name",
+    "old_value",
+    "new_value",
+    "changes_json",
+    "notes",
+    "changed_at",
+)
+
+# ドキュメントエクスポートの列
+DOCUMENT_EXPORT_COLUMNS = (
+    DocumentModel.id,
+    DocumentModel.case_id,
+    CaseModel.case_number,
+    DocumentModel.document_type,
+    DocumentModel.file_name,
+    DocumentModel.template_name,
+    DocumentModel.generated_by,
+    UserModel.username.label("generated_by_name"),
+    DocumentModel.generated_at,
+    DocumentModel.notes,
+)
+
+
+def _column_names(columns) -> list:
+    return [column.key for column in columns]
+
+
+@router.get("/cases", summary="案件の一括エクスポート")
+async def export_cases(
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+    export_format: str = Query(EXPORT_FORMAT_CSV, alias="format", pattern=EXPORT_FORMAT_PATTERN, description="出力形式（ndjson/csv）"),
+    search: Optional[str] = Query(None, description="検索キーワード（案件番号、顧客名、商品名）"),
+    trade_type: Optional[str] = Query(None, description="区分フィルタ"),
+    status: Optional[str] = Query(None, description="ステータスフィルタ"),
+    pic: Optional[str] = Query(None, description="担当者フィルタ"),
+    shipment_date_from: Optional[date] = Query(None, description="船積予定日（開始）"),
+    shipment_date_to: Optional[date] = Query(None, description="船積予定日（終了）"),
+    sort_by: Optional[str] = Query("created_at", pattern=CASE_SORT_PATTERN, description="ソート項目"),
+    sort_order: Optional[str] = Query("desc", description="ソート順（asc/desc）"),
+    include_archived: bool = Query(False, description="アーカイブ済みの案件も含める"),
+) -> Any:
+    """
+    案件一覧と同じフィルタ条件に一致する全件をストリーミング出力
+
+    Args:
+        db: データベースセッション
+        current_user: 現在のユーザー
+        export_format: 出力形式（ndjson/csv。CSVはExcel向けにBOM付きUTF-8）
+        search: 検索キーワード
+        trade_type: 区分フィルタ
+        status: ステータスフィルタ
+        pic: 担当者フィルタ
+        shipment_date_from: 船積予定日（開始）
+        shipment_date_to: 船積予定日（終了）
+        sort_by: ソート項目
+        sort_order: ソート順
+        include_archived: アーカイブ済みの案件も含める
+
+    Returns:
+        StreamingResponse: エクスポートファイル
+    """
+    source = case_source(include_archived)
+    query = db.query(source)
+
+    filters = build_case_filters(
+        db,
+        search=search,
+        trade_type=trade_type,
+        status=status,
+        pic=pic,
+        shipment_date_from=shipment_date_from,
+        shipment_date_to=shipment_date_to,
+        model=source,
+    )
+    if filters:
+        query = query.filter(and_(*filters))
+
+    query = (
+        query.with_entities(*adapt_columns(CASE_EXPORT_COLUMNS, source))
+        .outerjoin(CustomerModel, source.customer_id == CustomerModel.id)
+        .outerjoin(ProductModel, source.product_id == ProductModel.id)
+    )
+
+    sort_column = getattr(source, CASE_SORT_COLUMNS.get(sort_by, CaseModel.created_at).key)
+    descending = not (sort_order and sort_order.lower() == "asc")
+    query = KeysetPaginator(sort_column, source.id, descending).order(query)
+
+    records = rows_to_records(stream_query(db, query))
+    return export_response(records, _column_names(CASE_EXPORT_COLUMNS), export_format, "cases")
+
+
+@router.get("/change-history", summary="変更履歴の一括エクスポート")
+async def export_change_history(
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+    export_format: str = Query(EXPORT_FORMAT_CSV, alias="format", pattern=EXPORT_FORMAT_PATTERN, description="出力形式（ndjson/csv）"),
+    case_id: Optional[int] = Query(None, description="案件IDフィルタ"),
+    case_number: Optional[str] = Query(None, description="案件番号フィルタ（部分一致）"),
+    change_type: Optional[str] = Query(None, description="変更タイプフィルタ（CREATE/UPDATE/DELETE）"),
+    sort_order: Optional[str] = Query("desc", description="変更日時のソート順（asc/desc）"),
+    include_archived: bool = Query(False, description="アーカイブ済みの変更履歴も含める"),
+) -> Any:
+    """
+    変更履歴一覧と同じフィルタ条件に一致する全件をストリーミング出力
+
+    案件番号のフィルタは履歴時点のスナップショット（case_number_snapshot 列）でDB側で判定する。
+
+    Args:
+        db: データベースセッション
+        current_user: 現在のユーザー
+        export_format: 出力形式（ndjson/csv）
+        case_id: 案件IDフィルタ
+        case_number: 案件番号フィルタ（部分一致）
+        change_type: 変更タイプフィルタ
+        sort_order: 変更日時のソート順
+        include_archived: アーカイブ済みの変更履歴も含める
+
+    Returns:
+        StreamingResponse: エクスポートファイル
+    """
+    source = change_history_source(include_archived)
+    query = db.query(source)
+
+    filters = build_change_history_filters(
+        case_id=case_id, change_type=change_type, case_number=case_number, model=source
+    )
+    if filters:
+        query = query.filter(and_(*filters))
+
+    # 変更者名は結合で取得する（行ごとにユーザーを引かない）
+    query = query.with_entities(*adapt_columns(CHANGE_HISTORY_EXPORT_COLUMNS, source)).outerjoin(
+        UserModel, source.changed_by == UserModel.id
+    )
+
+    descending = not (sort_order and sort_order.lower() == "asc")
+    query = KeysetPaginator(source.changed_at, source.id, descending).order(query)
+
+    def to_record(row) -> Dict[str, Any]:
+        record = dict(row._mapping)
+        record["case_number"] = resolve_case_number(row)
+        record["changed_at"] = to_jst(record["changed_at"])
+        return {field: record.get(field) for field in CHANGE_HISTORY_EXPORT_FIELDS}
+
+    records = map(to_record, stream_query(db, query))
+    return export_response(records, CHANGE_HISTORY_EXPORT_FIELDS, export_format, "change_history")
+
+
+@router.get("/documents", summary="ドキュメント履歴の一括エクスポート")
+async def export_documents(
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+    export_format: str = Query(EXPORT_FORMAT_CSV, alias="format", pattern=EXPORT_FORMAT_PATTERN, description="出力形式（ndjson/csv）"),
+    case_id: Optional[int] = Query(None, description="案件IDでフィルタリング"),
+    document_type: Optional[str] = Query(None, description="ドキュメントタイプでフィルタリング"),
+) -> Any:
+    """
+    ドキュメント一覧と同じフィルタ条件に一致する全件をストリーミング出力
+
+    Args:
+        db: データベースセッション
+        current_user: 現在のユーザー
+        export_format: 出力形式（ndjson/csv）
+        case_id: 案件IDでフィルタリング
+        document_type: ドキュメントタイプでフィルタリング
+
+    Returns:
+        StreamingResponse: エクスポートファイル
+    """
+    query = db.query(DocumentModel)
+
+    if case_id:
+        query = query.filter(DocumentModel.case_id == case_id)
+
+    if document_type:
+        query = query.filter(DocumentModel.document_type == document_type)
+
+    query = (
+        query.with_entities(*DOCUMENT_EXPORT_COLUMNS)
+        .outerjoin(CaseModel, DocumentModel.case_id == CaseModel.id)
+        .outerjoin(UserModel, DocumentModel.generated_by == UserModel.id)
+    )
+    query = KeysetPaginator(DocumentModel.generated_at, DocumentModel.id, descending=True).order(query)
+
+    records = rows_to_records(stream_query(db, query))
+    return export_response(records, _column_names(DOCUMENT_EXPORT_COLUMNS), export_format, "documents")
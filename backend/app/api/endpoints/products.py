@@ -2,11 +2,30 @@
 商品マスタ API エンドポイント
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-
-from ...core.deps import get_db, get_current_user
+from sqlalchemy import func, select
+
+from ...core.deps import get_async_db, get_db, get_current_user
+from ...core.pagination import KeysetPaginator
+from ...services.search_service import search_condition
+from ...services.count_cache import (
+    TOTAL_MODE_EXACT,
+    TOTAL_MODE_NONE,
+    TOTAL_MODE_PATTERN,
+    resolve_total,
+    total_pages_for,
+)
+from ...services.master_data_cache import master_data_cache, page_items
+from ...services.etag_service import (
+    compute_etag,
+    is_not_modified,
+    master_data_cache_control,
+    not_modified_response,
+    set_etag_headers,
+    table_state,
+)
 from ...models.user import User
 from ...models.product import Product
 from ...schemas.product import (
@@ -20,67 +39,135 @@ router = APIRouter()
 
 
 @router.get("/", response_model=ProductListResponse)
-def get_products(
+async def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="スキップ件数"),
     limit: int = Query(50, ge=1, le=100, description="取得件数"),
+    cursor: Optional[str] = Query(None, description="次ページのカーソル（指定時はskipより優先）"),
     search: Optional[str] = Query(None, description="検索キーワード（商品コード、商品名）"),
     category: Optional[str] = Query(None, description="カテゴリフィルタ"),
     is_active: Optional[int] = Query(None, description="有効フラグフィルタ"),
-    db: Session = Depends(get_db),
+    total_mode: str = Query(TOTAL_MODE_EXACT, alias="total", pattern=TOTAL_MODE_PATTERN, description="総件数の取得方法（exact/estimate/none）"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     商品マスタ一覧取得
+
+    マスタデータは更新頻度が低いため、短時間のブラウザキャッシュを許可し、
+    期限後は ETag による条件付きGET（一致すれば304）で再検証させる。
     """
-    query = db.query(Product)
-
-    # 検索フィルタ
-    if search:
-        query = query.filter(
-            or_(
-                Product.product_code.ilike(f"%{search}%"),
-                Product.product_name.ilike(f"%{search}%"),
-                Product.product_name_en.ilike(f"%{search}%")
+    # マスタキャッシュ・総件数キャッシュ・キーセットページングは同期ヘルパーのため、
+    # 非同期セッション上で同期的に実行する
+    def build_response(sync_db: Session):
+        cache_control = master_data_cache_control()
+        etag_params = {
+            "skip": skip,
+            "limit": limit,
+            "cursor": cursor,
+            "search": search,
+            "category": category,
+            "is_active": is_active,
+            "total": total_mode,
+        }
+
+        # 検索条件がなければマスタキャッシュから返す（検索は検索インデックスを使うためDBで行う）
+        if not search:
+            # ETagはスナップショットの世代から計算する（DBの集計を行わない）
+            etag = compute_etag(etag_params, [master_data_cache.generation(sync_db, "products")])
+            if is_not_modified(request, etag):
+                return not_modified_response(etag, cache_control)
+            set_etag_headers(response, etag, cache_control)
+            items = [
+                item for item in master_data_cache.all(sync_db, "products")
+                if (is_active is None or item.is_active == is_active)
+                and (not category or item.category == category)
+            ]
+            products, next_cursor = page_items(items, "product_code", skip, limit, cursor)
+            total = None if total_mode == TOTAL_MODE_NONE else len(items)
+            return ProductListResponse(
+                total=total,
+                items=products,
+                page=(skip // limit) + 1,
+                page_size=limit,
+                total_pages=total_pages_for(total, limit),
+                next_cursor=next_cursor
             )
-        )
-
-    # カテゴリフィルタ
-    if category:
-        query = query.filter(Product.category == category)
-
-    # 有効フラグフィルタ
-    if is_active is not None:
-        query = query.filter(Product.is_active == is_active)
-
-    # 総件数
-    total = query.count()
-
-    # ページング
-    products = query.order_by(Product.product_code).offset(skip).limit(limit).all()
 
-    # ページ情報計算
-    page = (skip // limit) + 1
-    total_pages = (total + limit - 1) // limit
+        count_filters = {
+            "search": search,
+            "category": category,
+            "is_active": is_active,
+        }
+        state = table_state(sync_db, [Product])
+        etag = compute_etag(etag_params, state, "products", count_filters)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, cache_control)
+        set_etag_headers(response, etag, cache_control)
+
+        query = sync_db.query(Product)
+
+        # 検索フィルタ（検索インデックスを利用）
+        if search:
+            search_filter = search_condition(sync_db, Product, search)
+            if search_filter is not None:
+                query = query.filter(search_filter)
+
+        # カテゴリフィルタ
+        if category:
+            query = query.filter(Product.category == category)
+
+        # 有効フラグフィルタ
+        if is_active is not None:
+            query = query.filter(Product.is_active == is_active)
+
+        # 総件数
+        total = resolve_total(
+            query,
+            total_mode,
+            scope="products",
+            filters=count_filters,
+            depends_on=("products",),
+        )
+        # 件数をキャッシュした場合は、次のリクエストと同じETagを返す
+        set_etag_headers(response, compute_etag(etag_params, state, "products", count_filters), cache_control)
+
+        # ページング（カーソル指定時はキーセット、それ以外はオフセット）
+        paginator = KeysetPaginator(Product.product_code, Product.id, descending=False)
+        query = paginator.order(query)
+        if cursor:
+            query = paginator.seek(query, cursor)
+        else:
+            query = query.offset(skip)
+        products, next_cursor = paginator.fetch(query, limit)
+
+        # ページ情報計算
+        page = (skip // limit) + 1
+        total_pages = total_pages_for(total, limit)
+
+        return ProductListResponse(
+            total=total,
+            items=products,
+            page=page,
+            page_size=limit,
+            total_pages=total_pages,
+            next_cursor=next_cursor
+        )
 
-    return ProductListResponse(
-        total=total,
-        items=products,
-        page=page,
-        page_size=limit,
-        total_pages=total_pages
-    )
+    return await db.run_sync(build_response)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(
+async def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     商品マスタ詳細取得
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.scalar(select(Product).where(Product.id == product_id))
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,6 +200,7 @@ def create_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    master_data_cache.put(product)
 
     return product
 
@@ -154,6 +242,7 @@ def update_product(
 
     db.commit()
     db.refresh(product)
+    master_data_cache.put(product)
 
     return product
 
@@ -177,44 +266,45 @@ def delete_product(
     # 論理削除
     product.is_active = 0
     db.commit()
+    db.refresh(product)
+    master_data_cache.put(product)
 
     return None
 
 
 @router.get("/autocomplete/", response_model=list[ProductResponse])
-def autocomplete_products(
+async def autocomplete_products(
     q: str = Query(..., min_length=1, description="検索キーワード"),
     limit: int = Query(10, ge=1, le=50, description="取得件数"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     商品マスタオートコンプリート
     （案件フォームでの入力補完用）
+
+    商品コード・商品名・英語名・HSコードの前方一致・部分一致（前方一致を優先）を
+    プロセス内のインデックスから返す（キャッシュが有効な間はDBへの問い合わせなし）。
     """
-    products = db.query(Product).filter(
-        Product.is_active == 1,
-        or_(
-            Product.product_code.ilike(f"%{q}%"),
-            Product.product_name.ilike(f"%{q}%")
-        )
-    ).order_by(Product.product_code).limit(limit).all()
+    products = await db.run_sync(master_data_cache.autocomplete, "products", q, limit)
 
     return products
 
 
 @router.get("/categories/", response_model=list[str])
-def get_categories(
-    db: Session = Depends(get_db),
+async def get_categories(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     カテゴリ一覧取得（ユニークなカテゴリ名を取得）
     """
-    categories = db.query(Product.category).filter(
-        Product.category.isnot(None),
-        Product.is_active == 1
-    ).distinct().order_by(Product.category).all()
+    categories = (await db.execute(
+        select(Product.category).where(
+            Product.category.isnot(None),
+            Product.is_active == 1
+        ).distinct().order_by(Product.category)
+    )).all()
 
     return [cat[0] for cat in categories if cat[0]]
 
@@ -4,13 +4,14 @@ WebSocketエンドポイント
 """
 import json
 import asyncio
-from typing import Dict, Set, Optional
+from typing import Dict, List, Set, Optional
 from datetime import datetime
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, HTTPException, status
 from sqlalchemy.orm import Session
 from ...core.database import SessionLocal
 from ...core.security import decode_access_token
 from ...models.user import User as UserModel
+from ...services.identity_cache import identity_cache
 
 router = APIRouter()
 
@@ -48,8 +49,7 @@ async def get_user_from_token(token: Optional[str], db: Session) -> Optional[Use
         if user_id is None:
             return None
 
-        user = db.query(UserModel).filter(UserModel.id == user_id).first()
-        return user
+        return identity_cache.get_user(db, int(user_id))
     except Exception:
         return None
 
@@ -262,6 +262,20 @@ async def notify_case_updated(case_id: int, action: str, user_id: Optional[int]
     await broadcast_message(message, exclude_user_id=user_id)
 
 
+async def notify_cases_updated(case_ids: List[int], action: str, user_id: Optional[int] = None):
+    """複数案件の更新通知を1件にまとめて送信（一括操作用）"""
+    update_server_status()
+    await broadcast_message({
+        "type": "case_updated",
+        "case_id": None,
+        "case_ids": case_ids,
+        "count": len(case_ids),
+        "action": action,
+        "timestamp": datetime.now().isoformat(),
+        "server_status": server_status,
+    }, exclude_user_id=user_id)
+
+
 async def notify_customer_updated(customer_id: int, action: str, user_id: Optional[int] = None):
     """顧客マスタ更新通知を送信"""
     update_server_status()
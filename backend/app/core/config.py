@@ -20,6 +20,70 @@ class Settings(BaseSettings):
     # データベース設定
     DATABASE_URL: str = "sqlite:///./trade_dx.db"
 
+    # 接続プール（同期・非同期エンジンそれぞれに適用。インメモリSQLiteでは使用しない）
+    # ワーカープロセスあたりの最大接続数は (DB_POOL_SIZE + DB_MAX_OVERFLOW) × 2（同期・非同期）
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # 1文の実行時間の上限（ミリ秒。0は無制限。PostgreSQLのみ）
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # SQLiteの接続ごとのPRAGMA（WALにより読み取りと書き込みが互いを待たない）
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MiB
+    SQLITE_CACHE_SIZE: int = -65536  # 負の値はKiB単位（64MiB）
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # PRAGMA optimize とWALのチェックポイントを実行する間隔（秒。0は実行しない）
+    SQLITE_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    # 案件の作成・更新を1つの書き込みスレッドに集約し、まとめてコミットする（SQLiteのみ）
+    SQLITE_SINGLE_WRITER: bool = False
+    SQLITE_WRITER_MAX_BATCH: int = 32
+
+    # 案件番号の連番の桁数（上限は 10^桁数 - 1）と、プロセスごとにまとめて予約する件数
+    # （2以上にすると採番ごとのDBアクセスが減るが、プロセス停止時の未使用分は欠番になる）
+    CASE_NUMBER_SEQUENCE_WIDTH: int = 3
+    CASE_NUMBER_BLOCK_SIZE: int = 1
+
+    # 変更履歴の書き込み方式（"transaction": 案件の変更と同じトランザクション、
+    # "buffered": コミット後にためておき、一定間隔・一定件数ごとにまとめて挿入）
+    CHANGE_HISTORY_WRITE_MODE: str = "transaction"
+    CHANGE_HISTORY_FLUSH_INTERVAL_MS: int = 200
+    CHANGE_HISTORY_FLUSH_MAX_ROWS: int = 500
+
+    # 完了・キャンセルの案件をアーカイブへ移すまでの日数（最終更新からの経過日数）、
+    # 1バッチの案件数、定期実行の間隔（秒。0は定期実行しない）
+    ARCHIVE_AFTER_DAYS: int = 365
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_INTERVAL_SECONDS: int = 0
+
+    # 案件状態のチェックポイントを保存する間隔（変更履歴の件数）。ある日時の状態の復元は
+    # チェックポイント1件と、この件数未満の変更履歴の読み取りで済む
+    CASE_CHECKPOINT_INTERVAL: int = 50
+
+    # 一覧APIの総件数キャッシュ
+    COUNT_CACHE_TTL_SECONDS: int = 30
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+
+    # 顧客・商品マスタのプロセス内キャッシュ（他ワーカーの書き込みを反映するまでの最大秒数）
+    MASTER_DATA_CACHE_TTL_SECONDS: int = 60
+
+    # 認証ユーザーのキャッシュ（ユーザー情報の保持秒数・件数、検証済みトークンの件数）
+    IDENTITY_CACHE_TTL_SECONDS: int = 30
+    IDENTITY_CACHE_MAX_ENTRIES: int = 1024
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096
+
+    # マスタデータ一覧のブラウザキャッシュ有効期間（秒。期限後はETagで再検証）
+    MASTER_DATA_CACHE_MAX_AGE: int = 60
+
+    # ブロッキング処理用スレッドプールのスレッド数（帳票生成・バックアップ・パスワード照合）
+    DOCUMENT_POOL_SIZE: int = 2
+    BACKUP_POOL_SIZE: int = 1
+    PASSWORD_HASH_POOL_SIZE: int = 4
+
     # JWT設定
     SECRET_KEY: str = "your-secret-key-here-please-change-in-production"
     ALGORITHM: str = "HS256"
@@ -1,25 +1,159 @@
 """
 データベース接続管理
+
+APIの読み取り処理は非同期エンジン（AsyncSession）を使い、クエリの待ち時間に
+イベントループを止めない。同期エンジン（SessionLocal）は書き込み処理・Alembic・
+スクリプト用に残している。
+
+接続プールの設定は Settings の DB_POOL_* で指定し、使用状況は pool_telemetry で集計する。
+SQLiteでは接続ごとに SQLITE_* のPRAGMA（WAL・busy_timeout など）を設定する。
 """
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
+
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from .config import settings
+from .pool_telemetry import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_telemetry
 
-# SQLiteの場合の接続引数
-if "sqlite" in settings.DATABASE_URL:
-    connect_args = {
-        "check_same_thread": False,
+# 非同期エンジンで使うドライバ（同期URLのドライバを置き換える）
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    同期ドライバのデータベースURLを非同期ドライバのURLに変換する
+
+    Args:
+        url: データベースURL（例: sqlite:///./trade_dx.db, postgresql://...）
+
+    Returns:
+        str: 非同期ドライバのURL（例: sqlite+aiosqlite:///./trade_dx.db）
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"非同期ドライバに対応していないデータベースです: {backend}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def pool_options(url: str, async_engine: bool = False) -> Dict[str, Any]:
+    """
+    接続プールの設定を返す
+
+    インメモリSQLiteは接続ごとに別のDBになるため、SQLAlchemyの既定のプールをそのまま使う。
+
+    Args:
+        url: データベースURL
+        async_engine: 非同期エンジン用の場合True
+
+    Returns:
+        Dict[str, Any]: create_engine / create_async_engine に渡すキーワード引数
+    """
+    if "sqlite" in url and ":memory:" in url:
+        return {}
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if async_engine else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
     }
-else:
-    connect_args = {}
+
+
+def connect_options(url: str, async_engine: bool = False) -> Dict[str, Any]:
+    """
+    ドライバに渡す接続引数を返す（PostgreSQLでは文の実行時間の上限を設定する）
+
+    Args:
+        url: データベースURL
+        async_engine: 非同期エンジン（asyncpg）用の場合True
+
+    Returns:
+        Dict[str, Any]: connect_args
+    """
+    if "sqlite" in url:
+        return {} if async_engine else {"check_same_thread": False}
+
+    if settings.DB_STATEMENT_TIMEOUT_MS <= 0:
+        return {}
+    if async_engine:
+        return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
 
 # データベースエンジンの作成
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args=connect_args
+    connect_args=connect_options(settings.DATABASE_URL),
+    **pool_options(settings.DATABASE_URL),
 )
 
+
+def sqlite_pragmas() -> List[str]:
+    """
+    SQLiteの接続ごとに実行するPRAGMAを返す（Settings の SQLITE_* から生成）
+
+    Returns:
+        List[str]: PRAGMA文のリスト
+    """
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+
+
+def configure_sqlite(sync_engine: Any, pragmas: Optional[List[str]] = None) -> None:
+    """
+    SQLiteエンジンの新規接続時にPRAGMAを実行するよう登録する
+
+    Args:
+        sync_engine: 同期エンジン（非同期エンジンの場合は sync_engine を渡す）
+        pragmas: 実行するPRAGMA文（省略時は sqlite_pragmas()）
+    """
+    statements = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def sqlite_maintenance(sync_engine: Any) -> Dict[str, int]:
+    """
+    SQLiteの定期保守（PRAGMA optimize とWALのチェックポイント）を実行する
+
+    チェックポイントはPASSIVE（実行中の読み取り・書き込みを待たない）で行う。
+
+    Args:
+        sync_engine: 同期エンジン
+
+    Returns:
+        Dict[str, int]: WALのページ数とチェックポイント済みのページ数
+    """
+    with sync_engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+        busy, log_pages, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)").one()
+        conn.commit()
+    return {"busy": busy, "wal_pages": log_pages, "checkpointed_pages": checkpointed}
+
+
 # SQLiteの場合、外部キー制約は有効化しない
 # （既存のDBとの互換性のため、また変更履歴を残すため）
 # 外部キー制約を有効化すると、案件削除時に変更履歴も削除される可能性がある
@@ -33,16 +167,48 @@ engine = create_engine(
 # セッションファクトリの作成
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 非同期エンジンとセッションファクトリ（コミット後も読み込み済みの属性を参照できるよう expire_on_commit=False）
+# aiosqlite はファイルDBでも既定でプールしない（接続ごとにスレッドを起動する）ため、同期エンジンと同じくプールする
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    connect_args=connect_options(settings.DATABASE_URL, async_engine=True),
+    **pool_options(settings.DATABASE_URL, async_engine=True),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# 接続プールの計測
+pool_telemetry["sync"].attach(engine)
+pool_telemetry["async"].attach(async_engine.sync_engine)
+
+# SQLiteのPRAGMA
+if "sqlite" in settings.DATABASE_URL:
+    configure_sqlite(engine)
+    configure_sqlite(async_engine.sync_engine)
+
 # ベースクラスの作成
 Base = declarative_base()
 
 
-def get_db():
+def get_db() -> Generator[Session, None, None]:
     """
-    データベースセッションを取得する依存性注入関数
+    データベースセッションを取得する
+
+    Yields:
+        Session: SQLAlchemyセッション
     """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    非同期データベースセッションを取得する
+
+    Yields:
+        AsyncSession: SQLAlchemy非同期セッション
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
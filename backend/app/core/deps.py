@@ -1,32 +1,29 @@
 """
 依存性注入（Dependencies）
 """
-from typing import Generator, Optional
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from .database import SessionLocal
+# セッションの依存関数は database で定義したものを共有する（オーバーライドのキーが1つになるよう再定義しない）
+from .database import get_async_db, get_db
 from .security import decode_access_token
 from ..models.user import User
+from ..services.identity_cache import identity_cache
+
+# エンドポイントはセッションの依存関数も deps から取得する（get_async_db は再エクスポート）
+__all__ = [
+    "get_db",
+    "get_async_db",
+    "get_current_user",
+    "get_current_active_user",
+    "get_current_superuser",
+]
 
 # OAuth2スキーム
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_db() -> Generator:
-    """
-    データベースセッションを取得する
-
-    Yields:
-        Session: SQLAlchemyセッション
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -65,8 +62,8 @@ async def get_current_user(
     except (ValueError, TypeError):
         raise credentials_exception
 
-    # ユーザーを取得
-    user = db.query(User).filter(User.id == user_id).first()
+    # ユーザーを取得（短時間キャッシュ。usersへの書き込みで破棄される）
+    user = identity_cache.get_user(db, user_id)
     if user is None:
         raise credentials_exception
 
@@ -0,0 +1,144 @@
+"""
+ブロッキング処理用のスレッドプール
+
+`async def` のエンドポイントから同期処理（Excelの帳票生成、バックアップのファイルコピー、
+bcryptによるパスワード照合など）を直接呼ぶと、その間イベントループが止まり、
+他のリクエストやWebSocketの通知がすべて待たされる。
+処理の種類ごとに上限付きの名前付きスレッドプールを用意し、そこで実行する。
+
+プールを分けているのは、重い処理（バックアップなど）が詰まっても
+ログインなど他の種類の処理の待ち時間に影響させないため。
+各プールの待ち件数・実行中件数・待ち時間は /health で確認できる。
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """待ち件数・待ち時間を計測する名前付きスレッドプール"""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"trade-dx-{self.name}",
+                )
+            return self._pool
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        同期関数をスレッドプールで実行し、完了を待つ
+
+        呼び出し元のコンテキスト変数を引き継ぐ。
+
+        Args:
+            fn: 実行する同期関数
+            *args: 位置引数
+            **kwargs: キーワード引数
+
+        Returns:
+            関数の戻り値（例外はそのまま送出される）
+        """
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, fn, *args, **kwargs)
+        submitted_at = time.perf_counter()
+
+        def worker() -> T:
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            try:
+                return call()
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        with self._lock:
+            self.queued += 1
+        try:
+            future = self._get_pool().submit(worker)
+        except RuntimeError:
+            with self._lock:
+                self.queued -= 1
+            raise
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """スレッドプールを停止する（次回の実行時に作り直す）"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """スレッド数・待ち件数・実行中件数・完了件数・待ち時間（ミリ秒）を返す"""
+        with self._lock:
+            started = self.completed + self.active
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "wait_ms_avg": round(self.wait_seconds_total / started * 1000, 2) if started else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 2),
+            }
+
+
+# 処理の種類ごとのスレッドプール
+executors: Dict[str, BlockingExecutor] = {
+    "documents": BlockingExecutor("documents", settings.DOCUMENT_POOL_SIZE),
+    "backups": BlockingExecutor("backups", settings.BACKUP_POOL_SIZE),
+    "password_hash": BlockingExecutor("password_hash", settings.PASSWORD_HASH_POOL_SIZE),
+}
+
+
+async def run_blocking(pool: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    同期関数を指定したスレッドプールで実行する
+
+    Args:
+        pool: プール名（documents / backups / password_hash）
+        fn: 実行する同期関数
+        *args: 位置引数
+        **kwargs: キーワード引数
+
+    Returns:
+        関数の戻り値
+    """
+    return await executors[pool].run(fn, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """全プールの統計情報を返す"""
+    return {name: executor.stats() for name, executor in executors.items()}
+
+
+def shutdown_executors() -> None:
+    """全プールを停止する"""
+    for executor in executors.values():
+        executor.shutdown()
@@ -0,0 +1,222 @@
+"""
+キーセット（カーソル）ページネーション
+
+一覧APIの `offset` ページングは深いページほど読み飛ばす行が増えるため、
+`(ソート列, id)` をキーにした不透明なカーソルで次ページの開始位置を指定する。
+カーソルは最後に返した行のソート値とIDをエンコードしたもので、
+どれだけ深いページでも同じコストで取得できる。
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import String, and_, literal, or_, tuple_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursorError(ValueError):
+    """カーソルが不正な場合のエラー"""
+    pass
+
+
+def _encode_value(value: Any) -> Any:
+    """ソート値をJSONに格納できる形に変換する"""
+    if isinstance(value, datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"t": "decimal", "v": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """_encode_value で変換したソート値を元の型に戻す"""
+    if not isinstance(value, dict):
+        return value
+
+    value_type = value.get("t")
+    raw = value.get("v")
+    if value_type == "datetime":
+        return datetime.fromisoformat(raw)
+    if value_type == "date":
+        return date.fromisoformat(raw)
+    if value_type == "decimal":
+        return Decimal(raw)
+    raise InvalidCursorError("無効なカーソルです")
+
+
+def encode_cursor(sort_key: str, descending: bool, value: Any, row_id: int) -> str:
+    """
+    カーソル文字列を生成する
+
+    Args:
+        sort_key: ソート項目名
+        descending: 降順の場合True
+        value: 最後の行のソート値
+        row_id: 最後の行のID
+
+    Returns:
+        str: URLセーフなカーソル文字列
+    """
+    payload = {
+        "k": sort_key,
+        "o": "desc" if descending else "asc",
+        "v": _encode_value(value),
+        "id": row_id,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, descending: bool) -> Tuple[Any, int]:
+    """
+    カーソル文字列をデコードする
+
+    Args:
+        cursor: カーソル文字列
+        sort_key: 現在のソート項目名
+        descending: 現在のソート順が降順の場合True
+
+    Returns:
+        Tuple[Any, int]: (ソート値, ID)
+
+    Raises:
+        InvalidCursorError: カーソルが不正、またはソート条件と一致しない場合
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        row_id = int(payload["id"])
+        value = _decode_value(payload.get("v"))
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError, InvalidOperation):
+        raise InvalidCursorError("無効なカーソルです")
+
+    if payload.get("k") != sort_key or payload.get("o") != ("desc" if descending else "asc"):
+        raise InvalidCursorError("カーソルのソート条件が現在のソート条件と一致しません")
+
+    return value, row_id
+
+
+class KeysetPaginator:
+    """
+    `(ソート列, id)` をキーにしたキーセットページネーション
+
+    並び順は `ソート列 → id` で一意に決まるため、`page` 指定と
+    `cursor` 指定のどちらでも同じ順序で結果を返す。
+    NULLを許容する列はNULLを末尾に並べる。
+    """
+
+    def __init__(self, sort_column, id_column, descending: bool = True):
+        self.sort_column = sort_column
+        self.id_column = id_column
+        self.descending = descending
+        self.sort_key = sort_column.key
+        self.nullable = self._is_nullable(sort_column)
+
+    @staticmethod
+    def _is_nullable(sort_column) -> bool:
+        """ソート列がNULLを許容するか"""
+        columns = getattr(getattr(sort_column, "property", None), "columns", None)
+        if not columns:
+            return True
+        return bool(getattr(columns[0], "nullable", True))
+
+    def order(self, query: Query) -> Query:
+        """クエリに `ソート列, id` の並び順を設定する"""
+        if self.descending:
+            sort_expr = self.sort_column.desc()
+            id_expr = self.id_column.desc()
+        else:
+            sort_expr = self.sort_column.asc()
+            id_expr = self.id_column.asc()
+
+        if self.nullable:
+            sort_expr = sort_expr.nulls_last()
+
+        return query.order_by(sort_expr, id_expr)
+
+    def seek(self, query: Query, cursor: str) -> Query:
+        """
+        カーソル位置より後ろの行に絞り込む
+
+        Raises:
+            InvalidCursorError: カーソルが不正な場合
+        """
+        value, row_id = decode_cursor(cursor, self.sort_key, self.descending)
+        return query.filter(self._after(query, value, row_id))
+
+    def _after(self, query: Query, value: Any, row_id: int):
+        """カーソル位置 (value, row_id) より後ろを表す条件式"""
+        col = self.sort_column
+        id_col = self.id_column
+
+        if value is None:
+            # NULLは末尾に並ぶため、NULL同士をIDで比較するだけでよい
+            id_cond = id_col < row_id if self.descending else id_col > row_id
+            return and_(col.is_(None), id_cond)
+
+        low, high = self._bounds(query, value)
+        if low is high:
+            # 行値比較はPostgreSQL・SQLiteともに複合インデックスで範囲走査できる
+            if self.descending:
+                cond = tuple_(col, id_col) < tuple_(value, row_id)
+            else:
+                cond = tuple_(col, id_col) > tuple_(value, row_id)
+        else:
+            if self.descending:
+                cond = or_(col < low, and_(col >= low, col <= high, id_col < row_id))
+            else:
+                cond = or_(col > high, and_(col >= low, col <= high, id_col > row_id))
+
+        if self.nullable:
+            cond = or_(cond, col.is_(None))
+        return cond
+
+    def _bounds(self, query: Query, value: Any) -> Tuple[Any, Any]:
+        """
+        ソート値と等しい保存値の範囲を返す
+
+        SQLiteの日時は文字列で保存され、サーバー側デフォルト（CURRENT_TIMESTAMP）は
+        マイクロ秒なし、ORMからの保存はマイクロ秒付きになる。
+        同じ時刻でも文字列表現が2通りあるため、比較範囲を両方に広げる。
+        """
+        bind = query.session.get_bind() if query.session is not None else None
+        dialect = bind.dialect.name if bind is not None else None
+
+        if dialect == "sqlite" and isinstance(value, datetime):
+            if value.microsecond == 0:
+                base = value.strftime("%Y-%m-%d %H:%M:%S")
+                return literal(base, String), literal(f"{base}.000000", String)
+
+        return value, value
+
+    def fetch(self, query: Query, limit: int) -> Tuple[List[Any], Optional[str]]:
+        """
+        1ページ分の行と次ページのカーソルを取得する
+
+        Args:
+            query: 並び順・絞り込み設定済みのクエリ
+            limit: 取得件数
+
+        Returns:
+            Tuple[List[Any], Optional[str]]: (行のリスト, 次ページのカーソル。最終ページの場合はNone)
+        """
+        rows = query.limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            self.sort_key,
+            self.descending,
+            getattr(last, self.sort_key),
+            getattr(last, self.id_column.key),
+        )
+        return rows, next_cursor
@@ -0,0 +1,133 @@
+"""
+データベース接続プールの計測
+
+複数のワーカープロセスでPostgreSQLの接続数を見積もれるよう、
+エンジンごとに接続プールの使用状況を集計する。
+
+- 貸し出し中・オーバーフロー中の接続数（プールの現在値）
+- 接続の貸し出し回数・新規接続数・無効化された接続数（プールイベント）
+- 接続の取得待ち時間のヒストグラムとタイムアウト回数
+
+取得待ち時間はプールの接続取得処理（QueuePool._do_get）を計測するため、
+TimedQueuePool / TimedAsyncAdaptedQueuePool を poolclass に指定したエンジンのみ集計される。
+"""
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 取得待ち時間のヒストグラムの上限（ミリ秒）。最後のバケットは上限なし
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolTelemetry:
+    """1つのエンジン（接続プール）の計測値"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Optional[Any] = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_counts: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """接続の取得待ち時間を記録する"""
+        index = bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            self.wait_counts[index] += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def _count(self, attribute: str) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def attach(self, engine: Any) -> None:
+        """
+        エンジンの接続プールにイベントリスナーを登録する
+
+        Args:
+            engine: 同期エンジン（非同期エンジンの場合は sync_engine を渡す）
+        """
+        self.engine = engine
+        event.listen(engine, "checkout", lambda *args: self._count("checkouts"))
+        event.listen(engine, "connect", lambda *args: self._count("connects"))
+        event.listen(engine, "invalidate", lambda *args: self._count("invalidations"))
+
+    def stats(self) -> Dict[str, Any]:
+        """プールの現在値と計測値を返す"""
+        pool = self.engine.pool if self.engine is not None else None
+        current: Dict[str, Any] = {"pool_class": type(pool).__name__ if pool is not None else None}
+        if isinstance(pool, QueuePool):
+            current.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                # 負の値は未作成の接続数を表すため、オーバーフロー中の接続数は0以上に丸める
+                "overflow": max(pool.overflow(), 0),
+            })
+
+        with self._lock:
+            waits = sum(self.wait_counts)
+            labels = [f"le_{bound}ms" for bound in WAIT_BUCKETS_MS] + ["inf"]
+            return {
+                **current,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_seconds_total / waits * 1000, 2) if waits else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 2),
+                "wait_histogram": dict(zip(labels, self.wait_counts)),
+            }
+
+
+# エンジンごとの計測値
+pool_telemetry: Dict[str, PoolTelemetry] = {
+    "sync": PoolTelemetry("sync"),
+    "async": PoolTelemetry("async"),
+}
+
+
+class _TimedPoolMixin:
+    """接続の取得待ち時間を計測する（プールを作り直しても計測先を引き継ぐようクラス属性で指定）"""
+
+    telemetry_name = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            pool_telemetry[self.telemetry_name].observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_telemetry[self.telemetry_name].observe_wait(time.perf_counter() - started)
+        return record
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """取得待ち時間を計測する QueuePool（同期エンジン用）"""
+
+    telemetry_name = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """取得待ち時間を計測する AsyncAdaptedQueuePool（非同期エンジン用）"""
+
+    telemetry_name = "async"
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """全エンジンの接続プールの計測値を返す"""
+    return {name: telemetry.stats() for name, telemetry in pool_telemetry.items()}
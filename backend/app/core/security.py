@@ -1,6 +1,9 @@
 """
 セキュリティ関連のユーティリティ
 """
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError
@@ -10,6 +13,10 @@ from .config import settings
 # パスワードハッシュ化コンテキスト
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# 署名検証済みトークンのLRU（トークン → ペイロード）
+_verified_tokens: "OrderedDict[str, dict]" = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -71,13 +78,39 @@ def decode_access_token(token: str) -> Optional[dict]:
 
     Returns:
         Optional[dict]: デコードされたデータ（無効な場合はNone）
+
+    Note:
+        署名を検証済みのトークンはLRUに保持し、同じトークンの再検証を省略する
+        （有効期限はキャッシュから返す場合も確認する）。
     """
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(token)
+        if payload is not None:
+            if payload.get("exp", 0) > time.time():
+                _verified_tokens.move_to_end(token)
+                return payload
+            del _verified_tokens[token]
+            return None
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
 
+    # 有効期限のないトークンはキャッシュしない
+    if isinstance(payload.get("exp"), (int, float)):
+        with _verified_tokens_lock:
+            _verified_tokens[token] = payload
+            while len(_verified_tokens) > settings.TOKEN_CACHE_MAX_ENTRIES:
+                _verified_tokens.popitem(last=False)
+    return payload
+
+
+def clear_verified_tokens() -> None:
+    """検証済みトークンのキャッシュを破棄する（鍵の変更時など）"""
+    with _verified_tokens_lock:
+        _verified_tokens.clear()
+
 
 
 
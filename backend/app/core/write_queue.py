@@ -0,0 +1,233 @@
+"""
+SQLiteの書き込みを1つのスレッド・接続に集約する書き込みキュー
+
+SQLiteはWALでも同時に書き込めるのは1接続のみで、複数のリクエストが並行して
+書き込むと busy_timeout まで待ったり "database is locked" になったりする。
+また SELECT ... FOR UPDATE が無視されるため、案件番号の採番が競合しうる。
+
+SQLITE_SINGLE_WRITER を有効にすると、書き込み処理（ジョブ）を専用スレッドの専用接続で
+1件ずつ順に実行する。キューにたまっているジョブはまとめて1つのトランザクションで実行し
+（ジョブごとにSAVEPOINTを張るため、失敗したジョブだけを取り消す）、1回のコミットで確定する
+（グループコミット）。読み取りは従来どおり接続プールを使う。
+
+ジョブは `fn(db, *args, **kwargs)` の形の同期関数で、コミットは書き込みキューが行うため
+ジョブ内では commit() を呼ばない。無効時（既定・PostgreSQL）は呼び出し元のセッションで
+実行してコミットする。
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ジョブ: (実行する関数, 位置引数, キーワード引数, 結果を返すFuture)
+_Job = Tuple[Callable[..., Any], tuple, dict, concurrent.futures.Future]
+
+# 書き込みスレッドを停止させる印
+_STOP = None
+
+
+class SingleWriter:
+    """専用スレッド・専用接続で書き込みジョブを順に実行する"""
+
+    def __init__(self, engine: Any, max_batch: int):
+        self.engine = engine
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.failed = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run_loop, name="trade-dx-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "concurrent.futures.Future[T]":
+        """
+        書き込みジョブをキューに追加する
+
+        Args:
+            fn: `fn(db, *args, **kwargs)` の形の同期関数（コミットしないこと）
+            *args: 位置引数
+            **kwargs: キーワード引数
+
+        Returns:
+            Future: コミット後にジョブの戻り値（または例外）が設定される
+        """
+        future: "concurrent.futures.Future[T]" = concurrent.futures.Future()
+        context = contextvars.copy_context()
+        self._ensure_started()
+        self._queue.put((functools.partial(context.run, fn), args, kwargs, future))
+        return future
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """書き込みジョブを実行し、コミットを待って戻り値を返す"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _run_loop(self) -> None:
+        connection = self.engine.connect()
+        # 戻り値のORMオブジェクトを呼び出し元のスレッドで参照できるよう、コミット後も期限切れにしない
+        db = Session(bind=connection, autoflush=False, expire_on_commit=False)
+        try:
+            stopping = False
+            while not stopping:
+                job = self._queue.get()
+                if job is _STOP:
+                    break
+                batch = [job]
+                while len(batch) < self.max_batch:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is _STOP:
+                        stopping = True
+                        break
+                    batch.append(job)
+                self._run_batch(db, batch)
+        finally:
+            db.close()
+            connection.close()
+
+    def _run_batch(self, db: Session, batch: List[_Job]) -> None:
+        """ジョブをまとめて1つのトランザクションで実行し、1回でコミットする"""
+        done = []
+        try:
+            # pysqlite はSAVEPOINTの前にBEGINを発行しないため明示的に開始する
+            # （IMMEDIATE で書き込みロックを先に取り、他の接続との競合を開始時点で解決する）
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        except Exception as e:
+            db.rollback()
+            for _, _, _, future in batch:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+            return
+
+        for call, args, kwargs, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            savepoint = db.begin_nested()
+            try:
+                result = call(db, *args, **kwargs)
+                savepoint.commit()
+            except BaseException as e:
+                if savepoint.is_active:
+                    savepoint.rollback()
+                future.set_exception(e)
+                continue
+            done.append((future, result))
+
+        try:
+            db.commit()
+        except Exception as e:
+            logger.error(f"書き込みキューのコミットに失敗しました: {str(e)}")
+            db.rollback()
+            for future, _ in done:
+                future.set_exception(e)
+            done = []
+        finally:
+            db.expunge_all()
+
+        with self._lock:
+            self.batches += 1
+            self.jobs += len(batch)
+            self.failed += len(batch) - len(done)
+            self.largest_batch = max(self.largest_batch, len(batch))
+        for future, result in done:
+            future.set_result(result)
+
+    def shutdown(self) -> None:
+        """キューのジョブを実行し終えてからスレッドを停止する（次回の実行時に再起動する）"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """待ち件数・実行件数・バッチ数（グループコミットの回数）を返す"""
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "jobs": self.jobs,
+                "failed": self.failed,
+                "batches": self.batches,
+                "largest_batch": self.largest_batch,
+            }
+
+
+_single_writer: Optional[SingleWriter] = None
+
+
+def single_writer_enabled() -> bool:
+    """書き込みキューを使うか（SQLiteで SQLITE_SINGLE_WRITER が有効な場合）"""
+    return settings.SQLITE_SINGLE_WRITER and "sqlite" in settings.DATABASE_URL
+
+
+def get_single_writer() -> SingleWriter:
+    """アプリの同期エンジンに対する書き込みキューを返す（初回呼び出し時に作成）"""
+    global _single_writer
+    if _single_writer is None:
+        from .database import engine
+        _single_writer = SingleWriter(engine, settings.SQLITE_WRITER_MAX_BATCH)
+    return _single_writer
+
+
+async def run_write(db: Session, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    書き込みジョブを実行してコミットする
+
+    書き込みキューが有効な場合は書き込みスレッドで実行する。呼び出し元のセッションは
+    待っている間に接続をプールへ返し、コミット後の内容を読めるよう読み取りトランザクションを終了する。
+    無効な場合は呼び出し元のセッションで実行してコミットする（失敗時はロールバック）。
+
+    Args:
+        db: リクエストのデータベースセッション
+        fn: `fn(db, *args, **kwargs)` の形の同期関数（コミットしないこと）
+        *args: 位置引数
+        **kwargs: キーワード引数
+
+    Returns:
+        ジョブの戻り値
+    """
+    if single_writer_enabled():
+        db.rollback()
+        return await get_single_writer().run(fn, *args, **kwargs)
+
+    try:
+        result = fn(db, *args, **kwargs)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return result
+
+
+def single_writer_stats() -> Dict[str, Any]:
+    """書き込みキューの統計情報を返す"""
+    stats: Dict[str, Any] = {"enabled": single_writer_enabled()}
+    if _single_writer is not None:
+        stats.update(_single_writer.stats())
+    return stats
+
+
+def shutdown_single_writer() -> None:
+    """書き込みキューを停止する"""
+    if _single_writer is not None:
+        _single_writer.shutdown()
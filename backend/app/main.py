@@ -1,13 +1,27 @@
 """
 FastAPI メインアプリケーション
 """
+import asyncio
 import logging
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from .core.config import settings
-from .core.database import engine, Base
-from .api.endpoints import auth, cases, case_numbers, customers, products, analytics, documents, change_history, backups, websocket
+from .core.database import async_engine, engine, Base
+from .core.executors import executor_stats, shutdown_executors
+from .core.pool_telemetry import pool_stats
+from .core.write_queue import shutdown_single_writer, single_writer_stats
+from .core.pagination import InvalidCursorError
+from .services.search_service import ensure_search_index
+from .services.change_history_service import ensure_case_number_snapshots
+from .services.change_history_fields import ensure_change_history_fields
+from .services.change_history_writer import change_history_writer
+from .services.count_cache import count_cache
+from .services.master_data_cache import master_data_cache
+from .services.identity_cache import identity_cache
+from .services.archive_service import case_archiver
+from .services.scheduler_service import run_archival_periodically, run_sqlite_maintenance_periodically
+from .api.endpoints import auth, cases, case_numbers, customers, products, analytics, documents, change_history, backups, exports, websocket
 from scripts.seed_data import main as init_db
 
 # ロギング設定
@@ -18,6 +32,9 @@ logger = logging.getLogger(__name__)
 try:
     Base.metadata.create_all(bind=engine)
     logger.info("データベーステーブルの作成が完了しました")
+    ensure_search_index(engine)
+    ensure_case_number_snapshots(engine)
+    ensure_change_history_fields(engine)
 except Exception as e:
     logger.error(f"データベーステーブルの作成に失敗しました: {str(e)}")
 
@@ -47,6 +64,7 @@ app.include_router(analytics.router, prefix="/api/analytics", tags=["分析・
 app.include_router(documents.router, prefix="/api/documents", tags=["ドキュメント生成"])
 app.include_router(change_history.router, prefix="/api/change-history", tags=["変更履歴"])
 app.include_router(backups.router, prefix="/api/backups", tags=["バックアップ"])
+app.include_router(exports.router, prefix="/api/exports", tags=["エクスポート"])
 app.include_router(websocket.router, prefix="/api", tags=["WebSocket"])
 
 @app.on_event("startup")
@@ -124,6 +142,34 @@ async def startup_event():
     # データベース初期化
     init_db()
 
+    # SQLiteの定期保守（PRAGMA optimize・WALのチェックポイント）
+    if "sqlite" in settings.DATABASE_URL and settings.SQLITE_MAINTENANCE_INTERVAL_SECONDS > 0:
+        app.state.sqlite_maintenance_task = asyncio.create_task(
+            run_sqlite_maintenance_periodically(settings.SQLITE_MAINTENANCE_INTERVAL_SECONDS)
+        )
+
+    # 完了・キャンセルから一定期間が過ぎた案件のアーカイブ
+    if settings.ARCHIVE_INTERVAL_SECONDS > 0:
+        app.state.archival_task = asyncio.create_task(
+            run_archival_periodically(settings.ARCHIVE_INTERVAL_SECONDS)
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """アプリ終了時の処理"""
+    for task_name in ("sqlite_maintenance_task", "archival_task"):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+
+    # 非同期エンジンの接続を解放
+    await async_engine.dispose()
+    shutdown_executors()
+    shutdown_single_writer()
+    # 遅延書き込み中の変更履歴を書き込む（書き込みキューの停止後に行う）
+    change_history_writer.drain()
+
 @app.get("/")
 async def root():
     """
@@ -140,13 +186,34 @@ async def root():
 async def health_check():
     """
     ヘルスチェックエンドポイント
+    （プロセス内キャッシュのヒット・ミス件数、スレッドプール・DB接続プールの使用状況を含む）
     """
     return {
         "status": "healthy",
         "app_name": settings.APP_NAME,
-        "version": settings.APP_VERSION
+        "version": settings.APP_VERSION,
+        "caches": {
+            "count": {"hits": count_cache.hits, "misses": count_cache.misses},
+            "master_data": master_data_cache.stats(),
+            "identity": identity_cache.stats(),
+        },
+        "executors": executor_stats(),
+        "database_pools": pool_stats(),
+        "single_writer": single_writer_stats(),
+        "change_history_writer": change_history_writer.stats(),
+        "archive": case_archiver.stats(),
     }
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_exception_handler(request: Request, exc: InvalidCursorError):
+    """
+    不正なページネーションカーソルを400エラーとして返す
+    """
+    return JSONResponse(
+        status_code=400,
+        content={"detail": str(exc)}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """
@@ -9,6 +9,9 @@ from .change_history import ChangeHistory
 from .case_number import CaseNumber
 from .backup import Backup
 from .document import Document
+from .archive import CaseArchive, ChangeHistoryArchive, ChangeHistoryFieldArchive
+from .case_checkpoint import CaseCheckpoint
+from .change_history_field import ChangeHistoryField
 
 __all__ = [
     "User",
@@ -19,6 +22,11 @@ __all__ = [
     "CaseNumber",
     "Backup",
     "Document",
+    "CaseArchive",
+    "ChangeHistoryArchive",
+    "ChangeHistoryFieldArchive",
+    "CaseCheckpoint",
+    "ChangeHistoryField",
 ]
 
 
@@ -0,0 +1,111 @@
+"""
+アーカイブモデル（完了・キャンセルから一定期間が過ぎた案件と、その変更履歴の保管先）
+
+列は案件・変更履歴テーブルと同じ名前・型にそろえる（アーカイブを含めて読み取る際に
+UNION ALL で1つの表として扱うため）。アーカイブ済みの行は更新しない。
+"""
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Text, ForeignKey, Index, JSON
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class CaseArchive(Base):
+    """案件アーカイブテーブル（IDは案件テーブルのIDをそのまま使う）"""
+    __tablename__ = "cases_archive"
+    __table_args__ = (
+        Index("ix_cases_archive_status_created_at", "status", "created_at", "id"),
+        Index("ix_cases_archive_created_at", "created_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    case_number = Column(String(20), unique=True, nullable=False, index=True, comment="案件番号")
+    trade_type = Column(String(10), nullable=False, comment="区分（輸出/輸入）")
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True, comment="顧客ID")
+    supplier_name = Column(String(100), nullable=True, comment="仕入先名")
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True, comment="商品ID")
+    quantity = Column(Numeric(15, 3), nullable=False, comment="数量")
+    unit = Column(String(10), nullable=False, comment="単位")
+    sales_unit_price = Column(Numeric(15, 2), nullable=False, comment="販売単価")
+    purchase_unit_price = Column(Numeric(15, 2), nullable=False, comment="仕入単価")
+    sales_amount = Column(Numeric(15, 2), nullable=True, comment="売上額（計算値）")
+    gross_profit = Column(Numeric(15, 2), nullable=True, comment="粗利額（計算値）")
+    gross_profit_rate = Column(Numeric(5, 2), nullable=True, comment="粗利率%（計算値）")
+    shipment_date = Column(Date, nullable=True, comment="船積予定日")
+    status = Column(String(20), nullable=False, comment="ステータス（完了/キャンセル）")
+    pic = Column(String(50), nullable=False, comment="担当者名")
+    notes = Column(Text, nullable=True, comment="備考")
+    search_key = Column(Text, nullable=True, comment="検索キー（正規化済みの検索対象列）")
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True, comment="作成者ID")
+    updated_by = Column(Integer, ForeignKey("users.id"), nullable=True, comment="更新者ID")
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    # アーカイブした日時
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, comment="アーカイブ日時")
+
+    def __repr__(self):
+        return f"<CaseArchive(id={self.id}, case_number={self.case_number})>"
+
+
+class ChangeHistoryArchive(Base):
+    """
+    変更履歴アーカイブテーブル
+
+    SQLiteの変更履歴テーブルは AUTOINCREMENT ではなく、末尾のIDがアーカイブで消えると
+    同じIDが再利用されるため、アーカイブ側は独自の主キーを持ち、元のIDは id 列に保存する。
+    """
+    __tablename__ = "change_history_archive"
+    __table_args__ = (
+        Index("ix_change_history_archive_case_number_snapshot", "case_number_snapshot", "id"),
+    )
+
+    archive_id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(Integer, nullable=False, index=True, comment="変更履歴ID（アーカイブ前のID）")
+    case_id = Column(Integer, nullable=True, index=True, comment="案件ID")
+    changed_by = Column(Integer, ForeignKey("users.id"), nullable=True, comment="変更者ID")
+    change_type = Column(String(20), nullable=False, comment="変更タイプ（CREATE/UPDATE/DELETE）")
+    field_name = Column(String(50), nullable=True, comment="変更フィールド名")
+    old_value = Column(Text, nullable=True, comment="変更前の値")
+    new_value = Column(Text, nullable=True, comment="変更後の値")
+    case_number_snapshot = Column(String(50), nullable=True, comment="案件番号スナップショット")
+    changes_json = Column(JSON, nullable=True, comment="変更詳細（JSON）")
+    notes = Column(Text, nullable=True, comment="備考")
+    changed_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    # アーカイブした日時
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, comment="アーカイブ日時")
+
+    def __repr__(self):
+        return f"<ChangeHistoryArchive(id={self.id}, case_id={self.case_id}, type={self.change_type})>"
+
+
+class ChangeHistoryFieldArchive(Base):
+    """
+    変更履歴の項目別テーブルのアーカイブ
+
+    アーカイブした変更履歴の項目別の行（change_history_fields と同じ列）。
+    項目別の行のIDはどこからも参照されないため、IDはアーカイブ側で採番する。
+    history_id はアーカイブ前の変更履歴ID（change_history_archive.id）。
+    """
+    __tablename__ = "change_history_fields_archive"
+    __table_args__ = (
+        Index("ix_change_history_fields_archive_field_changed_at", "field_name", "changed_at", "id"),
+        Index("ix_change_history_fields_archive_case_field", "case_id", "field_name", "changed_at"),
+        Index("ix_change_history_fields_archive_changed_by", "changed_by", "changed_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    history_id = Column(Integer, nullable=False, index=True, comment="変更履歴ID（アーカイブ前のID）")
+    case_id = Column(Integer, nullable=True, comment="案件ID")
+    changed_by = Column(Integer, nullable=True, comment="変更者ID")
+    change_type = Column(String(20), nullable=False, comment="変更タイプ（CREATE/UPDATE/DELETE）")
+    changed_at = Column(DateTime(timezone=True), nullable=False, comment="変更日時")
+    field_name = Column(String(50), nullable=False, comment="変更フィールド名")
+    old_value = Column(Text, nullable=True, comment="変更前の値")
+    new_value = Column(Text, nullable=True, comment="変更後の値")
+
+    # アーカイブした日時
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, comment="アーカイブ日時")
+
+    def __repr__(self):
+        return f"<ChangeHistoryFieldArchive(history_id={self.history_id}, field={self.field_name})>"
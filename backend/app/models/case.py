@@ -1,7 +1,7 @@
 """
 案件モデル
 """
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -10,7 +10,17 @@ from ..core.database import Base
 class Case(Base):
     """案件テーブル"""
     __tablename__ = "cases"
-    __table_args__ = {"sqlite_autoincrement": True}
+    __table_args__ = (
+        # 一覧APIのフィルタ・ソート用（末尾のidはキーセットページネーションの同値順）
+        Index("ix_cases_status_created_at", "status", "created_at", "id"),
+        Index("ix_cases_status_id", "status", "id"),
+        Index("ix_cases_trade_type_shipment_date", "trade_type", "shipment_date", "id"),
+        Index("ix_cases_created_at", "created_at", "id"),
+        Index("ix_cases_updated_at", "updated_at", "id"),
+        Index("ix_cases_shipment_date", "shipment_date", "id"),
+        Index("ix_cases_sales_amount", "sales_amount", "id"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     case_number = Column(String(20), unique=True, nullable=False, index=True, comment="案件番号 (例: 2025-EX-001)")
@@ -19,11 +29,11 @@ class Case(Base):
     trade_type = Column(String(10), nullable=False, comment="区分（輸出/輸入）")
 
     # 顧客・仕入先情報
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, comment="顧客ID")
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True, comment="顧客ID")
     supplier_name = Column(String(100), nullable=True, comment="仕入先名")
 
     # 商品情報
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, comment="商品ID")
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True, comment="商品ID")
     quantity = Column(Numeric(15, 3), nullable=False, comment="数量")
     unit = Column(String(10), nullable=False, comment="単位")
 
@@ -46,6 +56,9 @@ class Case(Base):
     # 備考
     notes = Column(Text, nullable=True, comment="備考")
 
+    # 検索キー（正規化済みの案件番号）
+    search_key = Column(Text, nullable=True, comment="検索キー（正規化済みの検索対象列）")
+
     # 作成・更新情報
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True, comment="作成者ID")
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=True, comment="更新者ID")
@@ -0,0 +1,33 @@
+"""
+案件状態チェックポイントモデル
+"""
+from sqlalchemy import Column, Index, Integer, DateTime, JSON
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class CaseCheckpoint(Base):
+    """案件状態チェックポイントテーブル
+
+    ある変更履歴を反映した時点の案件の全項目を保存する（変更履歴の値と同じ文字列表現）。
+    ある日時の案件の状態は、その日時以前で最新のチェックポイントと、それ以降の変更履歴から復元する
+    （services/case_state_service.py）。変更履歴から再作成できるため、削除しても復元結果は変わらない。
+    案件のアーカイブ後も使うため、案件への外部キー制約は設定しない。
+    """
+    __tablename__ = "case_checkpoints"
+    __table_args__ = (
+        # 案件ごとに「指定日時以前で最新のチェックポイント」を探す
+        Index("ix_case_checkpoints_case_id_changed_at", "case_id", "changed_at", "history_id"),
+        Index("uq_case_checkpoints_case_id_history_id", "case_id", "history_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    case_id = Column(Integer, nullable=False, comment="案件ID")
+    history_id = Column(Integer, nullable=False, comment="最後に反映した変更履歴ID")
+    changed_at = Column(DateTime(timezone=True), nullable=False, comment="最後に反映した変更履歴の変更日時")
+    sequence = Column(Integer, nullable=False, comment="反映した変更履歴の件数")
+    state = Column(JSON, nullable=False, comment="案件の全項目（項目名と値）")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<CaseCheckpoint(case_id={self.case_id}, history_id={self.history_id})>"
@@ -1,7 +1,7 @@
 """
 案件番号管理モデル
 """
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Index, Integer, String, DateTime
 from sqlalchemy.sql import func
 from ..core.database import Base
 
@@ -13,9 +13,15 @@ class CaseNumber(Base):
     形式: YYYY-XX-NNN
     - YYYY: 年
     - XX: 区分コード (EX=輸出, IM=輸入)
-    - NNN: 連番 (001-999)
+    - NNN: 連番（桁数は CASE_NUMBER_SEQUENCE_WIDTH、既定は3桁: 001-999）
+
+    採番は services/case_number_allocator.py の1文の UPDATE ... RETURNING で行う。
     """
     __tablename__ = "case_numbers"
+    __table_args__ = (
+        # (年, 区分) ごとに1行（同時に行を作成した場合は一意制約違反で検出する）
+        Index("uq_case_numbers_year_trade_type", "year", "trade_type", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     year = Column(Integer, nullable=False, index=True, comment="年（YYYY）")
@@ -29,19 +35,20 @@ class CaseNumber(Base):
         return f"<CaseNumber(year={self.year}, type={self.trade_type}, last_seq={self.last_sequence})>"
 
     @classmethod
-    def generate_case_number(cls, year: int, trade_type: str, sequence: int) -> str:
+    def generate_case_number(cls, year: int, trade_type: str, sequence: int, width: int = 3) -> str:
         """案件番号を生成する
         
         Args:
             year: 年（YYYY）
             trade_type: 区分（輸出/輸入）
             sequence: 連番
+            width: 連番の桁数（ゼロ埋め）
             
         Returns:
             案件番号（例: 2025-EX-001）
         """
         type_code = "EX" if trade_type == "輸出" else "IM"
-        return f"{year}-{type_code}-{sequence:03d}"
+        return f"{year}-{type_code}-{sequence:0{width}d}"
 
 
 
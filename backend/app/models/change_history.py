@@ -1,7 +1,7 @@
 """
 変更履歴モデル
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime, ForeignKey, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -10,6 +10,10 @@ from ..core.database import Base
 class ChangeHistory(Base):
     """変更履歴テーブル"""
     __tablename__ = "change_history"
+    __table_args__ = (
+        # 案件番号による絞り込み・ソート（キーセットページングの (案件番号, id)）
+        Index("ix_change_history_case_number_snapshot", "case_number_snapshot", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     # 案件削除後も履歴を残すため、外部キー制約はON DELETE SET NULLを設定
@@ -25,6 +29,9 @@ class ChangeHistory(Base):
     old_value = Column(Text, nullable=True, comment="変更前の値")
     new_value = Column(Text, nullable=True, comment="変更後の値")
 
+    # 履歴時点の案件番号（案件番号が後から変わっても履歴の表示・検索に使う）
+    case_number_snapshot = Column(String(50), nullable=True, comment="案件番号スナップショット")
+
     # 変更の詳細（JSON形式で複数フィールドの変更を保存）
     changes_json = Column(JSON, nullable=True, comment="変更詳細（JSON）")
 
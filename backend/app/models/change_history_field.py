@@ -0,0 +1,39 @@
+"""
+変更履歴の項目別テーブルモデル
+"""
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime
+from ..core.database import Base
+
+
+class ChangeHistoryField(Base):
+    """変更履歴の項目別テーブル
+
+    変更履歴1件の changes_json を項目ごとの1行に展開したもの
+    （services/change_history_fields.py）。項目・変更前後の値・変更者・期間による
+    監査向けの検索を、changes_json を読み取らずにインデックスで行うために使う。
+    変更履歴を削除する際はこの表の行も削除し、アーカイブする際は
+    change_history_fields_archive へ移す。
+    """
+    __tablename__ = "change_history_fields"
+    __table_args__ = (
+        Index("ix_change_history_fields_field_changed_at", "field_name", "changed_at", "id"),
+        Index("ix_change_history_fields_case_field", "case_id", "field_name", "changed_at"),
+        Index("ix_change_history_fields_changed_by", "changed_by", "changed_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    history_id = Column(Integer, nullable=False, index=True, comment="変更履歴ID")
+
+    # 絞り込みに使う変更履歴の列（変更履歴と結合せずに検索できるように複製する）
+    case_id = Column(Integer, nullable=True, comment="案件ID")
+    changed_by = Column(Integer, nullable=True, comment="変更者ID")
+    change_type = Column(String(20), nullable=False, comment="変更タイプ（CREATE/UPDATE/DELETE）")
+    changed_at = Column(DateTime(timezone=True), nullable=False, comment="変更日時")
+
+    # 変更内容（変更履歴と同じ文字列表現）
+    field_name = Column(String(50), nullable=False, comment="変更フィールド名")
+    old_value = Column(Text, nullable=True, comment="変更前の値")
+    new_value = Column(Text, nullable=True, comment="変更後の値")
+
+    def __repr__(self):
+        return f"<ChangeHistoryField(history_id={self.history_id}, field={self.field_name})>"
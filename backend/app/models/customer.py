@@ -22,6 +22,7 @@ class Customer(Base):
     email = Column(String(100), nullable=True, comment="メールアドレス")
     payment_terms = Column(String(50), nullable=True, comment="支払条件")
     notes = Column(Text, nullable=True, comment="備考")
+    search_key = Column(Text, nullable=True, comment="検索キー（正規化済みの検索対象列）")
     is_active = Column(Integer, default=1, nullable=False, comment="有効フラグ（1=有効, 0=無効）")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
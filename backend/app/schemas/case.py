@@ -1,9 +1,9 @@
 """
 案件スキーマ
 """
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import date, datetime
-from typing import Optional
+from typing import Dict, Optional
 from decimal import Decimal
 
 
@@ -49,6 +49,28 @@ class CaseCreate(CaseBase):
     pass
 
 
+# 一括作成の上限件数
+CASE_BULK_CREATE_MAX_ITEMS = 5000
+
+
+# 案件一括作成用
+class CaseBulkCreate(BaseModel):
+    """案件一括作成スキーマ"""
+    items: list[CaseCreate] = Field(..., min_length=1, max_length=CASE_BULK_CREATE_MAX_ITEMS, description="作成する案件")
+
+
+class CaseBulkCreateItem(BaseModel):
+    """一括作成された案件"""
+    id: int
+    case_number: str
+
+
+class CaseBulkCreateResponse(BaseModel):
+    """案件一括作成レスポンス（リクエストと同じ順序）"""
+    created: int
+    items: list[CaseBulkCreateItem]
+
+
 # 案件更新用
 class CaseUpdate(BaseModel):
     """案件更新スキーマ"""
@@ -88,6 +110,60 @@ class CaseUpdate(BaseModel):
         return v
 
 
+# 一括更新・一括削除の上限件数
+CASE_BULK_UPDATE_MAX_ITEMS = 5000
+
+
+class CaseBulkFilter(BaseModel):
+    """一括更新の対象条件（案件一覧のフィルタと同じ）"""
+    search: Optional[str] = Field(None, description="検索キーワード（案件番号、顧客名、商品名）")
+    trade_type: Optional[str] = Field(None, description="区分フィルタ")
+    status: Optional[str] = Field(None, description="ステータスフィルタ")
+    pic: Optional[str] = Field(None, description="担当者フィルタ")
+    shipment_date_from: Optional[date] = Field(None, description="船積予定日（開始）")
+    shipment_date_to: Optional[date] = Field(None, description="船積予定日（終了）")
+
+
+# 案件一括更新用
+class CaseBulkUpdate(BaseModel):
+    """案件一括更新スキーマ（ids と filter のどちらか一方を指定）"""
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=CASE_BULK_UPDATE_MAX_ITEMS, description="更新する案件ID")
+    filter: Optional[CaseBulkFilter] = Field(None, description="更新する案件の条件")
+    patch: CaseUpdate = Field(..., description="更新内容（指定したフィールドのみ更新）")
+
+    @model_validator(mode="after")
+    def validate_target(self) -> "CaseBulkUpdate":
+        """対象の指定方法のバリデーション"""
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError('ids と filter のどちらか一方を指定する必要があります')
+        return self
+
+
+class CaseBulkResult(BaseModel):
+    """案件ごとの一括更新・一括削除の結果"""
+    id: int
+    result: str = Field(..., description="updated/unchanged/deleted/not_found")
+    case_number: Optional[str] = None
+
+
+class CaseBulkUpdateResponse(BaseModel):
+    """案件一括更新レスポンス"""
+    updated: int
+    results: list[CaseBulkResult]
+
+
+# 案件一括削除用
+class CaseBulkDelete(BaseModel):
+    """案件一括削除スキーマ"""
+    ids: list[int] = Field(..., min_length=1, max_length=CASE_BULK_UPDATE_MAX_ITEMS, description="削除する案件ID")
+
+
+class CaseBulkDeleteResponse(BaseModel):
+    """案件一括削除レスポンス"""
+    deleted: int
+    results: list[CaseBulkResult]
+
+
 # 顧客情報（埋め込み用）
 class CustomerInCase(BaseModel):
     """案件内の顧客情報"""
@@ -131,6 +207,21 @@ class Case(CaseBase):
         from_attributes = True
 
 
+class CaseStateAsOf(BaseModel):
+    """ある日時の案件の状態（変更履歴から復元）"""
+    case_id: int
+    as_of: datetime
+    deleted: bool = False
+    # 項目名と値（変更履歴と同じ文字列表現）
+    state: Dict[str, Optional[str]]
+    # 最後に反映した変更履歴
+    history_id: int
+    changed_at: datetime
+    # 復元に使ったチェックポイントの変更履歴ID（作成時から反映した場合は None）
+    checkpoint_history_id: Optional[int] = None
+    replayed_changes: int
+
+
 # 案件一覧用（簡易版）
 class CaseListItem(BaseModel):
     """案件一覧用スキーマ"""
@@ -160,8 +251,9 @@ class CaseListItem(BaseModel):
 class CaseListResponse(BaseModel):
     """案件一覧レスポンス（ページネーション付き）"""
     items: list[CaseListItem]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
 
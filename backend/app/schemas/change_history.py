@@ -54,3 +54,29 @@ class ChangeHistoryListResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
+
+
+class ChangeHistoryFieldItem(BaseModel):
+    """項目別の変更履歴（1項目の変更）"""
+    id: int
+    history_id: int
+    case_id: Optional[int] = None
+    case_number: Optional[str] = None
+    changed_by: Optional[int] = None
+    changed_by_name: Optional[str] = None
+    change_type: str
+    field_name: str
+    old_value: Optional[str] = None
+    new_value: Optional[str] = None
+    changed_at: datetime
+
+
+class ChangeHistoryFieldListResponse(BaseModel):
+    """項目別の変更履歴の検索結果（ページネーション付き）"""
+    items: list[ChangeHistoryFieldItem]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+    next_cursor: Optional[str] = None
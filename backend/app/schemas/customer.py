@@ -58,11 +58,12 @@ class CustomerResponse(CustomerInDB):
 
 class CustomerListResponse(BaseModel):
     """顧客マスタ一覧レスポンススキーマ"""
-    total: int
+    total: Optional[int]
     items: list[CustomerResponse]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 
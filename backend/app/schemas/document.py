@@ -50,7 +50,8 @@ class DocumentResponse(DocumentBase):
 class DocumentListResponse(BaseModel):
     """ドキュメント一覧レスポンス"""
     documents: list[DocumentResponse]
-    total: int
+    total: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class InvoiceData(BaseModel):
@@ -57,11 +57,12 @@ class ProductResponse(ProductInDB):
 
 class ProductListResponse(BaseModel):
     """商品マスタ一覧レスポンススキーマ"""
-    total: int
+    total: Optional[int]
     items: list[ProductResponse]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 
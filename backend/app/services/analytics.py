@@ -1,13 +1,16 @@
 """
 分析・集計サービス
+
+集計クエリは非同期セッションで実行し、集計中もイベントループを止めない。
+既定では案件テーブル（アーカイブ前の案件）だけを集計し、include_archived の場合は
+アーカイブ済みの案件も含めて集計する。
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
 from datetime import datetime, date, timedelta
 from typing import List, Optional, Dict
 from decimal import Decimal
 
-from ..models.case import Case
 from ..models.customer import Customer
 from ..models.product import Product
 from ..schemas.analytics import (
@@ -16,122 +19,102 @@ from ..schemas.analytics import (
     MonthlyTrend,
     CustomerRevenue,
 )
+from .archive_service import case_source
 
 
 class AnalyticsService:
     """分析サービス"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, include_archived: bool = False):
         self.db = db
+        # 案件の読み取り元（アーカイブを含める場合は UNION ALL した Case の別名）
+        self.cases = case_source(include_archived)
 
-    def get_summary(
+    async def get_summary(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
     ) -> Dict:
-        """サマリーデータを取得"""
+        """
+        サマリーデータを取得
+
+        案件全体を走査する指標（総数・進行中・完了・ステータス分布）は、ステータス別の
+        件数（GROUP BY）1文・1回の走査で求める。期間を指定した場合は WHERE で絞り込むため、
+        作成日時のインデックスで期間内の案件だけを読み取る。今月・先月の指標と顧客数・商品数は、
+        作成日時の範囲検索のスカラーサブクエリとして1行の1文で求める（行ごとに条件を評価しない）。
+        期間の指定は総数・進行中・完了・ステータス分布にのみ適用する（今月・先月の指標は常に全案件が対象）。
+        """
         # 日付フィルター条件
         query_filter = []
         if start_date:
-            query_filter.append(Case.created_at >= start_date)
+            query_filter.append(self.cases.created_at >= start_date)
         if end_date:
-            query_filter.append(Case.created_at <= end_date)
-
-        # 総案件数
-        total_cases = self.db.query(func.count(Case.id)).filter(*query_filter).scalar() or 0
-
-        # 進行中案件数（見積中、受注済、船積済）
-        active_statuses = ["見積中", "受注済", "船積済"]
-        active_cases = (
-            self.db.query(func.count(Case.id))
-            .filter(Case.status.in_(active_statuses))
-            .filter(*query_filter)
-            .scalar() or 0
-        )
-
-        # 完了案件数
-        completed_cases = (
-            self.db.query(func.count(Case.id))
-            .filter(Case.status == "完了")
-            .filter(*query_filter)
-            .scalar() or 0
-        )
+            query_filter.append(self.cases.created_at <= end_date)
 
-        # 総顧客数
-        total_customers = self.db.query(func.count(Customer.id)).scalar() or 0
-
-        # 総商品数
-        total_products = self.db.query(func.count(Product.id)).scalar() or 0
+        # ステータス別の件数（期間内）
+        status_counts = (
+            await self.db.execute(
+                select(self.cases.status, func.count().label("count"))
+                .where(*query_filter)
+                .group_by(self.cases.status)
+            )
+        ).all()
 
-        # 今月の案件数と売上額
+        # 今月・先月の期間
         today = date.today()
         first_day_of_month = date(today.year, today.month, 1)
-
-        this_month_cases = (
-            self.db.query(func.count(Case.id))
-            .filter(Case.created_at >= first_day_of_month)
-            .scalar() or 0
-        )
-
-        this_month_revenue = (
-            self.db.query(func.coalesce(func.sum(Case.sales_amount), 0))
-            .filter(Case.created_at >= first_day_of_month)
-            .scalar() or 0
-        )
-
-        # 先月の売上額
         if today.month == 1:
             last_month = date(today.year - 1, 12, 1)
-            first_day_of_this_month = date(today.year, 1, 1)
         else:
             last_month = date(today.year, today.month - 1, 1)
-            first_day_of_this_month = first_day_of_month
 
-        last_month_revenue = (
-            self.db.query(func.coalesce(func.sum(Case.sales_amount), 0))
-            .filter(Case.created_at >= last_month)
-            .filter(Case.created_at < first_day_of_this_month)
-            .scalar() or 0
-        )
+        def case_aggregate(aggregate, *conditions):
+            return select(aggregate).where(*conditions).scalar_subquery()
+
+        revenue = func.coalesce(func.sum(self.cases.sales_amount), 0)
+        totals = (
+            await self.db.execute(
+                select(
+                    select(func.count(Customer.id)).scalar_subquery().label("customers"),
+                    select(func.count(Product.id)).scalar_subquery().label("products"),
+                    case_aggregate(func.count(), self.cases.created_at >= first_day_of_month).label("this_month_cases"),
+                    case_aggregate(revenue, self.cases.created_at >= first_day_of_month).label("this_month_revenue"),
+                    case_aggregate(
+                        revenue,
+                        self.cases.created_at >= last_month,
+                        self.cases.created_at < first_day_of_month,
+                    ).label("last_month_revenue"),
+                )
+            )
+        ).one()
 
+        # 進行中案件（見積中、受注済、船積済）
+        active_statuses = ["見積中", "受注済", "船積済"]
         summary = SummaryData(
-            total_cases=total_cases,
-            active_cases=active_cases,
-            completed_cases=completed_cases,
-            total_customers=total_customers,
-            total_products=total_products,
-            this_month_cases=this_month_cases,
-            this_month_revenue=float(this_month_revenue),
-            last_month_revenue=float(last_month_revenue),
+            total_cases=sum(row.count for row in status_counts),
+            active_cases=sum(row.count for row in status_counts if row.status in active_statuses),
+            completed_cases=sum(row.count for row in status_counts if row.status == "完了"),
+            total_customers=totals.customers or 0,
+            total_products=totals.products or 0,
+            this_month_cases=totals.this_month_cases or 0,
+            this_month_revenue=float(totals.this_month_revenue or 0),
+            last_month_revenue=float(totals.last_month_revenue or 0),
         )
 
-        # ステータス分布
-        status_distribution = self._get_status_distribution(query_filter)
-
         return {
             "summary": summary,
-            "status_distribution": status_distribution,
+            "status_distribution": self._status_distribution(status_counts),
         }
 
-    def _get_status_distribution(self, query_filter: List) -> List[CaseStatusDistribution]:
-        """ステータス分布を取得"""
-        # ステータス別の件数を取得
-        status_counts = (
-            self.db.query(
-                Case.status,
-                func.count(Case.id).label("count")
-            )
-            .filter(*query_filter)
-            .group_by(Case.status)
-            .all()
-        )
-
+    @staticmethod
+    def _status_distribution(rows: List) -> List[CaseStatusDistribution]:
+        """ステータス別の件数（期間内）からステータス分布を組み立てる"""
         # 総件数
-        total = sum(row.count for row in status_counts)
+        total = sum(row.count for row in rows)
 
         # パーセンテージを計算
         distribution = []
-        for row in status_counts:
+        for row in rows:
             percentage = (row.count / total * 100) if total > 0 else 0
             distribution.append(
                 CaseStatusDistribution(
@@ -147,7 +130,7 @@ class AnalyticsService:
 
         return distribution
 
-    def get_trends(self, period_months: int = 12) -> Dict:
+    async def get_trends(self, period_months: int = 12) -> Dict:
         """月次トレンドを取得"""
         # 期間の開始日を計算（N ヶ月前の1日）
         today = date.today()
@@ -160,23 +143,24 @@ class AnalyticsService:
 
         if db_dialect == 'postgresql':
             # PostgreSQL用: to_char関数を使用
-            year_month_expr = func.to_char(Case.created_at, 'YYYY-MM')
+            year_month_expr = func.to_char(self.cases.created_at, 'YYYY-MM')
         else:
             # SQLite用: strftime関数を使用
-            year_month_expr = func.strftime('%Y-%m', Case.created_at)
+            year_month_expr = func.strftime('%Y-%m', self.cases.created_at)
 
         # 月次集計
         monthly_data = (
-            self.db.query(
-                year_month_expr.label('year_month'),
-                func.count(Case.id).label('case_count'),
-                func.coalesce(func.sum(Case.sales_amount), 0).label('revenue')
+            await self.db.execute(
+                select(
+                    year_month_expr.label('year_month'),
+                    func.count(self.cases.id).label('case_count'),
+                    func.coalesce(func.sum(self.cases.sales_amount), 0).label('revenue')
+                )
+                .where(self.cases.created_at >= start_date)
+                .group_by(year_month_expr)
+                .order_by(year_month_expr)
             )
-            .filter(Case.created_at >= start_date)
-            .group_by(year_month_expr)
-            .order_by(year_month_expr)
-            .all()
-        )
+        ).all()
 
         trends = [
             MonthlyTrend(
@@ -192,23 +176,24 @@ class AnalyticsService:
             "period_months": period_months,
         }
 
-    def get_top_customers(self, limit: int = 10) -> Dict:
+    async def get_top_customers(self, limit: int = 10) -> Dict:
         """顧客別売上TOP取得"""
         # 顧客別の案件数と売上額を集計
         customer_data = (
-            self.db.query(
-                Customer.id,
-                Customer.customer_code,
-                Customer.customer_name,
-                func.count(Case.id).label('case_count'),
-                func.coalesce(func.sum(Case.sales_amount), 0).label('total_revenue')
+            await self.db.execute(
+                select(
+                    Customer.id,
+                    Customer.customer_code,
+                    Customer.customer_name,
+                    func.count(self.cases.id).label('case_count'),
+                    func.coalesce(func.sum(self.cases.sales_amount), 0).label('total_revenue')
+                )
+                .join(self.cases, Customer.id == self.cases.customer_id)
+                .group_by(Customer.id, Customer.customer_code, Customer.customer_name)
+                .order_by(desc('total_revenue'))
+                .limit(limit)
             )
-            .join(Case, Customer.id == Case.customer_id)
-            .group_by(Customer.id, Customer.customer_code, Customer.customer_name)
-            .order_by(desc('total_revenue'))
-            .limit(limit)
-            .all()
-        )
+        ).all()
 
         top_customers = [
             CustomerRevenue(
@@ -0,0 +1,260 @@
+"""
+案件・変更履歴のアーカイブ（ホット／コールドの分離）
+
+完了・キャンセルのまま ARCHIVE_AFTER_DAYS 日以上更新されていない案件と、その変更履歴を
+アーカイブテーブル（cases_archive / change_history_archive。変更履歴の項目別の行は
+change_history_fields_archive）へ移す。
+一覧・件数・集計は既定で案件・変更履歴テーブル（ホット）だけを読み取り、
+include_archived=true の場合はアーカイブと UNION ALL した読み取り元（case_source /
+change_history_source / change_history_field_source）を使う。
+
+アーカイブはIDの昇順に ARCHIVE_BATCH_SIZE 件ずつ、1バッチ1トランザクションで
+「アーカイブへのコピー → 元の行の削除」を行う。移した行は対象条件から外れるため、
+途中で中断しても再実行すれば残りから続けて処理する。
+生成済みドキュメントがある案件はドキュメントの参照先が消えるためアーカイブしない。
+"""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, exists, insert, inspect, select, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, aliased
+
+from ..core.config import settings
+from ..models.archive import CaseArchive, ChangeHistoryArchive, ChangeHistoryFieldArchive
+from ..models.case import Case as CaseModel
+from ..models.change_history import ChangeHistory as ChangeHistoryModel
+from ..models.change_history_field import ChangeHistoryField as ChangeHistoryFieldModel
+from ..models.document import Document as DocumentModel
+
+logger = logging.getLogger(__name__)
+
+# アーカイブの対象になるステータス
+ARCHIVABLE_STATUSES = ("完了", "キャンセル")
+
+
+def _with_archive(model, archive_model, name: str):
+    """ホットテーブルとアーカイブを UNION ALL し、元のモデルの別名として返す"""
+    hot = model.__table__
+    archive = archive_model.__table__
+    names = [column.name for column in hot.columns]
+    combined = union_all(
+        select(*[hot.c[name] for name in names]),
+        select(*[archive.c[name] for name in names]),
+    ).subquery(name)
+    return aliased(model, combined, adapt_on_names=True)
+
+
+def case_source(include_archived: bool = False):
+    """
+    案件の読み取り元を返す
+
+    Args:
+        include_archived: アーカイブ済みの案件も含める場合 True
+
+    Returns:
+        Case モデル、またはアーカイブと UNION ALL した Case の別名（列名・属性は Case と同じ）
+    """
+    if not include_archived:
+        return CaseModel
+    return _with_archive(CaseModel, CaseArchive, "cases_all")
+
+
+def change_history_source(include_archived: bool = False):
+    """
+    変更履歴の読み取り元を返す
+
+    Args:
+        include_archived: アーカイブ済みの変更履歴も含める場合 True
+
+    Returns:
+        ChangeHistory モデル、またはアーカイブと UNION ALL した ChangeHistory の別名
+    """
+    if not include_archived:
+        return ChangeHistoryModel
+    return _with_archive(ChangeHistoryModel, ChangeHistoryArchive, "change_history_all")
+
+
+def change_history_field_source(include_archived: bool = False):
+    """
+    変更履歴の項目別の行の読み取り元を返す
+
+    Args:
+        include_archived: アーカイブ済みの変更履歴の項目別の行も含める場合 True
+
+    Returns:
+        ChangeHistoryField モデル、またはアーカイブと UNION ALL した ChangeHistoryField の別名
+    """
+    if not include_archived:
+        return ChangeHistoryFieldModel
+    return _with_archive(ChangeHistoryFieldModel, ChangeHistoryFieldArchive, "change_history_fields_all")
+
+
+def adapt_columns(columns: Iterable[Any], source) -> List[Any]:
+    """
+    モデルの列の並びを読み取り元（case_source / change_history_source の戻り値）の列に置き換える
+
+    読み取り元と同じモデルの列だけを置き換え、結合先の列やラベル付きの列はそのまま使う。
+    """
+    model = inspect(source).mapper.class_
+    return [
+        getattr(source, column.key) if getattr(column, "class_", None) is model else column
+        for column in columns
+    ]
+
+
+class CaseArchiver:
+    """案件・変更履歴のアーカイブジョブ（同時に1つだけ実行する）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+        self.runs = 0
+        self.archived_cases = 0
+        self.archived_histories = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def run(
+        self,
+        engine: Engine,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        対象の案件と変更履歴をバッチごとにアーカイブへ移す
+
+        Args:
+            engine: 対象のエンジン
+            older_than_days: 最終更新からの経過日数（未指定時は ARCHIVE_AFTER_DAYS）
+            batch_size: 1バッチの案件数（未指定時は ARCHIVE_BATCH_SIZE）
+            max_batches: 1回の実行で処理する最大バッチ数（未指定時は対象がなくなるまで）
+
+        Returns:
+            dict: 移した案件数・変更履歴数・バッチ数、対象が残っているか
+
+        Raises:
+            ValueError: 別のアーカイブジョブが実行中の場合
+        """
+        if not self._running.acquire(blocking=False):
+            raise ValueError("アーカイブジョブは実行中です")
+
+        try:
+            days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+            size = batch_size or settings.ARCHIVE_BATCH_SIZE
+            cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+            result = {"cases": 0, "change_history": 0, "batches": 0, "remaining": False}
+            last_id = 0
+            while max_batches is None or result["batches"] < max_batches:
+                with Session(bind=engine) as session:
+                    case_ids = self._next_batch(session, cutoff, last_id, size)
+                    if not case_ids:
+                        break
+                    histories = self._archive_batch(session, case_ids)
+                    session.commit()
+
+                result["cases"] += len(case_ids)
+                result["change_history"] += histories
+                result["batches"] += 1
+                last_id = case_ids[-1]
+                with self._lock:
+                    self.archived_cases += len(case_ids)
+                    self.archived_histories += histories
+            else:
+                # 最大バッチ数で打ち切った場合は、対象が残っているかを返す
+                with Session(bind=engine) as session:
+                    result["remaining"] = bool(self._next_batch(session, cutoff, last_id, 1))
+
+            with self._lock:
+                self.runs += 1
+                self.last_run_at = datetime.now(timezone.utc)
+                self.last_result = result
+            if result["cases"]:
+                logger.info(f"案件 {result['cases']} 件・変更履歴 {result['change_history']} 件をアーカイブしました")
+            return result
+        finally:
+            self._running.release()
+
+    @staticmethod
+    def _next_batch(session: Session, cutoff: datetime, last_id: int, size: int) -> List[int]:
+        """アーカイブ対象の案件IDをIDの昇順に size 件取得する"""
+        has_documents = exists().where(DocumentModel.case_id == CaseModel.id)
+        return session.scalars(
+            select(CaseModel.id)
+            .where(
+                CaseModel.id > last_id,
+                CaseModel.status.in_(ARCHIVABLE_STATUSES),
+                CaseModel.updated_at < cutoff,
+                ~has_documents,
+            )
+            .order_by(CaseModel.id)
+            .limit(size)
+        ).all()
+
+    @staticmethod
+    def _archive_batch(session: Session, case_ids: List[int]) -> int:
+        """案件・変更履歴・変更履歴の項目別の行をアーカイブへコピーしてから削除し、移した変更履歴の件数を返す"""
+        case_columns = [column.name for column in CaseModel.__table__.columns]
+        history_columns = [column.name for column in ChangeHistoryModel.__table__.columns]
+        # 項目別の行のIDはアーカイブ側で採番する
+        field_columns = [column.name for column in ChangeHistoryFieldModel.__table__.columns if column.name != "id"]
+        cases = CaseModel.__table__
+        histories = ChangeHistoryModel.__table__
+        fields = ChangeHistoryFieldModel.__table__
+        archived_history_ids = select(histories.c.id).where(histories.c.case_id.in_(case_ids))
+
+        session.execute(
+            insert(CaseArchive.__table__).from_select(
+                case_columns,
+                select(*[cases.c[name] for name in case_columns]).where(cases.c.id.in_(case_ids)),
+            )
+        )
+        session.execute(
+            insert(ChangeHistoryArchive.__table__).from_select(
+                history_columns,
+                select(*[histories.c[name] for name in history_columns])
+                .where(histories.c.case_id.in_(case_ids))
+                .order_by(histories.c.id),
+            )
+        )
+        session.execute(
+            insert(ChangeHistoryFieldArchive.__table__).from_select(
+                field_columns,
+                select(*[fields.c[name] for name in field_columns])
+                .where(fields.c.history_id.in_(archived_history_ids))
+                .order_by(fields.c.id),
+            )
+        )
+        session.execute(
+            delete(ChangeHistoryFieldModel).where(ChangeHistoryFieldModel.history_id.in_(archived_history_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        moved = session.execute(
+            delete(ChangeHistoryModel).where(ChangeHistoryModel.case_id.in_(case_ids)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        session.execute(
+            delete(CaseModel).where(CaseModel.id.in_(case_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        return moved
+
+    def stats(self) -> Dict[str, Any]:
+        """実行回数・移した件数・前回の実行結果を返す"""
+        with self._lock:
+            return {
+                "running": self._running.locked(),
+                "runs": self.runs,
+                "archived_cases": self.archived_cases,
+                "archived_histories": self.archived_histories,
+                "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+                "last_result": self.last_result,
+            }
+
+
+case_archiver = CaseArchiver()
+
@@ -0,0 +1,198 @@
+"""
+マスタデータのオートコンプリート用インデックス
+
+入力補完はキー入力のたびに呼ばれるため、DBへの問い合わせなしに
+プロセス内のインデックスだけで候補を返す。
+
+- 前方一致: 正規化した各項目の値と、値に含まれる単語の先頭からの文字列を
+  ソート済み配列に持ち、二分探索で範囲を取り出す
+  （1文字目の入力などで一致が全体の大半になる場合は、並び順に走査して先頭から取る）
+- 部分一致: 正規化した各項目の値の文字（1文字）と文字バイグラムの転置インデックスを持ち、
+  検索語のバイグラムの積集合を取ってから実際に含むかを確認する（日本語名の途中一致用）
+
+正規化は検索インデックスと同じ normalize_search_text を使うため、
+全角・半角、大文字・小文字、カタカナ・ひらがなを区別しない。
+候補は前方一致を先に、それぞれソートキー・ID順に返す。
+"""
+import bisect
+import heapq
+import threading
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .search_service import normalize_search_text
+
+# 前方一致の範囲の上限に使う文字（正規化後の文字列に現れない最大のコードポイント）
+_MAX_CHAR = "\U0010ffff"
+
+# 前方一致の件数が全体のこの割合を超えたら、並び順に走査して必要な件数だけ取る
+_SCAN_RATIO = 0.25
+
+
+def _prefix_terms(text: str) -> Set[str]:
+    """前方一致の対象にする文字列（値全体と、各単語の先頭から末尾まで）"""
+    terms = {text}
+    for i, char in enumerate(text):
+        if char == " " and i + 1 < len(text):
+            terms.add(text[i + 1:])
+    return terms
+
+
+def _grams(text: str) -> Set[str]:
+    """文字と文字バイグラムの集合"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _query_grams(keyword: str) -> Set[str]:
+    """検索語の照合に使うグラム（2文字以上はバイグラム、1文字はその文字）"""
+    if len(keyword) == 1:
+        return {keyword}
+    return {keyword[i:i + 2] for i in range(len(keyword) - 1)}
+
+
+class AutocompleteIndex:
+    """
+    前方一致（ソート済み配列）と部分一致（文字バイグラム）のインデックス
+
+    add・remove で1件ずつ更新できるため、マスタの書き込み時に全体を作り直す必要はない。
+    """
+
+    def __init__(self, fields: Tuple[str, ...], sort_key: str):
+        self.fields = fields
+        self.sort_key = sort_key
+        self._lock = threading.Lock()
+        self._items: Dict[int, Any] = {}
+        self._texts: Dict[int, Tuple[str, ...]] = {}
+        self._prefixes: List[Tuple[str, int]] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._ordered: List[Tuple[Any, int]] = []
+
+    def copy(self) -> "AutocompleteIndex":
+        """複製を返す（複製への add・remove は元のインデックスとその読み取りに影響しない）"""
+        clone = AutocompleteIndex(self.fields, self.sort_key)
+        with self._lock:
+            clone._items = dict(self._items)
+            clone._texts = dict(self._texts)
+            clone._prefixes = list(self._prefixes)
+            clone._postings = {gram: set(ids) for gram, ids in self._postings.items()}
+            clone._ordered = list(self._ordered)
+        return clone
+
+    def _normalized(self, item: Any) -> Tuple[str, ...]:
+        texts = (normalize_search_text(getattr(item, field, None)) for field in self.fields)
+        return tuple(text for text in texts if text)
+
+    def _order(self, item_id: int) -> Tuple[Any, int]:
+        return getattr(self._items[item_id], self.sort_key), item_id
+
+    def build(self, items: Iterable[Any]) -> None:
+        """インデックスを作り直す"""
+        items = list(items)
+        with self._lock:
+            self._items = {}
+            self._texts = {}
+            self._postings = {}
+            prefixes = []
+            for item in items:
+                texts = self._add_postings(item)
+                prefixes.extend((term, item.id) for text in texts for term in _prefix_terms(text))
+            self._prefixes = sorted(prefixes)
+            self._ordered = sorted(self._order(item_id) for item_id in self._items)
+
+    def _add_postings(self, item: Any) -> Tuple[str, ...]:
+        texts = self._normalized(item)
+        self._items[item.id] = item
+        self._texts[item.id] = texts
+        for text in texts:
+            for gram in _grams(text):
+                self._postings.setdefault(gram, set()).add(item.id)
+        return texts
+
+    def add(self, item: Any) -> None:
+        """1件を追加する（同じIDがあれば置き換える）"""
+        with self._lock:
+            self._remove(item.id)
+            texts = self._add_postings(item)
+            for text in texts:
+                for term in _prefix_terms(text):
+                    bisect.insort(self._prefixes, (term, item.id))
+            bisect.insort(self._ordered, self._order(item.id))
+
+    def remove(self, item_id: int) -> None:
+        """1件を削除する"""
+        with self._lock:
+            self._remove(item_id)
+
+    def _remove(self, item_id: int) -> None:
+        if item_id not in self._items:
+            return
+        order = self._order(item_id)
+        position = bisect.bisect_left(self._ordered, order)
+        if position < len(self._ordered) and self._ordered[position] == order:
+            del self._ordered[position]
+
+        texts = self._texts.pop(item_id)
+        self._items.pop(item_id)
+
+        for text in texts:
+            for term in _prefix_terms(text):
+                position = bisect.bisect_left(self._prefixes, (term, item_id))
+                if position < len(self._prefixes) and self._prefixes[position] == (term, item_id):
+                    del self._prefixes[position]
+            for gram in _grams(text):
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(item_id)
+                    if not ids:
+                        del self._postings[gram]
+
+    def _scan_prefix(self, keyword: str, limit: int) -> List[int]:
+        """並び順に走査して、前方一致する行を先頭から limit 件取る"""
+        word_start = " " + keyword
+        matches = []
+        for _, item_id in self._ordered:
+            if any(text.startswith(keyword) or word_start in text for text in self._texts[item_id]):
+                matches.append(item_id)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def search(self, keyword: str, limit: int) -> List[Any]:
+        """
+        検索語に前方一致・部分一致する行を返す
+
+        Args:
+            keyword: 検索語（未正規化）
+            limit: 最大件数
+
+        Returns:
+            List[Any]: 前方一致の行、部分一致の行の順（それぞれソートキー・ID順）
+        """
+        keyword = normalize_search_text(keyword)
+        if not keyword:
+            return []
+
+        with self._lock:
+            # 前方一致（ソート済み配列の範囲）
+            low = bisect.bisect_left(self._prefixes, (keyword,))
+            high = bisect.bisect_left(self._prefixes, (keyword + _MAX_CHAR,), low)
+            if high - low > len(self._ordered) * _SCAN_RATIO:
+                matches = self._scan_prefix(keyword, limit)
+                if len(matches) >= limit:
+                    return [self._items[item_id] for item_id in matches]
+
+            prefix_ids = {item_id for _, item_id in self._prefixes[low:high]}
+            matches = heapq.nsmallest(limit, prefix_ids, key=self._order)
+            if len(matches) >= limit:
+                return [self._items[item_id] for item_id in matches]
+
+            # 部分一致（グラムの積集合を実際の値で確認する）
+            postings = sorted((self._postings.get(gram, set()) for gram in _query_grams(keyword)), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:]) - prefix_ids
+            contained = [
+                item_id for item_id in candidates
+                if any(keyword in text for text in self._texts[item_id])
+            ]
+            matches.extend(heapq.nsmallest(limit - len(matches), contained, key=self._order))
+            return [self._items[item_id] for item_id in matches]
@@ -2,7 +2,6 @@
 バックアップサービス
 """
 import os
-import shutil
 import sqlite3
 import json
 from datetime import datetime
@@ -12,6 +11,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import create_engine, text
 from ..models.backup import Backup as BackupModel
 from ..core.config import settings
+from .case_number_allocator import case_number_allocator
+from .change_history_fields import ensure_change_history_fields
 
 
 # バックアップディレクトリ（絶対パスを使用）
@@ -32,6 +33,29 @@ def get_database_path() -> str:
     return None  # PostgreSQLの場合はNoneを返す
 
 
+def copy_sqlite_database(source_path: str, destination_path: str) -> None:
+    """
+    SQLiteのデータベースをオンラインバックアップAPIでコピーする
+
+    WALモードではコミット済みのページが -wal ファイルに残っているため、
+    ファイルのコピーでは最新の内容にならない。バックアップAPIは接続を通して
+    整合性のとれた内容を書き込むため、稼働中のデータベースへの復元にも使える。
+
+    Args:
+        source_path: コピー元のデータベースファイル
+        destination_path: コピー先のデータベースファイル
+    """
+    source = sqlite3.connect(str(source_path))
+    try:
+        destination = sqlite3.connect(str(destination_path))
+        try:
+            source.backup(destination)
+        finally:
+            destination.close()
+    finally:
+        source.close()
+
+
 def create_backup(
     db: Session,
     backup_name: Optional[str] = None,
@@ -97,7 +121,7 @@ def create_backup(
             if not db_path or not os.path.exists(db_path):
                 raise FileNotFoundError(f"データベースファイルが見つかりません: {db_path}")
 
-            shutil.copy2(db_path, backup_path)
+            copy_sqlite_database(db_path, backup_path)
 
             # ファイルサイズを取得
             file_size = os.path.getsize(backup_path)
@@ -148,6 +172,7 @@ def export_postgresql_data(db: Session) -> dict:
     from ..models.change_history import ChangeHistory as ChangeHistoryModel
     from ..models.document import Document as DocumentModel
     from ..models.case_number import CaseNumber as CaseNumberModel
+    from ..models.archive import CaseArchive as CaseArchiveModel, ChangeHistoryArchive as ChangeHistoryArchiveModel
 
     backup_data = {
         'exported_at': datetime.now().isoformat(),
@@ -164,6 +189,8 @@ def export_postgresql_data(db: Session) -> dict:
         ('cases', CaseModel),
         ('change_history', ChangeHistoryModel),
         ('documents', DocumentModel),
+        ('cases_archive', CaseArchiveModel),
+        ('change_history_archive', ChangeHistoryArchiveModel),
     ]
 
     for table_name, model in tables_to_export:
@@ -282,10 +309,13 @@ def restore_backup(
             if current_db_path.exists():
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 safety_backup_path = BACKUP_DIR / f"safety_backup_before_restore_{timestamp}.db"
-                shutil.copy2(current_db_path, safety_backup_path)
+                copy_sqlite_database(current_db_path, safety_backup_path)
 
             # バックアップファイルを復元先にコピー
-            shutil.copy2(backup_path, restore_path)
+            copy_sqlite_database(backup_path, restore_path)
+
+        # case_numbers が置き換わったため、プロセス内で予約済みの連番を破棄
+        case_number_allocator.reset()
 
         # 復元完了：ステータスを元に戻す（または「success」に設定）
         backup_record.status = original_status if original_status == "success" else "success"
@@ -319,6 +349,10 @@ def import_postgresql_data(db: Session, backup_data: dict) -> None:
     from ..models.change_history import ChangeHistory as ChangeHistoryModel
     from ..models.document import Document as DocumentModel
     from ..models.case_number import CaseNumber as CaseNumberModel
+    from ..models.archive import CaseArchive as CaseArchiveModel, ChangeHistoryArchive as ChangeHistoryArchiveModel
+    from ..models.case_checkpoint import CaseCheckpoint as CaseCheckpointModel
+    from ..models.change_history_field import ChangeHistoryField as ChangeHistoryFieldModel
+    from ..models.archive import ChangeHistoryFieldArchive as ChangeHistoryFieldArchiveModel
     from sqlalchemy import inspect
 
     # テーブルマッピング
@@ -330,10 +364,15 @@ def import_postgresql_data(db: Session, backup_data: dict) -> None:
         'cases': CaseModel,
         'change_history': ChangeHistoryModel,
         'documents': DocumentModel,
+        'cases_archive': CaseArchiveModel,
+        'change_history_archive': ChangeHistoryArchiveModel,
     }
 
     # 外部キー制約を考慮して順序を定義（依存関係の順）
-    import_order = ['users', 'customers', 'products', 'case_numbers', 'cases', 'change_history', 'documents']
+    import_order = [
+        'users', 'customers', 'products', 'case_numbers', 'cases', 'change_history', 'documents',
+        'cases_archive', 'change_history_archive',
+    ]
 
     try:
         # 既存のデータを削除（注意：本番環境では慎重に）
@@ -344,6 +383,12 @@ def import_postgresql_data(db: Session, backup_data: dict) -> None:
                 model = table_mapping[table_name]
                 db.query(model).delete()
 
+        # 案件状態のチェックポイントと変更履歴の項目別の行（アーカイブを含む）は変更履歴から再作成されるため、
+        # バックアップには含めずに削除する（項目別の行はインポート後に補完する）
+        db.query(CaseCheckpointModel).delete()
+        db.query(ChangeHistoryFieldModel).delete()
+        db.query(ChangeHistoryFieldArchiveModel).delete()
+
         # usersテーブルは最後に削除
         if 'users' in table_mapping:
             db.query(table_mapping['users']).delete()
@@ -425,7 +470,6 @@ def import_postgresql_data(db: Session, backup_data: dict) -> None:
         db_url = settings.DATABASE_URL
         if "postgresql" in db_url.lower():
             try:
-                from sqlalchemy import text
                 # 各テーブルのシーケンスを更新
                 sequence_updates = [
                     ("users", "users_id_seq"),
@@ -435,15 +479,20 @@ def import_postgresql_data(db: Session, backup_data: dict) -> None:
                     ("cases", "cases_id_seq"),
                     ("change_history", "change_history_id_seq"),
                     ("documents", "documents_id_seq"),
+                    ("change_history_archive", "change_history_archive_archive_id_seq"),
                 ]
 
                 for table_name, sequence_name in sequence_updates:
                     if table_name in backup_data.get('tables', {}):
                         table_data = backup_data['tables'][table_name]
                         records_data = table_data.get('data', [])
+                        if table_name == "cases":
+                            # アーカイブ済みの案件のIDも再利用しない
+                            records_data = records_data + backup_data['tables'].get('cases_archive', {}).get('data', [])
+                        id_key = 'archive_id' if table_name == "change_history_archive" else 'id'
                         if records_data:
                             # 最大IDを取得
-                            max_id = max([r.get('id', 0) for r in records_data if r.get('id')], default=0)
+                            max_id = max([r.get(id_key, 0) for r in records_data if r.get(id_key)], default=0)
                             if max_id > 0:
                                 # シーケンスを更新
                                 try:
@@ -459,6 +508,9 @@ def import_postgresql_data(db: Session, backup_data: dict) -> None:
                 logging.warning(f"シーケンスの更新中にエラーが発生しました: {str(seq_update_error)}")
                 # シーケンス更新の失敗は致命的ではないので続行
 
+        # 変更履歴の項目別の行を作り直す
+        ensure_change_history_fields(db.get_bind())
+
     except Exception as e:
         db.rollback()
         raise Exception(f"データのインポートに失敗しました: {str(e)}")
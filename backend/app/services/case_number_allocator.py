@@ -0,0 +1,226 @@
+"""
+案件番号の採番サービス
+
+案件番号管理テーブル（case_numbers）の (年, 区分) の行を
+`UPDATE ... SET last_sequence = last_sequence + N ... RETURNING last_sequence` の1文で進める。
+採番は呼び出し元とは別の短いトランザクションで行い、すぐにコミットするため、
+案件の登録が終わるまで行ロックを持ち続けることがない（案件作成同士が直列化されない）。
+
+CASE_NUMBER_BLOCK_SIZE を2以上にすると、プロセスごとに連番をまとめて予約し（hi-lo方式）、
+予約済みの連番を使い切るまではデータベースにアクセスせずに採番する。
+プロセスの停止時に使われなかった予約分と、採番後に登録に失敗した連番は欠番になる。
+"""
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.case_number import CaseNumber
+
+
+def trade_type_code(trade_type: str) -> str:
+    """区分コード（EX=輸出, IM=輸入）を返す"""
+    return "EX" if trade_type == "輸出" else "IM"
+
+
+def max_sequence() -> int:
+    """連番の上限（CASE_NUMBER_SEQUENCE_WIDTH 桁で表せる最大値）"""
+    return 10 ** settings.CASE_NUMBER_SEQUENCE_WIDTH - 1
+
+
+def format_case_number(year: int, trade_type: str, sequence: int) -> str:
+    """
+    案件番号を組み立てる
+
+    Args:
+        year: 年（YYYY）
+        trade_type: 区分（輸出/輸入）
+        sequence: 連番
+
+    Returns:
+        str: 案件番号（例: 2025-EX-001）
+    """
+    return CaseNumber.generate_case_number(year, trade_type, sequence, settings.CASE_NUMBER_SEQUENCE_WIDTH)
+
+
+def _reserve(connection: Any, year: int, trade_type: str, count: int) -> int:
+    """
+    (年, 区分) の連番を count 件進め、進めた後の最後の連番を返す
+
+    行がなければ作成する。同時に作成された場合は一意制約違反になるため、更新をやり直す。
+    """
+    table = CaseNumber.__table__
+    advance = (
+        update(table)
+        .where(table.c.year == year, table.c.trade_type == trade_type)
+        .values(last_sequence=table.c.last_sequence + count, updated_at=func.now())
+        .returning(table.c.last_sequence)
+    )
+    last_sequence = connection.execute(advance).scalar()
+    if last_sequence is not None:
+        return last_sequence
+
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(table).values(
+                year=year,
+                trade_type=trade_type,
+                trade_type_code=trade_type_code(trade_type),
+                last_sequence=count,
+            ))
+        return count
+    except IntegrityError:
+        return connection.execute(advance).scalar()
+
+
+class CaseNumberAllocator:
+    """案件番号の採番（プロセス内で予約済みの連番を保持する）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (データベースURL, 年, 区分) -> [次に使う連番, 予約済みの最後の連番]
+        self._blocks: Dict[Tuple[str, int, str], List[int]] = {}
+        # (データベースURL, 年, 区分) -> 予約を直列化するロック
+        self._key_locks: Dict[Tuple[str, int, str], threading.Lock] = {}
+        self.allocated = 0
+        self.reservations = 0
+
+    def allocate_sequences(
+        self,
+        db: Session,
+        trade_type: str,
+        count: int = 1,
+        year: Optional[int] = None,
+        in_transaction: bool = False,
+    ) -> List[int]:
+        """
+        連番を count 件採番する
+
+        Args:
+            db: データベースセッション（接続先の特定、in_transaction の場合は採番の実行に使う）
+            trade_type: 区分（輸出/輸入）
+            count: 採番する件数
+            year: 年（未指定時は現在の年）
+            in_transaction: 呼び出し元のトランザクション内で採番する場合 True
+                （書き込みキューのように書き込みが直列化済みの場合に使う。予約は行わず、
+                呼び出し元がロールバックすると採番も取り消される）
+
+        Returns:
+            List[int]: 採番した連番（昇順）
+
+        Raises:
+            ValueError: 連番が上限に達した場合
+        """
+        year = year or datetime.now().year
+        limit = max_sequence()
+
+        if in_transaction:
+            last_sequence = _reserve(db.connection(), year, trade_type, count)
+            if last_sequence > limit:
+                raise ValueError(f"{year}年の{trade_type}案件番号の連番が上限({limit})に達しました")
+            with self._lock:
+                self.allocated += count
+                self.reservations += 1
+            return list(range(last_sequence - count + 1, last_sequence + 1))
+
+        engine = db.get_bind()
+        key = (str(engine.url), year, trade_type)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # 予約（データベースへのアクセス）は (年, 区分) ごとのロックで直列化し、
+        # 共有のロックは予約済みの連番と件数の更新の間だけ持つ（他の区分の採番を止めない）
+        with key_lock:
+            sequences: List[int] = []
+            with self._lock:
+                block = self._blocks.get(key)
+                if block is not None:
+                    take = min(count, block[1] - block[0] + 1)
+                    sequences.extend(range(block[0], block[0] + take))
+                    block[0] += take
+                    if block[0] > block[1]:
+                        del self._blocks[key]
+
+            needed = count - len(sequences)
+            if needed:
+                reserve = max(needed, settings.CASE_NUMBER_BLOCK_SIZE)
+                last_sequence = self._reserve_block(engine, year, trade_type, reserve, limit)
+                if last_sequence is None and reserve > needed:
+                    # 上限付近では必要な件数だけを予約する
+                    reserve = needed
+                    last_sequence = self._reserve_block(engine, year, trade_type, reserve, limit)
+                if last_sequence is None:
+                    # 取り出した予約分は欠番にせず戻す
+                    if sequences:
+                        with self._lock:
+                            self._blocks[key] = [sequences[0], sequences[-1]]
+                    raise ValueError(f"{year}年の{trade_type}案件番号の連番が上限({limit})に達しました")
+                first_sequence = last_sequence - reserve + 1
+                sequences.extend(range(first_sequence, first_sequence + needed))
+                if reserve > needed:
+                    with self._lock:
+                        self._blocks[key] = [first_sequence + needed, last_sequence]
+
+            with self._lock:
+                self.allocated += count
+            return sequences
+
+    def _reserve_block(self, engine: Any, year: int, trade_type: str, count: int, limit: int) -> Optional[int]:
+        """
+        別の短いトランザクションで連番を count 件予約し、最後の連番を返す（上限を超える場合は None）
+        """
+        with engine.connect() as connection:
+            with connection.begin() as transaction:
+                last_sequence = _reserve(connection, year, trade_type, count)
+                if last_sequence > limit:
+                    transaction.rollback()
+                    return None
+        with self._lock:
+            self.reservations += 1
+        return last_sequence
+
+    def allocate(
+        self,
+        db: Session,
+        trade_type: str,
+        count: int = 1,
+        year: Optional[int] = None,
+        in_transaction: bool = False,
+    ) -> List[str]:
+        """
+        案件番号を count 件採番する（引数は allocate_sequences と同じ）
+
+        Returns:
+            List[str]: 採番した案件番号
+
+        Raises:
+            ValueError: 連番が上限に達した場合
+        """
+        year = year or datetime.now().year
+        return [
+            format_case_number(year, trade_type, sequence)
+            for sequence in self.allocate_sequences(db, trade_type, count, year, in_transaction)
+        ]
+
+    def reset(self) -> None:
+        """予約済みの連番を破棄する（バックアップの復元などで case_numbers が置き換わった場合）"""
+        with self._lock:
+            self._blocks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """採番件数・予約回数・プロセス内に残っている予約済みの連番の数を返す"""
+        with self._lock:
+            return {
+                "block_size": settings.CASE_NUMBER_BLOCK_SIZE,
+                "allocated": self.allocated,
+                "reservations": self.reservations,
+                "reserved_remaining": sum(last - next_ + 1 for next_, last in self._blocks.values()),
+            }
+
+
+# アプリ全体で共有する採番サービス
+case_number_allocator = CaseNumberAllocator()
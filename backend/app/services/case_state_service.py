@@ -0,0 +1,313 @@
+"""
+案件状態の復元サービス（ある日時の案件の状態を変更履歴から組み立てる）
+
+変更履歴の changes_json は項目ごとの差分のため、作成時（CREATE）から順に反映すれば
+任意の日時の状態を復元できるが、変更の多い案件ほど読み取る履歴が増える。
+そこで変更履歴を CASE_CHECKPOINT_INTERVAL 件反映するごとに、その時点の全項目を
+チェックポイント（case_checkpoints）として保存し、復元は「指定日時以前で最新の
+チェックポイント + それ以降の変更履歴（CASE_CHECKPOINT_INTERVAL 件未満）」で行う。
+
+チェックポイントは変更履歴を記録するトランザクション（record_change_history、一括の作成・更新・
+削除では insert_change_histories）で、前回のチェックポイントからの変更履歴が間隔に達した時点で
+作成する（読み取りでは書き込まない）。
+変更履歴の遅延書き込みでは記録時にIDが決まらないため、その場合に限り復元の際に保存する。
+既存の案件の分は scripts/build_case_checkpoints.py でまとめて作成できる。
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.pagination import KeysetPaginator, encode_cursor
+from ..models.case_checkpoint import CaseCheckpoint as CaseCheckpointModel
+from ..models.change_history import ChangeHistory as ChangeHistoryModel
+from .archive_service import change_history_source
+from .change_history_writer import buffered_mode
+
+logger = logging.getLogger(__name__)
+
+JST = timezone(timedelta(hours=9))
+
+# 変更履歴に記録される案件の項目（change_history_service.build_change_history と同じ）
+CASE_STATE_FIELDS = [
+    'case_number', 'trade_type', 'customer_id', 'supplier_name',
+    'product_id', 'quantity', 'unit', 'sales_unit_price',
+    'purchase_unit_price', 'shipment_date', 'status', 'pic', 'notes'
+]
+
+# 記録から間もない変更履歴にはチェックポイントを作らない（秒）
+# 遅延書き込みや長いトランザクションでは、変更日時の古い履歴が後から挿入されることがあるため
+CHECKPOINT_SETTLE_SECONDS = 60
+
+# 変更履歴を読み取る1回のフェッチ件数
+REPLAY_FETCH_SIZE = 500
+
+
+def _as_utc(dt: datetime) -> datetime:
+    """日時をUTCに変換する（SQLiteから読み取ったnaive datetimeはUTCとして扱う）"""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def apply_change(state: Dict[str, Optional[str]], history: Any) -> bool:
+    """
+    変更履歴1件を案件の状態に反映する
+
+    Args:
+        state: 案件の状態（項目名と値。変更履歴と同じ文字列表現）
+        history: 変更履歴（ChangeHistory またはアーカイブを含む読み取り元の行）
+
+    Returns:
+        bool: 反映後に案件が削除済みの場合 True
+    """
+    changes = history.changes_json or {}
+
+    if history.change_type == "CREATE":
+        state.clear()
+        for field in CASE_STATE_FIELDS:
+            change = changes.get(field)
+            state[field] = change.get('new') if isinstance(change, dict) else None
+        return False
+
+    if history.change_type == "DELETE":
+        return True
+
+    applied = False
+    for field, change in changes.items():
+        if field in CASE_STATE_FIELDS and isinstance(change, dict) and 'new' in change:
+            state[field] = change['new']
+            applied = True
+    # changes_json のない古い履歴は単一項目の列から反映する
+    if not applied and history.field_name in CASE_STATE_FIELDS:
+        state[history.field_name] = history.new_value
+    return False
+
+
+def _latest_checkpoint(db: Session, case_id: int, as_of: Optional[datetime] = None) -> Optional[CaseCheckpointModel]:
+    """指定日時以前（未指定時は全期間）で最新のチェックポイントを取得する"""
+    query = db.query(CaseCheckpointModel).filter(CaseCheckpointModel.case_id == case_id)
+    if as_of is not None:
+        query = query.filter(CaseCheckpointModel.changed_at <= as_of)
+    return query.order_by(CaseCheckpointModel.changed_at.desc(), CaseCheckpointModel.history_id.desc()).first()
+
+
+def _after_checkpoint(query, paginator: KeysetPaginator, checkpoint: Optional[CaseCheckpointModel]):
+    """変更日時・ID順の変更履歴のクエリを、チェックポイントの変更履歴 (変更日時, ID) より後ろに絞り込む"""
+    query = paginator.order(query)
+    if checkpoint:
+        query = paginator.seek(
+            query,
+            encode_cursor(paginator.sort_key, False, checkpoint.changed_at, checkpoint.history_id),
+        )
+    return query
+
+
+def _replay(
+    query,
+    case_id: int,
+    state: Dict[str, Optional[str]],
+    sequence: int,
+    interval: int,
+    settled_before: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    変更履歴を順に反映し、反映した件数が間隔に達するたびにチェックポイントを組み立てる
+
+    Args:
+        query: 反映する変更履歴のクエリ（変更日時・ID順）
+        case_id: 案件ID
+        state: 反映前の案件の状態（反映後の状態に更新される）
+        sequence: 反映前までに反映した変更履歴の件数（作成時から数える）
+        interval: チェックポイントを組み立てる間隔
+        settled_before: この日時以降に記録された変更履歴にはチェックポイントを作らない
+
+    Returns:
+        dict: 削除済みか、最後に反映した変更履歴、反映した件数、組み立てたチェックポイント（未保存）
+    """
+    checkpoints: List[CaseCheckpointModel] = []
+    last = None
+    deleted = False
+    replayed = 0
+    since_checkpoint = 0
+    for history in query.yield_per(REPLAY_FETCH_SIZE):
+        deleted = apply_change(state, history)
+        sequence += 1
+        replayed += 1
+        since_checkpoint += 1
+        last = history
+
+        settled = settled_before is None or _as_utc(history.changed_at) < settled_before
+        if since_checkpoint >= interval and not deleted and settled:
+            checkpoints.append(CaseCheckpointModel(
+                case_id=case_id,
+                history_id=history.id,
+                changed_at=history.changed_at,
+                sequence=sequence,
+                state=dict(state),
+            ))
+            since_checkpoint = 0
+
+    return {"deleted": deleted, "last": last, "replayed": replayed, "checkpoints": checkpoints}
+
+
+def checkpoint_on_write(db: Session, case_id: int, interval: Optional[int] = None) -> List[CaseCheckpointModel]:
+    """
+    変更履歴の記録時に、必要であれば案件状態のチェックポイントを作成する
+
+    前回のチェックポイント以降の変更履歴（記録中の変更履歴を含む）が間隔に達した場合だけ、
+    それらを反映してチェックポイントを呼び出し側のトランザクションに追加する（コミットしない）。
+    間隔に達しない書き込みでは、変更履歴の件数（最大で間隔の件数まで）を数えるだけで済む。
+    同じ案件への書き込みは案件の行の更新で直列化されるため、変更履歴が後から割り込むことはない。
+
+    Args:
+        db: データベースセッション（変更履歴を flush 済みのもの）
+        case_id: 案件ID
+        interval: チェックポイントを作成する間隔（未指定時は CASE_CHECKPOINT_INTERVAL）
+
+    Returns:
+        list: 追加したチェックポイント
+    """
+    interval = interval or settings.CASE_CHECKPOINT_INTERVAL
+    checkpoint = _latest_checkpoint(db, case_id)
+
+    paginator = KeysetPaginator(ChangeHistoryModel.changed_at, ChangeHistoryModel.id, descending=False)
+    query = _after_checkpoint(
+        db.query(ChangeHistoryModel).filter(ChangeHistoryModel.case_id == case_id), paginator, checkpoint
+    )
+    pending = query.with_entities(ChangeHistoryModel.id).limit(interval).count()
+    if pending < interval:
+        return []
+
+    state = dict(checkpoint.state) if checkpoint else {}
+    result = _replay(query, case_id, state, checkpoint.sequence if checkpoint else 0, interval)
+    db.add_all(result["checkpoints"])
+    return result["checkpoints"]
+
+
+def checkpoints_on_bulk_write(
+    db: Session,
+    case_ids: Iterable[Optional[int]],
+    interval: Optional[int] = None,
+) -> List[CaseCheckpointModel]:
+    """
+    変更履歴の一括記録時に、必要な案件の状態のチェックポイントを作成する
+
+    前回のチェックポイント以降の変更履歴の件数を案件ごとに1文で数え（変更履歴IDの順で数える目安）、
+    間隔に達した案件だけを checkpoint_on_write で判定・作成する。
+
+    Args:
+        db: データベースセッション（変更履歴を挿入済みのもの）
+        case_ids: 変更履歴を記録した案件ID
+        interval: チェックポイントを作成する間隔（未指定時は CASE_CHECKPOINT_INTERVAL）
+
+    Returns:
+        list: 追加したチェックポイント
+    """
+    interval = interval or settings.CASE_CHECKPOINT_INTERVAL
+    case_ids = sorted({case_id for case_id in case_ids if case_id is not None})
+    if not case_ids:
+        return []
+
+    histories = ChangeHistoryModel
+    latest = (
+        select(CaseCheckpointModel.case_id, func.max(CaseCheckpointModel.history_id).label("history_id"))
+        .where(CaseCheckpointModel.case_id.in_(case_ids))
+        .group_by(CaseCheckpointModel.case_id)
+        .subquery()
+    )
+    due = db.scalars(
+        select(histories.case_id)
+        .outerjoin(latest, latest.c.case_id == histories.case_id)
+        .where(
+            histories.case_id.in_(case_ids),
+            or_(latest.c.history_id.is_(None), histories.id > latest.c.history_id),
+        )
+        .group_by(histories.case_id)
+        .having(func.count() >= interval)
+    ).all()
+
+    added: List[CaseCheckpointModel] = []
+    for case_id in due:
+        added.extend(checkpoint_on_write(db, case_id, interval))
+    return added
+
+
+def reconstruct_case_state(
+    db: Session,
+    case_id: int,
+    as_of: datetime,
+    include_archived: bool = False,
+    interval: Optional[int] = None,
+    save_checkpoints: Optional[bool] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    指定日時の案件の状態を復元する
+
+    指定日時以前で最新のチェックポイントから、それ以降の変更履歴を順に反映する。
+    変更履歴の遅延書き込みでは書き込み時にチェックポイントを作れないため、反映した件数が
+    間隔に達するたびにチェックポイントを保存する（保存に失敗しても復元結果は返す）。
+
+    Args:
+        db: データベースセッション
+        case_id: 案件ID
+        as_of: 日時（タイムゾーンのない日時は日本時間として扱う）
+        include_archived: アーカイブ済みの変更履歴も対象にする
+        interval: チェックポイントを保存する間隔（未指定時は CASE_CHECKPOINT_INTERVAL）
+        save_checkpoints: チェックポイントを保存するか（未指定時は変更履歴を遅延書き込みする場合だけ保存する）
+
+    Returns:
+        dict: 案件の状態（項目名と値）、削除済みか、最後に反映した変更履歴、
+            使用したチェックポイント、反映した変更履歴の件数。
+            指定日時以前の変更履歴がない場合は None
+    """
+    interval = interval or settings.CASE_CHECKPOINT_INTERVAL
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=JST)
+    as_of = as_of.astimezone(timezone.utc)
+
+    checkpoint = _latest_checkpoint(db, case_id, as_of)
+
+    source = change_history_source(include_archived)
+    paginator = KeysetPaginator(source.changed_at, source.id, descending=False)
+    query = _after_checkpoint(
+        db.query(source).filter(source.case_id == case_id, source.changed_at <= as_of), paginator, checkpoint
+    )
+
+    state: Dict[str, Optional[str]] = dict(checkpoint.state) if checkpoint else {}
+    settled_before = datetime.now(timezone.utc) - timedelta(seconds=CHECKPOINT_SETTLE_SECONDS)
+    result = _replay(query, case_id, state, checkpoint.sequence if checkpoint else 0, interval, settled_before)
+
+    last = result["last"] or checkpoint
+    if last is None:
+        return None
+
+    if save_checkpoints is None:
+        save_checkpoints = buffered_mode()
+    if result["checkpoints"] and save_checkpoints:
+        _save_checkpoints(db, result["checkpoints"])
+
+    return {
+        "case_id": case_id,
+        "as_of": as_of.astimezone(JST),
+        "deleted": result["deleted"],
+        "state": {field: state.get(field) for field in CASE_STATE_FIELDS},
+        "history_id": last.history_id if last is checkpoint else last.id,
+        "changed_at": _as_utc(last.changed_at).astimezone(JST),
+        "checkpoint_history_id": checkpoint.history_id if checkpoint else None,
+        "replayed_changes": result["replayed"],
+    }
+
+
+def _save_checkpoints(db: Session, checkpoints: List[CaseCheckpointModel]) -> None:
+    """チェックポイントを保存する（同時に同じチェックポイントを保存した場合などの失敗は無視する）"""
+    try:
+        db.add_all(checkpoints)
+        db.commit()
+    except (IntegrityError, OperationalError) as e:
+        db.rollback()
+        logger.debug(f"案件状態のチェックポイントを保存できませんでした: {e}")
@@ -0,0 +1,165 @@
+"""
+変更履歴の項目別テーブル（change_history_fields）の書き込み
+
+変更履歴1件の changes_json を項目ごとの1行に展開して保存する。変更履歴の挿入と同じ
+トランザクション（遅延書き込みでは同じ書き込み）で挿入し、項目別テーブルを追加する前の
+変更履歴は backfill_change_history_fields でバッチごとに補完する。アーカイブ済みの変更履歴
+（change_history_archive）の項目別の行は change_history_fields_archive に補完する。
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Mapping
+
+from sqlalchemy import bindparam, exists, insert, select
+from sqlalchemy.engine import Engine
+
+from ..models.archive import ChangeHistoryArchive, ChangeHistoryFieldArchive
+from ..models.change_history import ChangeHistory as ChangeHistoryModel
+from ..models.change_history_field import ChangeHistoryField as ChangeHistoryFieldModel
+
+logger = logging.getLogger(__name__)
+
+# 項目別の行を補完する1バッチの変更履歴の件数
+FIELD_BACKFILL_BATCH_SIZE = 1000
+
+# 項目別の行の組み立てに使う変更履歴の列
+RETURNED_COLUMNS = (
+    "id", "case_id", "changed_by", "change_type", "changed_at",
+    "changes_json", "field_name", "old_value", "new_value",
+)
+
+
+def field_rows(history_id: int, changed_at: Any, history: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """
+    変更履歴1件を項目別テーブルの行に展開する
+
+    changes_json の項目ごとに1行を作る（案件番号スナップショットなど "_" で始まるキーは除く）。
+    changes_json のない古い変更履歴は field_name / old_value / new_value の1行にする。
+
+    Args:
+        history_id: 変更履歴ID
+        changed_at: 変更日時
+        history: 変更履歴の列の値（history_row の戻り値や、変更履歴テーブルの行）
+
+    Returns:
+        list: 項目別テーブルに挿入する行
+    """
+    changes = history.get("changes_json") or {}
+    values = [
+        (field, change.get("old"), change.get("new"))
+        for field, change in changes.items()
+        if not field.startswith("_") and isinstance(change, dict)
+    ]
+    if not values and history.get("field_name"):
+        values = [(history["field_name"], history.get("old_value"), history.get("new_value"))]
+
+    return [
+        {
+            "history_id": history_id,
+            "case_id": history.get("case_id"),
+            "changed_by": history.get("changed_by"),
+            "change_type": history.get("change_type"),
+            "changed_at": changed_at,
+            "field_name": field,
+            "old_value": old_value,
+            "new_value": new_value,
+        }
+        for field, old_value, new_value in values
+    ]
+
+
+def insert_histories(connection: Any, rows: List[Dict[str, Any]]) -> int:
+    """
+    変更履歴を1回のexecutemanyで挿入し、続けて項目別の行を挿入する
+
+    項目別の行は RETURNING で返された変更履歴の列から組み立てる
+    （返される行の順序に依存しないため、SQLiteでも1文の複数行INSERTのまま挿入できる）。
+
+    Args:
+        connection: 挿入に使う接続またはセッション（呼び出し側のトランザクションで実行する）
+        rows: 変更履歴テーブルに挿入する行
+
+    Returns:
+        int: 挿入した変更履歴の件数
+    """
+    if not rows:
+        return 0
+    table = ChangeHistoryModel.__table__
+    inserted = connection.execute(
+        insert(table).returning(*[table.c[name] for name in RETURNED_COLUMNS]),
+        rows,
+    ).all()
+    insert_fields(connection, [
+        field
+        for row in inserted
+        for field in field_rows(row.id, row.changed_at, row._mapping)
+    ])
+    return len(inserted)
+
+
+def insert_fields(connection: Any, rows: Iterable[Dict[str, Any]], model: Any = ChangeHistoryFieldModel) -> None:
+    """項目別の行を1回のexecutemanyで挿入する（model にはアーカイブのモデルも指定できる）"""
+    rows = list(rows)
+    if rows:
+        connection.execute(insert(model), rows)
+
+
+def backfill_change_history_fields(
+    engine: Engine,
+    batch_size: int = FIELD_BACKFILL_BATCH_SIZE,
+    archived: bool = False,
+) -> int:
+    """
+    項目別の行がない変更履歴について、項目別の行を補完する
+
+    主キーの昇順にバッチで処理し、バッチごとにコミットするため、途中で中断しても
+    再実行すれば未補完の変更履歴から続けて処理する。
+
+    Args:
+        engine: 対象のエンジン
+        batch_size: 1バッチの変更履歴の件数
+        archived: アーカイブ済みの変更履歴（change_history_archive）を対象にする
+
+    Returns:
+        int: 項目別の行を補完した変更履歴の件数
+    """
+    table = (ChangeHistoryArchive if archived else ChangeHistoryModel).__table__
+    field_model = ChangeHistoryFieldArchive if archived else ChangeHistoryFieldModel
+    fields = field_model.__table__
+    # アーカイブは独自の主キー（archive_id）を持ち、元の変更履歴IDは id 列に保存している
+    key = table.c.archive_id if archived else table.c.id
+    fetch = (
+        select(key.label("batch_key"), *[table.c[name] for name in RETURNED_COLUMNS])
+        .where(key > bindparam("last_id"), ~exists().where(fields.c.history_id == table.c.id))
+        .order_by(key)
+        .limit(batch_size)
+    )
+
+    filled = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(fetch, {"last_id": last_id}).fetchall()
+            if not rows:
+                break
+            values: List[Dict[str, Any]] = []
+            for row in rows:
+                history_values = field_rows(row.id, row.changed_at, row._mapping)
+                if history_values:
+                    values.extend(history_values)
+                    filled += 1
+            insert_fields(connection, values, field_model)
+        last_id = rows[-1].batch_key
+    return filled
+
+
+def ensure_change_history_fields(engine: Engine) -> None:
+    """項目別の行がない変更履歴を補完する（起動時に呼び出す、冪等）"""
+    try:
+        filled = backfill_change_history_fields(engine)
+        if filled:
+            logger.info(f"変更履歴 {filled} 件の項目別の行を補完しました")
+        filled = backfill_change_history_fields(engine, archived=True)
+        if filled:
+            logger.info(f"アーカイブ済みの変更履歴 {filled} 件の項目別の行を補完しました")
+    except Exception as e:
+        logger.warning(f"変更履歴の項目別の行の補完に失敗しました: {str(e)}")
@@ -1,13 +1,27 @@
 """
 変更履歴サービス
 """
-from typing import Optional, Any, Dict
+import logging
+from typing import Optional, Any, Dict, Iterable
+from sqlalchemy import bindparam, inspect, select, update
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from ..models.change_history import ChangeHistory as ChangeHistoryModel
 from ..models.case import Case as CaseModel
+from .case_state_service import checkpoint_on_write, checkpoints_on_bulk_write
+from .change_history_fields import field_rows, insert_fields, insert_histories
+from .change_history_writer import buffered_mode, change_history_writer, history_row
 from datetime import datetime
 import json
 
+logger = logging.getLogger(__name__)
+
+# changes_json に保存する案件番号スナップショットのキー（case_number_snapshot 列を追加する前の履歴にも残っている）
+CASE_NUMBER_SNAPSHOT_KEY = "_case_number_snapshot"
+
+# case_number_snapshot を補完する1バッチの件数
+SNAPSHOT_BACKFILL_BATCH_SIZE = 1000
+
 
 def serialize_value(value: Any) -> Optional[str]:
     """
@@ -34,8 +48,49 @@ def serialize_value(value: Any) -> Optional[str]:
     return str(value)
 
 
-def record_change_history(
-    db: Session,
+def case_number_from_changes(
+    change_type: Optional[str],
+    changes_json: Any,
+    field_name: Optional[str],
+    old_value: Optional[str],
+    new_value: Optional[str],
+) -> Optional[str]:
+    """
+    変更内容から履歴時点の案件番号を取り出す（case_number_snapshot 列がない古い履歴用）
+
+    Args:
+        change_type: 変更タイプ（CREATE/UPDATE/DELETE）
+        changes_json: 変更詳細
+        field_name: 変更フィールド名
+        old_value: 変更前の値
+        new_value: 変更後の値
+
+    Returns:
+        Optional[str]: 案件番号（取り出せない場合は None）
+    """
+    if isinstance(changes_json, dict):
+        snapshot = changes_json.get(CASE_NUMBER_SNAPSHOT_KEY)
+        if isinstance(snapshot, str) and snapshot:
+            return snapshot
+
+        case_number_data = changes_json.get("case_number")
+        if isinstance(case_number_data, dict):
+            if change_type == "DELETE":
+                case_number = case_number_data.get("old") or case_number_data.get("new")
+            else:
+                case_number = case_number_data.get("new") or case_number_data.get("old")
+            if case_number:
+                return case_number
+        elif isinstance(case_number_data, str) and case_number_data:
+            return case_number_data
+
+    # 単一フィールド変更時にfield_name/new_valueに入っている場合
+    if field_name == "case_number":
+        return new_value or old_value
+    return None
+
+
+def build_change_history(
     case_id: int,
     change_type: str,
     changed_by: Optional[int],
@@ -46,10 +101,9 @@ def record_change_history(
     case_number_snapshot: Optional[str] = None,
 ) -> ChangeHistoryModel:
     """
-    変更履歴を記録
+    変更履歴を組み立てる（セッションには追加しない）
 
     Args:
-        db: データベースセッション
         case_id: 案件ID
         change_type: 変更タイプ（CREATE/UPDATE/DELETE）
         changed_by: 変更者ID
@@ -59,7 +113,7 @@ def record_change_history(
         notes: 備考
 
     Returns:
-        ChangeHistoryModel: 作成された変更履歴
+        ChangeHistoryModel: 組み立てた変更履歴（未保存）
     """
     # 案件番号スナップショット（履歴表示用）
     snapshot_case_number = (
@@ -72,7 +126,8 @@ def record_change_history(
         case_id=case_id,
         changed_by=changed_by,
         change_type=change_type,
-        notes=notes
+        notes=notes,
+        case_number_snapshot=snapshot_case_number,
     )
 
     # 変更タイプに応じて履歴を記録
@@ -170,14 +225,175 @@ def record_change_history(
         change_history.old_value = None
         change_history.new_value = None
 
-    # 案件番号スナップショットをchanges_jsonに保存
+    # 案件番号スナップショットはchanges_jsonにも保存する（列を参照しない既存の利用側向け）
     if snapshot_case_number:
         if change_history.changes_json is None:
             change_history.changes_json = {}
-        change_history.changes_json["_case_number_snapshot"] = snapshot_case_number
+        change_history.changes_json[CASE_NUMBER_SNAPSHOT_KEY] = snapshot_case_number
+
+    return change_history
+
+
+def record_change_history(
+    db: Session,
+    case_id: int,
+    change_type: str,
+    changed_by: Optional[int],
+    old_case: Optional[CaseModel] = None,
+    new_case: Optional[CaseModel] = None,
+    changes: Optional[Dict[str, Any]] = None,
+    notes: Optional[str] = None,
+    case_number_snapshot: Optional[str] = None,
+) -> ChangeHistoryModel:
+    """
+    変更履歴を記録
+
+    CHANGE_HISTORY_WRITE_MODE が "buffered" の場合は、セッションのコミット後に
+    変更履歴の遅延書き込みでまとめて挿入する。それ以外の場合は同じトランザクションで挿入し、
+    前回のチェックポイントからの変更履歴が CASE_CHECKPOINT_INTERVAL 件に達した場合は
+    案件状態のチェックポイントも作成する。
+
+    Args:
+        db: データベースセッション
+        case_id: 案件ID
+        change_type: 変更タイプ（CREATE/UPDATE/DELETE）
+        changed_by: 変更者ID
+        old_case: 変更前の案件データ（UPDATE/DELETEの場合）
+        new_case: 変更後の案件データ（CREATE/UPDATEの場合）
+        changes: 変更内容の辞書（フィールド名と新旧値のペア）
+        notes: 備考
+
+    Returns:
+        ChangeHistoryModel: 作成された変更履歴
+    """
+    change_history = build_change_history(
+        case_id=case_id,
+        change_type=change_type,
+        changed_by=changed_by,
+        old_case=old_case,
+        new_case=new_case,
+        changes=changes,
+        notes=notes,
+        case_number_snapshot=case_number_snapshot,
+    )
+
+    if buffered_mode():
+        # コミット後にまとめて書き込む（IDは採番されない）
+        change_history_writer.add(db, [change_history])
+        return change_history
 
     db.add(change_history)
     db.flush()  # IDを取得するためにflush
-    db.refresh(change_history)
+    insert_fields(db, field_rows(change_history.id, change_history.changed_at, history_row(change_history)))
+    if case_id is not None:
+        checkpoint_on_write(db, case_id)
 
     return change_history
+
+
+def insert_change_histories(
+    db: Session,
+    histories: Iterable[ChangeHistoryModel],
+    allow_buffered: bool = True,
+) -> int:
+    """
+    組み立て済みの変更履歴を1回のexecutemanyでまとめて挿入する（項目別の行も挿入する）
+
+    同じトランザクションで挿入した場合は、前回のチェックポイントからの変更履歴が
+    CASE_CHECKPOINT_INTERVAL 件に達した案件の状態のチェックポイントも作成する。
+
+    Args:
+        db: データベースセッション
+        histories: build_change_history で組み立てた変更履歴
+        allow_buffered: CHANGE_HISTORY_WRITE_MODE が "buffered" の場合に遅延書き込みするか
+            （False の場合は常に同じトランザクションで挿入する）
+
+    Returns:
+        int: 挿入した件数
+    """
+    if allow_buffered and buffered_mode():
+        return change_history_writer.add(db, histories)
+
+    rows = [history_row(history) for history in histories]
+    inserted = insert_histories(db, rows)
+    checkpoints_on_bulk_write(db, (row["case_id"] for row in rows))
+    return inserted
+
+
+def backfill_case_number_snapshots(engine: Engine, batch_size: int = SNAPSHOT_BACKFILL_BATCH_SIZE) -> int:
+    """
+    case_number_snapshot が未設定の変更履歴を changes_json から補完する
+
+    IDの昇順にバッチで処理し、バッチごとにコミットするため、途中で中断しても
+    再実行すれば未設定の行から続けて補完する。案件番号を取り出せない行は未設定のまま残す。
+
+    Args:
+        engine: 対象のエンジン
+        batch_size: 1バッチの件数
+
+    Returns:
+        int: 補完した件数
+    """
+    table = ChangeHistoryModel.__table__
+    fetch = (
+        select(table.c.id, table.c.change_type, table.c.changes_json,
+               table.c.field_name, table.c.old_value, table.c.new_value)
+        .where(table.c.id > bindparam("last_id"), table.c.case_number_snapshot.is_(None))
+        .order_by(table.c.id)
+        .limit(batch_size)
+    )
+    fill = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values(case_number_snapshot=bindparam("snapshot"))
+    )
+    max_length = table.c.case_number_snapshot.type.length
+
+    filled = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(fetch, {"last_id": last_id}).fetchall()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                case_number = case_number_from_changes(*row[1:])
+                if case_number:
+                    params.append({"row_id": row.id, "snapshot": case_number[:max_length]})
+            if params:
+                connection.execute(fill, params)
+        filled += len(params)
+        last_id = rows[-1].id
+    return filled
+
+
+def ensure_case_number_snapshots(engine: Engine) -> None:
+    """
+    case_number_snapshot 列を整備する（起動時に呼び出す、冪等）
+
+    - 列がない既存DB（create_allで作成されたDB）に列とインデックスを追加する
+    - 未設定の行を changes_json から補完する
+    """
+    try:
+        inspector = inspect(engine)
+        if not inspector.has_table(ChangeHistoryModel.__tablename__):
+            return
+        columns = {column["name"] for column in inspector.get_columns(ChangeHistoryModel.__tablename__)}
+        with engine.begin() as connection:
+            if "case_number_snapshot" not in columns:
+                logger.info("change_history.case_number_snapshot 列を追加します")
+                connection.exec_driver_sql("ALTER TABLE change_history ADD COLUMN case_number_snapshot VARCHAR(50)")
+            for index in ChangeHistoryModel.__table__.indexes:
+                if index.name == "ix_change_history_case_number_snapshot":
+                    index.create(connection, checkfirst=True)
+    except Exception as e:
+        logger.warning(f"case_number_snapshot 列の追加に失敗しました: {str(e)}")
+        return
+
+    try:
+        filled = backfill_case_number_snapshots(engine)
+        if filled:
+            logger.info(f"case_number_snapshot を {filled} 件補完しました")
+    except Exception as e:
+        logger.warning(f"case_number_snapshot の補完に失敗しました: {str(e)}")
@@ -0,0 +1,240 @@
+"""
+変更履歴の書き込み（同一トランザクション／遅延書き込み）
+
+CHANGE_HISTORY_WRITE_MODE で書き込み方式を切り替える。
+
+- "transaction"（既定）: 案件の変更と同じトランザクションで変更履歴を挿入する。
+  案件の変更がコミットされれば変更履歴も必ず残る（厳密な監査向け）。
+- "buffered": 変更履歴をメモリにためておき、案件の変更がコミットされた後に
+  CHANGE_HISTORY_FLUSH_INTERVAL_MS ごと、または CHANGE_HISTORY_FLUSH_MAX_ROWS 件ごとに
+  1回のexecutemanyでまとめて挿入する。書き込みのたびの変更履歴の挿入がなくなる代わりに、
+  一覧への反映が最大で書き込み間隔だけ遅れ、プロセスが異常終了すると未書き込みの履歴は失われる。
+  正常終了時はシャットダウン処理で残りを書き込む（drain）。
+
+"buffered" では、セッションのコミットを待ってから履歴を書き込みキューに移す。
+ロールバックされたトランザクション（SAVEPOINTを含む）で記録した履歴は破棄する。
+"""
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, SessionTransaction
+
+from ..core.config import settings
+from ..models.change_history import ChangeHistory as ChangeHistoryModel
+from .change_history_fields import insert_histories
+
+logger = logging.getLogger(__name__)
+
+WRITE_MODE_TRANSACTION = "transaction"
+WRITE_MODE_BUFFERED = "buffered"
+
+# 挿入する列（changed_at は記録した時刻を入れる）
+HISTORY_COLUMNS = (
+    "case_id", "changed_by", "change_type", "field_name", "old_value", "new_value",
+    "case_number_snapshot", "changes_json", "notes",
+)
+
+# コミット待ちの履歴を保持する Session.info のキー
+_PENDING_KEY = "change_history_pending"
+
+
+def buffered_mode() -> bool:
+    """変更履歴を遅延書き込みするか"""
+    return settings.CHANGE_HISTORY_WRITE_MODE == WRITE_MODE_BUFFERED
+
+
+def history_row(history: ChangeHistoryModel) -> Dict[str, Any]:
+    """組み立て済みの変更履歴を挿入用の辞書にする"""
+    return {column: getattr(history, column) for column in HISTORY_COLUMNS}
+
+
+class ChangeHistoryWriter:
+    """コミット済みの変更履歴をためておき、まとめて挿入する"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # (接続先エンジン, 挿入する行)
+        self._buffer: List[Tuple[Any, Dict[str, Any]]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.discarded = 0
+
+    def add(self, db: Session, histories: Iterable[ChangeHistoryModel]) -> int:
+        """
+        変更履歴をセッションのコミット待ちに追加する
+
+        セッションがコミットされると書き込みキューに移り、ロールバックされると破棄される。
+
+        Args:
+            db: 案件の変更を行っているセッション
+            histories: build_change_history で組み立てた変更履歴
+
+        Returns:
+            int: 追加した件数
+        """
+        transaction = db.get_nested_transaction() or db.get_transaction()
+        engine = db.get_bind()
+        recorded_at = datetime.now(timezone.utc)
+        pending = db.info.setdefault(_PENDING_KEY, [])
+        count = 0
+        for history in histories:
+            row = history_row(history)
+            row["changed_at"] = recorded_at
+            pending.append((transaction, engine, row))
+            count += 1
+        return count
+
+    def _enqueue(self, rows: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        with self._lock:
+            self._buffer.extend(rows)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run_loop, name="trade-dx-history", daemon=True)
+                self._thread.start()
+            if len(self._buffer) >= settings.CHANGE_HISTORY_FLUSH_MAX_ROWS:
+                self._wakeup.notify()
+
+    def _run_loop(self) -> None:
+        while True:
+            with self._lock:
+                if not self._stopping and len(self._buffer) < settings.CHANGE_HISTORY_FLUSH_MAX_ROWS:
+                    self._wakeup.wait(settings.CHANGE_HISTORY_FLUSH_INTERVAL_MS / 1000)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self) -> int:
+        """
+        ためている変更履歴をエンジンごとに1回のexecutemanyで挿入する（項目別の行も同じトランザクションで挿入する）
+
+        挿入に失敗した履歴は次回の書き込みで再試行する。
+
+        Returns:
+            int: 挿入した件数
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+
+        by_engine: Dict[Any, List[Dict[str, Any]]] = {}
+        for engine, row in rows:
+            by_engine.setdefault(engine, []).append(row)
+
+        written = 0
+        failed: List[Tuple[Any, Dict[str, Any]]] = []
+        for engine, engine_rows in by_engine.items():
+            try:
+                with engine.begin() as connection:
+                    insert_histories(connection, engine_rows)
+                written += len(engine_rows)
+            except IntegrityError:
+                # 書き込み前に案件が削除された行があるため、1件ずつ挿入する
+                for row in engine_rows:
+                    if self._insert_one(engine, row):
+                        written += 1
+                    else:
+                        failed.append((engine, row))
+            except Exception as e:
+                logger.error(f"変更履歴の書き込みに失敗しました（{len(engine_rows)}件、次回再試行）: {str(e)}")
+                failed.extend((engine, row) for row in engine_rows)
+
+        with self._lock:
+            self._buffer[:0] = failed
+            self.written += written
+            self.flushes += 1
+            if failed:
+                self.failed_flushes += 1
+        return written
+
+    def _insert_one(self, engine: Any, row: Dict[str, Any]) -> bool:
+        """
+        変更履歴を1件挿入する
+
+        案件が削除済みで外部キー制約に違反する場合は、削除時の他の履歴と同じく case_id をNULLにして挿入する。
+        """
+        try:
+            with engine.begin() as connection:
+                try:
+                    with connection.begin_nested():
+                        insert_histories(connection, [row])
+                except IntegrityError:
+                    insert_histories(connection, [{**row, "case_id": None}])
+            return True
+        except Exception as e:
+            logger.error(f"変更履歴の書き込みに失敗しました（次回再試行）: {str(e)}")
+            return False
+
+    def _discard(self, count: int) -> None:
+        with self._lock:
+            self.discarded += count
+
+    def drain(self) -> None:
+        """残りの変更履歴を書き込んでからスレッドを停止する（シャットダウン時に呼び出す）"""
+        with self._lock:
+            thread = self._thread
+            self._stopping = True
+            self._wakeup.notify()
+        if thread is not None and thread.is_alive():
+            thread.join()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """書き込み方式・未書き込み件数・書き込み件数・書き込み回数を返す"""
+        with self._lock:
+            return {
+                "mode": settings.CHANGE_HISTORY_WRITE_MODE,
+                "buffered": len(self._buffer),
+                "written": self.written,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "discarded": self.discarded,
+            }
+
+
+change_history_writer = ChangeHistoryWriter()
+
+
+def _within(transaction: Optional[SessionTransaction], ended: SessionTransaction) -> bool:
+    """transaction が ended またはその内側のトランザクションか"""
+    while transaction is not None:
+        if transaction is ended:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    # SAVEPOINTのコミットでも呼ばれるため、最上位のトランザクションのコミットのみ扱う
+    pending = session.info.get(_PENDING_KEY)
+    if pending and session.get_nested_transaction() is None:
+        session.info[_PENDING_KEY] = []
+        change_history_writer._enqueue([(engine, row) for _, engine, row in pending])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_soft_rollback(session: Session, previous_transaction: SessionTransaction) -> None:
+    # ロールバックされたトランザクション（SAVEPOINTを含む）の内側で記録した履歴を破棄する
+    pending = session.info.get(_PENDING_KEY)
+    if pending:
+        kept = [entry for entry in pending if not _within(entry[0], previous_transaction)]
+        session.info[_PENDING_KEY] = kept
+        change_history_writer._discard(len(pending) - len(kept))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(session: Session, transaction: SessionTransaction) -> None:
+    # コミットされずに終わった最上位のトランザクション（close() など）の履歴を破棄する
+    if transaction.parent is None and session.info.get(_PENDING_KEY):
+        change_history_writer._discard(len(session.info[_PENDING_KEY]))
+        session.info[_PENDING_KEY] = []
@@ -0,0 +1,217 @@
+"""
+一覧APIの総件数キャッシュ
+
+一覧APIは毎回 `query.count()` でJOIN込みの全件数を数えており、
+負荷が高いとページ本体の取得より件数取得の方が重くなる。
+正規化したフィルタ条件のハッシュをキーに件数をキャッシュし、
+対象テーブルへの書き込みがコミットされた時点で無効化する。
+
+キャッシュはプロセス内のみで共有されるため、複数ワーカー構成では
+他ワーカーの書き込みはTTL経過まで反映されない。
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Query
+
+from ..core.config import settings
+from .table_versions import table_versions
+
+logger = logging.getLogger(__name__)
+
+# 総件数の取得モード
+TOTAL_MODE_EXACT = "exact"
+TOTAL_MODE_ESTIMATE = "estimate"
+TOTAL_MODE_NONE = "none"
+TOTAL_MODE_PATTERN = "^(exact|estimate|none)$"
+
+
+def normalize_filters(filters: Dict[str, Any]) -> str:
+    """
+    フィルタ条件を正規化してハッシュ化する
+
+    未指定（None・空文字）の条件は除外し、文字列は前後の空白を除去する。
+    """
+    normalized = {}
+    for key, value in filters.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        normalized[key] = value
+
+    raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class CountCache:
+    """
+    フィルタ条件ごとの総件数キャッシュ
+
+    スコープ（一覧の種類）ごとに依存テーブルを登録しておき、
+    いずれかのテーブルが書き込まれたらそのスコープのエントリを破棄する。
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict[str, Tuple[int, float]]] = {}
+        self._dependencies: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, scope: str, key: str) -> Optional[int]:
+        """キャッシュ済みの件数を取得する（期限切れ・未登録の場合はNone）"""
+        with self._lock:
+            entry = self._entries.get(scope, {}).get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[scope][key]
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return value
+
+    def peek(self, scope: str, filters: Dict[str, Any]) -> Optional[int]:
+        """キャッシュ済みの件数を参照する（ヒット・ミスの統計に含めない。ETagの計算用）"""
+        key = normalize_filters(filters)
+        with self._lock:
+            entry = self._entries.get(scope, {}).get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, scope: str, key: str, value: int, depends_on: Iterable[str]) -> None:
+        """件数をキャッシュする"""
+        with self._lock:
+            self._dependencies.setdefault(scope, set()).update(depends_on)
+            entries = self._entries.setdefault(scope, {})
+            if len(entries) >= self.max_entries:
+                # 上限に達した場合は最も古いエントリを破棄
+                entries.pop(next(iter(entries)))
+            entries[key] = (value, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, *tables: str) -> None:
+        """指定テーブルに依存するスコープのエントリを破棄する"""
+        tables = set(tables)
+        with self._lock:
+            for scope, depends_on in self._dependencies.items():
+                if depends_on & tables:
+                    self._entries.pop(scope, None)
+
+    def clear(self) -> None:
+        """全エントリを破棄する"""
+        with self._lock:
+            self._entries.clear()
+
+    def count(
+        self,
+        scope: str,
+        filters: Dict[str, Any],
+        counter: Callable[[], int],
+        depends_on: Iterable[str],
+    ) -> int:
+        """
+        キャッシュから件数を取得し、なければ counter() で数えてキャッシュする
+
+        Args:
+            scope: 一覧の種類（例: "cases"）
+            filters: フィルタ条件
+            counter: 件数を数える関数
+            depends_on: 件数が依存するテーブル名
+
+        Returns:
+            int: 総件数
+        """
+        key = normalize_filters(filters)
+        cached = self.get(scope, key)
+        if cached is not None:
+            return cached
+
+        value = counter()
+        self.set(scope, key, value, depends_on)
+        return value
+
+
+count_cache = CountCache(
+    ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+)
+
+
+def estimate_count(query: Query) -> Optional[int]:
+    """
+    プランナの統計情報から件数を推定する（PostgreSQLのみ）
+
+    Returns:
+        Optional[int]: 推定件数（PostgreSQL以外、または推定に失敗した場合はNone）
+    """
+    session = query.session
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    try:
+        compiled = query.statement.compile(dialect=bind.dialect)
+        result = session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        )
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"件数の推定に失敗しました（正確な件数で代替）: {str(e)}")
+        return None
+
+
+def resolve_total(
+    query: Query,
+    mode: str,
+    scope: str,
+    filters: Dict[str, Any],
+    depends_on: Iterable[str],
+) -> Optional[int]:
+    """
+    総件数の取得モードに応じて総件数を返す
+
+    Args:
+        query: フィルタ適用済み（ソート・ページング前）のクエリ
+        mode: exact（キャッシュ付き正確な件数）/ estimate（推定値）/ none（取得しない）
+        scope: 一覧の種類
+        filters: フィルタ条件
+        depends_on: 件数が依存するテーブル名
+
+    Returns:
+        Optional[int]: 総件数（none の場合はNone）
+    """
+    if mode == TOTAL_MODE_NONE:
+        return None
+
+    if mode == TOTAL_MODE_ESTIMATE:
+        estimated = estimate_count(query)
+        if estimated is not None:
+            return estimated
+
+    return count_cache.count(scope, filters, query.count, depends_on)
+
+
+def total_pages_for(total: Optional[int], page_size: int) -> Optional[int]:
+    """総件数から総ページ数を計算する（総件数がない場合はNone）"""
+    if total is None:
+        return None
+    return (total + page_size - 1) // page_size
+
+
+# 対象テーブルへの書き込みがコミットされたら件数キャッシュを無効化する
+table_versions.subscribe(count_cache.invalidate)
@@ -11,6 +11,8 @@ from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 from sqlalchemy.orm import Session
 
+from app.core.pagination import KeysetPaginator
+from app.services.count_cache import TOTAL_MODE_EXACT, resolve_total
 from app.models.case import Case
 from app.models.customer import Customer
 from app.models.product import Product
@@ -339,8 +341,10 @@ class DocumentGenerator:
         case_id: Optional[int] = None,
         document_type: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> tuple[list[Document], int]:
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        total_mode: str = TOTAL_MODE_EXACT
+    ) -> tuple[list[Document], Optional[int], Optional[str]]:
         """
         ドキュメント一覧を取得
 
@@ -349,9 +353,14 @@ class DocumentGenerator:
             document_type: ドキュメントタイプでフィルタリング（オプション）
             skip: スキップ数
             limit: 取得件数上限
+            cursor: 次ページのカーソル（指定時はskipより優先）
+            total_mode: 総件数の取得方法（exact/estimate/none）
 
         Returns:
-            tuple: (ドキュメントリスト, 総件数)
+            tuple: (ドキュメントリスト, 総件数（none の場合はNone）, 次ページのカーソル)
+
+        Raises:
+            InvalidCursorError: カーソルが不正な場合
         """
         query = self.db.query(Document)
 
@@ -361,10 +370,23 @@ class DocumentGenerator:
         if document_type:
             query = query.filter(Document.document_type == document_type)
 
-        total = query.count()
-        documents = query.order_by(Document.generated_at.desc()).offset(skip).limit(limit).all()
+        total = resolve_total(
+            query,
+            total_mode,
+            scope="documents",
+            filters={"case_id": case_id, "document_type": document_type},
+            depends_on=("documents",),
+        )
+
+        paginator = KeysetPaginator(Document.generated_at, Document.id, descending=True)
+        query = paginator.order(query)
+        if cursor:
+            query = paginator.seek(query, cursor)
+        else:
+            query = query.offset(skip)
+        documents, next_cursor = paginator.fetch(query, limit)
 
-        return documents, total
+        return documents, total, next_cursor
 
     def get_document_file(self, document_id: int) -> Path:
         """
@@ -0,0 +1,115 @@
+"""
+一覧APIのETag（条件付きGET）
+
+`case_updated` などの通知を受けたブラウザは表示中の一覧を再取得するが、
+多くの場合その一覧の内容は変わっていない。一覧の内容を代表する安価な値から
+弱いETagを計算し、`If-None-Match` が一致すれば本文を組み立てずに304を返す。
+
+ETagの元になる値（リクエストごとに件数を数えない）:
+- リクエストのクエリパラメータ（ページ・ソート・フィルタ）
+- プロセス内のテーブル書き込みバージョン（このワーカーでコミットされた書き込み）
+- 対象テーブルの updated_at の最大値（インデックスのある列・件数の少ないマスタのみ、1回のクエリで取得。
+  他ワーカーでの作成・更新用）
+- 同じフィルタ条件で総件数キャッシュ（count_cache）に保持している件数（あれば。
+  他ワーカーでの削除はキャッシュの期限切れ後に数え直した件数で反映される）
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from .count_cache import count_cache
+from .table_versions import table_versions
+
+# 案件一覧（更新が多いため毎回再検証させる）
+CACHE_CONTROL_DEFAULT = "private, no-cache"
+
+
+def master_data_cache_control() -> str:
+    """マスタデータ一覧の Cache-Control（短時間はブラウザのキャッシュを使わせる）"""
+    return f"private, max-age={settings.MASTER_DATA_CACHE_MAX_AGE}, must-revalidate"
+
+
+def table_state(db: Session, models: Iterable[Any], tables: Iterable[str] = ()) -> List[Any]:
+    """
+    ETagの元になるテーブルの状態を取得する
+
+    Args:
+        db: データベースセッション
+        models: 書き込みバージョンと updated_at の最大値を含めるモデル
+            （updated_at にインデックスがあるか、件数の少ないテーブルに限る）
+        tables: 書き込みバージョンだけを含めるテーブル名
+
+    Returns:
+        list: テーブルごとの書き込みバージョンと updated_at の最大値
+    """
+    models = list(models)
+    state: List[Any] = [table_versions.get(model.__tablename__) for model in models]
+    state.extend(table_versions.get(table) for table in tables)
+    if models:
+        latest = db.execute(
+            select(*[select(func.max(model.updated_at)).scalar_subquery() for model in models])
+        ).one()
+        state.extend(latest)
+    return state
+
+
+def compute_etag(
+    params: Dict[str, Any],
+    state: Iterable[Any],
+    count_scope: Optional[str] = None,
+    count_filters: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    一覧の弱いETagを計算する
+
+    Args:
+        params: リクエストのパラメータ
+        state: テーブルの状態（table_state の戻り値、マスタデータキャッシュの世代など）
+        count_scope: 総件数キャッシュのスコープ（指定時はキャッシュ済みの件数を含める）
+        count_filters: 総件数キャッシュのフィルタ条件
+
+    Returns:
+        str: 弱いETag（例: W/"..."）
+    """
+    count = count_cache.peek(count_scope, count_filters or {}) if count_scope else None
+
+    raw = json.dumps([params, list(state), count], sort_keys=True, ensure_ascii=False, default=str)
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match ヘッダーがETagと一致するか（弱い比較）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def not_modified_response(etag: str, cache_control: str = CACHE_CONTROL_DEFAULT) -> Response:
+    """304 Not Modified レスポンスを生成する"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def set_etag_headers(response: Response, etag: str, cache_control: str = CACHE_CONTROL_DEFAULT) -> None:
+    """レスポンスにETagと Cache-Control を設定する"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
@@ -0,0 +1,162 @@
+"""
+認証ユーザーのキャッシュ
+
+認証付きのリクエストは毎回 `get_current_user` でユーザーを取得し、
+変更履歴の一覧も行ごとに変更者名を引いていた。
+ユーザーIDをキーに列の値を短時間キャッシュし、定常状態では
+リクエストの認証・ユーザー名の解決でDBに問い合わせない。
+
+usersテーブルへの書き込みがコミットされた時点で全エントリを破棄する。
+キャッシュはプロセス内のみで共有されるため、複数ワーカー構成では
+他ワーカーでの変更（無効化など）はTTL経過まで反映されない。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..core.config import settings
+from ..models.user import User
+from .table_versions import table_versions
+
+# キャッシュする列（パスワードハッシュは保持しない）
+USER_CACHE_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "full_name",
+    "is_active",
+    "is_superuser",
+    "created_at",
+    "updated_at",
+)
+
+
+class IdentityCache:
+    """ユーザーIDごとのユーザー情報キャッシュ（LRU・TTL付き）"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """キャッシュ済みの列の値を取得する（期限切れ・未登録の場合はNone）"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            values, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return values
+
+    def _set(self, user: User, version: int) -> Dict[str, Any]:
+        """
+        ユーザーの列の値をキャッシュする
+
+        読み込み開始（version取得）後にusersへの書き込みがコミットされていた場合は、
+        古い値の可能性があるためキャッシュしない。
+        """
+        values = {field: getattr(user, field) for field in USER_CACHE_FIELDS}
+        with self._lock:
+            if table_versions.get(User.__tablename__) != version:
+                return values
+            self._entries[user.id] = (values, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return values
+
+    def get_user(self, db: Session, user_id: int) -> Optional[User]:
+        """
+        ユーザーを取得する
+
+        返すインスタンスはリクエストごとに作る切り離し状態（detached）のもので、
+        セッションには属さない（パスワードハッシュは読み込まれていない）。
+
+        Args:
+            db: データベースセッション
+            user_id: ユーザーID
+
+        Returns:
+            Optional[User]: ユーザー（存在しない場合はNone）
+        """
+        values = self._get(user_id)
+        if values is None:
+            version = table_versions.get(User.__tablename__)
+            user = db.query(User).filter(User.id == user_id).first()
+            if user is None:
+                return None
+            values = self._set(user, version)
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def usernames(self, db: Session, user_ids: Iterable[Optional[int]]) -> Dict[int, str]:
+        """
+        ユーザーIDからユーザー名を解決する（キャッシュにないIDはまとめて1回で取得）
+
+        Returns:
+            Dict[int, str]: ユーザーID→ユーザー名（存在しないIDは含まない）
+        """
+        names = {}
+        missing = set()
+        for user_id in set(user_ids):
+            if user_id is None:
+                continue
+            values = self._get(user_id)
+            if values is None:
+                missing.add(user_id)
+            else:
+                names[user_id] = values["username"]
+
+        if missing:
+            version = table_versions.get(User.__tablename__)
+            for user in db.query(User).filter(User.id.in_(missing)):
+                names[user.id] = self._set(user, version)["username"]
+        return names
+
+    def invalidate(self, *user_ids: int) -> None:
+        """指定ユーザーのエントリを破棄する"""
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """全エントリを破棄する"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミス件数とエントリ数を返す"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+identity_cache = IdentityCache(
+    ttl_seconds=settings.IDENTITY_CACHE_TTL_SECONDS,
+    max_entries=settings.IDENTITY_CACHE_MAX_ENTRIES,
+)
+
+
+def _invalidate_users(*tables: str) -> None:
+    if User.__tablename__ in tables:
+        identity_cache.clear()
+
+
+# usersテーブルへの書き込みがコミットされたらキャッシュを破棄する
+table_versions.subscribe(_invalidate_users)
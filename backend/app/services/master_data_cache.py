@@ -0,0 +1,275 @@
+"""
+顧客・商品マスタのプロセス内キャッシュ
+
+案件の作成・更新のたびに顧客・商品の存在確認クエリが発行され、
+フロントエンドも更新通知のたびにマスタ一覧を再取得する。
+マスタデータは件数が少なく更新頻度も低いため、テーブル全体のスナップショットを
+プロセス内に保持し、存在確認・オートコンプリート・一覧の取得をここから返す。
+オートコンプリートは有効な行から作るインデックス（autocomplete_index）で引く。
+
+スナップショットは読み込み時のテーブル書き込みバージョン（table_versions）を持ち、
+コミットでバージョンが進んだら次の読み取りで読み直す。スナップショットを作るたびに進む世代は、
+キャッシュから返す一覧のETagに使う（DBを読まずに内容の変化を判定できる）。
+マスタAPIの作成・更新・削除では、コミット後の行をスナップショットに書き込む（ライトスルー）。
+
+キャッシュはプロセス内のみで共有されるため、複数ワーカー構成では
+他ワーカーの書き込みはTTL経過まで反映されない（存在確認はキャッシュにないIDのみDBで確認する）。
+"""
+import bisect
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.pagination import decode_cursor, encode_cursor
+from ..models.customer import Customer
+from ..models.product import Product
+from ..schemas.customer import CustomerResponse
+from ..schemas.product import ProductResponse
+from .autocomplete_index import AutocompleteIndex
+from .table_versions import table_versions
+
+
+@dataclass(frozen=True)
+class _Source:
+    """キャッシュ対象のテーブル定義"""
+    model: Any
+    schema: Any
+    sort_key: str
+    search_fields: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """
+    テーブル全体のスナップショット（読み取り側はロックなしで参照するため不変）
+
+    items はソートキー・ID順に並べた全行（無効化されたマスタを含む）。
+    index はライトスルー時に複製を差分更新し、次のスナップショットに渡す
+    （現在のスナップショットの index は変更しない）。
+    """
+    version: int
+    generation: int
+    expires_at: float
+    items: Tuple[Any, ...]
+    by_id: Dict[int, Any]
+    index: AutocompleteIndex
+
+
+class MasterDataCache:
+    """テーブル単位のマスタデータキャッシュ"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._sources: Dict[str, _Source] = {}
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._lock = threading.Lock()
+        self._generations = itertools.count(1)
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, model: Any, schema: Any, sort_key: str, search_fields: Tuple[str, ...]) -> None:
+        """キャッシュ対象のテーブルを登録する"""
+        self._sources[model.__tablename__] = _Source(model, schema, sort_key, search_fields)
+
+    def _build(
+        self,
+        table: str,
+        version: int,
+        items: Iterable[Any],
+        index: Optional[AutocompleteIndex] = None,
+    ) -> _Snapshot:
+        """行のリストからスナップショットを作る（index 未指定時はインデックスも作り直す）"""
+        source = self._sources[table]
+        items = sorted(items, key=lambda item: (getattr(item, source.sort_key), item.id))
+        if index is None:
+            index = AutocompleteIndex(source.search_fields, source.sort_key)
+            index.build(item for item in items if item.is_active == 1)
+        return _Snapshot(
+            version=version,
+            generation=next(self._generations),
+            expires_at=time.monotonic() + self.ttl_seconds,
+            items=tuple(items),
+            by_id={item.id: item for item in items},
+            index=index,
+        )
+
+    def _snapshot(self, db: Session, table: str) -> _Snapshot:
+        """有効なスナップショットを返す（無効・期限切れの場合はDBから読み直す）"""
+        version = table_versions.get(table)
+        with self._lock:
+            snapshot = self._snapshots.get(table)
+            if snapshot is not None and snapshot.version == version and snapshot.expires_at >= time.monotonic():
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+
+        # 読み込み中にコミットされた書き込みは、バージョンの不一致により次回読み直す
+        source = self._sources[table]
+        rows = db.query(source.model).all()
+        snapshot = self._build(table, version, (source.schema.model_validate(row) for row in rows))
+        with self._lock:
+            self._snapshots[table] = snapshot
+        return snapshot
+
+    def generation(self, db: Session, table: str) -> int:
+        """
+        スナップショットの世代を取得する
+
+        読み直し・ライトスルーのたびに進むため、世代が同じ間はキャッシュから返す一覧も変わらない。
+        """
+        return self._snapshot(db, table).generation
+
+    def all(self, db: Session, table: str) -> Tuple[Any, ...]:
+        """全行をソートキー・ID順に取得する（無効化されたマスタを含む）"""
+        return self._snapshot(db, table).items
+
+    def active(self, db: Session, table: str) -> List[Any]:
+        """有効な行をソートキー・ID順に取得する"""
+        return [item for item in self._snapshot(db, table).items if item.is_active == 1]
+
+    def autocomplete(self, db: Session, table: str, keyword: str, limit: int) -> List[Any]:
+        """有効な行から検索語に前方一致・部分一致する行を返す"""
+        return self._snapshot(db, table).index.search(keyword, limit)
+
+    def get(self, db: Session, table: str, item_id: int) -> Optional[Any]:
+        """
+        IDで1行を取得する
+
+        キャッシュにないIDは他ワーカーで作成された可能性があるため、DBで確認する。
+
+        Returns:
+            Optional[Any]: レスポンススキーマの値（存在しない場合はNone）
+        """
+        item = self._snapshot(db, table).by_id.get(item_id)
+        if item is not None:
+            return item
+        found = self.existing_ids(db, table, [item_id])
+        return self._snapshot(db, table).by_id.get(item_id) if found else None
+
+    def existing_ids(self, db: Session, table: str, ids: Iterable[int]) -> Set[int]:
+        """
+        指定したIDのうち存在するものを返す
+
+        キャッシュにないIDだけをDBで確認し、見つかった場合はスナップショットを破棄する。
+        """
+        ids = set(ids)
+        found = ids & self._snapshot(db, table).by_id.keys()
+        unknown = ids - found
+        if not unknown:
+            return found
+
+        model = self._sources[table].model
+        with self._lock:
+            self.misses += 1
+        found_in_db = {row_id for (row_id,) in db.query(model.id).filter(model.id.in_(unknown))}
+        if found_in_db:
+            self.invalidate(table)
+        return found | found_in_db
+
+    def put(self, instance: Any) -> None:
+        """
+        コミット済みの行をスナップショットに書き込む（ライトスルー）
+
+        スナップショット作成後の書き込みがこのコミットだけの場合に限り反映し、
+        それ以外（他の書き込みと競合した場合など）はスナップショットを破棄する。
+        """
+        table = instance.__tablename__
+        source = self._sources.get(table)
+        if source is None:
+            return
+
+        item = source.schema.model_validate(instance)
+        version = table_versions.get(table)
+        with self._lock:
+            snapshot = self._snapshots.get(table)
+            if snapshot is None:
+                return
+            if snapshot.version + 1 != version:
+                self._snapshots.pop(table, None)
+                return
+
+            # 現在のスナップショットはロックなしで読まれているため、複製を更新する
+            index = snapshot.index.copy()
+            if item.is_active == 1:
+                index.add(item)
+            else:
+                index.remove(item.id)
+
+            items = dict(snapshot.by_id)
+            items[item.id] = item
+            self._snapshots[table] = self._build(table, version, items.values(), index)
+
+    def invalidate(self, *tables: str) -> None:
+        """指定テーブルのスナップショットを破棄する"""
+        with self._lock:
+            for table in tables:
+                self._snapshots.pop(table, None)
+
+    def clear(self) -> None:
+        """全スナップショットを破棄する"""
+        with self._lock:
+            self._snapshots.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """ヒット・ミス件数とキャッシュ済みの件数を返す"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": {table: len(snapshot.items) for table, snapshot in self._snapshots.items()},
+            }
+
+
+def page_items(
+    items: List[Any],
+    sort_key: str,
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    ソートキー・ID昇順に並んだ行を1ページ分切り出す
+
+    カーソルは KeysetPaginator と同じ形式のため、DBから取得した一覧と相互に使える。
+
+    Args:
+        items: ソートキー・ID昇順に並んだ行
+        sort_key: ソート項目名
+        skip: スキップ件数（カーソル指定時は無視）
+        limit: 取得件数
+        cursor: 次ページのカーソル
+
+    Returns:
+        Tuple[List[Any], Optional[str]]: (行のリスト, 次ページのカーソル。最終ページの場合はNone)
+
+    Raises:
+        InvalidCursorError: カーソルが不正な場合
+    """
+    start = skip
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_key, descending=False)
+        keys = [(getattr(item, sort_key), item.id) for item in items]
+        start = bisect.bisect_right(keys, (value, row_id))
+
+    page = items[start:start + limit]
+    if start + limit >= len(items):
+        return page, None
+
+    last = page[-1]
+    return page, encode_cursor(sort_key, False, getattr(last, sort_key), last.id)
+
+
+master_data_cache = MasterDataCache(ttl_seconds=settings.MASTER_DATA_CACHE_TTL_SECONDS)
+master_data_cache.register(
+    Customer, CustomerResponse, "customer_code",
+    search_fields=("customer_code", "customer_name", "customer_name_en"),
+)
+master_data_cache.register(
+    Product, ProductResponse, "product_code",
+    search_fields=("product_code", "product_name", "product_name_en", "hs_code"),
+)
@@ -1,10 +1,14 @@
 """
-スケジューラーサービス（バックアップ自動作成用）
+スケジューラーサービス（バックアップ自動作成・SQLiteの定期保守・案件のアーカイブ用）
 """
+import asyncio
 import logging
 from datetime import datetime, time
 from typing import Optional
 from sqlalchemy.orm import Session
+from ..core.database import engine, sqlite_maintenance
+from ..core.executors import run_blocking
+from ..services.archive_service import case_archiver
 from ..services.backup_service import create_backup
 
 logger = logging.getLogger(__name__)
@@ -110,9 +114,39 @@ def cleanup_old_scheduled_backups(db: Session, keep_days: int = 30) -> int:
     return deleted_count
 
 
+async def run_sqlite_maintenance_periodically(interval_seconds: int) -> None:
+    """
+    SQLiteの定期保守（PRAGMA optimize・WALのチェックポイント）を一定間隔で実行する
 
+    データベースファイルを扱う処理のため、バックアップと同じスレッドプールで順に実行する。
+    アプリ終了時にタスクをキャンセルして停止する。
 
+    Args:
+        interval_seconds: 実行間隔（秒）
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            result = await run_blocking("backups", sqlite_maintenance, engine)
+            logger.info(f"SQLiteの定期保守が完了しました: {result}")
+        except Exception as e:
+            logger.warning(f"SQLiteの定期保守に失敗しました（次回再実行）: {str(e)}")
 
 
+async def run_archival_periodically(interval_seconds: int) -> None:
+    """
+    案件・変更履歴のアーカイブを一定間隔で実行する
 
+    バッチごとにコミットするため、停止・失敗した場合も次回は残りから続けて処理する。
+    アプリ終了時にタスクをキャンセルして停止する。
 
+    Args:
+        interval_seconds: 実行間隔（秒）
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            result = await run_blocking("backups", case_archiver.run, engine)
+            logger.info(f"案件のアーカイブが完了しました: {result}")
+        except Exception as e:
+            logger.warning(f"案件のアーカイブに失敗しました（次回再実行）: {str(e)}")
@@ -0,0 +1,314 @@
+"""
+部分一致検索サービス
+
+案件・顧客・商品の一覧検索は `ilike('%kw%')` で複数列を走査しており、
+インデックスが使えず毎回シーケンシャルスキャンになっていた。
+検索対象の列を正規化して連結した `search_key` 列を持たせ、
+PostgreSQLでは pg_trgm の GINインデックス、SQLiteでは FTS5（trigram）の
+シャドウテーブルで部分一致検索をインデックスで解決する。
+
+正規化（normalize_search_text）:
+- NFKC正規化（全角英数記号→半角、半角カナ→全角カナ）
+- 英字の小文字化
+- カタカナ→ひらがな
+- 連続する空白を1つにまとめる
+
+PostgreSQLで日本語を trigram 化するには、データベースの LC_CTYPE が
+UTF-8 系ロケールである必要がある（C ロケールでは日本語のtrigramが作られない）。
+"""
+import logging
+import unicodedata
+import weakref
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, event, inspect, literal_column, or_, select, table, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models.case import Case
+from ..models.customer import Customer
+from ..models.product import Product
+
+logger = logging.getLogger(__name__)
+
+# カタカナ（ァ〜ヶ）→ ひらがな（ぁ〜ゖ）の変換表
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+# search_key を構成する列（モデルごと）
+SEARCH_SOURCES: Dict[type, Tuple[str, ...]] = {
+    Case: ("case_number",),
+    Customer: ("customer_code", "customer_name", "customer_name_en"),
+    Product: ("product_code", "product_name", "product_name_en"),
+}
+
+# FTS5 trigram はパターンが3文字以上の場合のみインデックスを使える
+FTS_MIN_LENGTH = 3
+
+# search_key 補完時の1バッチあたりの件数
+BACKFILL_BATCH_SIZE = 500
+
+# SQLiteでFTS5テーブルが利用できるか（エンジンごと）
+_fts_available: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """
+    検索用に文字列を正規化する
+
+    Args:
+        value: 正規化する文字列
+
+    Returns:
+        str: 正規化された文字列（Noneの場合は空文字）
+    """
+    if not value:
+        return ""
+
+    normalized = unicodedata.normalize("NFKC", value).lower()
+    normalized = normalized.translate(_KATAKANA_TO_HIRAGANA)
+    return " ".join(normalized.split())
+
+
+def build_search_key(instance, model=None) -> str:
+    """
+    モデルインスタンスの検索キーを生成する
+
+    列ごとの値は改行で区切る。検索語は正規化で改行を含まないため、
+    列の境界をまたいだ一致は起こらない。
+    model を指定した場合は instance にそのモデルの列を持つ行（Core の select の結果など）を渡せる。
+    """
+    fields = SEARCH_SOURCES[model or type(instance)]
+    parts = [normalize_search_text(getattr(instance, field, None)) for field in fields]
+    return "\n".join(part for part in parts if part)
+
+
+def _fts_table_name(model) -> str:
+    return f"{model.__tablename__}_search"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _is_fts_available(session: Session) -> bool:
+    """SQLiteのFTS5シャドウテーブルが存在するか"""
+    engine = session.get_bind()
+    if engine.dialect.name != "sqlite":
+        return False
+
+    engine = getattr(engine, "engine", engine)
+    available = _fts_available.get(engine)
+    if available is None:
+        row = session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": _fts_table_name(Customer)},
+        ).first()
+        available = row is not None
+        _fts_available[engine] = available
+    return available
+
+
+def search_condition(session: Session, model, keyword: str):
+    """
+    モデルの search_key に対する部分一致条件を生成する
+
+    Args:
+        session: データベースセッション
+        model: 検索対象のモデル（Case/Customer/Product）
+        keyword: 検索キーワード（未正規化）
+
+    Returns:
+        部分一致条件式（キーワードが空の場合はNone）
+    """
+    normalized = normalize_search_text(keyword)
+    if not normalized:
+        return None
+
+    if len(normalized) >= FTS_MIN_LENGTH and _is_fts_available(session):
+        fts_name = _fts_table_name(model)
+        phrase = '"' + normalized.replace('"', '""') + '"'
+        matched_ids = (
+            select(literal_column("rowid"))
+            .select_from(table(fts_name))
+            .where(literal_column(fts_name).op("MATCH")(phrase))
+        )
+        return model.id.in_(matched_ids)
+
+    # PostgreSQL: pg_trgm の GINインデックスが LIKE '%kw%' に利用される
+    return model.search_key.like(f"%{_escape_like(normalized)}%", escape="\\")
+
+
+def case_search_condition(session: Session, keyword: str, model=Case):
+    """
+    案件番号・顧客名・商品名に対する部分一致条件を生成する
+
+    顧客・商品は各テーブルの検索インデックスでIDを絞り込んでから
+    案件の外部キーで突き合わせるため、JOINは不要。
+
+    Args:
+        session: データベースセッション
+        keyword: 検索キーワード（未正規化）
+        model: 案件の読み取り元（アーカイブを含む別名の場合、案件番号は search_key のLIKEで判定する）
+    """
+    if model is Case:
+        case_condition = search_condition(session, Case, keyword)
+    else:
+        # アーカイブにはFTS5シャドウテーブルがないため、案件番号は search_key を直接走査する
+        normalized = normalize_search_text(keyword)
+        case_condition = model.search_key.like(f"%{_escape_like(normalized)}%", escape="\\") if normalized else None
+    if case_condition is None:
+        return None
+
+    customer_ids = select(Customer.id).where(search_condition(session, Customer, keyword))
+    product_ids = select(Product.id).where(search_condition(session, Product, keyword))
+    return or_(
+        case_condition,
+        model.customer_id.in_(customer_ids),
+        model.product_id.in_(product_ids),
+    )
+
+
+# search_key の自動更新
+def _update_search_key(mapper, connection, target):
+    target.search_key = build_search_key(target)
+
+
+for _model in SEARCH_SOURCES:
+    event.listen(_model, "before_insert", _update_search_key)
+    event.listen(_model, "before_update", _update_search_key)
+
+
+# SQLite: FTS5シャドウテーブル
+def _sqlite_fts_ddl(model) -> Tuple[str, ...]:
+    """FTS5シャドウテーブルと同期トリガーのDDL"""
+    base = model.__tablename__
+    fts = _fts_table_name(model)
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"search_key, content='{base}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {base} BEGIN "
+        f"INSERT INTO {fts}(rowid, search_key) VALUES (new.id, new.search_key); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {base} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, search_key) VALUES ('delete', old.id, old.search_key); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF search_key ON {base} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, search_key) VALUES ('delete', old.id, old.search_key); "
+        f"INSERT INTO {fts}(rowid, search_key) VALUES (new.id, new.search_key); END",
+    )
+
+
+def _create_sqlite_fts(connection, model, rebuild: bool) -> bool:
+    """FTS5シャドウテーブルを作成する（FTS5/trigramが使えない場合はFalse）"""
+    try:
+        for statement in _sqlite_fts_ddl(model):
+            connection.exec_driver_sql(statement)
+        if rebuild:
+            fts = _fts_table_name(model)
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        return True
+    except Exception as e:
+        logger.warning(f"FTS5検索インデックスを作成できません（LIKE検索で代替）: {str(e)}")
+        return False
+
+
+def _after_create(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+
+    model = next(m for m in SEARCH_SOURCES if m.__table__ is target)
+    # テーブルを作り直した場合、以前のシャドウテーブルの内容は無効
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {_fts_table_name(model)}")
+    available = _create_sqlite_fts(connection, model, rebuild=False)
+    _fts_available[connection.engine] = available
+
+
+def _before_drop(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+
+    model = next(m for m in SEARCH_SOURCES if m.__table__ is target)
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {_fts_table_name(model)}")
+    _fts_available.pop(connection.engine, None)
+
+
+for _model in SEARCH_SOURCES:
+    event.listen(_model.__table__, "after_create", _after_create)
+    event.listen(_model.__table__, "before_drop", _before_drop)
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """
+    検索インデックスを整備する（起動時に呼び出す、冪等）
+
+    - search_key 列がない既存DB（create_allで作成されたDB）に列を追加する
+    - search_key が未設定の行を埋める
+    - SQLite: FTS5シャドウテーブルと同期トリガーを作成する
+    - PostgreSQL: pg_trgm 拡張と GINインデックスを作成する
+    """
+    try:
+        inspector = inspect(engine)
+        with engine.begin() as connection:
+            for model in SEARCH_SOURCES:
+                base = model.__tablename__
+                if not inspector.has_table(base):
+                    continue
+                columns = {column["name"] for column in inspector.get_columns(base)}
+                if "search_key" not in columns:
+                    logger.info(f"{base}.search_key 列を追加します")
+                    connection.exec_driver_sql(f"ALTER TABLE {base} ADD COLUMN search_key TEXT")
+    except Exception as e:
+        logger.warning(f"search_key 列の追加に失敗しました: {str(e)}")
+        return
+
+    # ORMで更新すると updated_at の onupdate で全行の更新日時が起動時刻になるため、
+    # Core の UPDATE で search_key だけを設定する（updated_at は元の値のまま）
+    try:
+        for model in SEARCH_SOURCES:
+            base = model.__table__
+            fetch = (
+                select(base.c.id, *[base.c[field] for field in SEARCH_SOURCES[model]])
+                .where(base.c.id > bindparam("last_id"), base.c.search_key.is_(None))
+                .order_by(base.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            )
+            fill = (
+                update(base)
+                .where(base.c.id == bindparam("row_id"))
+                .values(search_key=bindparam("key"), updated_at=base.c.updated_at)
+            )
+            last_id = 0
+            while True:
+                with engine.begin() as connection:
+                    rows = connection.execute(fetch, {"last_id": last_id}).fetchall()
+                    if not rows:
+                        break
+                    connection.execute(
+                        fill, [{"row_id": row.id, "key": build_search_key(row, model)} for row in rows]
+                    )
+                last_id = rows[-1].id
+    except Exception as e:
+        logger.warning(f"search_key の補完に失敗しました: {str(e)}")
+        return
+
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            available = True
+            for model in SEARCH_SOURCES:
+                exists = connection.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                    (_fts_table_name(model),),
+                ).first()
+                available = _create_sqlite_fts(connection, model, rebuild=exists is None) and available
+            _fts_available[engine] = available
+
+    if engine.dialect.name == "postgresql":
+        try:
+            with engine.begin() as connection:
+                connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                for model in SEARCH_SOURCES:
+                    base = model.__tablename__
+                    connection.exec_driver_sql(
+                        f"CREATE INDEX IF NOT EXISTS ix_{base}_search_key_trgm "
+                        f"ON {base} USING gin (search_key gin_trgm_ops)"
+                    )
+        except Exception as e:
+            logger.warning(f"pg_trgm インデックスを作成できません: {str(e)}")
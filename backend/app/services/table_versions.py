@@ -0,0 +1,88 @@
+"""
+テーブルの書き込み検知とバージョン管理
+
+セッションの flush・一括UPDATE/DELETE で書き込まれたテーブルを記録し、
+コミットされた時点でテーブルごとのバージョンを進めて購読者に通知する。
+件数キャッシュの無効化やETagの計算に利用する。
+
+バージョンはプロセス内のみで管理されるため、複数ワーカー構成では
+他ワーカーの書き込みは反映されない（利用側でDBの値と組み合わせて使う）。
+"""
+import threading
+from typing import Callable, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TableVersions:
+    """テーブルごとの書き込みバージョン"""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._subscribers: List[Callable[..., None]] = []
+        self._lock = threading.Lock()
+
+    def get(self, table: str) -> int:
+        """テーブルの現在のバージョンを取得する（未書き込みの場合は0）"""
+        with self._lock:
+            return self._versions.get(table, 0)
+
+    def bump(self, *tables: str) -> None:
+        """テーブルのバージョンを進め、購読者に通知する"""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            callback(*tables)
+
+    def subscribe(self, callback: Callable[..., None]) -> None:
+        """書き込みのコミット時に呼び出す関数（引数はテーブル名）を登録する"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+
+table_versions = TableVersions()
+
+
+# 書き込みの検知
+# flush時に書き込まれたテーブルを記録し、コミット時にまとめて通知する
+_DIRTY_TABLES_KEY = "dirty_tables"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_tables(session, flush_context):
+    tables = session.info.setdefault(_DIRTY_TABLES_KEY, set())
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(instance, "__tablename__", None)
+        if table:
+            tables.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_written_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        name = getattr(table, "name", None)
+        if name:
+            orm_execute_state.session.info.setdefault(_DIRTY_TABLES_KEY, set()).add(name)
+
+
+# SAVEPOINT（begin_nested）の解放・ロールバックでも呼ばれるため、最上位のトランザクションのみ扱う
+# （SAVEPOINTの時点で通知すると、外側のコミット前の状態をキャッシュが読み込んでしまう）
+@event.listens_for(Session, "after_commit")
+def _bump_written_tables(session):
+    if session.get_nested_transaction() is not None:
+        return
+    tables = session.info.pop(_DIRTY_TABLES_KEY, None)
+    if tables:
+        table_versions.bump(*tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session):
+    if session.get_nested_transaction() is not None:
+        return
+    session.info.pop(_DIRTY_TABLES_KEY, None)
@@ -0,0 +1,44 @@
+"""
+案件・変更履歴のアーカイブを手動で実行するスクリプト
+
+完了・キャンセルのまま一定期間更新されていない案件と、その変更履歴をアーカイブテーブルへ移します。
+バッチごとにコミットするため、途中で中断しても再実行すれば残りから続けて処理します。
+
+使い方:
+    python scripts/archive_cases.py [--older-than-days 365] [--batch-size 500] [--max-batches N]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.services.archive_service import case_archiver  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="案件・変更履歴のアーカイブ")
+    parser.add_argument(
+        "--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS,
+        help="最終更新からの経過日数（完了・キャンセルの案件が対象）",
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="1バッチの案件数")
+    parser.add_argument("--max-batches", type=int, help="処理する最大バッチ数（省略時は対象がなくなるまで）")
+    args = parser.parse_args()
+
+    result = case_archiver.run(
+        engine,
+        older_than_days=args.older_than_days,
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+    )
+    print(f"案件: {result['cases']} 件  変更履歴: {result['change_history']} 件  バッチ: {result['batches']}")
+    if result["remaining"]:
+        print("対象の案件が残っています（再実行すると続きから処理します）")
+
+
+if __name__ == "__main__":
+    main()
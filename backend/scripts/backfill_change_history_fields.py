@@ -0,0 +1,41 @@
+"""
+変更履歴の項目別の行（change_history_fields）を補完するスクリプト
+
+項目別テーブルを追加する前の変更履歴について、changes_json を項目ごとの行に展開します。
+アーカイブ済みの変更履歴の分は change_history_fields_archive に補完します。
+アプリ起動時にも同じ補完を行いますが、変更履歴が多い場合は起動前にこのスクリプトで実行できます。
+バッチごとにコミットするため、途中で中断しても再実行すれば未補完の変更履歴から続けて処理します。
+
+使い方:
+    python scripts/backfill_change_history_fields.py [--batch-size 1000]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import Base, engine  # noqa: E402
+from app.models.archive import ChangeHistoryFieldArchive  # noqa: E402
+from app.models.change_history_field import ChangeHistoryField  # noqa: E402
+from app.services.change_history_fields import (  # noqa: E402
+    FIELD_BACKFILL_BATCH_SIZE,
+    backfill_change_history_fields,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="変更履歴の項目別の行の補完")
+    parser.add_argument("--batch-size", type=int, default=FIELD_BACKFILL_BATCH_SIZE, help="1バッチの変更履歴の件数")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[ChangeHistoryField.__table__, ChangeHistoryFieldArchive.__table__])
+    filled = backfill_change_history_fields(engine, args.batch_size)
+    print(f"変更履歴 {filled} 件の項目別の行を補完しました")
+    filled = backfill_change_history_fields(engine, args.batch_size, archived=True)
+    print(f"アーカイブ済みの変更履歴 {filled} 件の項目別の行を補完しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+ダッシュボードのサマリー集計（AnalyticsService.get_summary）のベンチマーク
+
+指標ごとに案件を集計していた従来の方式（案件の集計8文 + ステータス分布1文）と、
+案件全体の指標をステータス別の件数（GROUP BY）1文（1回の走査）で、今月・先月の指標を
+範囲検索のスカラーサブクエリ1文で求める現在の方式を比較します。
+期間を指定しない場合と、直近90日の期間を指定した場合のそれぞれを計測します。
+一時ファイルのSQLiteに案件を投入して計測するため、既存のデータベースには影響しません。
+
+使い方:
+    python scripts/benchmark_analytics_summary.py [--cases 1000000] [--repeat 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event, func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models import Case, Customer, Product  # noqa: E402
+from app.services.analytics import AnalyticsService  # noqa: E402
+
+STATUSES = ["見積中", "受注済", "船積済", "完了", "キャンセル"]
+SEED_CHUNK = 50000
+
+
+def seed(path: str, case_count: int) -> None:
+    """ベンチマーク用のデータを投入（作成日時は直近2年に分散）"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(insert(Customer), [{"customer_code": f"C{i:04d}", "customer_name": f"顧客{i}"} for i in range(1, 101)])
+        connection.execute(insert(Product), [{"product_code": f"P{i:04d}", "product_name": f"商品{i}"} for i in range(1, 101)])
+    for start in range(0, case_count, SEED_CHUNK):
+        rows = []
+        for i in range(start, min(start + SEED_CHUNK, case_count)):
+            created_at = now - timedelta(minutes=rng.randrange(2 * 365 * 24 * 60))
+            amount = rng.randrange(1, 1000) * 1000
+            rows.append({
+                "case_number": f"{created_at.year}-EX-{i:07d}",
+                "customer_id": i % 100 + 1,
+                "product_id": (i * 7) % 100 + 1,
+                "trade_type": "輸出",
+                "quantity": 10,
+                "unit": "pcs",
+                "sales_unit_price": amount // 10,
+                "purchase_unit_price": amount // 20,
+                "sales_amount": amount,
+                "gross_profit": amount // 2,
+                "gross_profit_rate": 50,
+                "status": STATUSES[rng.randrange(len(STATUSES))],
+                "pic": "担当者",
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        with engine.begin() as connection:
+            connection.execute(insert(Case), rows)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+
+async def legacy_summary(db: AsyncSession, start_date=None, end_date=None) -> dict:
+    """従来方式: 指標ごとに1文（案件の集計8文 + ステータス分布1文）"""
+    query_filter = []
+    if start_date:
+        query_filter.append(Case.created_at >= start_date)
+    if end_date:
+        query_filter.append(Case.created_at <= end_date)
+
+    async def count(*conditions) -> int:
+        return await db.scalar(select(func.count(Case.id)).where(*conditions)) or 0
+
+    async def revenue(*conditions) -> float:
+        return await db.scalar(select(func.coalesce(func.sum(Case.sales_amount), 0)).where(*conditions)) or 0
+
+    today = date.today()
+    first_day_of_month = date(today.year, today.month, 1)
+    last_month = date(today.year - 1, 12, 1) if today.month == 1 else date(today.year, today.month - 1, 1)
+    summary = {
+        "total_cases": await count(*query_filter),
+        "active_cases": await count(Case.status.in_(["見積中", "受注済", "船積済"]), *query_filter),
+        "completed_cases": await count(Case.status == "完了", *query_filter),
+        "total_customers": await db.scalar(select(func.count(Customer.id))) or 0,
+        "total_products": await db.scalar(select(func.count(Product.id))) or 0,
+        "this_month_cases": await count(Case.created_at >= first_day_of_month),
+        "this_month_revenue": float(await revenue(Case.created_at >= first_day_of_month)),
+        "last_month_revenue": float(await revenue(Case.created_at >= last_month, Case.created_at < first_day_of_month)),
+    }
+    rows = (await db.execute(
+        select(Case.status, func.count(Case.id)).where(*query_filter).group_by(Case.status)
+    )).all()
+    return {"summary": summary, "status_counts": dict(rows)}
+
+
+async def current_summary(db: AsyncSession, start_date=None, end_date=None) -> dict:
+    """現在の方式: AnalyticsService.get_summary"""
+    result = await AnalyticsService(db).get_summary(start_date, end_date)
+    return {
+        "summary": result["summary"].model_dump(),
+        "status_counts": {item.status: item.count for item in result["status_distribution"]},
+    }
+
+
+async def measure(label: str, func, engine, repeat: int, **period) -> dict:
+    """1回あたりの平均処理時間（ミリ秒）と実行した文の数を計測"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with AsyncSession(engine) as db:
+        result = await func(db, **period)  # ウォームアップ
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                await func(db, **period)
+            elapsed = (time.perf_counter() - started) * 1000 / repeat
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    print(f"{label:<36} {elapsed:10.1f} ms / 回   {len(statements) // repeat} 文")
+    return result
+
+
+def assert_same(legacy: dict, current: dict) -> None:
+    """両方式の結果が一致することを確認"""
+    assert legacy["status_counts"] == current["status_counts"], "ステータス分布が一致しません"
+    for key, value in legacy["summary"].items():
+        assert abs(current["summary"][key] - value) < 0.01, f"{key} が一致しません"
+
+
+async def run(path: str, repeat: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    now = datetime.now(timezone.utc)
+    period = {"start_date": now - timedelta(days=90), "end_date": now}
+    try:
+        assert_same(
+            await measure("従来（指標ごとに1文）", legacy_summary, engine, repeat),
+            await measure("現在（ステータス別1文）", current_summary, engine, repeat),
+        )
+        assert_same(
+            await measure("従来・直近90日", legacy_summary, engine, repeat, **period),
+            await measure("現在・直近90日", current_summary, engine, repeat, **period),
+        )
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="サマリー集計のベンチマーク")
+    parser.add_argument("--cases", type=int, default=1_000_000, help="投入する案件数")
+    parser.add_argument("--repeat", type=int, default=10, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.db")
+        started = time.perf_counter()
+        seed(path, args.cases)
+        print(f"案件 {args.cases:,} 件を投入しました（{time.perf_counter() - started:.1f} 秒）")
+        asyncio.run(run(path, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
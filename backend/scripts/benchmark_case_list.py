@@ -0,0 +1,148 @@
+"""
+案件一覧のシリアライズ方式ベンチマーク
+
+ORMエンティティを組み立てて CaseListItem を検証する従来の方式と、
+列の射影で取得した行を検証なしでシリアライズする方式を比較します。
+インメモリのSQLiteに案件を投入して計測するため、既存のデータベースには影響しません。
+
+使い方:
+    python scripts/benchmark_case_list.py [--cases 5000] [--page-size 100] [--repeat 200]
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import joinedload, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import Case, Customer, Product
+from app.schemas.case import CaseListItem, CaseListResponse
+from app.api.endpoints.cases import CASE_LIST_COLUMNS
+
+
+def seed(db, case_count: int):
+    """ベンチマーク用のデータを投入"""
+    db.execute(insert(Customer), [{"customer_code": f"C{i:04d}", "customer_name": f"顧客{i}"} for i in range(1, 101)])
+    db.execute(insert(Product), [{"product_code": f"P{i:04d}", "product_name": f"商品{i}"} for i in range(1, 101)])
+    db.execute(
+        insert(Case),
+        [
+            {
+                "case_number": f"2025-EX-{i:05d}",
+                "customer_id": i % 100 + 1,
+                "product_id": (i * 7) % 100 + 1,
+                "trade_type": "輸出",
+                "quantity": 10,
+                "unit": "pcs",
+                "sales_unit_price": 1000,
+                "purchase_unit_price": 800,
+                "sales_amount": 10000,
+                "gross_profit": 2000,
+                "gross_profit_rate": 20,
+                "shipment_date": date(2025, 1, 1) + timedelta(days=i % 365),
+                "status": "受注済",
+                "pic": "担当者",
+            }
+            for i in range(case_count)
+        ],
+    )
+    db.commit()
+
+
+def orm_page(db, page_size: int) -> bytes:
+    """従来方式: エンティティを組み立て、CaseListItem を検証してからシリアライズ"""
+    cases = (
+        db.query(Case)
+        .options(joinedload(Case.customer), joinedload(Case.product))
+        .order_by(Case.created_at.desc(), Case.id.desc())
+        .limit(page_size)
+        .all()
+    )
+    items = [
+        CaseListItem(
+            id=case.id,
+            case_number=case.case_number,
+            trade_type=case.trade_type,
+            customer_id=case.customer_id,
+            customer_name=case.customer.customer_name if case.customer else None,
+            product_id=case.product_id,
+            product_name=case.product.product_name if case.product else None,
+            quantity=case.quantity,
+            unit=case.unit,
+            sales_amount=case.sales_amount,
+            gross_profit=case.gross_profit,
+            gross_profit_rate=case.gross_profit_rate,
+            status=case.status,
+            pic=case.pic,
+            shipment_date=case.shipment_date,
+            created_at=case.created_at,
+            updated_at=case.updated_at,
+        )
+        for case in cases
+    ]
+    response = CaseListResponse(items=items, total=None, page=1, page_size=page_size, total_pages=None)
+    # FastAPI の response_model による再検証に相当
+    response = CaseListResponse.model_validate(response.model_dump())
+    return response.model_dump_json().encode("utf-8")
+
+
+def projection_page(db, page_size: int) -> bytes:
+    """射影方式: 列を行として取得し、検証なしでシリアライズ"""
+    rows = (
+        db.query(Case)
+        .with_entities(*CASE_LIST_COLUMNS)
+        .outerjoin(Customer, Case.customer_id == Customer.id)
+        .outerjoin(Product, Case.product_id == Product.id)
+        .order_by(Case.created_at.desc(), Case.id.desc())
+        .limit(page_size)
+        .all()
+    )
+    items = [CaseListItem.model_construct(**row._mapping) for row in rows]
+    response = CaseListResponse.model_construct(items=items, total=None, page=1, page_size=page_size, total_pages=None, next_cursor=None)
+    return response.model_dump_json().encode("utf-8")
+
+
+def measure(label: str, func, db, page_size: int, repeat: int) -> float:
+    """1ページあたりの平均処理時間（ミリ秒）を計測"""
+    func(db, page_size)  # ウォームアップ
+    db.expunge_all()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(db, page_size)
+        db.expunge_all()
+    elapsed = (time.perf_counter() - started) * 1000 / repeat
+    print(f"{label:<12} {elapsed:8.2f} ms/page")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="案件一覧のシリアライズ方式ベンチマーク")
+    parser.add_argument("--cases", type=int, default=5000, help="投入する案件数")
+    parser.add_argument("--page-size", type=int, default=100, help="1ページあたりの件数")
+    parser.add_argument("--repeat", type=int, default=200, help="計測回数")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        seed(db, args.cases)
+        assert orm_page(db, args.page_size) == projection_page(db, args.page_size), "出力が一致しません"
+
+        print(f"案件数: {args.cases}, ページサイズ: {args.page_size}, 計測回数: {args.repeat}")
+        orm_ms = measure("ORM", orm_page, db, args.page_size, args.repeat)
+        projection_ms = measure("射影", projection_page, db, args.page_size, args.repeat)
+        print(f"高速化: {orm_ms / projection_ms:.1f}倍")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
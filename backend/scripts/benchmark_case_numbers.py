@@ -0,0 +1,190 @@
+"""
+案件番号の採番の同時実行ベンチマーク
+
+複数のプロセス（ワーカープロセスを想定）と各プロセス内の複数のスレッドが同時に
+「案件番号を採番して案件を登録する」処理を繰り返し、次の方式を比較します。
+
+- 従来方式: 案件の登録と同じトランザクションで case_numbers の行を読み取り・更新する
+- 採番サービス: UPDATE ... RETURNING の短いトランザクションで採番する（CASE_NUMBER_BLOCK_SIZE ごと）
+
+登録された案件番号に重複がないこと、欠番が予約済みで未使用のまま残った連番
+（プロセス数 × (ブロックサイズ - 1) 件以内）だけであることを確認します。
+--database-url を省略すると一時ファイルのSQLiteを使うため、既存のデータベースには影響しません。
+--database-url にはベンチマーク専用のデータベースを指定してください（テーブルを作り直します）。
+
+使い方:
+    python scripts/benchmark_case_numbers.py [--processes 4] [--threads 4] [--cases 200] [--block-sizes 1,20]
+        [--database-url postgresql://...]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.exc import DBAPIError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base, configure_sqlite  # noqa: E402
+from app.models import Case, CaseNumber, Customer, Product  # noqa: E402
+from app.services.case_number_allocator import case_number_allocator  # noqa: E402
+
+YEAR = 2025
+TRADE_TYPE = "輸出"
+WIDTH = 6
+
+
+def make_engine(database_url: str, threads: int):
+    """ベンチマーク用のエンジンを作成"""
+    if database_url.startswith("sqlite"):
+        engine = create_engine(database_url, connect_args={"check_same_thread": False}, pool_size=threads + 1)
+        configure_sqlite(engine)
+        return engine
+    return create_engine(database_url, pool_size=threads + 1)
+
+
+def case_values(case_number: str) -> dict:
+    """登録する案件の値"""
+    return {
+        "case_number": case_number,
+        "trade_type": TRADE_TYPE,
+        "customer_id": 1,
+        "product_id": 1,
+        "quantity": 1,
+        "unit": "pcs",
+        "sales_unit_price": 1000,
+        "purchase_unit_price": 800,
+        "status": "見積中",
+        "pic": "担当者",
+    }
+
+
+def create_legacy(db):
+    """従来方式: 登録と同じトランザクションで行を読み取って更新する"""
+    record = db.query(CaseNumber).filter(
+        CaseNumber.year == YEAR, CaseNumber.trade_type == TRADE_TYPE
+    ).with_for_update().first()
+    if record:
+        record.last_sequence += 1
+        sequence = record.last_sequence
+    else:
+        sequence = 1
+        db.add(CaseNumber(year=YEAR, trade_type=TRADE_TYPE, trade_type_code="EX", last_sequence=1))
+    db.flush()
+    db.execute(insert(Case).values(**case_values(CaseNumber.generate_case_number(YEAR, TRADE_TYPE, sequence, WIDTH))))
+    db.commit()
+
+
+def create_with_allocator(db):
+    """採番サービス: 短いトランザクションで採番してから登録する"""
+    case_number = case_number_allocator.allocate(db, TRADE_TYPE, year=YEAR)[0]
+    db.execute(insert(Case).values(**case_values(case_number)))
+    db.commit()
+
+
+def worker_process(database_url: str, mode: str, block_size: int, threads: int, cases: int, results):
+    """1つのワーカープロセス: 複数のスレッドで案件を登録する"""
+    settings.CASE_NUMBER_BLOCK_SIZE = block_size
+    settings.CASE_NUMBER_SEQUENCE_WIDTH = WIDTH
+    engine = make_engine(database_url, threads)
+    Session = sessionmaker(bind=engine)
+    create = create_legacy if mode == "legacy" else create_with_allocator
+    created = Counter()
+    lock = threading.Lock()
+
+    def run_thread():
+        db = Session()
+        try:
+            for _ in range(cases):
+                try:
+                    create(db)
+                    outcome = "ok"
+                except DBAPIError:
+                    db.rollback()
+                    outcome = "errors"
+                with lock:
+                    created[outcome] += 1
+        finally:
+            db.close()
+
+    workers = [threading.Thread(target=run_thread) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    engine.dispose()
+    results.put((created["ok"], created["errors"]))
+
+
+def run(database_url: str, label: str, mode: str, block_size: int, processes: int, threads: int, cases: int):
+    """1つの方式で負荷をかけ、重複・欠番を確認する"""
+    engine = make_engine(database_url, 1)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Customer).values(customer_code="C0001", customer_name="顧客1"))
+        connection.execute(insert(Product).values(product_code="P0001", product_name="商品1"))
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    children = [
+        context.Process(target=worker_process, args=(database_url, mode, block_size, threads, cases, results))
+        for _ in range(processes)
+    ]
+    started = time.perf_counter()
+    for child in children:
+        child.start()
+    outcomes = [results.get() for _ in children]
+    for child in children:
+        child.join()
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as connection:
+        numbers = connection.execute(select(Case.case_number)).scalars().all()
+        last_sequence = connection.execute(select(CaseNumber.last_sequence)).scalar() or 0
+    engine.dispose()
+
+    duplicates = sum(count - 1 for count in Counter(numbers).values() if count > 1)
+    used = {int(number.rsplit("-", 1)[1]) for number in numbers}
+    gaps = last_sequence - len(used)
+    allowed_gaps = processes * (block_size - 1) if mode != "legacy" else 0
+    ok = sum(created for created, _ in outcomes)
+    errors = sum(failed for _, failed in outcomes)
+
+    print(f"[{label}]")
+    print(f"  登録: {ok} 件（{ok / elapsed:8.1f} 件/s）  エラー: {errors} 件")
+    print(f"  重複: {duplicates} 件  欠番: {gaps} 件（許容: {allowed_gaps} 件以内）  最後の連番: {last_sequence}")
+    if duplicates or gaps > allowed_gaps:
+        print("  NG: 重複または予約分を超える欠番があります")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="案件番号の採番の同時実行ベンチマーク")
+    parser.add_argument("--processes", type=int, default=4, help="ワーカープロセス数")
+    parser.add_argument("--threads", type=int, default=4, help="プロセスあたりのスレッド数")
+    parser.add_argument("--cases", type=int, default=200, help="スレッドあたりの登録件数")
+    parser.add_argument("--block-sizes", default="1,20", help="採番サービスのブロックサイズ（カンマ区切り）")
+    parser.add_argument("--database-url", help="データベースURL（省略時は一時ファイルのSQLite）")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='trade_dx_numbers_'), 'bench.db')}"
+    print(f"プロセス数: {args.processes}, スレッド数: {args.threads}, スレッドあたりの登録件数: {args.cases}")
+    run(database_url, "従来方式（登録と同じトランザクション）", "legacy", 1, args.processes, args.threads, args.cases)
+    for block_size in (int(value) for value in args.block_sizes.split(",")):
+        run(
+            database_url, f"採番サービス（ブロックサイズ {block_size}）", "allocator", block_size,
+            args.processes, args.threads, args.cases,
+        )
+
+
+if __name__ == "__main__":
+    main()
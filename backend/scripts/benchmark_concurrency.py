@@ -0,0 +1,161 @@
+"""
+同時アクセス時のレイテンシベンチマーク
+
+複数のクライアントが一覧・詳細・集計APIを同時に呼び出したときのレイテンシと、
+その間に /health を定期的に呼び出したときの応答時間（イベントループの詰まり具合）を計測します。
+一時ファイルのSQLiteにデータを投入し、アプリをプロセス内（ASGI）で呼び出すため、
+既存のデータベースには影響しません。
+
+使い方:
+    python scripts/benchmark_concurrency.py [--cases 5000] [--clients 20] [--requests 25]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# アプリの設定を読み込む前に一時データベースを指定する
+_workdir = tempfile.mkdtemp(prefix="trade_dx_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/bench.db"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Case, ChangeHistory, Customer, Product, User  # noqa: E402
+
+USERNAME = "bench"
+PASSWORD = "benchpassword"
+
+
+def seed(case_count: int):
+    """ベンチマーク用のデータを投入"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add(User(username=USERNAME, email="bench@example.com", hashed_password=get_password_hash(PASSWORD)))
+        db.execute(insert(Customer), [{"customer_code": f"C{i:04d}", "customer_name": f"顧客{i}"} for i in range(1, 101)])
+        db.execute(insert(Product), [{"product_code": f"P{i:04d}", "product_name": f"商品{i}"} for i in range(1, 101)])
+        db.execute(
+            insert(Case),
+            [
+                {
+                    "case_number": f"2025-EX-{i:05d}",
+                    "customer_id": i % 100 + 1,
+                    "product_id": (i * 7) % 100 + 1,
+                    "trade_type": "輸出",
+                    "quantity": 10,
+                    "unit": "pcs",
+                    "sales_unit_price": 1000,
+                    "purchase_unit_price": 800,
+                    "sales_amount": 10000,
+                    "gross_profit": 2000,
+                    "gross_profit_rate": 20,
+                    "shipment_date": date(2025, 1, 1) + timedelta(days=i % 365),
+                    "status": ("見積中", "受注済", "完了")[i % 3],
+                    "pic": "担当者",
+                }
+                for i in range(case_count)
+            ],
+        )
+        db.execute(
+            insert(ChangeHistory),
+            [
+                {"case_id": i + 1, "changed_by": 1, "change_type": "UPDATE", "field_name": "status"}
+                for i in range(case_count)
+            ],
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def percentile(values, ratio: float) -> float:
+    """パーセンタイル値（ミリ秒）"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label: str, values):
+    print(
+        f"{label:<10} n={len(values):5d}  p50={percentile(values, 0.5):8.2f} ms"
+        f"  p95={percentile(values, 0.95):8.2f} ms  p99={percentile(values, 0.99):8.2f} ms"
+        f"  mean={statistics.mean(values):8.2f} ms"
+    )
+
+
+async def run(clients: int, requests_per_client: int, case_count: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/auth/login", data={"username": USERNAME, "password": PASSWORD})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        paths = [
+            "/api/cases?page_size=50&total=none",
+            "/api/cases?status=受注済&sort_by=shipment_date",
+            "/api/cases/stats/summary",
+            "/api/customers/?limit=100",
+            "/api/change-history?page_size=50",
+            "/api/analytics/summary",
+        ]
+        api_latencies = []
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def worker(worker_id: int):
+            for i in range(requests_per_client):
+                path = paths[(worker_id + i) % len(paths)]
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                api_latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        # ウォームアップ
+        for path in paths:
+            (await client.get(path, headers=headers)).raise_for_status()
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    print(f"案件数: {case_count}, 同時クライアント数: {clients}, 1クライアントあたりのリクエスト数: {requests_per_client}")
+    print(f"スループット: {len(api_latencies) / elapsed:.1f} req/s")
+    report("API", api_latencies)
+    report("/health", probe_latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同時アクセス時のレイテンシベンチマーク")
+    parser.add_argument("--cases", type=int, default=5000, help="投入する案件数")
+    parser.add_argument("--clients", type=int, default=20, help="同時クライアント数")
+    parser.add_argument("--requests", type=int, default=25, help="1クライアントあたりのリクエスト数")
+    args = parser.parse_args()
+
+    seed(args.cases)
+    asyncio.run(run(args.clients, args.requests, args.cases))
+
+
+if __name__ == "__main__":
+    main()
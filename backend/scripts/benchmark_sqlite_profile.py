@@ -0,0 +1,150 @@
+"""
+SQLiteのPRAGMA設定ごとの読み書き混在スループットのベンチマーク
+
+複数のスレッドが案件一覧の読み取りと案件の更新を混在して実行し、
+PRAGMAなし（ロールバックジャーナル）と Settings の SQLITE_* による設定（WALなど）で
+スループット・レイテンシ・"database is locked" エラーの件数を比較します。
+一時ファイルのSQLiteを使うため、既存のデータベースには影響しません。
+
+使い方:
+    python scripts/benchmark_sqlite_profile.py [--cases 5000] [--threads 8] [--seconds 10] [--write-ratio 0.2]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, configure_sqlite, sqlite_pragmas
+from app.models import Case, Customer, Product
+
+
+def seed(engine, case_count: int):
+    """ベンチマーク用のデータを投入"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [{"customer_code": f"C{i:04d}", "customer_name": f"顧客{i}"} for i in range(1, 101)])
+        conn.execute(insert(Product), [{"product_code": f"P{i:04d}", "product_name": f"商品{i}"} for i in range(1, 101)])
+        conn.execute(
+            insert(Case),
+            [
+                {
+                    "case_number": f"2025-EX-{i:05d}",
+                    "customer_id": i % 100 + 1,
+                    "product_id": (i * 7) % 100 + 1,
+                    "trade_type": "輸出",
+                    "quantity": 10,
+                    "unit": "pcs",
+                    "sales_unit_price": 1000,
+                    "purchase_unit_price": 800,
+                    "sales_amount": 10000,
+                    "shipment_date": date(2025, 1, 1) + timedelta(days=i % 365),
+                    "status": ("見積中", "受注済", "完了")[i % 3],
+                    "pic": "担当者",
+                }
+                for i in range(case_count)
+            ],
+        )
+
+
+def percentile(values, ratio: float) -> float:
+    """パーセンタイル値（ミリ秒）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(ratio * (len(ordered) - 1))))]
+
+
+def run(label: str, pragmas, case_count: int, threads: int, seconds: float, write_ratio: float):
+    """1つのPRAGMA設定で読み書き混在の負荷をかける"""
+    workdir = tempfile.mkdtemp(prefix="trade_dx_sqlite_bench_")
+    engine = create_engine(
+        f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        connect_args={"check_same_thread": False},
+        pool_size=threads,
+    )
+    configure_sqlite(engine, pragmas)
+    seed(engine, case_count)
+    Session = sessionmaker(bind=engine)
+
+    reads, writes, errors = [], [], []
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed_value: int):
+        rng = random.Random(seed_value)
+        db = Session()
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    if rng.random() < write_ratio:
+                        case_id = rng.randint(1, case_count)
+                        db.execute(
+                            update(Case)
+                            .where(Case.id == case_id)
+                            .values(quantity=Case.quantity + 1, status=rng.choice(("見積中", "受注済", "完了")))
+                        )
+                        db.commit()
+                        writes.append((time.perf_counter() - started) * 1000)
+                    else:
+                        db.execute(
+                            select(Case.id, Case.case_number, Customer.customer_name)
+                            .outerjoin(Customer, Case.customer_id == Customer.id)
+                            .where(Case.status == rng.choice(("見積中", "受注済", "完了")))
+                            .order_by(Case.created_at.desc(), Case.id.desc())
+                            .limit(50)
+                        ).all()
+                        db.commit()
+                        reads.append((time.perf_counter() - started) * 1000)
+                except OperationalError as e:
+                    db.rollback()
+                    errors.append(str(e.orig))
+        finally:
+            db.close()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    locked = sum(1 for error in errors if "locked" in error)
+    print(f"[{label}]")
+    print(f"  スループット: {(len(reads) + len(writes)) / elapsed:8.1f} ops/s（読み取り {len(reads)} / 書き込み {len(writes)}）")
+    if reads:
+        print(f"  読み取り: p50={percentile(reads, 0.5):7.2f} ms  p99={percentile(reads, 0.99):7.2f} ms  mean={statistics.mean(reads):7.2f} ms")
+    if writes:
+        print(f"  書き込み: p50={percentile(writes, 0.5):7.2f} ms  p99={percentile(writes, 0.99):7.2f} ms  mean={statistics.mean(writes):7.2f} ms")
+    print(f"  エラー: {len(errors)} 件（database is locked: {locked} 件）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLiteのPRAGMA設定ごとの読み書き混在スループットのベンチマーク")
+    parser.add_argument("--cases", type=int, default=5000, help="投入する案件数")
+    parser.add_argument("--threads", type=int, default=8, help="同時実行スレッド数")
+    parser.add_argument("--seconds", type=float, default=10.0, help="計測時間（秒）")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="書き込みの割合")
+    args = parser.parse_args()
+
+    print(f"案件数: {args.cases}, スレッド数: {args.threads}, 計測時間: {args.seconds}秒, 書き込み割合: {args.write_ratio}")
+    run("PRAGMAなし（ロールバックジャーナル）", ["PRAGMA journal_mode=DELETE"], args.cases, args.threads, args.seconds, args.write_ratio)
+    run("SQLITE_* の設定", sqlite_pragmas(), args.cases, args.threads, args.seconds, args.write_ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+案件状態のチェックポイントをまとめて作成するスクリプト
+
+変更履歴の多い既存の案件について、ある日時の状態の復元（GET /api/cases/{id}/as-of）が
+最初の1回から CASE_CHECKPOINT_INTERVAL 件未満の変更履歴の読み取りで済むように、
+現在までの変更履歴を反映してチェックポイントを作成します。
+作成済みのチェックポイント以降だけを反映するため、途中で中断しても再実行できます。
+
+使い方:
+    python scripts/build_case_checkpoints.py [--batch-size 500] [--include-archived]
+"""
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import distinct, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.services.archive_service import change_history_source  # noqa: E402
+from app.services.case_state_service import reconstruct_case_state  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="案件状態のチェックポイントの作成")
+    parser.add_argument("--batch-size", type=int, default=500, help="1バッチの案件数")
+    parser.add_argument("--include-archived", action="store_true", help="アーカイブ済みの案件も対象にする")
+    args = parser.parse_args()
+
+    source = change_history_source(args.include_archived)
+    now = datetime.now(timezone.utc)
+    last_id = 0
+    processed = 0
+    while True:
+        with Session(bind=engine) as session:
+            case_ids = session.scalars(
+                select(distinct(source.case_id))
+                .where(source.case_id > last_id)
+                .order_by(source.case_id)
+                .limit(args.batch_size)
+            ).all()
+            if not case_ids:
+                break
+            for case_id in case_ids:
+                reconstruct_case_state(
+                    session, case_id, now, include_archived=args.include_archived, save_checkpoints=True
+                )
+
+        processed += len(case_ids)
+        last_id = case_ids[-1]
+        print(f"{processed} 件の案件を処理しました（間隔: {settings.CASE_CHECKPOINT_INTERVAL} 件）")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 既存の履歴レコードには `_case_number_snapshot` が存在しないため、
 案件番号が後から変わった場合に表示が上書きされてしまう。
 このスクリプトを実行すると、可能な限り過去の履歴にもスナップショットを補完する。
+（同じ案件の前後の履歴からも補うため、起動時の補完で埋まらなかった case_number_snapshot 列も埋める）
 """
 
 from __future__ import annotations
@@ -68,6 +69,8 @@ def main() -> None:
                 snapshot_value = current_case_number[case_id]
 
             if snapshot_value:
+                if not history.case_number_snapshot:
+                    history.case_number_snapshot = snapshot_value[:50]
                 if history.changes_json is None or not isinstance(history.changes_json, dict):
                     history.changes_json = {}
                 if not history.changes_json.get("_case_number_snapshot"):
@@ -3,23 +3,32 @@ pytest設定とフィクスチャ
 """
 import pytest
 import os
+import tempfile
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 from fastapi.testclient import TestClient
 
-from app.core.database import Base
+from app.core.database import Base, configure_sqlite
 from app.main import app
 from app.models.user import User
 from app.core.security import get_password_hash
+from app.services.count_cache import count_cache
+from app.services.master_data_cache import master_data_cache
+from app.services.identity_cache import identity_cache
 
 # get_dbを明示的にインポート（オーバーライド用）
 # 注意: auth.pyなどではcore.deps.get_dbを使用しているため、こちらをオーバーライドする必要がある
 from app.core.deps import get_db as original_get_db
+from app.core.deps import get_async_db as original_get_async_db
 
 
 # テスト用データベースURL
-TEST_DATABASE_URL = "sqlite:///:memory:"
+# 読み取りAPIは非同期エンジン（別接続）を使うため、インメモリではなく一時ファイルを共有する
+TEST_DATABASE_PATH = os.path.join(tempfile.mkdtemp(prefix="trade_dx_test_"), "test.db")
+TEST_DATABASE_URL = f"sqlite:///{TEST_DATABASE_PATH}"
+TEST_ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}"
 
 # テスト用エンジン
 test_engine = create_engine(
@@ -31,6 +40,14 @@ test_engine = create_engine(
 # テスト用セッションファクトリ
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# テスト用非同期エンジン（TestClientはリクエストごとにイベントループが異なりうるため接続をプールしない）
+test_async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(test_async_engine, autoflush=False, expire_on_commit=False)
+
+# 本番と同じSQLiteのPRAGMA（WAL・busy_timeout など）を設定する
+configure_sqlite(test_engine)
+configure_sqlite(test_async_engine.sync_engine)
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -41,6 +58,11 @@ def db_session():
     # テーブルを作成
     Base.metadata.create_all(bind=test_engine)
 
+    # プロセス内キャッシュを初期化（前のテストのDB状態を持ち越さない）
+    count_cache.clear()
+    master_data_cache.clear()
+    identity_cache.clear()
+
     # セッションを作成
     session = TestingSessionLocal()
 
@@ -63,9 +85,15 @@ def client(db_session):
         yield db_session
         # セッションは閉じない（テスト終了時に閉じる）
 
+    # 非同期セッションは同じデータベースファイルに接続する
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     # 依存性をオーバーライド
     # get_db関数オブジェクト自体をキーとして使用
     app.dependency_overrides[original_get_db] = override_get_db
+    app.dependency_overrides[original_get_async_db] = override_get_async_db
 
     try:
         with TestClient(app) as test_client:
@@ -4,9 +4,11 @@
 import pytest
 from fastapi import status
 from datetime import datetime, timedelta
+from sqlalchemy import event
 from app.models.customer import Customer
 from app.models.product import Product
 from app.models.case import Case
+from tests.conftest import test_async_engine
 
 
 @pytest.mark.unit
@@ -93,6 +95,47 @@ class TestAnalytics:
         assert "summary" in data
         assert "total_cases" in data["summary"]
 
+    def test_get_analytics_summary_single_pass(self, client, auth_headers, db_session, test_data):
+        """案件の指標とステータス分布を2文で集計し、期間指定は今月・先月の指標に影響しない"""
+        last_month = datetime.now() - timedelta(days=40)
+        last_month_case = test_data["cases"][0]
+        last_month_case.created_at = last_month
+        db_session.commit()
+
+        engine = test_async_engine.sync_engine
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "FROM cases" in statement:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.get("/api/analytics/summary", headers=auth_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        assert len(statements) == 2
+
+        cases = db_session.query(Case).all()
+        summary = response.json()["summary"]
+        assert summary["total_cases"] == len(cases)
+        assert summary["completed_cases"] == sum(1 for case in cases if case.status == "完了")
+        assert summary["this_month_cases"] == len(cases) - 1
+        distribution = {item["status"]: item["count"] for item in response.json()["status_distribution"]}
+        assert sum(distribution.values()) == len(cases)
+
+        # 期間外の案件は総数・分布から除くが、今月の指標は全案件が対象
+        response = client.get(
+            "/api/analytics/summary",
+            params={"start_date": (last_month - timedelta(days=1)).isoformat(), "end_date": (last_month + timedelta(days=1)).isoformat()},
+            headers=auth_headers,
+        )
+        data = response.json()
+        assert data["summary"]["total_cases"] == 1
+        assert data["summary"]["active_cases"] == 1
+        assert data["summary"]["this_month_cases"] == len(cases) - 1
+        assert [(item["status"], item["count"]) for item in data["status_distribution"]] == [("見積中", 1)]
+
     def test_get_analytics_trends(self, client, auth_headers, test_data):
         """月次トレンド取得のテスト"""
         response = client.get(
@@ -0,0 +1,152 @@
+"""
+案件・変更履歴のアーカイブのテスト
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from app.models.archive import CaseArchive, ChangeHistoryArchive, ChangeHistoryFieldArchive
+from app.models.case import Case
+from app.models.change_history import ChangeHistory
+from app.models.change_history_field import ChangeHistoryField
+from app.models.customer import Customer
+from app.models.document import Document
+from app.models.product import Product
+from app.services.archive_service import case_archiver
+from app.services.change_history_fields import backfill_change_history_fields
+from app.services.change_history_service import build_change_history, insert_change_histories
+
+
+@pytest.mark.unit
+class TestArchive:
+    """アーカイブジョブと include_archived のテスト"""
+
+    @pytest.fixture
+    def test_cases(self, db_session, test_user):
+        """ステータス・最終更新日時の異なる案件と変更履歴を作成"""
+        customer = Customer(customer_code="C_ARC", customer_name="アーカイブ顧客")
+        product = Product(product_code="P_ARC", product_name="アーカイブ商品")
+        db_session.add_all([customer, product])
+        db_session.commit()
+
+        old = datetime.now(timezone.utc) - timedelta(days=400)
+        recent = datetime.now(timezone.utc) - timedelta(days=10)
+        cases = []
+        for i, (case_status, updated_at) in enumerate([
+            ("完了", old), ("キャンセル", old), ("完了", old), ("完了", recent), ("受注済", old),
+        ]):
+            case = Case(
+                case_number=f"2024-ARC-{i:03d}",
+                customer_id=customer.id,
+                product_id=product.id,
+                trade_type="輸出",
+                quantity=10,
+                unit="pcs",
+                sales_unit_price=1000,
+                purchase_unit_price=800,
+                status=case_status,
+                pic="テスト担当",
+                created_at=updated_at,
+                updated_at=updated_at,
+            )
+            case.calculate_amounts()
+            db_session.add(case)
+            cases.append(case)
+        db_session.commit()
+
+        for case in cases:
+            db_session.add(ChangeHistory(
+                case_id=case.id,
+                changed_by=test_user.id,
+                change_type="CREATE",
+                case_number_snapshot=case.case_number,
+            ))
+        # 生成済みドキュメントがある案件はアーカイブしない
+        db_session.add(Document(
+            case_id=cases[2].id, document_type="invoice", file_name="invoice.xlsx", generated_by=test_user.id,
+        ))
+        db_session.commit()
+        return cases
+
+    def test_archive_moves_closed_cases_in_batches(self, db_session, test_cases):
+        """完了・キャンセルから一定期間が過ぎた案件と変更履歴をバッチごとに移し、再実行で続きから処理する"""
+        engine = db_session.get_bind()
+        expected = [test_cases[0].id, test_cases[1].id]
+
+        first = case_archiver.run(engine, older_than_days=365, batch_size=1, max_batches=1)
+        assert first == {"cases": 1, "change_history": 1, "batches": 1, "remaining": True}
+
+        second = case_archiver.run(engine, older_than_days=365, batch_size=1)
+        assert second["cases"] == 1
+        assert second["remaining"] is False
+
+        db_session.expire_all()
+        archived_ids = sorted(case.id for case in db_session.query(CaseArchive))
+        assert archived_ids == expected
+        assert db_session.query(Case).filter(Case.id.in_(archived_ids)).count() == 0
+        assert sorted(history.case_id for history in db_session.query(ChangeHistoryArchive)) == archived_ids
+        assert db_session.query(ChangeHistory).filter(ChangeHistory.case_id.in_(archived_ids)).count() == 0
+
+    def test_include_archived_reads_both_tiers(self, client, auth_headers, db_session, test_cases):
+        """既定はホットのみ、include_archived=true でアーカイブも読み取る"""
+        case_numbers = [case.case_number for case in test_cases]
+        archived_id, archived_number = test_cases[0].id, test_cases[0].case_number
+        case_archiver.run(db_session.get_bind(), older_than_days=365)
+
+        response = client.get("/api/cases", params={"search": "2024-arc"}, headers=auth_headers)
+        assert response.json()["total"] == 3
+
+        response = client.get(
+            "/api/cases",
+            params={"search": "2024-arc", "include_archived": True, "sort_by": "case_number", "sort_order": "asc"},
+            headers=auth_headers,
+        )
+        data = response.json()
+        assert data["total"] == 5
+        assert [item["case_number"] for item in data["items"]] == case_numbers
+        assert data["items"][0]["customer_name"] == "アーカイブ顧客"
+
+        assert client.get(f"/api/cases/{archived_id}", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+        response = client.get(f"/api/cases/{archived_id}", params={"include_archived": True}, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["customer"]["customer_code"] == "C_ARC"
+
+        response = client.get(
+            f"/api/change-history/case/{archived_id}/history", params={"include_archived": True}, headers=auth_headers
+        )
+        assert [item["case_number"] for item in response.json()["items"]] == [archived_number]
+
+        response = client.get("/api/analytics/summary", params={"include_archived": True}, headers=auth_headers)
+        assert response.json()["summary"]["total_cases"] == 5
+
+    def test_field_history_moves_with_archive(self, client, auth_headers, db_session, test_cases, test_user):
+        """項目別の行もアーカイブへ移し、include_archived=true の項目別の検索で読み取る"""
+        archived_id, archived_number = test_cases[0].id, test_cases[0].case_number
+        insert_change_histories(db_session, [build_change_history(
+            archived_id, "UPDATE", test_user.id, changes={"status": {"old": "船積済", "new": "完了"}},
+            case_number_snapshot=archived_number,
+        )])
+        db_session.commit()
+
+        case_archiver.run(db_session.get_bind(), older_than_days=365)
+        db_session.expire_all()
+        assert db_session.query(ChangeHistoryField).filter(ChangeHistoryField.case_id == archived_id).count() == 0
+        assert db_session.query(ChangeHistoryFieldArchive).filter(ChangeHistoryFieldArchive.case_id == archived_id).count() == 1
+
+        params = {"field_name": "status", "new_value": "完了", "case_id": archived_id}
+        response = client.get("/api/change-history/fields", params=params, headers=auth_headers)
+        assert response.json()["total"] == 0
+
+        response = client.get(
+            "/api/change-history/fields", params={**params, "include_archived": True}, headers=auth_headers
+        )
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["case_number"] == archived_number
+        assert data["items"][0]["old_value"] == "船積済"
+
+        # アーカイブ済みの変更履歴の項目別の行も補完できる
+        db_session.query(ChangeHistoryFieldArchive).delete()
+        db_session.commit()
+        assert backfill_change_history_fields(db_session.get_bind(), archived=True) == 1
+        assert db_session.query(ChangeHistoryFieldArchive).filter(ChangeHistoryFieldArchive.case_id == archived_id).count() == 1
@@ -70,3 +70,40 @@ class TestAuth:
             headers=auth_headers
         )
         assert response.status_code == status.HTTP_200_OK
+
+    def test_get_current_user_is_cached(self, client, auth_headers, db_session, test_user):
+        """認証済みリクエストはキャッシュから解決し、ユーザーの変更で破棄される"""
+        from sqlalchemy import event
+
+        client.get("/api/auth/me", headers=auth_headers)
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "FROM users" in statement:
+                statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            for _ in range(3):
+                response = client.get("/api/auth/me", headers=auth_headers)
+                assert response.status_code == status.HTTP_200_OK
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        assert statements == []
+
+        # 無効化はコミット時点で反映される
+        test_user.is_active = False
+        db_session.commit()
+        response = client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_token_is_rejected(self, client, auth_headers):
+        """検証済みトークンと署名が異なるトークンは拒否される"""
+        client.get("/api/auth/me", headers=auth_headers)
+
+        token = auth_headers["Authorization"].split(" ", 1)[1]
+        tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+        response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {tampered}"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -3,7 +3,9 @@
 """
 import pytest
 from fastapi import status
+from app.core.config import settings
 from app.models.case_number import CaseNumber
+from app.services.case_number_allocator import case_number_allocator
 from datetime import datetime
 
 
@@ -130,3 +132,90 @@ class TestCaseNumbers:
             }
         )
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.unit
+class TestCaseNumberAllocator:
+    """採番サービスのテスト"""
+
+    @pytest.fixture(autouse=True)
+    def reset_allocator(self):
+        case_number_allocator.reset()
+        yield
+        case_number_allocator.reset()
+
+    def test_block_reservation(self, client, auth_headers, monkeypatch):
+        """まとめて予約した連番をデータベースにアクセスせずに払い出すことをテスト"""
+        monkeypatch.setattr(settings, "CASE_NUMBER_BLOCK_SIZE", 5)
+
+        sequences = []
+        for _ in range(6):
+            response = client.post("/api/case-numbers/generate", json={"trade_type": "輸出"}, headers=auth_headers)
+            assert response.status_code == status.HTTP_200_OK
+            sequences.append(response.json()["sequence"])
+            if len(sequences) == 1:
+                # 1回目で5件分が予約済みになる
+                current = client.get("/api/case-numbers/current/輸出", headers=auth_headers).json()
+                assert current["last_sequence"] == 5
+
+        assert sequences == [1, 2, 3, 4, 5, 6]
+        current = client.get("/api/case-numbers/current/輸出", headers=auth_headers).json()
+        assert current["last_sequence"] == 10
+        assert case_number_allocator.stats()["reserved_remaining"] == 4
+
+    def test_reservation_does_not_block_other_trade_types(self, db_session, monkeypatch):
+        """ある区分の予約中（データベースへのアクセス中）も、他の区分の採番が待たされないことをテスト"""
+        import threading
+
+        monkeypatch.setattr(settings, "CASE_NUMBER_BLOCK_SIZE", 5)
+        reserve_block = case_number_allocator._reserve_block
+        entered = threading.Event()
+        release = threading.Event()
+
+        def slow_reserve_block(engine, year, trade_type, count, limit):
+            if trade_type == "輸出":
+                entered.set()
+                release.wait(timeout=10)
+            return reserve_block(engine, year, trade_type, count, limit)
+
+        monkeypatch.setattr(case_number_allocator, "_reserve_block", slow_reserve_block)
+        results = {}
+        worker = threading.Thread(
+            target=lambda: results.setdefault("輸出", case_number_allocator.allocate_sequences(db_session, "輸出"))
+        )
+        worker.start()
+        try:
+            assert entered.wait(timeout=10)
+            # 輸出の予約が終わる前に輸入の採番が完了する
+            results["輸入"] = case_number_allocator.allocate_sequences(db_session, "輸入")
+            assert "輸出" not in results
+        finally:
+            release.set()
+            worker.join(timeout=10)
+
+        assert results == {"輸出": [1], "輸入": [1]}
+
+    def test_sequence_width(self, client, auth_headers, monkeypatch):
+        """連番の桁数を設定で変更できることをテスト"""
+        monkeypatch.setattr(settings, "CASE_NUMBER_SEQUENCE_WIDTH", 5)
+        response = client.post("/api/case-numbers/generate", json={"trade_type": "輸入"}, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["case_number"] == f"{datetime.now().year}-IM-00001"
+
+    def test_sequence_limit(self, client, auth_headers, monkeypatch):
+        """連番が上限に達した場合にエラーになり、予約が上限を超えないことをテスト"""
+        monkeypatch.setattr(settings, "CASE_NUMBER_SEQUENCE_WIDTH", 1)
+        monkeypatch.setattr(settings, "CASE_NUMBER_BLOCK_SIZE", 4)
+
+        sequences = []
+        for _ in range(9):
+            response = client.post("/api/case-numbers/generate", json={"trade_type": "輸入"}, headers=auth_headers)
+            assert response.status_code == status.HTTP_200_OK
+            sequences.append(response.json()["sequence"])
+        assert sequences == list(range(1, 10))
+
+        response = client.post("/api/case-numbers/generate", json={"trade_type": "輸入"}, headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "上限(9)" in response.json()["detail"]
+        current = client.get("/api/case-numbers/current/輸入", headers=auth_headers).json()
+        assert current["last_sequence"] == 9
@@ -0,0 +1,166 @@
+"""
+指定日時の案件の状態の復元のテスト
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from app.core.config import settings
+from app.models.case import Case
+from app.models.case_checkpoint import CaseCheckpoint
+from app.models.customer import Customer
+from app.models.product import Product
+from app.services.change_history_service import build_change_history, insert_change_histories, record_change_history
+
+
+@pytest.mark.unit
+class TestCaseStateAsOf:
+    """GET /api/cases/{id}/as-of のテスト"""
+
+    @pytest.fixture
+    def test_case(self, db_session, test_user):
+        """作成から1日ごとに数量を変更した案件（変更履歴7件）を作成"""
+        customer = Customer(customer_code="C_ASOF", customer_name="復元テスト顧客")
+        product = Product(product_code="P_ASOF", product_name="復元テスト商品")
+        db_session.add_all([customer, product])
+        db_session.commit()
+
+        case = Case(
+            case_number="2025-EX-042",
+            customer_id=customer.id,
+            product_id=product.id,
+            trade_type="輸出",
+            quantity=100,
+            unit="pcs",
+            sales_unit_price=1000,
+            purchase_unit_price=800,
+            status="見積中",
+            pic="テスト担当",
+        )
+        db_session.add(case)
+        db_session.commit()
+
+        start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        histories = [build_change_history(case.id, "CREATE", test_user.id, new_case=case)]
+        for day in range(1, 7):
+            histories.append(build_change_history(
+                case.id, "UPDATE", test_user.id,
+                changes={"quantity": {"old": 100 * day, "new": 100 * (day + 1)}},
+            ))
+        histories[3].changes_json["status"] = {"old": "見積中", "new": "受注済"}
+        for day, history in enumerate(histories):
+            history.changed_at = start + timedelta(days=day)
+        db_session.add_all(histories)
+        db_session.commit()
+        return case
+
+    def test_checkpoints_written_with_change_history(self, client, auth_headers, db_session, test_case, test_user, monkeypatch):
+        """変更履歴の記録時に、間隔ごとのチェックポイントを同じトランザクションで作成する"""
+        monkeypatch.setattr(settings, "CASE_CHECKPOINT_INTERVAL", 3)
+
+        # 変更履歴7件（チェックポイントなし）に2件を追加すると、作成時から3件ごとに作成する
+        for quantity in (800, 900):
+            record_change_history(
+                db_session, test_case.id, "UPDATE", test_user.id,
+                changes={"quantity": {"old": quantity - 100, "new": quantity}},
+            )
+            db_session.commit()
+
+        checkpoints = (
+            db_session.query(CaseCheckpoint)
+            .filter(CaseCheckpoint.case_id == test_case.id)
+            .order_by(CaseCheckpoint.sequence)
+            .all()
+        )
+        assert [checkpoint.sequence for checkpoint in checkpoints] == [3, 6, 9]
+        assert checkpoints[-1].state["quantity"] == "900"
+
+        # 次のチェックポイントまでの書き込みでは作成しない
+        record_change_history(
+            db_session, test_case.id, "UPDATE", test_user.id, changes={"quantity": {"old": 900, "new": 1000}}
+        )
+        db_session.commit()
+        assert db_session.query(CaseCheckpoint).filter(CaseCheckpoint.case_id == test_case.id).count() == 3
+
+        # 読み取りでは最新のチェックポイント以降だけを反映し、チェックポイントを書き込まない
+        response = client.get(
+            f"/api/cases/{test_case.id}/as-of",
+            params={"ts": (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()},
+            headers=auth_headers,
+        )
+        data = response.json()
+        assert data["state"]["quantity"] == "1000"
+        assert data["checkpoint_history_id"] == checkpoints[-1].history_id
+        assert data["replayed_changes"] == 1
+        assert db_session.query(CaseCheckpoint).filter(CaseCheckpoint.case_id == test_case.id).count() == 3
+
+    def test_checkpoints_written_with_bulk_change_history(self, db_session, test_case, test_user, monkeypatch):
+        """一括で記録した変更履歴でも、間隔に達した案件のチェックポイントを作成する"""
+        monkeypatch.setattr(settings, "CASE_CHECKPOINT_INTERVAL", 4)
+
+        # 変更履歴7件（チェックポイントなし）に1件を追加すると、作成時から4件ごとに作成する
+        insert_change_histories(db_session, [build_change_history(
+            test_case.id, "UPDATE", test_user.id, changes={"status": {"old": "受注済", "new": "船積済"}},
+        )])
+        db_session.commit()
+
+        checkpoints = (
+            db_session.query(CaseCheckpoint)
+            .filter(CaseCheckpoint.case_id == test_case.id)
+            .order_by(CaseCheckpoint.sequence)
+            .all()
+        )
+        assert [checkpoint.sequence for checkpoint in checkpoints] == [4, 8]
+        assert checkpoints[-1].state["status"] == "船積済"
+        assert checkpoints[-1].state["quantity"] == "700"
+
+        # 次のチェックポイントまでの一括の書き込みでは作成しない
+        insert_change_histories(db_session, [build_change_history(
+            test_case.id, "UPDATE", test_user.id, changes={"quantity": {"old": 700, "new": 800}},
+        )])
+        db_session.commit()
+        assert db_session.query(CaseCheckpoint).filter(CaseCheckpoint.case_id == test_case.id).count() == 2
+
+    def test_as_of_replays_from_checkpoints(self, client, auth_headers, db_session, test_case, monkeypatch):
+        """変更履歴の遅延書き込みでは、復元の際にチェックポイントを保存する"""
+        monkeypatch.setattr(settings, "CASE_CHECKPOINT_INTERVAL", 3)
+        monkeypatch.setattr(settings, "CHANGE_HISTORY_WRITE_MODE", "buffered")
+
+        # 初回は作成時から反映し、3件ごとにチェックポイントを保存する
+        response = client.get(
+            f"/api/cases/{test_case.id}/as-of", params={"ts": "2025-03-05T12:00:00+00:00"}, headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["state"]["quantity"] == "500"
+        assert data["state"]["status"] == "受注済"
+        assert data["state"]["case_number"] == "2025-EX-042"
+        assert data["replayed_changes"] == 5
+        assert data["checkpoint_history_id"] is None
+        assert data["deleted"] is False
+
+        checkpoints = db_session.query(CaseCheckpoint).filter(CaseCheckpoint.case_id == test_case.id).all()
+        assert [checkpoint.sequence for checkpoint in checkpoints] == [3]
+
+        # 2回目以降はチェックポイントから反映する
+        response = client.get(
+            f"/api/cases/{test_case.id}/as-of", params={"ts": "2025-03-05T12:00:00+00:00"}, headers=auth_headers
+        )
+        data = response.json()
+        assert data["state"]["quantity"] == "500"
+        assert data["checkpoint_history_id"] == checkpoints[0].history_id
+        assert data["replayed_changes"] == 2
+
+        # タイムゾーンのない日時は日本時間（2025-03-02 08:59 JST = 2025-03-01 23:59 UTC）
+        response = client.get(
+            f"/api/cases/{test_case.id}/as-of", params={"ts": "2025-03-02T08:59:00"}, headers=auth_headers
+        )
+        assert response.json()["state"]["quantity"] == "100.000"
+        assert response.json()["state"]["status"] == "見積中"
+
+    def test_as_of_before_creation_not_found(self, client, auth_headers, test_case):
+        """指定日時以前の変更履歴がない場合は404"""
+        response = client.get(
+            f"/api/cases/{test_case.id}/as-of", params={"ts": "2025-02-01T00:00:00+00:00"}, headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -3,9 +3,11 @@
 """
 import pytest
 from fastapi import status
+from sqlalchemy import event, text
 from app.models.customer import Customer
 from app.models.product import Product
 from app.models.case import Case
+from tests.conftest import test_async_engine
 
 
 @pytest.mark.unit
@@ -212,3 +214,587 @@ class TestCases:
         data = response.json()
         assert len(data["items"]) > 0
         assert any("SEARCH" in item["case_number"] for item in data["items"])
+
+    def test_get_cases_with_cursor(self, client, auth_headers, db_session, test_customer, test_product):
+        """カーソルページネーションで全件を重複なく取得できる"""
+        for i in range(5):
+            db_session.add(Case(
+                case_number=f"2025-IM-C{i:02d}",
+                customer_id=test_customer.id,
+                product_id=test_product.id,
+                trade_type="輸入",
+                quantity=100,
+                unit="pcs",
+                sales_unit_price=1000,
+                purchase_unit_price=800,
+                status="見積中",
+                pic="テスト担当"
+            ))
+        db_session.commit()
+
+        response = client.get("/api/cases?page_size=2", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        seen = [item["id"] for item in data["items"]]
+        assert data["next_cursor"] is not None
+
+        while data["next_cursor"]:
+            response = client.get(
+                "/api/cases",
+                params={"page_size": 2, "cursor": data["next_cursor"]},
+                headers=auth_headers
+            )
+            assert response.status_code == status.HTTP_200_OK
+            data = response.json()
+            seen.extend(item["id"] for item in data["items"])
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+        # オフセット指定と同じ順序で返される
+        response = client.get("/api/cases?page=2&page_size=2", headers=auth_headers)
+        assert [item["id"] for item in response.json()["items"]] == seen[2:4]
+
+    def test_get_cases_sorted_by_status_with_cursor(self, client, auth_headers, db_session, test_customer, test_product):
+        """ステータス順のカーソルページネーションで、(ステータス, id) 順に全件を重複なく取得できる"""
+        statuses = ["見積中", "受注済", "完了"]
+        for i in range(7):
+            db_session.add(Case(
+                case_number=f"2025-IM-S{i:02d}",
+                customer_id=test_customer.id,
+                product_id=test_product.id,
+                trade_type="輸入",
+                quantity=100,
+                unit="pcs",
+                sales_unit_price=1000,
+                purchase_unit_price=800,
+                status=statuses[i % len(statuses)],
+                pic="テスト担当"
+            ))
+        db_session.commit()
+
+        params = {"sort_by": "status", "sort_order": "asc", "page_size": 3}
+        response = client.get("/api/cases", params=params, headers=auth_headers)
+        data = response.json()
+        seen = [(item["status"], item["id"]) for item in data["items"]]
+        while data["next_cursor"]:
+            response = client.get("/api/cases", params={**params, "cursor": data["next_cursor"]}, headers=auth_headers)
+            assert response.status_code == status.HTTP_200_OK
+            data = response.json()
+            seen.extend((item["status"], item["id"]) for item in data["items"])
+
+        assert len(seen) == 7
+        assert seen == sorted(seen)
+
+    def test_get_cases_with_invalid_cursor(self, client, auth_headers):
+        """不正なカーソルは400エラー"""
+        response = client.get("/api/cases?cursor=invalid", headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        # ソート条件が異なるカーソルも拒否する
+        from app.core.pagination import encode_cursor
+        cursor = encode_cursor("created_at", True, None, 1)
+        response = client.get(
+            "/api/cases",
+            params={"cursor": cursor, "sort_by": "case_number"},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_get_cases_total_modes(self, client, auth_headers, test_customer, test_product):
+        """総件数の取得モードとキャッシュの無効化"""
+        response = client.get("/api/cases", headers=auth_headers)
+        assert response.json()["total"] == 0
+
+        # 案件作成のコミットで件数キャッシュが無効化される
+        response = client.post(
+            "/api/cases",
+            json={
+                "customer_id": test_customer.id,
+                "product_id": test_product.id,
+                "trade_type": "輸入",
+                "quantity": 10,
+                "unit": "pcs",
+                "sales_unit_price": 100,
+                "purchase_unit_price": 80,
+                "status": "見積中",
+                "pic": "テスト担当"
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = client.get("/api/cases", headers=auth_headers)
+        assert response.json()["total"] == 1
+
+        # none: 総件数を返さない
+        response = client.get("/api/cases?total=none", headers=auth_headers)
+        data = response.json()
+        assert data["total"] is None
+        assert data["total_pages"] is None
+        assert len(data["items"]) == 1
+
+        # estimate: PostgreSQL以外では正確な件数で代替
+        response = client.get("/api/cases?total=estimate", headers=auth_headers)
+        assert response.json()["total"] == 1
+
+        response = client.get("/api/cases?total=invalid", headers=auth_headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_get_cases_with_normalized_search(self, client, auth_headers, db_session, test_customer, test_product):
+        """全角・半角、カタカナ・ひらがなを区別せずに顧客名・案件番号を検索できる"""
+        case = Case(
+            case_number="2025-EX-NORM",
+            customer_id=test_customer.id,
+            product_id=test_product.id,
+            trade_type="輸出",
+            quantity=100,
+            unit="pcs",
+            sales_unit_price=1000,
+            purchase_unit_price=800,
+            status="見積中",
+            pic="テスト担当"
+        )
+        db_session.add(case)
+        db_session.commit()
+
+        # 半角カナで顧客名「テスト顧客」を検索
+        response = client.get("/api/cases", params={"search": "ﾃｽﾄ"}, headers=auth_headers)
+        assert [item["case_number"] for item in response.json()["items"]] == ["2025-EX-NORM"]
+
+        # ひらがなで検索
+        response = client.get("/api/cases", params={"search": "てすと顧客"}, headers=auth_headers)
+        assert len(response.json()["items"]) == 1
+
+        # 全角英数で案件番号を検索
+        response = client.get("/api/cases", params={"search": "ｅｘ－ｎｏｒｍ"}, headers=auth_headers)
+        assert len(response.json()["items"]) == 1
+
+        # 2文字以下の検索語も検索できる
+        response = client.get("/api/cases", params={"search": "No"}, headers=auth_headers)
+        assert len(response.json()["items"]) == 1
+
+        response = client.get("/api/cases", params={"search": "該当なし"}, headers=auth_headers)
+        assert response.json()["items"] == []
+
+    def test_get_cases_with_invalid_sort_by(self, client, auth_headers):
+        """インデックスのない列でのソートは指定できない"""
+        response = client.get("/api/cases?sort_by=notes", headers=auth_headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_get_cases_query_plans_use_indexes(self, client, auth_headers, db_session, test_customer, test_product):
+        """一覧APIの発行するSQLが案件テーブルを全件走査しない"""
+        from datetime import date, timedelta
+        from sqlalchemy import event, insert
+        from sqlalchemy.engine import Engine
+
+        statuses = ["見積中", "受注済", "船積済", "完了", "キャンセル"]
+        db_session.execute(insert(Customer), [{"customer_code": f"C{i:04d}", "customer_name": f"顧客{i}"} for i in range(2, 101)])
+        db_session.execute(insert(Product), [{"product_code": f"P{i:04d}", "product_name": f"商品{i}"} for i in range(2, 101)])
+        db_session.execute(
+            insert(Case),
+            [
+                {
+                    "case_number": f"2025-EX-{i:05d}",
+                    "customer_id": i % 100 + 1,
+                    "product_id": (i * 7) % 100 + 1,
+                    "trade_type": "輸出" if i % 2 else "輸入",
+                    "quantity": 1,
+                    "unit": "pcs",
+                    "sales_unit_price": 100,
+                    "purchase_unit_price": 80,
+                    "sales_amount": i,
+                    "shipment_date": date(2025, 1, 1) + timedelta(days=i % 365),
+                    "status": statuses[i % len(statuses)],
+                    "pic": "テスト担当",
+                }
+                for i in range(5000)
+            ],
+        )
+        db_session.commit()
+        db_session.execute(text("ANALYZE"))
+
+        # 読み取りAPIは非同期エンジンで実行されるため、全エンジンの文を捕捉する
+        engine = Engine
+        statements = []
+        current = {}
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and "FROM cases" in statement:
+                statements.append((statement, parameters, current.get("sort_by")))
+
+        requests = [
+            {},
+            {"status": "受注済"},
+            {"trade_type": "輸出", "shipment_date_from": "2025-03-01", "shipment_date_to": "2025-03-31"},
+            {"search": "ex-0001"},
+        ] + [{"sort_by": column} for column in ("updated_at", "case_number", "shipment_date", "sales_amount", "status")]
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            for params in requests:
+                current = params
+                response = client.get("/api/cases", params=params, headers=auth_headers)
+                assert response.status_code == status.HTTP_200_OK
+                cursor = response.json()["next_cursor"]
+                if cursor:
+                    response = client.get("/api/cases", params={**params, "cursor": cursor}, headers=auth_headers)
+                    assert response.status_code == status.HTTP_200_OK
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert statements
+        for statement, parameters, sort_by in statements:
+            plan = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            details = [row[-1] for row in plan]
+            full_scans = [detail for detail in details if detail.strip() in ("SCAN cases", "SCAN TABLE cases")]
+            assert not full_scans, f"casesの全件走査: {details}\n{statement}"
+            # ソートの指定だけの一覧は (ソート列, id) のインデックスを順に読み、並べ替えを行わない
+            if sort_by and "ORDER BY" in statement:
+                assert not [detail for detail in details if "TEMP B-TREE" in detail], f"一覧の並べ替え: {details}\n{statement}"
+
+    def test_get_cases_projection_matches_schema(self, client, auth_headers, db_session, test_customer, test_product):
+        """列の射影で返した一覧が CaseListItem の検証結果と一致する"""
+        from app.schemas.case import CaseListItem
+
+        case = Case(
+            case_number="2025-EX-PROJ",
+            customer_id=test_customer.id,
+            product_id=test_product.id,
+            trade_type="輸出",
+            quantity=12.5,
+            unit="kg",
+            sales_unit_price=1000,
+            purchase_unit_price=800,
+            status="受注済",
+            pic="テスト担当"
+        )
+        case.calculate_amounts()
+        db_session.add(case)
+        db_session.commit()
+        db_session.refresh(case)
+
+        response = client.get("/api/cases", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        item = response.json()["items"][0]
+
+        expected = CaseListItem(
+            id=case.id,
+            case_number=case.case_number,
+            trade_type=case.trade_type,
+            customer_id=case.customer_id,
+            customer_name=test_customer.customer_name,
+            product_id=case.product_id,
+            product_name=test_product.product_name,
+            quantity=case.quantity,
+            unit=case.unit,
+            sales_amount=case.sales_amount,
+            gross_profit=case.gross_profit,
+            gross_profit_rate=case.gross_profit_rate,
+            status=case.status,
+            pic=case.pic,
+            shipment_date=case.shipment_date,
+            created_at=case.created_at,
+            updated_at=case.updated_at,
+        ).model_dump(mode="json")
+        assert item == expected
+
+    def test_get_cases_conditional_get(self, client, auth_headers, db_session, test_customer, test_product):
+        """ETagが一致すれば304を返し、案件・顧客の更新後はETagが変わる"""
+        case = Case(
+            case_number="2025-EX-ETAG",
+            customer_id=test_customer.id,
+            product_id=test_product.id,
+            trade_type="輸出",
+            quantity=10,
+            unit="pcs",
+            sales_unit_price=1000,
+            purchase_unit_price=800,
+            status="見積中",
+            pic="テスト担当"
+        )
+        db_session.add(case)
+        db_session.commit()
+        db_session.refresh(case)
+
+        response = client.get("/api/cases", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        # 再検証では件数を数えない（ETagは書き込みバージョン・updated_at の最大値・キャッシュ済みの件数から計算）
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.lower())
+
+        event.listen(test_async_engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            response = client.get("/api/cases", headers={**auth_headers, "If-None-Match": etag})
+        finally:
+            event.remove(test_async_engine.sync_engine, "before_cursor_execute", capture)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert [statement for statement in statements if "max(" in statement]
+        assert not [statement for statement in statements if "count(" in statement]
+
+        # フィルタ・ページが異なれば別のETag
+        response = client.get("/api/cases", params={"status": "見積中"}, headers=auth_headers)
+        assert response.headers["etag"] != etag
+
+        # 案件の更新後は200で最新の一覧を返す
+        client.put(f"/api/cases/{case.id}", json={"status": "受注済"}, headers=auth_headers)
+        response = client.get("/api/cases", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["items"][0]["status"] == "受注済"
+        etag = response.headers["etag"]
+
+        # 一覧に表示される顧客名の変更も反映する
+        client.put(f"/api/customers/{test_customer.id}", json={"customer_name": "変更後顧客"}, headers=auth_headers)
+        response = client.get("/api/cases", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["items"][0]["customer_name"] == "変更後顧客"
+
+    def test_create_cases_bulk(self, client, auth_headers, db_session, test_customer, test_product):
+        """案件の一括作成（採番・変更履歴・検索キー）"""
+        from app.models.change_history import ChangeHistory
+
+        base = {
+            "customer_id": test_customer.id,
+            "product_id": test_product.id,
+            "quantity": 10,
+            "unit": "pcs",
+            "sales_unit_price": 1000,
+            "purchase_unit_price": 800,
+            "status": "見積中",
+            "pic": "テスト担当"
+        }
+        payload = {"items": [
+            {**base, "trade_type": "輸出"},
+            {**base, "trade_type": "輸入"},
+            {**base, "trade_type": "輸出", "case_number": "2025-EX-BULK"},
+            {**base, "trade_type": "輸出"},
+        ]}
+        response = client.post("/api/cases/bulk", json=payload, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["created"] == 4
+
+        numbers = [item["case_number"] for item in data["items"]]
+        assert numbers[0].endswith("-EX-001")
+        assert numbers[1].endswith("-IM-001")
+        assert numbers[2] == "2025-EX-BULK"
+        assert numbers[3].endswith("-EX-002")
+
+        created = db_session.query(Case).filter(Case.id == data["items"][0]["id"]).first()
+        assert created.case_number == numbers[0]
+        assert created.sales_amount == 10000
+        assert created.search_key == numbers[0].lower()
+
+        histories = db_session.query(ChangeHistory).filter(ChangeHistory.change_type == "CREATE").all()
+        assert sorted(h.case_id for h in histories) == sorted(item["id"] for item in data["items"])
+
+        # 一覧・検索に反映される
+        response = client.get("/api/cases", params={"search": "ex-bulk"}, headers=auth_headers)
+        assert [item["case_number"] for item in response.json()["items"]] == ["2025-EX-BULK"]
+
+        # 単体作成の採番は一括作成の続きから
+        response = client.post("/api/cases", json={**base, "trade_type": "輸出"}, headers=auth_headers)
+        assert response.json()["case_number"].endswith("-EX-003")
+
+    def test_create_cases_bulk_rejects_invalid_items(self, client, auth_headers, db_session, test_customer, test_product):
+        """不正な案件が含まれる場合は1件も作成しない"""
+        base = {
+            "customer_id": test_customer.id,
+            "product_id": test_product.id,
+            "trade_type": "輸出",
+            "quantity": 10,
+            "unit": "pcs",
+            "sales_unit_price": 1000,
+            "purchase_unit_price": 800,
+            "status": "見積中",
+            "pic": "テスト担当"
+        }
+        response = client.post(
+            "/api/cases/bulk",
+            json={"items": [base, {**base, "customer_id": 99999}]},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert "99999" in response.json()["detail"]
+
+        response = client.post(
+            "/api/cases/bulk",
+            json={"items": [{**base, "case_number": "2025-EX-DUP"}, {**base, "case_number": "2025-EX-DUP"}]},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.post("/api/cases/bulk", json={"items": []}, headers=auth_headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        assert db_session.query(Case).count() == 0
+
+    def test_update_cases_bulk(self, client, auth_headers, db_session, test_customer, test_product):
+        """案件の一括更新（IDリスト指定・金額の再計算・変更履歴）"""
+        from app.models.change_history import ChangeHistory
+
+        cases = []
+        for i, case_status in enumerate(["船積済", "船積済", "完了"]):
+            case = Case(
+                case_number=f"2025-EX-B{i:02d}",
+                customer_id=test_customer.id,
+                product_id=test_product.id,
+                trade_type="輸出",
+                quantity=10,
+                unit="pcs",
+                sales_unit_price=1000,
+                purchase_unit_price=800,
+                status=case_status,
+                pic="テスト担当"
+            )
+            case.calculate_amounts()
+            db_session.add(case)
+            cases.append(case)
+        db_session.commit()
+
+        response = client.patch(
+            "/api/cases/bulk",
+            json={
+                "ids": [cases[0].id, cases[1].id, cases[2].id, 99999],
+                "patch": {"status": "完了", "sales_unit_price": 1200}
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["updated"] == 3
+        assert [r["result"] for r in data["results"]] == ["updated", "updated", "updated", "not_found"]
+
+        db_session.expire_all()
+        updated = db_session.query(Case).filter(Case.id == cases[0].id).first()
+        assert updated.status == "完了"
+        assert float(updated.sales_amount) == 12000
+        assert float(updated.gross_profit) == 4000
+        assert round(float(updated.gross_profit_rate), 2) == 33.33
+
+        history = db_session.query(ChangeHistory).filter(ChangeHistory.case_id == cases[0].id).one()
+        assert history.change_type == "UPDATE"
+        assert history.changes_json["status"] == {"old": "船積済", "new": "完了"}
+        assert history.changes_json["_case_number_snapshot"] == "2025-EX-B00"
+
+        # 値が変わらない案件は更新しない
+        response = client.patch(
+            "/api/cases/bulk",
+            json={"ids": [cases[2].id], "patch": {"status": "完了"}},
+            headers=auth_headers
+        )
+        assert response.json()["updated"] == 0
+        assert response.json()["results"][0]["result"] == "unchanged"
+
+    def test_update_cases_bulk_by_filter(self, client, auth_headers, db_session, test_customer, test_product):
+        """フィルタ条件で対象を指定した一括更新"""
+        for i, case_status in enumerate(["船積済", "船積済", "見積中"]):
+            db_session.add(Case(
+                case_number=f"2025-EX-F{i:02d}",
+                customer_id=test_customer.id,
+                product_id=test_product.id,
+                trade_type="輸出",
+                quantity=10,
+                unit="pcs",
+                sales_unit_price=1000,
+                purchase_unit_price=800,
+                status=case_status,
+                pic="テスト担当"
+            ))
+        db_session.commit()
+
+        response = client.patch(
+            "/api/cases/bulk",
+            json={"filter": {"status": "船積済"}, "patch": {"status": "完了"}},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["updated"] == 2
+
+        response = client.get("/api/cases", params={"status": "完了"}, headers=auth_headers)
+        assert response.json()["total"] == 2
+
+        # 条件なし・対象の指定方法が不正・空にできないフィールド
+        response = client.patch("/api/cases/bulk", json={"filter": {}, "patch": {"status": "完了"}}, headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = client.patch("/api/cases/bulk", json={"patch": {"status": "完了"}}, headers=auth_headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        response = client.patch("/api/cases/bulk", json={"ids": [1], "patch": {"pic": None}}, headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_delete_cases_bulk(self, client, auth_headers, db_session, test_user, test_customer, test_product):
+        """案件の一括削除（変更履歴・ドキュメントの扱いとSQL発行回数）"""
+        from sqlalchemy import event
+        from app.models.change_history import ChangeHistory
+        from app.models.document import Document
+
+        def create_cases(prefix, count):
+            cases = []
+            for i in range(count):
+                case = Case(
+                    case_number=f"2025-EX-{prefix}{i:02d}",
+                    customer_id=test_customer.id,
+                    product_id=test_product.id,
+                    trade_type="輸出",
+                    quantity=10,
+                    unit="pcs",
+                    sales_unit_price=1000,
+                    purchase_unit_price=800,
+                    status="見積中",
+                    pic="テスト担当"
+                )
+                db_session.add(case)
+                cases.append(case)
+            db_session.commit()
+            return [case.id for case in cases]
+
+        small_ids = create_cases("S", 2)
+        large_ids = create_cases("L", 20)
+
+        # 削除前の変更履歴とドキュメント
+        client.put(f"/api/cases/{small_ids[0]}", json={"quantity": 20}, headers=auth_headers)
+        db_session.add(Document(case_id=small_ids[0], document_type="invoice", file_name="invoice.xlsx", generated_by=test_user.id))
+        db_session.commit()
+
+        engine = db_session.get_bind()
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        def delete_and_count(ids):
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                response = client.request("DELETE", "/api/cases/bulk", json={"ids": ids}, headers=auth_headers)
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+            assert response.status_code == status.HTTP_200_OK
+            return response.json(), len(statements)
+
+        data, small_count = delete_and_count(small_ids + [99999])
+        assert data["deleted"] == 2
+        assert [r["result"] for r in data["results"]] == ["deleted", "deleted", "not_found"]
+
+        _, large_count = delete_and_count(large_ids)
+        assert large_count == small_count
+
+        db_session.expire_all()
+        assert db_session.query(Case).count() == 0
+        assert db_session.query(Document).count() == 0
+
+        # 更新履歴は参照が解除され、削除履歴は案件番号スナップショット付きで残る
+        update_history = db_session.query(ChangeHistory).filter(ChangeHistory.change_type == "UPDATE").one()
+        assert update_history.case_id is None
+        delete_histories = db_session.query(ChangeHistory).filter(ChangeHistory.change_type == "DELETE").all()
+        assert len(delete_histories) == 22
+        snapshots = {h.case_id: h.changes_json["_case_number_snapshot"] for h in delete_histories}
+        assert snapshots[small_ids[0]] == "2025-EX-S00"
@@ -3,10 +3,14 @@
 """
 import pytest
 from fastapi import status
+from app.core.config import settings
 from app.models.customer import Customer
 from app.models.product import Product
 from app.models.case import Case
 from app.models.change_history import ChangeHistory
+from app.models.change_history_field import ChangeHistoryField
+from app.services.change_history_service import record_change_history
+from app.services.change_history_writer import change_history_writer
 
 
 @pytest.mark.unit
@@ -177,3 +181,219 @@ class TestChangeHistory:
         """認証なしでの変更履歴取得のテスト"""
         response = client.get("/api/change-history")
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_get_change_history_resolves_names_in_one_query(self, client, auth_headers, db_session, test_user, test_case):
+        """変更者名は行数によらずまとめて解決される"""
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        for i in range(5):
+            db_session.add(ChangeHistory(
+                case_id=test_case.id,
+                changed_by=test_user.id,
+                change_type="UPDATE",
+                field_name="quantity",
+                old_value=str(i),
+                new_value=str(i + 1)
+            ))
+        db_session.commit()
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "FROM users" in statement:
+                statements.append(statement)
+
+        # 読み取りAPIは非同期エンジンで実行されるため、全エンジンの文を捕捉する
+        engine = Engine
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.get("/api/change-history", headers=auth_headers)
+            assert [item["changed_by_name"] for item in response.json()["items"]] == [test_user.username] * 5
+            response = client.get("/api/change-history", headers=auth_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        # 初回のみ（認証・変更者名で各1回）、2回目以降はキャッシュから解決
+        assert len(statements) <= 2
+
+    def test_get_change_history_case_number_filter_and_sort_in_sql(self, client, auth_headers, db_session, test_user, test_case):
+        """案件番号による絞り込み・ソートはスナップショット列でDB側で行い、カーソルでページングできる"""
+        for case_number in ("2024-EX-003", "2024-EX-001", "2025-IM-002", "2024-EX-002"):
+            db_session.add(ChangeHistory(
+                case_id=test_case.id,
+                changed_by=test_user.id,
+                change_type="UPDATE",
+                case_number_snapshot=case_number,
+            ))
+        db_session.commit()
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "FROM change_history" in statement:
+                statements.append(statement)
+
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, "before_cursor_execute", capture)
+        try:
+            params = {"case_number": "2024-ex", "sort_by": "case_number", "sort_order": "asc", "page_size": 2}
+            first = client.get("/api/change-history", params=params, headers=auth_headers).json()
+            second = client.get(
+                "/api/change-history", params={**params, "cursor": first["next_cursor"]}, headers=auth_headers
+            ).json()
+        finally:
+            event.remove(Engine, "before_cursor_execute", capture)
+
+        assert first["total"] == 3
+        assert [item["case_number"] for item in first["items"]] == ["2024-EX-001", "2024-EX-002"]
+        assert [item["case_number"] for item in second["items"]] == ["2024-EX-003"]
+        assert first["items"][0]["changed_by_name"] == test_user.username
+        assert all("LIMIT" in statement or "count(*)" in statement for statement in statements)
+
+    def test_backfill_case_number_snapshots(self, db_session, test_case):
+        """スナップショット列が未設定の履歴を changes_json から補完する"""
+        from app.services.change_history_service import backfill_case_number_snapshots
+
+        db_session.add_all([
+            ChangeHistory(case_id=test_case.id, change_type="UPDATE",
+                          changes_json={"_case_number_snapshot": "2024-EX-010"}),
+            ChangeHistory(case_id=test_case.id, change_type="DELETE",
+                          changes_json={"case_number": {"old": "2024-EX-011", "new": None}}),
+            ChangeHistory(case_id=test_case.id, change_type="UPDATE", field_name="case_number",
+                          old_value="2024-EX-012", new_value="2024-EX-013"),
+            ChangeHistory(case_id=test_case.id, change_type="UPDATE", field_name="quantity"),
+        ])
+        db_session.commit()
+
+        assert backfill_case_number_snapshots(db_session.get_bind(), batch_size=2) == 3
+        db_session.expire_all()
+        snapshots = [history.case_number_snapshot for history in db_session.query(ChangeHistory).order_by(ChangeHistory.id)]
+        assert snapshots == ["2024-EX-010", "2024-EX-011", "2024-EX-013", None]
+        # 再実行しても補完済みの行は変わらない
+        assert backfill_case_number_snapshots(db_session.get_bind(), batch_size=2) == 0
+
+    def test_search_change_history_fields(self, client, auth_headers, db_session, test_user, test_case):
+        """項目・変更後の値・顧客・期間で項目別の変更履歴を検索する"""
+        client.put(f"/api/cases/{test_case.id}", json={"status": "船積済"}, headers=auth_headers)
+        client.put(
+            f"/api/cases/{test_case.id}", json={"sales_unit_price": 1200, "quantity": 150}, headers=auth_headers
+        )
+
+        response = client.get(
+            "/api/change-history/fields",
+            params={"field_name": "status", "new_value": "船積済", "date_from": "2000-01-01T00:00:00"},
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] == 1
+        item = data["items"][0]
+        assert (item["case_id"], item["old_value"], item["case_number"]) == (test_case.id, "見積中", "2025-IM-HIST")
+
+        response = client.get(
+            "/api/change-history/fields",
+            params={"field_name": "sales_unit_price", "customer_id": test_case.customer_id},
+            headers=auth_headers,
+        )
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["changed_by_name"] == test_user.username
+        assert data["items"][0]["new_value"] == "1200"
+
+        response = client.get(
+            "/api/change-history/fields",
+            params={"field_name": "status", "date_to": "2000-01-01T00:00:00"},
+            headers=auth_headers,
+        )
+        assert response.json()["total"] == 0
+
+    def test_backfill_change_history_fields(self, db_session, test_case):
+        """項目別の行がない変更履歴を changes_json から補完する"""
+        from app.services.change_history_fields import backfill_change_history_fields
+
+        db_session.add_all([
+            ChangeHistory(case_id=test_case.id, change_type="UPDATE", changes_json={
+                "status": {"old": "見積中", "new": "受注済"},
+                "pic": {"old": "A", "new": "B"},
+                "_case_number_snapshot": "2025-IM-HIST",
+            }),
+            ChangeHistory(case_id=test_case.id, change_type="UPDATE", field_name="quantity",
+                          old_value="100", new_value="200"),
+            ChangeHistory(case_id=test_case.id, change_type="UPDATE", notes="項目なし"),
+        ])
+        db_session.commit()
+
+        assert backfill_change_history_fields(db_session.get_bind(), batch_size=2) == 2
+        fields = db_session.query(ChangeHistoryField).order_by(ChangeHistoryField.id).all()
+        assert [(field.field_name, field.new_value) for field in fields] == [
+            ("status", "受注済"), ("pic", "B"), ("quantity", "200"),
+        ]
+        assert all(field.changed_at is not None for field in fields)
+        # 再実行しても補完済みの変更履歴は変わらない
+        assert backfill_change_history_fields(db_session.get_bind(), batch_size=2) == 0
+
+
+@pytest.mark.unit
+class TestBufferedChangeHistory:
+    """変更履歴の遅延書き込みのテスト"""
+
+    @pytest.fixture(autouse=True)
+    def buffered(self, monkeypatch):
+        monkeypatch.setattr(settings, "CHANGE_HISTORY_WRITE_MODE", "buffered")
+        # 自動の書き込みが走らないよう間隔を長くし、テスト内で drain する
+        monkeypatch.setattr(settings, "CHANGE_HISTORY_FLUSH_INTERVAL_MS", 60000)
+        yield
+        change_history_writer.drain()
+
+    def test_history_written_after_commit(self, client, auth_headers, db_session, test_user):
+        """案件作成のコミット後に変更履歴がまとめて書き込まれることをテスト"""
+        customer = Customer(customer_code="C_BUF", customer_name="遅延書き込み顧客")
+        product = Product(product_code="P_BUF", product_name="遅延書き込み商品")
+        db_session.add_all([customer, product])
+        db_session.commit()
+
+        case_ids = []
+        for _ in range(3):
+            response = client.post(
+                "/api/cases",
+                json={
+                    "trade_type": "輸出", "customer_id": customer.id, "product_id": product.id,
+                    "quantity": 10, "unit": "pcs", "sales_unit_price": 100, "purchase_unit_price": 80,
+                    "status": "見積中", "pic": "担当",
+                },
+                headers=auth_headers,
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            case_ids.append(response.json()["id"])
+
+        assert db_session.query(ChangeHistory).count() == 0
+        assert change_history_writer.stats()["buffered"] == 3
+
+        change_history_writer.drain()
+        db_session.expire_all()
+        histories = db_session.query(ChangeHistory).order_by(ChangeHistory.id).all()
+        assert [history.case_id for history in histories] == case_ids
+        assert all(history.change_type == "CREATE" and history.changed_at is not None for history in histories)
+        # 項目別の行も同じ書き込みで挿入される
+        assert db_session.query(ChangeHistoryField).filter(ChangeHistoryField.field_name == "status").count() == 3
+
+    def test_rolled_back_history_discarded(self, db_session, test_user):
+        """ロールバックしたSAVEPOINT・トランザクションで記録した変更履歴が書き込まれないことをテスト"""
+        written = change_history_writer.stats()["written"]
+
+        with pytest.raises(ValueError):
+            with db_session.begin_nested():
+                record_change_history(db_session, case_id=None, change_type="UPDATE", changed_by=test_user.id, notes="破棄")
+                raise ValueError("ロールバック")
+        record_change_history(db_session, case_id=None, change_type="UPDATE", changed_by=test_user.id, notes="保存")
+        db_session.commit()
+
+        record_change_history(db_session, case_id=None, change_type="UPDATE", changed_by=test_user.id, notes="破棄")
+        db_session.rollback()
+
+        change_history_writer.drain()
+        db_session.expire_all()
+        assert [history.notes for history in db_session.query(ChangeHistory).all()] == ["保存"]
+        assert change_history_writer.stats()["written"] == written + 1
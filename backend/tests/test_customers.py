@@ -112,3 +112,166 @@ class TestCustomers:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert data["is_active"] == 0
+
+    def test_get_customers_with_cursor(self, client, auth_headers, db_session):
+        """カーソルページネーションで顧客コード順に取得できる"""
+        for i in range(3):
+            db_session.add(Customer(
+                customer_code=f"C90{i}",
+                customer_name=f"カーソル顧客{i}"
+            ))
+        db_session.commit()
+
+        response = client.get("/api/customers?limit=2", headers=auth_headers)
+        data = response.json()
+        assert [item["customer_code"] for item in data["items"]] == ["C900", "C901"]
+
+        response = client.get(
+            "/api/customers",
+            params={"limit": 2, "cursor": data["next_cursor"]},
+            headers=auth_headers
+        )
+        data = response.json()
+        assert [item["customer_code"] for item in data["items"]] == ["C902"]
+        assert data["next_cursor"] is None
+
+    def test_get_customers_with_search(self, client, auth_headers, db_session):
+        """顧客コード・顧客名・英語名の部分一致検索（更新後の名称で検索できる）"""
+        customer = Customer(
+            customer_code="C800",
+            customer_name="サクラ商事",
+            customer_name_en="Sakura Trading"
+        )
+        db_session.add(customer)
+        db_session.commit()
+        db_session.refresh(customer)
+
+        response = client.get("/api/customers", params={"search": "さくら"}, headers=auth_headers)
+        assert [item["customer_code"] for item in response.json()["items"]] == ["C800"]
+
+        response = client.get("/api/customers", params={"search": "TRADING"}, headers=auth_headers)
+        assert len(response.json()["items"]) == 1
+
+        client.put(
+            f"/api/customers/{customer.id}",
+            json={"customer_name": "ツバキ物産"},
+            headers=auth_headers
+        )
+        response = client.get("/api/customers", params={"search": "サクラ"}, headers=auth_headers)
+        assert response.json()["items"] == []
+        response = client.get("/api/customers", params={"search": "つばき"}, headers=auth_headers)
+        assert len(response.json()["items"]) == 1
+
+    def test_search_key_backfill_keeps_updated_at(self, db_session):
+        """起動時の search_key の補完で更新日時が変わらないことをテスト"""
+        from datetime import datetime
+        from sqlalchemy import update
+        from app.services.search_service import ensure_search_index
+
+        customer = Customer(customer_code="C_BACKFILL", customer_name="補完テスト商事")
+        db_session.add(customer)
+        db_session.commit()
+        modified_at = datetime(2020, 1, 1, 12, 0, 0)
+        db_session.execute(
+            update(Customer.__table__)
+            .where(Customer.__table__.c.id == customer.id)
+            .values(search_key=None, updated_at=modified_at)
+        )
+        db_session.commit()
+
+        ensure_search_index(db_session.get_bind())
+
+        db_session.expire_all()
+        customer = db_session.get(Customer, customer.id)
+        assert customer.search_key == "c_backfill\n補完てすと商事"
+        assert customer.updated_at.replace(tzinfo=None) == modified_at
+
+    def test_get_customers_conditional_get(self, client, auth_headers, db_session):
+        """マスタ一覧はキャッシュ可能で、ETagが一致すれば304を返す"""
+        db_session.add(Customer(customer_code="C700", customer_name="ETag顧客"))
+        db_session.commit()
+
+        response = client.get("/api/customers", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        assert "max-age=" in response.headers["cache-control"]
+
+        response = client.get("/api/customers", headers={**auth_headers, "If-None-Match": f'"other", {etag}'})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+
+        client.post(
+            "/api/customers",
+            json={"customer_code": "C701", "customer_name": "追加顧客"},
+            headers=auth_headers
+        )
+        response = client.get("/api/customers", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["items"]) == 2
+
+    def test_master_data_write_through_keeps_previous_snapshot(self, client, auth_headers, db_session):
+        """ライトスルーは新しいスナップショットを作り、読み取り中の旧スナップショットのインデックスを変更しない"""
+        from app.services.master_data_cache import master_data_cache
+
+        response = client.post(
+            "/api/customers",
+            json={"customer_code": "C650", "customer_name": "スナップショット商事"},
+            headers=auth_headers
+        )
+        customer_id = response.json()["id"]
+        client.get("/api/customers/autocomplete/", params={"q": "スナップショット"}, headers=auth_headers)
+        previous = master_data_cache._snapshots["customers"]
+
+        client.put(f"/api/customers/{customer_id}", json={"customer_name": "書き換え後商事"}, headers=auth_headers)
+
+        assert [item.id for item in previous.index.search("スナップショット", 10)] == [customer_id]
+        assert previous.index.search("書き換え後", 10) == []
+        response = client.get("/api/customers/autocomplete/", params={"q": "書き換え後"}, headers=auth_headers)
+        assert [item["id"] for item in response.json()] == [customer_id]
+        assert master_data_cache._snapshots["customers"] is not previous
+
+    def test_customers_served_from_master_data_cache(self, client, auth_headers, db_session):
+        """オートコンプリート・一覧はキャッシュから返し、作成・更新・削除が即座に反映される"""
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        response = client.post(
+            "/api/customers",
+            json={"customer_code": "C600", "customer_name": "キャッシュ商事"},
+            headers=auth_headers
+        )
+        customer_id = response.json()["id"]
+
+        response = client.get("/api/customers/autocomplete/", params={"q": "キャッシュ"}, headers=auth_headers)
+        assert [item["id"] for item in response.json()] == [customer_id]
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "FROM customers" in statement:
+                statements.append(statement)
+
+        # 読み取りAPIは非同期エンジンで実行されるため、全エンジンの文を捕捉する
+        engine = Engine
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.get("/api/customers/autocomplete/", params={"q": "c600"}, headers=auth_headers)
+            assert len(response.json()) == 1
+            response = client.get("/api/customers", params={"total": "none"}, headers=auth_headers)
+            assert [item["customer_code"] for item in response.json()["items"]] == ["C600"]
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        # キャッシュから返す一覧はETagもスナップショットの世代から計算し、customersテーブルを読まない
+        assert statements == []
+
+        client.put(f"/api/customers/{customer_id}", json={"customer_name": "更新後商事"}, headers=auth_headers)
+        response = client.get("/api/customers/autocomplete/", params={"q": "更新後"}, headers=auth_headers)
+        assert [item["id"] for item in response.json()] == [customer_id]
+
+        client.delete(f"/api/customers/{customer_id}", headers=auth_headers)
+        response = client.get("/api/customers/autocomplete/", params={"q": "C600"}, headers=auth_headers)
+        assert response.json() == []
+
+        caches = client.get("/health").json()["caches"]
+        assert caches["master_data"]["hits"] > 0
+        assert caches["master_data"]["entries"]["customers"] == 1
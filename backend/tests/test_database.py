@@ -0,0 +1,103 @@
+"""
+データベース接続設定のテスト
+"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import sqlite_maintenance
+from app.core.write_queue import SingleWriter, run_write
+from app.models import Customer
+from app.services.table_versions import table_versions
+
+
+@pytest.mark.unit
+class TestSqliteProfile:
+    """SQLiteのPRAGMA設定と定期保守のテスト"""
+
+    def test_connection_pragmas_applied(self, db_session):
+        """接続ごとにWAL・synchronous・busy_timeoutが設定されることをテスト"""
+        connection = db_session.connection()
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar().upper() == settings.SQLITE_JOURNAL_MODE
+        # synchronous=NORMAL は 1
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == settings.SQLITE_CACHE_SIZE
+
+    def test_sqlite_maintenance_checkpoints_wal(self, db_session):
+        """定期保守でWALのチェックポイントが実行されることをテスト"""
+        engine = db_session.get_bind()
+        db_session.close()
+        result = sqlite_maintenance(engine)
+        assert set(result) == {"busy", "wal_pages", "checkpointed_pages"}
+        assert result["busy"] == 0
+        assert result["checkpointed_pages"] <= result["wal_pages"]
+
+
+@pytest.mark.unit
+class TestSingleWriter:
+    """書き込みキューのテスト"""
+
+    def test_jobs_are_group_committed_and_failures_isolated(self, db_session):
+        """まとめて実行したジョブのうち失敗したジョブだけが取り消されることをテスト"""
+        engine = db_session.get_bind()
+        db_session.close()
+        writer = SingleWriter(engine, max_batch=32)
+
+        def add_customer(db, code):
+            db.add(Customer(customer_code=code, customer_name=f"顧客{code}"))
+            db.flush()
+            if code == "FAIL":
+                raise ValueError("失敗するジョブ")
+            return code
+
+        # 書き込みスレッドが起動する前にキューへ積み、1つのバッチで実行させる
+        start = writer._ensure_started
+        writer._ensure_started = lambda: None
+        futures = [writer.submit(add_customer, code) for code in ("W001", "FAIL", "W002")]
+        start()
+
+        assert futures[0].result(timeout=10) == "W001"
+        assert futures[2].result(timeout=10) == "W002"
+        with pytest.raises(ValueError):
+            futures[1].result(timeout=10)
+        writer.shutdown()
+
+        codes = {row[0] for row in db_session.query(Customer.customer_code).all()}
+        assert {"W001", "W002"} <= codes
+        assert "FAIL" not in codes
+        stats = writer.stats()
+        assert stats["batches"] == 1
+        assert stats["jobs"] == 3
+        assert stats["failed"] == 1
+
+    def test_run_write_commits_on_session_when_disabled(self, db_session, monkeypatch):
+        """書き込みキューが無効な場合は呼び出し元のセッションでコミットされることをテスト"""
+        monkeypatch.setattr(settings, "SQLITE_SINGLE_WRITER", False)
+
+        def add_customer(db):
+            customer = Customer(customer_code="W100", customer_name="顧客W100")
+            db.add(customer)
+            db.flush()
+            return customer.id
+
+        customer_id = asyncio.run(run_write(db_session, add_customer))
+        assert not db_session.in_transaction()
+        assert db_session.query(Customer).filter(Customer.id == customer_id).count() == 1
+
+
+@pytest.mark.unit
+class TestTableVersions:
+    """テーブル書き込みバージョンのテスト"""
+
+    def test_savepoint_release_does_not_bump_until_commit(self, db_session):
+        """SAVEPOINTの解放ではバージョンを進めず、外側のトランザクションのコミットで進めることをテスト"""
+        before = table_versions.get("customers")
+
+        with db_session.begin_nested():
+            db_session.add(Customer(customer_code="C_SAVEPOINT", customer_name="セーブポイント商事"))
+        assert table_versions.get("customers") == before
+
+        db_session.commit()
+        assert table_versions.get("customers") == before + 1
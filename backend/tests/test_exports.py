@@ -0,0 +1,156 @@
+"""
+一括エクスポートAPIのテスト
+"""
+import csv
+import io
+import json
+
+import pytest
+from fastapi import status
+from app.models.customer import Customer
+from app.models.product import Product
+from app.models.case import Case
+from app.models.document import Document
+
+
+@pytest.mark.unit
+class TestExports:
+    """エクスポートエンドポイントのテスト"""
+
+    @pytest.fixture
+    def test_cases(self, db_session):
+        """テスト用案件を作成"""
+        customer = Customer(
+            customer_code="C_EXP",
+            customer_name="エクスポート顧客"
+        )
+        product = Product(
+            product_code="P_EXP",
+            product_name="エクスポート商品"
+        )
+        db_session.add_all([customer, product])
+        db_session.commit()
+
+        cases = []
+        for i, (trade_type, case_status) in enumerate([("輸出", "見積中"), ("輸出", "受注済"), ("輸入", "受注済")]):
+            case = Case(
+                case_number=f"2025-EXP-{i:03d}",
+                customer_id=customer.id,
+                product_id=product.id,
+                trade_type=trade_type,
+                quantity=10,
+                unit="pcs",
+                sales_unit_price=1000,
+                purchase_unit_price=800,
+                status=case_status,
+                pic="テスト担当",
+                notes="備考,カンマ入り"
+            )
+            case.calculate_amounts()
+            db_session.add(case)
+            cases.append(case)
+        db_session.commit()
+        return cases
+
+    def test_export_cases_csv(self, client, auth_headers, test_cases):
+        """CSVはBOM付きUTF-8で、一覧と同じフィルタが適用される"""
+        response = client.get(
+            "/api/exports/cases",
+            params={"status": "受注済"},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        assert response.content.startswith(b"\xef\xbb\xbf")
+
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+        assert sorted(row["case_number"] for row in rows) == ["2025-EXP-001", "2025-EXP-002"]
+        assert rows[0]["customer_name"] == "エクスポート顧客"
+        assert rows[0]["notes"] == "備考,カンマ入り"
+
+    def test_export_cases_ndjson(self, client, auth_headers, test_cases):
+        """NDJSONは1行1件で出力される"""
+        response = client.get(
+            "/api/exports/cases",
+            params={"format": "ndjson", "search": "exp-000", "sort_order": "asc"},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 1
+        assert records[0]["case_number"] == "2025-EXP-000"
+        assert records[0]["product_name"] == "エクスポート商品"
+        assert records[0]["sales_amount"] == "10000.00"
+
+    def test_export_cases_invalid_format(self, client, auth_headers):
+        """未対応の出力形式は422エラー"""
+        response = client.get("/api/exports/cases?format=xlsx", headers=auth_headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_export_requires_auth(self, client):
+        """認証なしではエクスポートできない"""
+        response = client.get("/api/exports/cases")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_export_change_history(self, client, auth_headers, test_user, test_cases):
+        """変更履歴は履歴時点の案件番号で絞り込まれる"""
+        # エクスポートはストリーミング終了時にセッションを閉じるため、先に値を取り出しておく
+        username = test_user.username
+        client.put(
+            f"/api/cases/{test_cases[0].id}",
+            json={"quantity": 20},
+            headers=auth_headers
+        )
+        client.put(
+            f"/api/cases/{test_cases[1].id}",
+            json={"quantity": 30},
+            headers=auth_headers
+        )
+
+        response = client.get(
+            "/api/exports/change-history",
+            params={"format": "ndjson", "case_number": "exp-001"},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 1
+        assert records[0]["case_number"] == "2025-EXP-001"
+        assert records[0]["case_id"] == test_cases[1].id
+        assert records[0]["changed_by_name"] == username
+        assert records[0]["change_type"] == "UPDATE"
+
+    def test_export_documents(self, client, auth_headers, db_session, test_user, test_cases):
+        """ドキュメント履歴をフィルタ付きで出力できる"""
+        db_session.add_all([
+            Document(
+                case_id=test_cases[0].id,
+                document_type="invoice",
+                file_name="invoice.xlsx",
+                generated_by=test_user.id
+            ),
+            Document(
+                case_id=test_cases[0].id,
+                document_type="packing_list",
+                file_name="packing_list.xlsx",
+                generated_by=test_user.id
+            ),
+        ])
+        db_session.commit()
+
+        response = client.get(
+            "/api/exports/documents",
+            params={"document_type": "invoice"},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+        assert len(rows) == 1
+        assert rows[0]["file_name"] == "invoice.xlsx"
+        assert rows[0]["case_number"] == "2025-EXP-000"
+        assert rows[0]["generated_by_name"] == test_user.username
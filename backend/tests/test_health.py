@@ -28,3 +28,31 @@ class TestHealth:
         assert data["status"] == "healthy"
         assert "app_name" in data
         assert "version" in data
+
+    def test_health_reports_executor_stats(self, client, auth_headers):
+        """ログインのパスワード照合がスレッドプールで実行され、待ち状況が返されることをテスト"""
+        response = client.get("/health")
+        assert response.status_code == status.HTTP_200_OK
+        executors = response.json()["executors"]
+        assert set(executors) == {"documents", "backups", "password_hash"}
+
+        password_hash = executors["password_hash"]
+        assert password_hash["completed"] >= 1
+        assert password_hash["queued"] == 0
+        assert password_hash["active"] == 0
+        assert password_hash["wait_ms_max"] >= password_hash["wait_ms_avg"] >= 0
+
+    def test_health_reports_database_pool_stats(self, client):
+        """DB接続プールの使用状況（貸し出し数・取得待ち時間のヒストグラム）が返されることをテスト"""
+        response = client.get("/health")
+        assert response.status_code == status.HTTP_200_OK
+        pools = response.json()["database_pools"]
+        assert set(pools) == {"sync", "async"}
+
+        sync_pool = pools["sync"]
+        # 起動時の初期化処理で同期エンジンの接続を使用している
+        assert sync_pool["checkouts"] >= 1
+        assert sum(sync_pool["wait_histogram"].values()) >= 1
+        assert sync_pool["checked_out"] == 0
+        assert sync_pool["overflow"] >= 0
+        assert sync_pool["timeouts"] == 0
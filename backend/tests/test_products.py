@@ -112,3 +112,35 @@ class TestProducts:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert data["is_active"] == 0
+
+    def test_autocomplete_products(self, client, auth_headers, db_session):
+        """コード・名称・HSコードの前方一致を優先し、日本語名は途中からでも一致する"""
+        db_session.add_all([
+            Product(product_code="P300", product_name="冷凍バナナ", hs_code="0803.90"),
+            Product(product_code="P100", product_name="バナナチップス", hs_code="2008.99"),
+            Product(product_code="P200", product_name="ﾊﾞﾅﾅ ピューレ", product_name_en="Banana Puree"),
+            Product(product_code="P400", product_name="停止バナナ", is_active=0),
+        ])
+        db_session.commit()
+
+        # 全角・半角カナ、ひらがなを区別しない（前方一致 → 部分一致の順）
+        response = client.get("/api/products/autocomplete/", params={"q": "ばなな"}, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["product_code"] for item in response.json()] == ["P100", "P200", "P300"]
+
+        response = client.get("/api/products/autocomplete/", params={"q": "puree"}, headers=auth_headers)
+        assert [item["product_code"] for item in response.json()] == ["P200"]
+
+        response = client.get("/api/products/autocomplete/", params={"q": "0803"}, headers=auth_headers)
+        assert [item["product_code"] for item in response.json()] == ["P300"]
+
+        response = client.get("/api/products/autocomplete/", params={"q": "p", "limit": 2}, headers=auth_headers)
+        assert [item["product_code"] for item in response.json()] == ["P100", "P200"]
+
+        # 書き込みはインデックスに差分反映される
+        product_id = response.json()[0]["id"]
+        client.put(f"/api/products/{product_id}", json={"product_name": "マンゴーチップス"}, headers=auth_headers)
+        response = client.get("/api/products/autocomplete/", params={"q": "チップ"}, headers=auth_headers)
+        assert [item["product_name"] for item in response.json()] == ["マンゴーチップス"]
+        response = client.get("/api/products/autocomplete/", params={"q": "ばなな"}, headers=auth_headers)
+        assert [item["product_code"] for item in response.json()] == ["P200", "P300"]